@@ -3,9 +3,16 @@ API REST - FacilIAuto Platform
 FastAPI backend para sistema de recomendação multi-tenant
 """
 from fastapi import FastAPI, HTTPException, Query, File, UploadFile
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
 from typing import List, Optional
 from datetime import datetime
+import asyncio
+from collections import deque
+from itertools import islice
+import json
 import sys
 import os
 import shutil
@@ -24,10 +31,23 @@ from models.feedback import (
     RefinementResponse,
     FeedbackAction
 )
-from models.interaction import InteractionEvent, InteractionStats
+from models.interaction import InteractionEvent, InteractionStats, InteractionType
 from services.unified_recommendation_engine import UnifiedRecommendationEngine
 from services.feedback_engine import FeedbackEngine
 from services.interaction_service import InteractionService
+from services.refinement_session import RefinementSessionStore
+from services.interaction_export import (
+    EXPORT_FORMATS,
+    MEDIA_TYPES,
+    PARQUET_AVAILABLE,
+    decode_cursor,
+    encode_cursor,
+    iter_csv,
+    iter_gzip,
+    iter_json_envelope,
+    iter_ndjson,
+    iter_parquet,
+)
 from services.app_transport_validator import validator as app_transport_validator
 from services.car.fuel_price_service import fuel_price_service
 from services.context_based_recommendation_skill import create_context_skill
@@ -84,10 +104,13 @@ try:
     feedback_engine = FeedbackEngine()
     
     print("[STARTUP] Inicializando InteractionService...")
-    interaction_service = InteractionService(data_dir=os.path.join(data_dir, "interactions"))
+    # ⚡ Log append-only por padrão (INTERACTION_STORAGE_BACKEND=json|jsonl|sqlite)
+    interaction_service = InteractionService(
+        data_dir=os.getenv("INTERACTIONS_DATA_DIR") or os.path.join(data_dir, "interactions")
+    )
     
     print("[STARTUP] Inicializando Context-Based Recommendation Skill...")
-    context_skill = create_context_skill(data_dir=data_dir)
+    context_skill = create_context_skill(data_dir=data_dir, recommendation_engine=engine)
     
     print("[STARTUP] Inicializando Search Intent Classifier...")
     intent_classifier = create_intent_classifier()
@@ -99,6 +122,57 @@ except Exception as e:
     traceback.print_exc()
     raise
 
+@app.on_event("shutdown")
+def _flush_interactions():
+    """fsync das interações ainda não sincronizadas e checkpoint ao encerrar o worker"""
+    interaction_service.flush()
+
+
+# 🚦 Limite explícito de scorings simultâneos por worker
+# (excedente espera até RECOMMENDATION_QUEUE_TIMEOUT e então recebe 503)
+MAX_CONCURRENT_RECOMMENDATIONS = int(os.getenv("MAX_CONCURRENT_RECOMMENDATIONS", "16"))
+RECOMMENDATION_QUEUE_TIMEOUT = float(os.getenv("RECOMMENDATION_QUEUE_TIMEOUT", "10"))
+recommendation_slots = asyncio.Semaphore(MAX_CONCURRENT_RECOMMENDATIONS)
+
+# 📊 FASE 2: Sessões de refinamento (candidatos e justificativas entre rodadas)
+refinement_sessions = RefinementSessionStore()
+
+# 🤖 ML System: paginação da exportação de interações
+EXPORT_DEFAULT_PAGE_SIZE = 1000
+EXPORT_MAX_PAGE_SIZE = 10000
+
+
+@asynccontextmanager
+async def _recommendation_slot():
+    """Reservar uma vaga de scoring (HTTPException 503 se o worker estiver saturado)"""
+    try:
+        await asyncio.wait_for(recommendation_slots.acquire(), timeout=RECOMMENDATION_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"[API] ⚠️ Worker saturado ({MAX_CONCURRENT_RECOMMENDATIONS} scorings simultâneos)")
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, tente novamente em instantes"
+        )
+    try:
+        yield
+    finally:
+        recommendation_slots.release()
+
+
+async def _recommend_with_justifications(profile: UserProfile, limit: int, score_threshold: float):
+    """
+    Ranking (pool de CPU, dentro do limite de concorrência) + justificativas
+    (LLM async, fora do limite - já têm seu próprio limite por lote)
+    """
+    async with _recommendation_slot():
+        recommendations = await engine.arank(profile, limit=limit, score_threshold=score_threshold)
+
+    justifications = await engine.generate_justifications_batch(recommendations, profile)
+    for rec, justification in zip(recommendations, justifications):
+        rec['justificativa'] = justification
+
+    return recommendations
+
 
 @app.get("/")
 def read_root():
@@ -176,8 +250,41 @@ def get_dealership(dealership_id: str):
     raise HTTPException(status_code=404, detail="Concessionária não encontrada")
 
 
+def _list_cars_impl(
+    dealership_id: Optional[str],
+    marca: Optional[str],
+    categoria: Optional[str],
+    preco_min: Optional[float],
+    preco_max: Optional[float],
+    limit: int
+) -> List[Car]:
+    """Filtragem da listagem de carros (síncrona, roda no pool do engine)"""
+    lookup = engine.get_car_lookup()
+    
+    # ⚡ Filtros por igualdade via índices hash (interseção das linhas)
+    row_sets = []
+    if dealership_id:
+        row_sets.append(lookup.dealership_rows(dealership_id))
+    if marca:
+        row_sets.append(lookup.marca_rows(marca))
+    if categoria:
+        row_sets.append(lookup.categoria_rows(categoria))
+    
+    rows = None
+    if row_sets:
+        row_sets.sort(key=len)
+        rows = sorted(set(row_sets[0]).intersection(*row_sets[1:]))
+    
+    # ⚡ Preço e disponibilidade pelas colunas do índice: só os `limit`
+    # carros devolvidos são materializados
+    index = engine.get_inventory_index()
+    rows = index.rows_where(rows, preco_min=preco_min, preco_max=preco_max)
+    
+    return lookup.take(rows[:limit].tolist())
+
+
 @app.get("/cars", response_model=List[Car])
-def list_cars(
+async def list_cars(
     dealership_id: Optional[str] = None,
     marca: Optional[str] = None,
     categoria: Optional[str] = None,
@@ -188,28 +295,9 @@ def list_cars(
     """
     Listar carros com filtros opcionais
     """
-    cars = engine.all_cars
-    
-    # Aplicar filtros
-    if dealership_id:
-        cars = [c for c in cars if c.dealership_id == dealership_id]
-    
-    if marca:
-        cars = [c for c in cars if c.marca.lower() == marca.lower()]
-    
-    if categoria:
-        cars = [c for c in cars if c.categoria.lower() == categoria.lower()]
-    
-    if preco_min:
-        cars = [c for c in cars if c.preco >= preco_min]
-    
-    if preco_max:
-        cars = [c for c in cars if c.preco <= preco_max]
-    
-    # Apenas disponíveis
-    cars = [c for c in cars if c.disponivel]
-    
-    return cars[:limit]
+    return await engine.run_in_cpu_pool(
+        _list_cars_impl, dealership_id, marca, categoria, preco_min, preco_max, limit
+    )
 
 
 @app.get("/cars/{car_id}", response_model=Car)
@@ -217,24 +305,32 @@ def get_car(car_id: str):
     """
     Obter detalhes de um carro específico
     """
-    for car in engine.all_cars:
-        if car.id == car_id:
-            return car
+    car = engine.get_car(car_id)
+    if car is not None:
+        return car
     
     raise HTTPException(status_code=404, detail="Carro não encontrado")
 
 
-def _recommend_cars_impl(profile: UserProfile):
-    """
-    Implementação interna de recomendações (compartilhada entre rotas)
-    """
+# Top N e score mínimo das rotas de recomendação
+RECOMMENDATION_LIMIT = 5
+RECOMMENDATION_SCORE_THRESHOLD = 0.2
+
+
+def _log_recommendation_request(profile: UserProfile):
+    """Log do perfil recebido"""
     # 🐛 DEBUG: Log do perfil recebido
     print(f"\n[API] Recebendo requisição de recomendação")
     print(f"[API] Orçamento: R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}")
     print(f"[API] Ano: {profile.ano_minimo} a {profile.ano_maximo}")
     print(f"[API] Estado: {profile.state}, Cidade: {profile.city}")
     print(f"[API] Uso principal: {profile.uso_principal}")
-    
+
+
+def _validate_recommendation_profile(profile: UserProfile):
+    """
+    Validar perfil antes de recomendar (HTTPException 400 se inválido)
+    """
     # Validar orçamento
     if profile.orcamento_max < profile.orcamento_min:
         raise HTTPException(
@@ -270,137 +366,120 @@ def _recommend_cars_impl(profile: UserProfile):
                 status_code=400,
                 detail=f"monthly_income_range inválido. Opções válidas: {', '.join(valid_ranges)}"
             )
-    
-    # Gerar recomendações - os 5 melhores
-    recommendations = engine.recommend(
-        profile=profile,
-        limit=5,
-        score_threshold=0.2
-    )
-    
-    # 🐛 DEBUG: Log dos resultados
-    print(f"[API] Engine retornou {len(recommendations)} recomendações")
-    for i, rec in enumerate(recommendations[:5], 1):
-        print(f"[API]   {i}. {rec['car'].nome} ({rec['car'].ano})")
-    
-    # Requirement 2.1: Melhorar resposta quando não há recomendações
-    if len(recommendations) == 0:
-        # 🔍 DIAGNÓSTICO: Verificar se o problema é localização ou filtros
-        # Verificar se existem concessionárias no local especificado
-        has_dealerships_in_location = False
-        has_cars_in_location = False
-        
-        if profile.state:
-            # Verificar se há concessionárias no estado
-            dealerships_in_state = [
-                d for d in engine.dealerships 
-                if d.active and d.state and d.state.upper() == profile.state.upper()
-            ]
-            has_dealerships_in_location = len(dealerships_in_state) > 0
-            
-            # Se há concessionárias, verificar se há carros (ignorando orçamento)
-            if has_dealerships_in_location:
-                if profile.city:
-                    # Verificar cidade específica
-                    cars_in_city = [
-                        c for c in engine.all_cars 
-                        if c.disponivel 
-                        and c.dealership_city 
-                        and c.dealership_city.lower() == profile.city.lower()
-                        and c.dealership_state 
-                        and c.dealership_state.upper() == profile.state.upper()
-                    ]
-                    has_cars_in_location = len(cars_in_city) > 0
-                else:
-                    # Verificar estado
-                    cars_in_state = [
-                        c for c in engine.all_cars 
-                        if c.disponivel 
-                        and c.dealership_state 
-                        and c.dealership_state.upper() == profile.state.upper()
-                    ]
-                    has_cars_in_location = len(cars_in_state) > 0
-        
-        # Determinar mensagem apropriada baseada no diagnóstico
-        if profile.city and profile.state:
-            location_str = f"{profile.city}, {profile.state}"
-            
-            if not has_dealerships_in_location:
-                # Caso 1: Não há concessionárias no estado
-                print(f"[API] ⚠️ Nenhuma concessionária encontrada em {profile.state}")
-                message = f"Nenhuma concessionária disponível em {profile.state}"
-                suggestion = "Tente selecionar um estado próximo"
-            elif not has_cars_in_location:
-                # Caso 2: Há concessionárias mas não na cidade específica
-                print(f"[API] ⚠️ Nenhuma concessionária encontrada em {profile.city}")
-                message = f"Nenhuma concessionária disponível em {profile.city}"
-                suggestion = "Tente buscar em cidades próximas ou expandir para todo o estado"
-            else:
-                # Caso 3: Há concessionárias e carros, mas não na faixa de preço
-                print(f"[API] ⚠️ Há carros em {location_str}, mas não na faixa R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}")
-                message = f"Nenhum carro encontrado na faixa de R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}"
-                suggestion = "Tente expandir seu orçamento ou ajustar seus filtros"
-            
-            return {
-                "total_recommendations": 0,
-                "profile_summary": {
-                    "budget_range": f"R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}",
-                    "usage": profile.uso_principal,
-                    "location": location_str,
-                    "top_priorities": []
-                },
-                "recommendations": [],
-                "message": message,
-                "suggestion": suggestion
-            }
-        elif profile.state:
-            # Usuário especificou apenas estado
-            if not has_dealerships_in_location:
-                # Caso 1: Não há concessionárias no estado
-                print(f"[API] ⚠️ Nenhuma concessionária encontrada em {profile.state}")
-                message = f"Nenhuma concessionária disponível em {profile.state}"
-                suggestion = "Tente selecionar um estado próximo"
-            elif not has_cars_in_location:
-                # Caso 2: Há concessionárias mas sem carros disponíveis
-                print(f"[API] ⚠️ Concessionárias em {profile.state} não têm carros disponíveis")
-                message = f"Nenhum carro disponível em {profile.state}"
-                suggestion = "Tente selecionar um estado próximo ou ajustar seus filtros"
-            else:
-                # Caso 3: Há carros, mas não na faixa de preço
-                print(f"[API] ⚠️ Há carros em {profile.state}, mas não na faixa R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}")
-                message = f"Nenhum carro encontrado na faixa de R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}"
-                suggestion = "Tente expandir seu orçamento ou ajustar seus filtros"
-            
-            return {
-                "total_recommendations": 0,
-                "profile_summary": {
-                    "budget_range": f"R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}",
-                    "usage": profile.uso_principal,
-                    "location": f"{profile.city or 'N/A'}, {profile.state}",
-                    "top_priorities": []
-                },
-                "recommendations": [],
-                "message": message,
-                "suggestion": suggestion
-            }
+
+
+def _empty_recommendations_response(profile: UserProfile):
+    """
+    Resposta quando não há recomendações (Requirement 2.1)
+
+    Diagnostica se o problema é localização ou filtros/orçamento.
+    """
+    # 🔍 DIAGNÓSTICO: Verificar se o problema é localização ou filtros
+    # Verificar se existem concessionárias no local especificado
+    has_dealerships_in_location = False
+    has_cars_in_location = False
+
+    if profile.state:
+        # Verificar se há concessionárias no estado
+        dealerships_in_state = [
+            d for d in engine.dealerships 
+            if d.active and d.state and d.state.upper() == profile.state.upper()
+        ]
+        has_dealerships_in_location = len(dealerships_in_state) > 0
+
+        # Se há concessionárias, verificar se há carros (ignorando orçamento)
+        if has_dealerships_in_location:
+            # ⚡ Colunas do índice (estado em maiúsculas, cidade em minúsculas)
+            index = engine.get_inventory_index()
+            in_location = index.disponivel & index.state.equals(profile.state.upper())
+            if profile.city:
+                # Verificar cidade específica
+                in_location &= index.city.equals(profile.city.lower())
+            has_cars_in_location = bool(in_location.any())
+
+    # Determinar mensagem apropriada baseada no diagnóstico
+    if profile.city and profile.state:
+        location_str = f"{profile.city}, {profile.state}"
+
+        if not has_dealerships_in_location:
+            # Caso 1: Não há concessionárias no estado
+            print(f"[API] ⚠️ Nenhuma concessionária encontrada em {profile.state}")
+            message = f"Nenhuma concessionária disponível em {profile.state}"
+            suggestion = "Tente selecionar um estado próximo"
+        elif not has_cars_in_location:
+            # Caso 2: Há concessionárias mas não na cidade específica
+            print(f"[API] ⚠️ Nenhuma concessionária encontrada em {profile.city}")
+            message = f"Nenhuma concessionária disponível em {profile.city}"
+            suggestion = "Tente buscar em cidades próximas ou expandir para todo o estado"
         else:
-            # Usuário NÃO especificou estado - problema é com filtros/orçamento
-            print(f"[API] ⚠️ Nenhuma recomendação encontrada (sem filtro de localização)")
-            print(f"[API] Possíveis razões: orçamento muito restrito ou filtros muito específicos")
-            
-            return {
-                "total_recommendations": 0,
-                "profile_summary": {
-                    "budget_range": f"R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}",
-                    "usage": profile.uso_principal,
-                    "location": "Qualquer localização",
-                    "top_priorities": []
-                },
-                "recommendations": [],
-                "message": "Nenhum carro encontrado com os filtros selecionados",
-                "suggestion": "Tente aumentar seu orçamento ou ajustar suas preferências"
-            }
-    
+            # Caso 3: Há concessionárias e carros, mas não na faixa de preço
+            print(f"[API] ⚠️ Há carros em {location_str}, mas não na faixa R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}")
+            message = f"Nenhum carro encontrado na faixa de R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}"
+            suggestion = "Tente expandir seu orçamento ou ajustar seus filtros"
+
+        return {
+            "total_recommendations": 0,
+            "profile_summary": {
+                "budget_range": f"R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}",
+                "usage": profile.uso_principal,
+                "location": location_str,
+                "top_priorities": []
+            },
+            "recommendations": [],
+            "message": message,
+            "suggestion": suggestion
+        }
+    elif profile.state:
+        # Usuário especificou apenas estado
+        if not has_dealerships_in_location:
+            # Caso 1: Não há concessionárias no estado
+            print(f"[API] ⚠️ Nenhuma concessionária encontrada em {profile.state}")
+            message = f"Nenhuma concessionária disponível em {profile.state}"
+            suggestion = "Tente selecionar um estado próximo"
+        elif not has_cars_in_location:
+            # Caso 2: Há concessionárias mas sem carros disponíveis
+            print(f"[API] ⚠️ Concessionárias em {profile.state} não têm carros disponíveis")
+            message = f"Nenhum carro disponível em {profile.state}"
+            suggestion = "Tente selecionar um estado próximo ou ajustar seus filtros"
+        else:
+            # Caso 3: Há carros, mas não na faixa de preço
+            print(f"[API] ⚠️ Há carros em {profile.state}, mas não na faixa R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}")
+            message = f"Nenhum carro encontrado na faixa de R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}"
+            suggestion = "Tente expandir seu orçamento ou ajustar seus filtros"
+
+        return {
+            "total_recommendations": 0,
+            "profile_summary": {
+                "budget_range": f"R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}",
+                "usage": profile.uso_principal,
+                "location": f"{profile.city or 'N/A'}, {profile.state}",
+                "top_priorities": []
+            },
+            "recommendations": [],
+            "message": message,
+            "suggestion": suggestion
+        }
+    else:
+        # Usuário NÃO especificou estado - problema é com filtros/orçamento
+        print(f"[API] ⚠️ Nenhuma recomendação encontrada (sem filtro de localização)")
+        print(f"[API] Possíveis razões: orçamento muito restrito ou filtros muito específicos")
+
+        return {
+            "total_recommendations": 0,
+            "profile_summary": {
+                "budget_range": f"R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}",
+                "usage": profile.uso_principal,
+                "location": "Qualquer localização",
+                "top_priorities": []
+            },
+            "recommendations": [],
+            "message": "Nenhum carro encontrado com os filtros selecionados",
+            "suggestion": "Tente aumentar seu orçamento ou ajustar suas preferências"
+        }
+
+
+def _top_priorities(profile: UserProfile) -> List[str]:
+    """Top 3 prioridades do perfil (rótulos legíveis)"""
     # Extrair top priorities do perfil (do dicionário prioridades)
     priority_labels = {
         'economia': 'Economia',
@@ -421,76 +500,165 @@ def _recommend_cars_impl(profile: UserProfile):
         for key, value in sorted_priorities[:3] 
         if value > 0
     ]
-    
-    # Formatar resposta
+    return top_priorities
+
+
+def _format_recommendation(rec: dict, profile: UserProfile):
+    """Formatar uma recomendação do engine para a resposta da API"""
+    return {
+        "car": {
+            "id": rec['car'].id,
+            "nome": rec['car'].nome,
+            "marca": rec['car'].marca,
+            "modelo": rec['car'].modelo,
+            "ano": rec['car'].ano,
+            "preco": rec['car'].preco,
+            "quilometragem": rec['car'].quilometragem,
+            "combustivel": rec['car'].combustivel,
+            "cambio": rec['car'].cambio,
+            "cor": rec['car'].cor,
+            "portas": rec['car'].portas,
+            "categoria": rec['car'].categoria,
+            "imagens": rec['car'].imagens,
+            "disponivel": rec['car'].disponivel,
+            "destaque": rec['car'].destaque,
+            "dealership_id": rec['car'].dealership_id,
+            "dealership_name": rec['car'].dealership_name,
+            "dealership_city": rec['car'].dealership_city,
+            "dealership_state": rec['car'].dealership_state,
+            "dealership_phone": rec['car'].dealership_phone,
+            "dealership_whatsapp": rec['car'].dealership_whatsapp,
+            "score_familia": rec['car'].score_familia,
+            "score_economia": rec['car'].score_economia,
+            "score_performance": rec['car'].score_performance,
+            "score_conforto": rec['car'].score_conforto,
+            "score_seguranca": rec['car'].score_seguranca,
+            # Adicionar categorias de transporte aceitas se for transporte_passageiros
+            "app_transport_categories": (
+                app_transport_validator.get_accepted_categories(
+                    rec['car'].marca,
+                    rec['car'].modelo,
+                    rec['car'].ano
+                ) if profile.uso_principal == "transporte_passageiros" and app_transport_validator.app_vehicles_data else []
+            ) if profile.uso_principal == "transporte_passageiros" else None
+        },
+        "match_score": rec['score'],
+        "match_percentage": rec['match_percentage'],
+        "justification": rec['justificativa'],
+        # 💰 TCO Information (Requirements 1.1-1.5, 2.1-2.5)
+        "tco_breakdown": rec.get('tco_breakdown').model_dump() if rec.get('tco_breakdown') else None,
+        "fits_budget": rec.get('fits_budget'),
+        "budget_percentage": round(rec.get('budget_percentage'), 1) if rec.get('budget_percentage') is not None else None,
+        # 🚦 Financial Health Indicator (Requirements 2.1-2.5)
+        "financial_health": rec.get('financial_health')
+    }
+
+
+def _recommendations_response(profile: UserProfile, recommendations: List[dict]):
+    """Resposta com as recomendações formatadas"""
     return {
         "total_recommendations": len(recommendations),
         "profile_summary": {
             "budget_range": f"R$ {profile.orcamento_min:,.0f} - R$ {profile.orcamento_max:,.0f}",
             "usage": profile.uso_principal,
             "location": f"{profile.city or 'N/A'}, {profile.state or 'N/A'}",
-            "top_priorities": top_priorities
+            "top_priorities": _top_priorities(profile)
         },
         "recommendations": [
-            {
-                "car": {
-                    "id": rec['car'].id,
-                    "nome": rec['car'].nome,
-                    "marca": rec['car'].marca,
-                    "modelo": rec['car'].modelo,
-                    "ano": rec['car'].ano,
-                    "preco": rec['car'].preco,
-                    "quilometragem": rec['car'].quilometragem,
-                    "combustivel": rec['car'].combustivel,
-                    "cambio": rec['car'].cambio,
-                    "cor": rec['car'].cor,
-                    "portas": rec['car'].portas,
-                    "categoria": rec['car'].categoria,
-                    "imagens": rec['car'].imagens,
-                    "disponivel": rec['car'].disponivel,
-                    "destaque": rec['car'].destaque,
-                    "dealership_id": rec['car'].dealership_id,
-                    "dealership_name": rec['car'].dealership_name,
-                    "dealership_city": rec['car'].dealership_city,
-                    "dealership_state": rec['car'].dealership_state,
-                    "dealership_phone": rec['car'].dealership_phone,
-                    "dealership_whatsapp": rec['car'].dealership_whatsapp,
-                    "score_familia": rec['car'].score_familia,
-                    "score_economia": rec['car'].score_economia,
-                    "score_performance": rec['car'].score_performance,
-                    "score_conforto": rec['car'].score_conforto,
-                    "score_seguranca": rec['car'].score_seguranca,
-                    # Adicionar categorias de transporte aceitas se for transporte_passageiros
-                    "app_transport_categories": (
-                        app_transport_validator.get_accepted_categories(
-                            rec['car'].marca,
-                            rec['car'].modelo,
-                            rec['car'].ano
-                        ) if profile.uso_principal == "transporte_passageiros" and app_transport_validator.app_vehicles_data else []
-                    ) if profile.uso_principal == "transporte_passageiros" else None
-                },
-                "match_score": rec['score'],
-                "match_percentage": rec['match_percentage'],
-                "justification": rec['justificativa'],
-                # 💰 TCO Information (Requirements 1.1-1.5, 2.1-2.5)
-                "tco_breakdown": rec.get('tco_breakdown').model_dump() if rec.get('tco_breakdown') else None,
-                "fits_budget": rec.get('fits_budget'),
-                "budget_percentage": round(rec.get('budget_percentage'), 1) if rec.get('budget_percentage') is not None else None,
-                # 🚦 Financial Health Indicator (Requirements 2.1-2.5)
-                "financial_health": rec.get('financial_health')
-            }
+            _format_recommendation(rec, profile)
             for rec in recommendations
         ]
     }
 
+
+async def _recommend_cars_impl(profile: UserProfile):
+    """
+    Implementação interna de recomendações (compartilhada entre rotas)
+    """
+    _log_recommendation_request(profile)
+    _validate_recommendation_profile(profile)
+    
+    # Gerar recomendações - os 5 melhores
+    recommendations = await _recommend_with_justifications(
+        profile,
+        limit=RECOMMENDATION_LIMIT,
+        score_threshold=RECOMMENDATION_SCORE_THRESHOLD
+    )
+    
+    # 🐛 DEBUG: Log dos resultados
+    print(f"[API] Engine retornou {len(recommendations)} recomendações")
+    for i, rec in enumerate(recommendations[:5], 1):
+        print(f"[API]   {i}. {rec['car'].nome} ({rec['car'].ano})")
+    
+    # Requirement 2.1: Melhorar resposta quando não há recomendações
+    if len(recommendations) == 0:
+        return _empty_recommendations_response(profile)
+    
+    return _recommendations_response(profile, recommendations)
+
+
+def _ndjson_line(payload: dict) -> str:
+    """Serializar um evento como uma linha NDJSON"""
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False) + "\n"
+
+
+async def _recommend_cars_stream_impl(profile: UserProfile):
+    """
+    Implementação interna das recomendações em streaming (NDJSON)
+
+    Eventos, um por linha:
+    - "ranking": mesma resposta de /recommend, com "justification": null
+      (emitido logo após o scoring)
+    - "justification": {"index", "car_id", "justification"} para cada carro,
+      na ordem em que as justificativas ficam prontas
+    - "error": falha inesperada ao gerar justificativas
+    - "done": fim do stream
+    """
+    _log_recommendation_request(profile)
+    _validate_recommendation_profile(profile)
+    
+    # Scoring é CPU-bound: roda no pool do engine, dentro do limite de concorrência
+    async with _recommendation_slot():
+        recommendations = await engine.arank(
+            profile,
+            limit=RECOMMENDATION_LIMIT,
+            score_threshold=RECOMMENDATION_SCORE_THRESHOLD
+        )
+    print(f"[API] Engine ranqueou {len(recommendations)} recomendações (streaming)")
+    
+    if len(recommendations) == 0:
+        ranking = _empty_recommendations_response(profile)
+    else:
+        ranking = _recommendations_response(profile, recommendations)
+    
+    async def events():
+        yield _ndjson_line({"event": "ranking", **ranking})
+        
+        try:
+            async for index, justification in engine.iter_justifications(recommendations, profile):
+                recommendations[index]['justificativa'] = justification
+                yield _ndjson_line({
+                    "event": "justification",
+                    "index": index,
+                    "car_id": recommendations[index]['car'].id,
+                    "justification": justification
+                })
+        except Exception as e:
+            print(f"[API ERROR] streaming de justificativas: {str(e)}")
+            yield _ndjson_line({"event": "error", "detail": f"Erro ao gerar justificativas: {str(e)}"})
+        
+        yield _ndjson_line({"event": "done"})
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 @app.post("/recommend")
-def recommend_cars(profile: UserProfile):
+async def recommend_cars(profile: UserProfile):
     """
     Gerar recomendações personalizadas baseadas no perfil do usuário
     (Rota sem prefixo - mantida para compatibilidade)
     """
     try:
-        return _recommend_cars_impl(profile)
+        return await _recommend_cars_impl(profile)
     except HTTPException:
         raise
     except Exception as e:
@@ -501,7 +669,7 @@ def recommend_cars(profile: UserProfile):
 
 
 @app.get("/search/contextual")
-def contextual_search(
+async def contextual_search(
     query: str = Query(..., description="Query de busca do usuário (ex: 'carros para fazer uber')"),
     max_results: int = Query(10, description="Número máximo de resultados"),
     budget_min: Optional[float] = Query(None, description="Orçamento mínimo"),
@@ -534,15 +702,21 @@ def contextual_search(
         if location:
             user_data['location'] = location
             
-        # Obter recomendações contextuais
-        recommendations = context_skill.recommend_by_context(
-            query=query,
-            user_data=user_data,
-            max_results=max_results
-        )
+        def _search():
+            # Obter recomendações contextuais
+            recommendations = context_skill.recommend_by_context(
+                query=query,
+                user_data=user_data,
+                max_results=max_results
+            )
+            
+            # Analisar contexto para insights
+            context = context_skill.analyze_search_context(query, user_data)
+            return recommendations, context
         
-        # Analisar contexto para insights
-        context = context_skill.analyze_search_context(query, user_data)
+        # CPU-bound: pool do engine, dentro do limite de concorrência
+        async with _recommendation_slot():
+            recommendations, context = await engine.run_in_cpu_pool(_search)
         
         return {
             "query": query,
@@ -586,6 +760,8 @@ def contextual_search(
             ]
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"[API ERROR] /search/contextual: {str(e)}")
         import traceback
@@ -770,13 +946,13 @@ def validate_app_transport(
 
 
 @app.post("/api/recommend")
-def recommend_cars_api(profile: UserProfile):
+async def recommend_cars_api(profile: UserProfile):
     """
     Gerar recomendações personalizadas baseadas no perfil do usuário
     (Rota com prefixo /api - nova rota para produção)
     """
     try:
-        return _recommend_cars_impl(profile)
+        return await _recommend_cars_impl(profile)
     except HTTPException:
         raise
     except Exception as e:
@@ -786,20 +962,51 @@ def recommend_cars_api(profile: UserProfile):
         raise HTTPException(status_code=500, detail=f"Erro ao gerar recomendações: {str(e)}")
 
 
+@app.post("/recommend/stream")
+async def recommend_cars_stream(profile: UserProfile):
+    """
+    Recomendações em streaming (NDJSON): ranking imediato, justificativas
+    conforme ficam prontas
+    (Rota sem prefixo - mantida para compatibilidade)
+    """
+    try:
+        return await _recommend_cars_stream_impl(profile)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[API ERROR] /recommend/stream: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar recomendações: {str(e)}")
+
+
+@app.post("/api/recommend/stream")
+async def recommend_cars_stream_api(profile: UserProfile):
+    """
+    Recomendações em streaming (NDJSON): ranking imediato, justificativas
+    conforme ficam prontas
+    (Rota com prefixo /api - nova rota para produção)
+    """
+    try:
+        return await _recommend_cars_stream_impl(profile)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"[API ERROR] /api/recommend/stream: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar recomendações: {str(e)}")
+
+
 def _get_platform_stats_impl():
     """Implementação interna de estatísticas da plataforma"""
     print(f"[API] Obtendo estatísticas da plataforma")
     stats = engine.get_stats()
     
-    # Calcular preços
-    prices = [car.preco for car in engine.all_cars if car.disponivel]
-    avg_price = sum(prices) / len(prices) if prices else 0
-    
-    # Agrupar por marca
-    cars_by_brand = {}
-    for car in engine.all_cars:
-        if car.disponivel:
-            cars_by_brand[car.marca] = cars_by_brand.get(car.marca, 0) + 1
+    # ⚡ Preços e marcas dos disponíveis, pré-agregados no índice
+    summary = engine.get_inventory_index().summary()
+    prices = summary["prices"]
+    cars_by_brand = dict(summary["cars_by_brand"])
     
     print(f"[API] Stats: {stats['available_cars']} carros disponíveis, {stats['active_dealerships']} concessionárias ativas")
     
@@ -808,10 +1015,10 @@ def _get_platform_stats_impl():
         "active_dealerships": stats['active_dealerships'],
         "total_cars": stats['total_cars'],
         "available_cars": stats['available_cars'],
-        "avg_price": round(avg_price, 2),
+        "avg_price": round(prices["avg"], 2),
         "price_range": {
-            "min": min(prices) if prices else 0,
-            "max": max(prices) if prices else 0
+            "min": prices["min"],
+            "max": prices["max"]
         },
         "cars_by_category": stats['cars_by_category'],
         "cars_by_brand": cars_by_brand,
@@ -858,8 +1065,7 @@ def list_categories():
     """
     Listar categorias de carros disponíveis
     """
-    categories = set(car.categoria for car in engine.all_cars if car.disponivel)
-    return sorted(list(categories))
+    return list(engine.get_inventory_index().summary()["categories"])
 
 
 @app.get("/brands")
@@ -867,8 +1073,7 @@ def list_brands():
     """
     Listar marcas de carros disponíveis
     """
-    brands = set(car.marca for car in engine.all_cars if car.disponivel)
-    return sorted(list(brands))
+    return list(engine.get_inventory_index().summary()["brands"])
 
 
 @app.get("/brands-models")
@@ -886,22 +1091,11 @@ def list_brands_with_models():
         "Chevrolet": ["Onix", "Tracker", "S10"]
     }
     """
-    from collections import defaultdict
-    
-    brands_models = defaultdict(set)
-    
-    # Agrupar modelos por marca
-    for car in engine.all_cars:
-        if car.disponivel:
-            brands_models[car.marca].add(car.modelo)
-    
-    # Converter sets para listas ordenadas
-    result = {
-        marca: sorted(list(modelos))
-        for marca, modelos in sorted(brands_models.items())
+    # ⚡ Pares marca/modelo dos disponíveis, pré-agregados no índice
+    return {
+        marca: list(modelos)
+        for marca, modelos in engine.get_inventory_index().summary()["brands_models"].items()
     }
-    
-    return result
 
 
 # ========================================
@@ -918,17 +1112,14 @@ async def upload_car_image(
     Upload de imagem para um carro específico
     """
     # Validar se carro existe e pertence à concessionária
-    car_found = None
-    for car in engine.all_cars:
-        if car.id == car_id:
-            if car.dealership_id != dealership_id:
-                raise HTTPException(status_code=403, detail="Carro não pertence a esta concessionária")
-            car_found = car
-            break
+    car_found = engine.get_car(car_id)
     
     if not car_found:
         raise HTTPException(status_code=404, detail="Carro não encontrado")
     
+    if car_found.dealership_id != dealership_id:
+        raise HTTPException(status_code=403, detail="Carro não pertence a esta concessionária")
+    
     # Validar tipo de arquivo
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Arquivo deve ser uma imagem")
@@ -1044,7 +1235,7 @@ def submit_feedback_api(feedback: UserFeedback):
 
 
 @app.post("/refine-recommendations")
-def refine_recommendations(request: RefinementRequest):
+async def refine_recommendations(request: RefinementRequest):
     """
     💻 Tech Lead + 📊 Data Analyst (FASE 2): Refinar recomendações baseado em feedback
     
@@ -1084,12 +1275,22 @@ def refine_recommendations(request: RefinementRequest):
             weight_adjustment
         )
         
-        # Gerar novas recomendações com perfil ajustado
-        recommendations = engine.recommend(
-            updated_profile,
-            limit=10,
-            score_threshold=0.3  # Mais permissivo para feedback
+        # ⚡ Gerar novas recomendações com perfil ajustado, reaproveitando a
+        # sessão: se só as prioridades mudaram, não refaz filtros/TCO e só
+        # gera justificativas para carros que entraram no top N
+        session = refinement_sessions.get_or_create(
+            request.user_id,
+            request.session_id or "default_session"
         )
+        async with _recommendation_slot():
+            recommendations = await engine.run_in_cpu_pool(
+                session.rank,
+                engine,
+                updated_profile,
+                limit=10,
+                score_threshold=0.3  # Mais permissivo para feedback
+            )
+        await session.justify(engine, recommendations, updated_profile)
         
         # Verificar convergência
         converged, best_score = feedback_engine.check_convergence(
@@ -1317,7 +1518,16 @@ async def get_ml_stats():
 
 @app.get("/api/ml/export-data")
 async def export_ml_data(
-    limit: Optional[int] = Query(None, description="Limitar número de interações retornadas")
+    limit: Optional[int] = Query(None, ge=1, description="Limitar às últimas N interações"),
+    export_format: str = Query("json", alias="format", description="json | ndjson | csv | parquet"),
+    cursor: Optional[str] = Query(None, description="Cursor devolvido pela página anterior"),
+    page_size: Optional[int] = Query(
+        None, ge=1, le=EXPORT_MAX_PAGE_SIZE, description="Interações por página (ativa a paginação)"
+    ),
+    since: Optional[datetime] = Query(None, description="Início do período (inclusivo)"),
+    until: Optional[datetime] = Query(None, description="Fim do período (exclusivo)"),
+    interaction_type: Optional[List[InteractionType]] = Query(None, description="Filtrar por tipo"),
+    compress: bool = Query(False, alias="gzip", description="Comprimir a resposta com gzip")
 ):
     """
     🤖 ML System: Exportar dados de interações para análise
@@ -1325,48 +1535,113 @@ async def export_ml_data(
     Permite download dos dados coletados para análise offline
     ou treinamento de modelos.
     
+    ⚡ A resposta é gerada em streaming a partir do backend de armazenamento
+    (memória constante, independente do volume). Com `page_size`, devolve uma
+    página e o cursor da próxima no header X-Next-Cursor (e em `next_cursor`
+    no formato json).
+    
     Args:
-        limit: Número máximo de interações a retornar (None = todas)
+        limit: Número máximo de interações a retornar (últimas N; None = todas)
+        format: json (envelope legado), ndjson, csv ou parquet
+        cursor: Continuar a partir da página anterior
+        page_size: Tamanho da página
+        since/until: Período [since, until)
+        interaction_type: Tipos de interação a incluir
+        gzip: Comprimir a resposta (Content-Encoding: gzip)
         
     Returns:
-        Dados de interações em formato JSON
+        Dados de interações no formato escolhido
     """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato inválido: {export_format} (use {', '.join(EXPORT_FORMATS)})"
+        )
+    if export_format == "parquet" and not PARQUET_AVAILABLE:
+        raise HTTPException(
+            status_code=501,
+            detail="Exportação Parquet requer pyarrow instalado no servidor"
+        )
+    if limit is not None and (cursor is not None or page_size is not None):
+        raise HTTPException(
+            status_code=400,
+            detail="Use limit ou cursor/page_size, não ambos"
+        )
+
+    backend = interaction_service.storage.name
     try:
-        # Obter todas as interações
-        interactions = interaction_service.get_all_interactions()
-        
-        # Aplicar limite se especificado
-        if limit:
-            interactions = interactions[-limit:]  # Últimas N interações
-        
-        # Obter estatísticas
-        stats = interaction_service.get_stats()
-        
-        return {
-            "status": "success",
-            "exported_at": datetime.now().isoformat(),
-            "total_interactions": len(interactions),
-            "data": {
-                "interactions": interactions,
-                "statistics": {
-                    "total": stats.total_interactions,
-                    "by_type": {
-                        "click": stats.click_count,
-                        "view_details": stats.view_details_count,
-                        "whatsapp_contact": stats.whatsapp_contact_count
-                    },
-                    "unique_sessions": stats.unique_sessions,
-                    "unique_cars": stats.unique_cars,
-                    "avg_duration_seconds": stats.avg_duration_seconds
-                }
-            },
-            "metadata": {
-                "version": "1.0",
-                "format": "json",
-                "encoding": "utf-8"
+        after = decode_cursor(cursor, backend) if cursor is not None else None
+        if after is not None and not interaction_service.storage.is_valid_position(after):
+            raise ValueError("Cursor inválido para este armazenamento")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    types = {t.value for t in interaction_type} if interaction_type else None
+
+    def _scan():
+        return interaction_service.scan_interactions(
+            after=after, since=since, until=until, interaction_types=types
+        )
+
+    def _collect_page():
+        # Uma interação a mais só para saber se existe próxima página
+        scan = _scan()
+        try:
+            page = list(islice(scan, page_size + 1))
+        finally:
+            scan.close()
+        next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            next_cursor = encode_cursor(backend, page[-1][0])
+        return [record for _, record in page], next_cursor
+
+    def _collect_last():
+        return list(deque((record for _, record in _scan()), maxlen=limit))
+
+    try:
+        next_cursor = None
+        if page_size is not None or cursor is not None:
+            page_size = page_size or EXPORT_DEFAULT_PAGE_SIZE
+            records, next_cursor = await asyncio.to_thread(_collect_page)
+        elif limit is not None:
+            records = await asyncio.to_thread(_collect_last)
+        else:
+            records = (record for _, record in _scan())
+
+        if export_format == "json":
+            stats = interaction_service.get_stats()
+            statistics = {
+                "total": stats.total_interactions,
+                "by_type": {
+                    "click": stats.click_count,
+                    "view_details": stats.view_details_count,
+                    "whatsapp_contact": stats.whatsapp_contact_count
+                },
+                "unique_sessions": stats.unique_sessions,
+                "unique_cars": stats.unique_cars,
+                "avg_duration_seconds": stats.avg_duration_seconds
             }
-        }
-    
+            body = iter_json_envelope(records, statistics, next_cursor)
+        elif export_format == "ndjson":
+            body = iter_ndjson(records)
+        elif export_format == "csv":
+            body = iter_csv(records)
+        else:
+            body = iter_parquet(records)
+
+        headers = {}
+        if export_format != "json":
+            filename = f"interactions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+        if compress:
+            body = iter_gzip(body)
+            headers["Content-Encoding"] = "gzip"
+
+        return StreamingResponse(body, media_type=MEDIA_TYPES[export_format], headers=headers)
+
     except Exception as e:
         raise HTTPException(
             status_code=500,
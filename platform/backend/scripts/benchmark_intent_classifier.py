@@ -0,0 +1,126 @@
+"""
+⚡ Benchmark do SearchIntentClassifier
+
+Compara, sobre um corpus de buscas reais (e seus prefixos, como chegam
+digitando no campo de busca):
+- legado: re.findall/re.finditer por padrão, como antes da pré-compilação
+- compilado: padrões pré-compilados + alternação por intenção, sem cache
+- com cache: LRU de análises recentes (INTENT_CACHE_SIZE)
+
+Uso:
+    python scripts/benchmark_intent_classifier.py [--rounds 20]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import re
+import time
+
+from services.search_intent_classifier import SearchIntentClassifier
+
+
+SEARCH_CORPUS = [
+    "preciso de um carro para fazer uber",
+    "carro para uber e 99 economico",
+    "quero trabalhar como motorista de app",
+    "carro pra renda extra com corridas",
+    "Toyota Corolla para trabalho diário",
+    "carro economico para ir ao trabalho todo dia",
+    "gasta pouco para usar todos os dias",
+    "SUV para família com crianças pequenas",
+    "carro com isofix para cadeirinha de bebe",
+    "sedan espaçoso para familia",
+    "pickup para entregas na minha empresa",
+    "strada ou saveiro para frete",
+    "fiorino para carregar mercadoria",
+    "van para comercio",
+    "meu primeiro carro, algo econômico",
+    "carro facil de dirigir para iniciante",
+    "acabei de tirar a cnh, carro basico",
+    "carro para viajar no fim de semana",
+    "suv 4x4 para trilha e aventura",
+    "hilux para lazer e passeio na praia",
+    "Honda Civic 2020 até 80 mil reais",
+    "hb20 2019 flex",
+    "onix plus automatico",
+    "jeep compass diesel",
+    "kicks ou creta",
+    "hatch flex barato de manter R$ 45.000",
+    "carro hibrido economico",
+    "byd eletrico",
+    "polo 2022 até 90.000 reais",
+    "sedan automatico confortavel e moderno",
+]
+
+
+def legacy_classify(classifier, query):
+    """Caminho antigo: cada padrão passa por re.findall/re.finditer"""
+    query_lower = query.lower()
+    for patterns in classifier.intent_patterns.values():
+        for group in ('primary_patterns', 'context_patterns', 'negative_patterns'):
+            for pattern in patterns.get(group, []):
+                re.findall(pattern, query_lower, re.IGNORECASE)
+    for config in classifier.entity_patterns.values():
+        for match in re.finditer(config['pattern'], query, re.IGNORECASE):
+            config['extract_func'](match.group())
+    classifier._extract_keywords(query_lower)
+
+
+def typing_queries(corpus):
+    """Prefixos por palavra de cada busca (sequência do type-ahead)"""
+    queries = []
+    for query in corpus:
+        words = query.split()
+        queries.extend(" ".join(words[:n]) for n in range(1, len(words) + 1))
+    return queries
+
+
+def timed(func, queries, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (rounds * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do SearchIntentClassifier")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    queries = typing_queries(SEARCH_CORPUS)
+    uncached = SearchIntentClassifier(cache_size=0)
+    cached = SearchIntentClassifier()
+
+    print("=" * 60)
+    print("⚡ BENCHMARK: SearchIntentClassifier")
+    print("=" * 60)
+    print(f"Corpus: {len(SEARCH_CORPUS)} buscas, {len(queries)} queries de type-ahead")
+
+    legacy_matching = timed(lambda q: legacy_classify(uncached, q), queries, args.rounds)
+    compiled_matching = timed(
+        lambda q: (
+            uncached._calculate_intent_scores(q.lower()),
+            uncached._extract_all_entities(q),
+            uncached._extract_keywords(q.lower()),
+        ),
+        queries, args.rounds
+    )
+    full = timed(uncached.classify_intent, queries, args.rounds)
+    with_cache = timed(cached.classify_intent, queries, args.rounds)
+
+    for label, micros in (
+        ("Matching legado", legacy_matching),
+        ("Matching pré-compilado", compiled_matching),
+        ("classify_intent (sem cache)", full),
+        ("classify_intent (com cache)", with_cache),
+    ):
+        print(f"  {label + ':':<30}{micros:8.1f} µs/query")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
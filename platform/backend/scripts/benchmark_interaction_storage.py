@@ -0,0 +1,110 @@
+"""
+⚡ Benchmark de escrita dos backends de interações
+
+Mede eventos/s de save_interaction para cada backend (json legado,
+jsonl append-only e sqlite) com um volume crescente já armazenado,
+evidenciando o custo O(N) por escrita do formato legado, e a latência de
+get_stats (varredura no legado, agregados incrementais nos demais).
+
+Uso:
+    python scripts/benchmark_interaction_storage.py [--events 200] [--prefill 0 2000]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import tempfile
+import time
+from typing import Tuple
+
+from models.interaction import InteractionEvent, InteractionType, UserPreferencesSnapshot
+from services.interaction_service import InteractionService
+from services.interaction_storage import JSONFileStorage, format_interaction_id
+
+
+def make_event(i: int) -> InteractionEvent:
+    return InteractionEvent(
+        session_id=f"sess_{i % 200}",
+        car_id=f"car_{i % 80}",
+        interaction_type=InteractionType.CLICK,
+        user_preferences=UserPreferencesSnapshot(
+            budget=100000,
+            usage="familia",
+            priorities=["economia", "seguranca"]
+        ),
+        recommendation_position=1 + i % 5,
+        score=0.8
+    )
+
+
+def prefill_storage(service: InteractionService, count: int):
+    """Gravar `count` eventos de base (o JSON legado é escrito de uma vez)"""
+    records = [service._event_to_dict(make_event(i)) for i in range(count)]
+
+    if isinstance(service.storage, JSONFileStorage):
+        for seq, record in enumerate(records, start=1):
+            record["id"] = format_interaction_id(seq)
+        with open(service.storage.path, "w", encoding="utf-8") as f:
+            json.dump({
+                "interactions": records,
+                "metadata": {"total_count": len(records), "version": "1.0"}
+            }, f, indent=2, ensure_ascii=False)
+        return
+
+    for record in records:
+        service.storage.append(record)
+
+
+def bench(backend: str, events: int, prefill: int) -> Tuple[float, float]:
+    """(eventos/s, ms por get_stats) após `prefill` eventos já gravados"""
+    data_dir = tempfile.mkdtemp(prefix="facilIAuto_interactions_")
+    try:
+        # Silenciar os prints por evento
+        with contextlib.redirect_stdout(io.StringIO()):
+            service = InteractionService(data_dir=data_dir, backend=backend)
+            prefill_storage(service, prefill)
+
+            start = time.perf_counter()
+            for i in range(events):
+                service.save_interaction(make_event(prefill + i))
+            service.flush()
+            elapsed = time.perf_counter() - start
+
+            stats_start = time.perf_counter()
+            for _ in range(20):
+                service.get_stats()
+            stats_ms = (time.perf_counter() - stats_start) * 1000 / 20
+
+            service.close()
+        return events / elapsed, stats_ms
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escrita de interações")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--prefill", type=int, nargs="+", default=[0, 2000])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("⚡ BENCHMARK DE ESCRITA: backends de interações")
+    print("=" * 60)
+
+    for prefill in args.prefill:
+        print(f"\nCom {prefill} interações já armazenadas ({args.events} novas):")
+        for backend in ("json", "jsonl", "sqlite"):
+            rate, stats_ms = bench(backend, args.events, prefill)
+            print(f"  {backend:<7} {rate:>10.0f} eventos/s   get_stats {stats_ms:>8.2f}ms")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+⚡ Benchmark de memória: inventário privado vs compartilhado entre workers
+
+Simula N workers (processos) construindo o UnifiedRecommendationEngine sobre
+um inventário ampliado (dealerships.json replicado) e mede o RSS privado de cada
+um após o start e após uma recomendação. Com INVENTORY_SHARED_MEMORY=true o
+RSS privado de start por worker deve ficar estável conforme o inventário
+cresce; o que sobra após a recomendação é working set do scoring (TCOCache,
+limitado por TCO_CACHE_SIZE).
+
+Uso:
+    python scripts/benchmark_shared_inventory.py [--workers 4] [--scales 1 10 50]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import shutil
+import tempfile
+
+
+def _rss_mb() -> float:
+    """
+    RSS privado (anônimo) do processo (Linux: /proc/self/status)
+
+    Páginas dos arquivos mapeados (RssFile) são compartilhadas entre os
+    workers e não entram na conta.
+    """
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _worker(data_dir: str, shared: bool, queue):
+    os.environ["INVENTORY_SHARED_MEMORY"] = "true" if shared else "false"
+    os.environ["INVENTORY_SNAPSHOT_ENABLED"] = "false"
+
+    from services.unified_recommendation_engine import UnifiedRecommendationEngine
+    from models.user_profile import UserProfile
+
+    baseline = _rss_mb()
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = UnifiedRecommendationEngine(data_dir=data_dir, use_llm=False)
+    startup = _rss_mb() - baseline
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.rank(UserProfile(
+            orcamento_min=30000,
+            orcamento_max=150000,
+            uso_principal="familia",
+            prioridades={"economia": 4, "espaco": 5, "seguranca": 5}
+        ), limit=10)
+
+    queue.put((len(engine.all_cars), startup, _rss_mb() - baseline))
+
+
+def build_data_dir(scale: int) -> str:
+    """Copiar dealerships.json replicando os carros `scale` vezes"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(backend_dir, "data", "dealerships.json"), encoding="utf-8") as f:
+        dealerships = json.load(f)
+
+    for dealership in dealerships:
+        dealership["carros"] = [
+            {**car, "id": f"{car['id']}_{copy}"}
+            for copy in range(scale)
+            for car in dealership["carros"]
+        ]
+
+    data_dir = tempfile.mkdtemp(prefix="facilIAuto_bench_")
+    with open(os.path.join(data_dir, "dealerships.json"), "w", encoding="utf-8") as f:
+        json.dump(dealerships, f, ensure_ascii=False)
+    return data_dir
+
+
+def run(data_dir: str, workers: int, shared: bool):
+    """Subir workers em sequência (o primeiro publica, os demais anexam)"""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    results = []
+
+    for _ in range(workers):
+        process = ctx.Process(target=_worker, args=(data_dir, shared, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memória do inventário")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("⚡ BENCHMARK DE MEMÓRIA: inventário privado vs compartilhado")
+    print("=" * 60)
+
+    for scale in args.scales:
+        data_dir = build_data_dir(scale)
+        try:
+            private = run(data_dir, args.workers, shared=False)
+            shared = run(data_dir, args.workers, shared=True)
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+        print(f"\nInventário: {private[0][0]} carros (x{scale})")
+        for label, results in (("privado", private), ("compartilhado", shared)):
+            # O primeiro worker carrega/publica; os extras são os que importam
+            extras = results[1:] or results
+            startup_mb = sum(r[1] for r in extras) / len(extras)
+            ranked_mb = sum(r[2] for r in extras) / len(extras)
+            print(
+                f"  RSS por worker extra ({label}): "
+                f"{startup_mb:.1f} MB no start, {ranked_mb:.1f} MB após recomendar"
+            )
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
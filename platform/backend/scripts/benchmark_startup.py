@@ -0,0 +1,68 @@
+"""
+⚡ Benchmark de start do engine: caminho completo vs snapshot binário
+
+Mede o tempo de construção do UnifiedRecommendationEngine:
+- frio: dealerships.json + validação Pydantic + métricas (sem snapshot)
+- quente: carga do snapshot binário em data/cache
+
+Uso:
+    python scripts/benchmark_startup.py [--runs 5] [--data-dir data]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from services.unified_recommendation_engine import UnifiedRecommendationEngine
+
+
+def time_startup(data_dir: str, runs: int, use_snapshot: bool) -> list:
+    """Tempos (ms) de construção do engine"""
+    os.environ["INVENTORY_SNAPSHOT_ENABLED"] = "true" if use_snapshot else "false"
+    times = []
+
+    for _ in range(runs):
+        # Silenciar os prints de carga
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            engine = UnifiedRecommendationEngine(data_dir=data_dir, use_llm=False)
+            times.append((time.perf_counter() - start) * 1000)
+        engine.cpu_executor.shutdown(wait=False)
+
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de start do engine")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--data-dir", default="data")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("⚡ BENCHMARK DE START: caminho completo vs snapshot")
+    print("=" * 60)
+
+    # Garantir snapshot atualizado antes das medições quentes
+    time_startup(args.data_dir, 1, use_snapshot=True)
+
+    cold = time_startup(args.data_dir, args.runs, use_snapshot=False)
+    warm = time_startup(args.data_dir, args.runs, use_snapshot=True)
+
+    cold_median = statistics.median(cold)
+    warm_median = statistics.median(warm)
+
+    print(f"\nExecuções por modo: {args.runs}")
+    print(f"Caminho completo (mediana): {cold_median:.1f}ms")
+    print(f"Snapshot binário (mediana): {warm_median:.1f}ms")
+    print(f"Speedup: {cold_median / warm_median:.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+🤖 ML System: Migração do user_interactions.json legado
+
+Copia as interações do arquivo JSON único para o backend append-only
+(jsonl) ou SQLite. Os IDs são reatribuídos na mesma ordem
+(int_000001, ...), corrigindo duplicados deixados por gravações
+concorrentes do formato antigo.
+
+Uso:
+    python scripts/migrate_interactions.py --backend jsonl [--data-dir data/interactions]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from pathlib import Path
+
+from services.interaction_storage import create_storage, migrate_legacy_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrar interações do JSON legado")
+    parser.add_argument("--backend", choices=["jsonl", "sqlite"], default="jsonl")
+    parser.add_argument("--data-dir", default="data/interactions")
+    parser.add_argument("--force", action="store_true", help="Migrar mesmo se o destino já tiver dados")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    legacy_file = data_dir / "user_interactions.json"
+    if not legacy_file.exists():
+        print(f"[ERRO] Arquivo legado não encontrado: {legacy_file}")
+        sys.exit(1)
+
+    storage = create_storage(args.backend, data_dir)
+    try:
+        existing = storage.count()
+        if existing and not args.force:
+            print(f"[ERRO] Destino {storage.path} já tem {existing} interações (use --force)")
+            sys.exit(1)
+
+        migrated = migrate_legacy_json(legacy_file, storage)
+        print(f"[OK] {migrated} interações migradas para {storage.path}")
+        print(f"[OK] Total no destino: {storage.count()}")
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -25,13 +25,13 @@ def reclassify_file(filepath):
     
     # Se for lista de carros diretamente
     if isinstance(data, list) and len(data) > 0 and 'nome' in data[0]:
-        for car in data:
+        # ⚡ Uma varredura para o arquivo inteiro
+        categories = classifier.classify_many(
+            {'nome': car['nome'], 'modelo': car.get('modelo', car['nome']), 'ano': car.get('ano')}
+            for car in data
+        )
+        for car, new_cat in zip(data, categories):
             old_cat = car.get('categoria', '')
-            new_cat = classifier.classify(
-                car['nome'], 
-                car.get('modelo', car['nome']),
-                car.get('ano')
-            )
             
             # Filtrar motos (não devem estar no estoque de carros)
             if new_cat == 'Moto':
@@ -51,31 +51,30 @@ def reclassify_file(filepath):
     
     # Se for lista de concessionárias com carros
     elif isinstance(data, list) and len(data) > 0 and 'carros' in data[0]:
-        for dealership in data:
-            for car in dealership.get('carros', []):
-                old_cat = car.get('categoria', '')
-                new_cat = classifier.classify(
-                    car['nome'], 
-                    car.get('modelo', car['nome']),
-                    car.get('ano')
-                )
-                
-                # Filtrar motos
-                if new_cat == 'Moto':
-                    print(f"⚠️  MOTO DETECTADA (será mantida mas marcada): {car['nome']}")
-                    car['categoria'] = 'Moto'
-                    car['disponivel'] = False
-                
-                if old_cat != new_cat:
-                    car['categoria'] = new_cat
-                    changed += 1
-                    examples.append({
-                        'nome': car['nome'],
-                        'ano': car.get('ano', 'N/A'),
-                        'old': old_cat,
-                        'new': new_cat
-                    })
-    
+        cars = [car for dealership in data for car in dealership.get('carros', [])]
+        categories = classifier.classify_many(
+            {'nome': car['nome'], 'modelo': car.get('modelo', car['nome']), 'ano': car.get('ano')}
+            for car in cars
+        )
+        for car, new_cat in zip(cars, categories):
+            old_cat = car.get('categoria', '')
+            
+            # Filtrar motos
+            if new_cat == 'Moto':
+                print(f"⚠️  MOTO DETECTADA (será mantida mas marcada): {car['nome']}")
+                car['categoria'] = 'Moto'
+                car['disponivel'] = False
+            
+            if old_cat != new_cat:
+                car['categoria'] = new_cat
+                changed += 1
+                examples.append({
+                    'nome': car['nome'],
+                    'ano': car.get('ano', 'N/A'),
+                    'old': old_cat,
+                    'new': new_cat
+                })
+
     # Salvar arquivo
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
@@ -8,6 +8,7 @@ Estrutura:
 - BaseAgent: Classe base abstrata para todos os agentes
 - CacheManager: Sistema de cache em múltiplas camadas
 - ScoringAgentOrchestrator: Coordenador central de agentes
+  (por carro ou em lote: calculate_advanced_scores_batch)
 
 Agentes especializados (implementados em sprints futuros):
 - EconomyAgent: Score de economia baseado em consumo real
@@ -6,8 +6,10 @@ especializados de cálculo de score.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+import hashlib
+import json
 import logging
 import time
 
@@ -18,14 +20,52 @@ from models.user_profile import UserProfile
 logger = logging.getLogger(__name__)
 
 
+# Versão do formato das chaves de cache (muda a derivação de todas as chaves)
+CACHE_KEY_SCHEMA = 2
+
+
+def _canonical(value: Any) -> Any:
+    """Valor em forma estável para JSON (modelos, conjuntos, objetos simples)"""
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if hasattr(value, '__dict__'):
+        return _canonical(vars(value))
+    return str(value)
+
+
+def _fields_payload(obj: Any, fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Campos lidos pelo agente (None = objeto inteiro)"""
+    if fields is None:
+        data = _canonical(obj)
+        return data if isinstance(data, dict) else {"value": data}
+    return {field: _canonical(getattr(obj, field, None)) for field in fields}
+
+
 class BaseAgent(ABC):
     """
     Classe base abstrata para agentes de scoring
 
     Todos os agentes especializados (EconomyAgent, MaintenanceAgent, etc.)
     devem herdar desta classe e implementar o método calculate_score().
+
+    Chave de cache: subclasses declaram os campos que realmente leem do
+    perfil (PROFILE_KEY_FIELDS) e do carro (CAR_KEY_FIELDS), e incrementam
+    CACHE_KEY_VERSION quando a fórmula muda (entradas antigas deixam de
+    ser encontradas). None = perfil inteiro.
     """
 
+    CACHE_KEY_VERSION = 1
+    PROFILE_KEY_FIELDS: Optional[Tuple[str, ...]] = None
+    CAR_KEY_FIELDS: Tuple[str, ...] = ()
+
     def __init__(self, cache_manager=None, name: str = None):
         """
         Inicializa o agente base
@@ -71,6 +111,28 @@ class BaseAgent(ABC):
             f"{self.name} deve implementar o método calculate_score()"
         )
 
+    async def calculate_scores_batch(
+        self,
+        cars: List[Car],
+        profile: UserProfile
+    ) -> List[float]:
+        """
+        Calcula scores de vários carros para o mesmo perfil (opcional)
+
+        Implementação padrão: calculate_score() carro a carro. Agentes
+        baseados em tabelas podem sobrescrever com uma versão vetorizada
+        sobre todo o conjunto de candidatos. O resultado deve ser idêntico
+        ao de calculate_score() para cada carro.
+
+        Args:
+            cars: Veículos a serem avaliados
+            profile: Perfil do usuário
+
+        Returns:
+            List[float]: Scores entre 0.0 e 1.0, na ordem de cars
+        """
+        return [await self.calculate_score(car, profile) for car in cars]
+
     async def calculate_score_with_cache(
         self,
         car: Car,
@@ -149,7 +211,11 @@ class BaseAgent(ABC):
         """
         Constrói chave de cache única para este carro e perfil
 
-        Formato: {agent_name}:{car_id}:{profile_hash}
+        Formato: {agent_name}:v{versão}:{car_id}:{digest}
+
+        O digest é BLAKE2b sobre uma codificação canônica (JSON ordenado) dos
+        campos declarados do perfil e do carro, então a chave é a mesma em
+        todos os workers (o hash() do Python muda a cada processo).
 
         Args:
             car: Veículo
@@ -158,15 +224,57 @@ class BaseAgent(ABC):
         Returns:
             str: Chave de cache única
         """
-        # Hash do perfil (simplificado - apenas campos relevantes)
-        profile_hash = hash((
-            profile.uso_principal,
-            profile.orcamento_min,
-            profile.orcamento_max,
-            getattr(profile, 'state', 'SP')
-        ))
-
-        return f"{self.name}:{car.id}:{profile_hash}"
+        return self._build_cache_keys([car], profile)[0]
+
+    def _build_cache_keys(self, cars: List[Car], profile: UserProfile) -> List[str]:
+        """
+        Chaves de cache de vários carros para o mesmo perfil
+
+        A parte do perfil é codificada uma única vez.
+
+        Args:
+            cars: Veículos
+            profile: Perfil do usuário
+
+        Returns:
+            List[str]: Chaves na ordem de cars
+        """
+        prefix = json.dumps(
+            {
+                "schema": CACHE_KEY_SCHEMA,
+                "agent": self.name,
+                "version": self.CACHE_KEY_VERSION,
+                "context": _canonical(self._get_cache_key_context()),
+                "profile": _fields_payload(profile, self.PROFILE_KEY_FIELDS),
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False
+        )
+
+        keys = []
+        for car in cars:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(prefix.encode("utf-8"))
+            digest.update(b"|")
+            digest.update(json.dumps(
+                [car.id, _fields_payload(car, self.CAR_KEY_FIELDS)],
+                sort_keys=True,
+                separators=(",", ":"),
+                ensure_ascii=False
+            ).encode("utf-8"))
+            keys.append(
+                f"{self.name}:v{self.CACHE_KEY_VERSION}:{car.id}:{digest.hexdigest()}"
+            )
+        return keys
+
+    def _get_cache_key_context(self) -> Any:
+        """
+        Dados do próprio agente que alteram o score (ex: ano de referência)
+
+        Por padrão, nenhum. Subclasses podem sobrescrever.
+        """
+        return None
 
     def _validate_score(self, score: float) -> bool:
         """
@@ -5,18 +5,99 @@ Implementa cache hierárquico:
 1. Memória local (LRU) - rápido mas limitado
 2. Redis (opcional) - compartilhado entre workers
 3. Fallback para cálculo direto
+
+⚡ A memória local é um LRU real (OrderedDict, get/set O(1)) limitado por
+número de entradas e por bytes estimados. Entradas expiradas saem na
+leitura (lazy) e numa varredura periódica. Opcionalmente, a admissão
+TinyLFU impede que chaves vistas uma única vez expulsem scores populares.
 """
 
 import json
+import os
+import sys
 import time
 import logging
-from typing import Any, Optional, Dict
+from collections import OrderedDict
+from typing import Any, Optional, Dict, List
 from datetime import datetime
 
 
 logger = logging.getLogger(__name__)
 
 
+def _approx_size(value: Any, depth: int = 0) -> int:
+    """Tamanho aproximado em bytes (sys.getsizeof + conteúdo de containers rasos)"""
+    size = sys.getsizeof(value)
+    if depth >= 3:
+        return size
+
+    if isinstance(value, dict):
+        size += sum(
+            _approx_size(k, depth + 1) + _approx_size(v, depth + 1)
+            for k, v in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_approx_size(item, depth + 1) for item in value)
+
+    return size
+
+
+class FrequencySketch:
+    """
+    Frequência aproximada de acesso por chave (Count-Min Sketch, 4 linhas)
+
+    Usado pela admissão TinyLFU. Contadores de 4 bits (saturam em 15) são
+    divididos por 2 a cada `sample_size` incrementos, para que popularidade
+    antiga não proteja uma chave para sempre.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+    SEEDS = (
+        0x9E3779B97F4A7C15,
+        0xC2B2AE3D27D4EB4F,
+        0x165667B19E3779F9,
+        0xD6E8FEB86659FD93,
+    )
+    MASK_64 = (1 << 64) - 1
+
+    def __init__(self, capacity: int):
+        width = 64
+        while width < 4 * capacity:
+            width <<= 1
+
+        self.width = width
+        self.table = bytearray(width * self.DEPTH)
+        self.sample_size = 10 * max(1, capacity)
+        self.additions = 0
+
+    def _indexes(self, key: str):
+        h = hash(key) & self.MASK_64
+        for row, seed in enumerate(self.SEEDS):
+            mixed = (h * seed) & self.MASK_64
+            yield row * self.width + (mixed >> 32) % self.width
+
+    def increment(self, key: str):
+        added = False
+        for i in self._indexes(key):
+            if self.table[i] < self.MAX_COUNT:
+                self.table[i] += 1
+                added = True
+
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self._age()
+
+    def estimate(self, key: str) -> int:
+        return min(self.table[i] for i in self._indexes(key))
+
+    def _age(self):
+        """Envelhecimento: divide todos os contadores por 2"""
+        self.table = bytearray(count >> 1 for count in self.table)
+        self.additions //= 2
+
+
 class CacheManager:
     """
     Gerenciador de cache em múltiplas camadas
@@ -25,11 +106,18 @@ class CacheManager:
     Camada 2: Redis (opcional, compartilhado)
     """
 
+    # Custo fixo estimado por entrada local: tupla (valor, expiração),
+    # float da expiração e slot/nó do OrderedDict
+    ENTRY_OVERHEAD_BYTES = 120
+
     def __init__(
         self,
         redis_url: Optional[str] = None,
         local_cache_max_size: int = 1000,
-        enable_redis: bool = True
+        enable_redis: bool = True,
+        local_cache_max_bytes: Optional[int] = None,
+        enable_admission: Optional[bool] = None,
+        expiry_sweep_interval: Optional[float] = None
     ):
         """
         Inicializa o gerenciador de cache
@@ -38,10 +126,28 @@ class CacheManager:
             redis_url: URL do Redis (ex: redis://localhost:6379)
             local_cache_max_size: Tamanho máximo do cache local
             enable_redis: Se deve tentar conectar ao Redis
+            local_cache_max_bytes: Orçamento de memória do cache local em
+                bytes estimados; AGENT_CACHE_MAX_BYTES (0 = sem limite)
+            enable_admission: Admissão TinyLFU; AGENT_CACHE_TINYLFU
+            expiry_sweep_interval: Segundos entre varreduras de expirados;
+                AGENT_CACHE_SWEEP_INTERVAL (0 = só expiração na leitura)
         """
-        # Camada 1: Cache local em memória
-        self.local_cache: Dict[str, tuple] = {}
+        if local_cache_max_bytes is None:
+            local_cache_max_bytes = int(os.getenv("AGENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        if enable_admission is None:
+            enable_admission = os.getenv("AGENT_CACHE_TINYLFU", "false").lower() == "true"
+        if expiry_sweep_interval is None:
+            expiry_sweep_interval = float(os.getenv("AGENT_CACHE_SWEEP_INTERVAL", "60"))
+
+        # Camada 1: Cache local em memória (ordem = recência, mais antigo primeiro)
+        self.local_cache: "OrderedDict[str, tuple]" = OrderedDict()
         self.local_cache_max_size = local_cache_max_size
+        self.local_cache_max_bytes = local_cache_max_bytes
+        self.local_cache_bytes = 0
+        self._entry_sizes: Dict[str, int] = {}
+        self.frequency = FrequencySketch(local_cache_max_size) if enable_admission else None
+        self.expiry_sweep_interval = expiry_sweep_interval
+        self._last_sweep = time.time()
 
         # Camada 2: Redis (opcional)
         self.redis_client = None
@@ -75,7 +181,10 @@ class CacheManager:
             'redis_hits': 0,
             'redis_misses': 0,
             'total_gets': 0,
-            'total_sets': 0
+            'total_sets': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'admission_rejections': 0
         }
 
     async def get(self, key: str) -> Optional[Any]:
@@ -139,6 +248,81 @@ class CacheManager:
             except Exception as e:
                 logger.warning(f"[CacheManager] Erro ao salvar no Redis: {e}")
 
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        Busca várias chaves de uma vez (local -> um único MGET no Redis)
+
+        Args:
+            keys: Chaves de cache
+
+        Returns:
+            Valores na ordem de keys (None para chaves não encontradas)
+        """
+        self.stats['total_gets'] += len(keys)
+
+        values: List[Optional[Any]] = []
+        missing: List[int] = []
+
+        # 1. Cache local
+        for i, key in enumerate(keys):
+            value = self._get_from_local(key)
+            values.append(value)
+            if value is None:
+                missing.append(i)
+
+        self.stats['local_hits'] += len(keys) - len(missing)
+        self.stats['local_misses'] += len(missing)
+
+        # 2. Redis: uma ida e volta para todas as faltantes
+        if missing and self.redis_available and self.redis_client:
+            try:
+                redis_values = await self.redis_client.mget(
+                    [keys[i] for i in missing]
+                )
+                for i, value_str in zip(missing, redis_values):
+                    if value_str is None:
+                        self.stats['redis_misses'] += 1
+                        continue
+
+                    value = self._deserialize(value_str)
+                    self.stats['redis_hits'] += 1
+
+                    # Promover para cache local
+                    self._set_in_local(keys[i], value, ttl=3600)
+                    values[i] = value
+
+            except Exception as e:
+                logger.warning(f"[CacheManager] Erro ao ler (MGET) do Redis: {e}")
+
+        return values
+
+    async def set_many(self, items: Dict[str, Any], ttl: int = 3600):
+        """
+        Salva vários valores com o mesmo TTL (local + pipeline no Redis)
+
+        Args:
+            items: Dicionário {chave: valor}
+            ttl: Time-to-live em segundos (padrão: 1 hora)
+        """
+        if not items:
+            return
+
+        self.stats['total_sets'] += len(items)
+
+        # 1. Salvar localmente
+        for key, value in items.items():
+            self._set_in_local(key, value, ttl)
+
+        # 2. Salvar no Redis (SETEX em pipeline, uma ida e volta)
+        if self.redis_available and self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key, value in items.items():
+                    pipe.setex(key, ttl, self._serialize(value))
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"[CacheManager] Erro ao salvar (pipeline) no Redis: {e}")
+
     async def delete(self, key: str):
         """
         Remove valor do cache (local + redis)
@@ -147,8 +331,7 @@ class CacheManager:
             key: Chave de cache a remover
         """
         # 1. Remover localmente
-        if key in self.local_cache:
-            del self.local_cache[key]
+        self._remove_local(key)
 
         # 2. Remover do Redis
         if self.redis_available and self.redis_client:
@@ -163,6 +346,8 @@ class CacheManager:
         """
         # 1. Limpar local
         self.local_cache.clear()
+        self._entry_sizes.clear()
+        self.local_cache_bytes = 0
 
         # 2. Limpar Redis (flush all - CUIDADO!)
         # Comentado por segurança - implementar com prefixo se necessário
@@ -171,7 +356,7 @@ class CacheManager:
 
     def _get_from_local(self, key: str) -> Optional[Any]:
         """
-        Busca valor no cache local
+        Busca valor no cache local (O(1), marca como usado recentemente)
 
         Args:
             key: Chave de cache
@@ -179,52 +364,123 @@ class CacheManager:
         Returns:
             Valor armazenado ou None se não encontrado/expirado
         """
-        if key not in self.local_cache:
+        if self.frequency is not None:
+            self.frequency.increment(key)
+
+        entry = self.local_cache.get(key)
+        if entry is None:
             return None
 
-        value, expiry = self.local_cache[key]
+        value, expiry = entry
 
-        # Verificar expiração
+        # Expiração lazy
         if expiry is not None and time.time() > expiry:
-            del self.local_cache[key]
+            self._remove_local(key)
+            self.stats['expirations'] += 1
             return None
 
+        self.local_cache.move_to_end(key)
         return value
 
     def _set_in_local(self, key: str, value: Any, ttl: int):
         """
-        Salva valor no cache local com LRU
+        Salva valor no cache local com LRU (O(1) amortizado)
 
         Args:
             key: Chave de cache
             value: Valor a armazenar
             ttl: Time-to-live em segundos
         """
-        expiry = time.time() + ttl if ttl else None
+        now = time.time()
+        self._sweep_expired(now)
+
+        expiry = now + ttl if ttl else None
+        size = self._estimate_entry_size(key, value)
+
+        if self.local_cache_max_bytes and size > self.local_cache_max_bytes:
+            # Maior que o orçamento inteiro: fica só no Redis
+            self._remove_local(key)
+            self.stats['admission_rejections'] += 1
+            return
+
+        if key in self.local_cache:
+            self.local_cache_bytes -= self._entry_sizes[key]
+            self.local_cache.move_to_end(key)
+        elif self.frequency is not None:
+            self.frequency.increment(key)
+            if self._over_budget(extra_entries=1, extra_bytes=size) and not self._admit(key, now):
+                self.stats['admission_rejections'] += 1
+                return
+
         self.local_cache[key] = (value, expiry)
+        self._entry_sizes[key] = size
+        self.local_cache_bytes += size
 
-        # Limpar cache se muito grande (LRU simples)
-        if len(self.local_cache) > self.local_cache_max_size:
+        while self._over_budget():
             self._evict_lru()
 
+    def _over_budget(self, extra_entries: int = 0, extra_bytes: int = 0) -> bool:
+        """Cache local acima do limite de entradas ou de bytes?"""
+        if len(self.local_cache) + extra_entries > self.local_cache_max_size:
+            return True
+        return bool(self.local_cache_max_bytes) and (
+            self.local_cache_bytes + extra_bytes > self.local_cache_max_bytes
+        )
+
+    def _admit(self, key: str, now: float) -> bool:
+        """
+        Admissão TinyLFU: a chave nova só entra se for mais frequente que a
+        vítima do LRU (ou se a vítima já expirou)
+        """
+        if not self.local_cache:
+            return True
+
+        victim = next(iter(self.local_cache))
+        victim_expiry = self.local_cache[victim][1]
+        if victim_expiry is not None and now > victim_expiry:
+            return True
+
+        return self.frequency.estimate(key) > self.frequency.estimate(victim)
+
     def _evict_lru(self):
         """
-        Remove 10% dos itens mais antigos (LRU)
+        Remove a entrada usada há mais tempo (O(1))
         """
-        # Ordenar por tempo de expiração (mais antigos primeiro)
-        sorted_keys = sorted(
-            self.local_cache.keys(),
-            key=lambda k: self.local_cache[k][1] or float('inf')
-        )
+        key, _ = self.local_cache.popitem(last=False)
+        self.local_cache_bytes -= self._entry_sizes.pop(key, 0)
+        self.stats['evictions'] += 1
 
-        # Remover 10% dos mais antigos
-        num_to_remove = max(1, len(sorted_keys) // 10)
-        for key_to_remove in sorted_keys[:num_to_remove]:
-            del self.local_cache[key_to_remove]
+    def _remove_local(self, key: str):
+        """Remove uma chave do cache local (se existir)"""
+        if self.local_cache.pop(key, None) is not None:
+            self.local_cache_bytes -= self._entry_sizes.pop(key, 0)
 
-        logger.debug(
-            f"[CacheManager] LRU eviction: removidos {num_to_remove} itens"
-        )
+    def _sweep_expired(self, now: float):
+        """
+        Varredura periódica de expirados (no máximo uma por intervalo)
+
+        Complementa a expiração lazy: entradas que nunca mais são lidas
+        deixam de ocupar o orçamento de memória.
+        """
+        if not self.expiry_sweep_interval or now - self._last_sweep < self.expiry_sweep_interval:
+            return
+
+        self._last_sweep = now
+        expired = [
+            key for key, (_, expiry) in self.local_cache.items()
+            if expiry is not None and now > expiry
+        ]
+        for key in expired:
+            self._remove_local(key)
+        self.stats['expirations'] += len(expired)
+
+        if expired:
+            logger.debug(f"[CacheManager] Varredura: {len(expired)} itens expirados removidos")
+
+    @classmethod
+    def _estimate_entry_size(cls, key: str, value: Any) -> int:
+        """Bytes estimados de uma entrada local (chave + valor + overhead)"""
+        return cls.ENTRY_OVERHEAD_BYTES + sys.getsizeof(key) + _approx_size(value)
 
     async def _get_from_redis(self, key: str) -> Optional[Any]:
         """
@@ -241,12 +497,7 @@ class CacheManager:
         if value_str is None:
             return None
 
-        # Deserializar JSON
-        try:
-            return json.loads(value_str)
-        except json.JSONDecodeError:
-            # Se não for JSON, retornar string direta
-            return value_str
+        return self._deserialize(value_str)
 
     async def _set_in_redis(self, key: str, value: Any, ttl: int):
         """
@@ -257,15 +508,26 @@ class CacheManager:
             value: Valor a armazenar
             ttl: Time-to-live em segundos
         """
-        # Serializar para JSON
+        # Salvar com TTL
+        await self.redis_client.setex(key, ttl, self._serialize(value))
+
+    @staticmethod
+    def _serialize(value: Any) -> str:
+        """Serializa valor para o Redis (JSON ou string)"""
         try:
-            value_str = json.dumps(value)
+            return json.dumps(value)
         except (TypeError, ValueError):
             # Se não for serializável, converter para string
-            value_str = str(value)
+            return str(value)
 
-        # Salvar com TTL
-        await self.redis_client.setex(key, ttl, value_str)
+    @staticmethod
+    def _deserialize(value_str: str) -> Any:
+        """Desserializa valor lido do Redis"""
+        try:
+            return json.loads(value_str)
+        except json.JSONDecodeError:
+            # Se não for JSON, retornar string direta
+            return value_str
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -277,11 +539,25 @@ class CacheManager:
                 - redis_hit_rate: Taxa de hit do Redis
                 - total_hit_rate: Taxa de hit geral
                 - local_size: Tamanho do cache local
+                - local_bytes / local_max_bytes: Memória estimada e orçamento
+                - evictions: Entradas removidas pelo LRU
+                - expirations: Entradas expiradas removidas
+                - admission_rejections: Entradas recusadas (TinyLFU/tamanho)
                 - total_gets: Total de leituras
                 - total_sets: Total de escritas
         """
         total_gets = self.stats['total_gets']
 
+        local_memory = {
+            'local_size': len(self.local_cache),
+            'local_bytes': self.local_cache_bytes,
+            'local_max_bytes': self.local_cache_max_bytes,
+            'evictions': self.stats['evictions'],
+            'expirations': self.stats['expirations'],
+            'admission_rejections': self.stats['admission_rejections'],
+            'admission_policy': 'tinylfu' if self.frequency is not None else 'lru',
+        }
+
         if total_gets == 0:
             return {
                 'local_hits': 0,
@@ -291,7 +567,7 @@ class CacheManager:
                 'redis_misses': 0,
                 'redis_hit_rate': 0.0,
                 'total_hit_rate': 0.0,
-                'local_size': len(self.local_cache),
+                **local_memory,
                 'total_gets': 0,
                 'total_sets': self.stats['total_sets']
             }
@@ -320,7 +596,7 @@ class CacheManager:
             'redis_misses': self.stats['redis_misses'],
             'redis_hit_rate': redis_hit_rate,
             'total_hit_rate': total_hit_rate,
-            'local_size': len(self.local_cache),
+            **local_memory,
             'total_gets': total_gets,
             'total_sets': self.stats['total_sets']
         }
@@ -333,7 +609,10 @@ class CacheManager:
             'redis_hits': 0,
             'redis_misses': 0,
             'total_gets': 0,
-            'total_sets': 0
+            'total_sets': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'admission_rejections': 0
         }
 
 
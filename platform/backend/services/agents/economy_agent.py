@@ -10,7 +10,9 @@ Calcula score de economia baseado em:
 """
 
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+import numpy as np
 
 from models.car import Car
 from models.user_profile import UserProfile
@@ -69,6 +71,13 @@ class EconomyAgent(BaseAgent):
         "Híbrido": 1.0    # Muito econômico
     }
 
+    # Campos que alteram o score (chave de cache)
+    PROFILE_KEY_FIELDS = ("uso_principal", "state", "monthly_km", "renda_mensal")
+    CAR_KEY_FIELDS = (
+        "categoria", "combustivel", "consumo_cidade", "consumo_estrada",
+        "consumo", "score_economia"
+    )
+
     def __init__(self, cache_manager=None):
         """
         Inicializa o EconomyAgent
@@ -145,6 +154,116 @@ class EconomyAgent(BaseAgent):
             # Retornar fallback
             return self._get_fallback_score(car)
 
+    async def calculate_scores_batch(
+        self,
+        cars: List[Car],
+        profile: UserProfile
+    ) -> List[float]:
+        """
+        Versão vetorizada de calculate_score() para todos os candidatos
+
+        Consumo, referências da categoria, preço e bonus do combustível
+        viram arrays (consultas às mesmas tabelas); as normalizações são
+        aplicadas de uma vez com NumPy. Preço base e km mensal dependem só
+        do perfil e são obtidos uma única vez.
+
+        Args:
+            cars: Veículos a serem avaliados
+            profile: Perfil do usuário
+
+        Returns:
+            List[float]: Scores (mesmos valores de calculate_score)
+        """
+        if not cars:
+            return []
+
+        default_ref = {"min": 8.0, "avg": 11.0, "max": 15.0}
+        refs = [
+            self.CATEGORY_FUEL_EFFICIENCY.get(car.categoria, default_ref)
+            for car in cars
+        ]
+        min_eff = np.array([ref["min"] for ref in refs], dtype=float)
+        avg_eff = np.array([ref["avg"] for ref in refs], dtype=float)
+        max_eff = np.array([ref["max"] for ref in refs], dtype=float)
+
+        efficiency = np.array(
+            [self._get_fuel_efficiency(car) for car in cars],
+            dtype=float
+        )
+        fuel_price = np.array(
+            self._get_fuel_prices([car.combustivel for car in cars], profile),
+            dtype=float
+        )
+        fuel_type_bonus = np.array(
+            [self._get_fuel_type_bonus(car.combustivel) for car in cars],
+            dtype=float
+        )
+
+        monthly_km = self._estimate_monthly_km(profile)
+        monthly_cost = (monthly_km / efficiency) * fuel_price
+
+        # Consumo normalizado pela categoria (mesma curva de _normalize_fuel_efficiency)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            above_avg = 0.6 + 0.4 * ((efficiency - avg_eff) / (max_eff - avg_eff))
+            below_avg = 0.2 + 0.4 * ((efficiency - min_eff) / (avg_eff - min_eff))
+        consumption_score = np.select(
+            [efficiency >= max_eff, efficiency <= min_eff, efficiency >= avg_eff],
+            [1.0, 0.2, np.clip(above_avg, 0.0, 1.0)],
+            default=np.clip(below_avg, 0.0, 1.0)
+        )
+
+        cost_score = self._normalize_fuel_costs(monthly_cost, profile)
+
+        final_score = (
+            0.60 * consumption_score +
+            0.30 * cost_score +
+            0.10 * fuel_type_bonus
+        )
+
+        return np.clip(final_score, 0.0, 1.0).tolist()
+
+    def _get_fuel_prices(self, combustiveis: List[str], profile: UserProfile) -> List[float]:
+        """
+        Preço por carro (mesmas regras de _get_fuel_price), consultando o
+        serviço de preços uma vez só
+        """
+        state = getattr(profile, 'state', 'SP')
+
+        try:
+            base_price = self.fuel_price_service.get_current_price(state)
+        except Exception as e:
+            logger.warning(f"[EconomyAgent] Erro ao buscar preço: {e}")
+            return [self.FUEL_TYPE_PRICES.get(c, 6.17) for c in combustiveis]
+
+        specific = {
+            "Etanol": base_price * 0.70,
+            "Diesel": self.FUEL_TYPE_PRICES["Diesel"],
+            "GNV": self.FUEL_TYPE_PRICES["GNV"],
+            "Elétrico": self.FUEL_TYPE_PRICES["Elétrico"],
+        }
+        return [specific.get(c, base_price) for c in combustiveis]
+
+    def _normalize_fuel_costs(self, monthly_cost: np.ndarray, profile: UserProfile) -> np.ndarray:
+        """Versão vetorizada de _normalize_fuel_cost"""
+        MIN_COST = 200
+        MAX_COST = 800
+
+        cost_score = np.select(
+            [monthly_cost <= MIN_COST, monthly_cost >= MAX_COST],
+            [1.0, 0.0],
+            default=1.0 - ((monthly_cost - MIN_COST) / (MAX_COST - MIN_COST))
+        )
+
+        if hasattr(profile, 'renda_mensal') and profile.renda_mensal:
+            cost_percentage = (monthly_cost / profile.renda_mensal) * 100
+            cost_score = np.select(
+                [cost_percentage > 15, cost_percentage > 10, cost_percentage < 3],
+                [cost_score * 0.7, cost_score * 0.85, np.minimum(1.0, cost_score * 1.1)],
+                default=cost_score
+            )
+
+        return np.clip(cost_score, 0.0, 1.0)
+
     def _get_fuel_efficiency(self, car: Car) -> float:
         """
         Obtém consumo de combustível (km/L)
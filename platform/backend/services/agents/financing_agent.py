@@ -13,6 +13,9 @@ class FinancingAgent(BaseAgent):
     Atua como um SLM (Small Language Model) especializado em risco de crédito.
     """
     
+    # Campos que alteram o score (chave de cache): não depende do carro
+    PROFILE_KEY_FIELDS = ("financial_capacity", "primeiro_carro", "tem_criancas", "tem_idosos")
+
     def __init__(self, cache_manager=None):
         super().__init__(cache_manager=cache_manager, name="financing")
         
@@ -11,9 +11,11 @@ Calcula score de manutenção baseado em:
 """
 
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
+import numpy as np
+
 from models.car import Car
 from models.user_profile import UserProfile
 from services.agents.base_agent import BaseAgent
@@ -103,6 +105,10 @@ class MaintenanceAgent(BaseAgent):
         "Peugeot": ["Caixa automática", "Sistema eletrônico"],
     }
 
+    # Campos que alteram o score (chave de cache): não depende do perfil
+    PROFILE_KEY_FIELDS = ()
+    CAR_KEY_FIELDS = ("marca", "ano", "quilometragem")
+
     def __init__(self, cache_manager=None):
         """
         Inicializa o MaintenanceAgent
@@ -184,6 +190,87 @@ class MaintenanceAgent(BaseAgent):
             logger.error(f"[MaintenanceAgent] Erro para {car.nome}: {e}")
             return self._get_fallback_score(car)
 
+    # Faixas das funções por partes (para a versão vetorizada)
+    # _get_mileage_multiplier: km < limite
+    MILEAGE_MULTIPLIER_BOUNDS = [30000, 60000, 100000, 150000]
+    MILEAGE_MULTIPLIERS = [1.0, 1.1, 1.2, 1.4, 1.7]
+    # _calculate_wear_penalty: idade <= limite / km < limite
+    AGE_PENALTY_BOUNDS = [2, 5, 10, 15]
+    KM_PENALTY_BOUNDS = [50000, 100000, 150000, 200000]
+    WEAR_PENALTIES = [0.0, 0.1, 0.2, 0.3, 0.4]
+
+    async def calculate_scores_batch(
+        self,
+        cars: List[Car],
+        profile: UserProfile
+    ) -> List[float]:
+        """
+        Versão vetorizada de calculate_score() para todos os candidatos
+
+        Marca, idade e quilometragem viram arrays; custos e confiabilidade
+        são consultas às tabelas por marca e as faixas de idade/km são
+        resolvidas com np.searchsorted.
+
+        Args:
+            cars: Veículos a serem avaliados
+            profile: Perfil do usuário
+
+        Returns:
+            List[float]: Scores (mesmos valores de calculate_score)
+        """
+        if not cars:
+            return []
+
+        brands = [car.marca for car in cars]
+        age = self.current_year - np.array([car.ano for car in cars], dtype=float)
+        km = np.array([car.quilometragem for car in cars], dtype=float)
+
+        default_cost = self.MAINTENANCE_COST_BY_BRAND["DEFAULT"]
+        base_cost = np.array(
+            [self.MAINTENANCE_COST_BY_BRAND.get(marca, default_cost) for marca in brands],
+            dtype=float
+        )
+        reliability = np.array(
+            [self._get_brand_reliability(marca) for marca in brands],
+            dtype=float
+        )
+        issues_by_brand = {
+            marca: self._get_known_issues_penalty(marca) for marca in set(brands)
+        }
+        issues_penalty = np.array([issues_by_brand[marca] for marca in brands], dtype=float)
+
+        # 1. Custo anual (marca x idade x quilometragem)
+        km_multiplier = np.array(self.MILEAGE_MULTIPLIERS)[
+            np.searchsorted(self.MILEAGE_MULTIPLIER_BOUNDS, km, side='right')
+        ]
+        annual_cost = base_cost * (1.0 + (age * 0.10)) * km_multiplier
+
+        # 2. Penalização por desgaste (média das faixas de idade e km)
+        penalties = np.array(self.WEAR_PENALTIES)
+        age_penalty = penalties[np.searchsorted(self.AGE_PENALTY_BOUNDS, age, side='left')]
+        km_penalty = penalties[np.searchsorted(self.KM_PENALTY_BOUNDS, km, side='right')]
+        wear_penalty = np.minimum(1.0, (age_penalty + km_penalty) / 2)
+
+        # 3. Custo normalizado (mesma faixa de _normalize_cost)
+        MIN_COST = 1500
+        MAX_COST = 8000
+        cost_score = np.select(
+            [annual_cost <= MIN_COST, annual_cost >= MAX_COST],
+            [1.0, 0.0],
+            default=np.clip(
+                1.0 - ((annual_cost - MIN_COST) / (MAX_COST - MIN_COST)), 0.0, 1.0
+            )
+        )
+
+        final_score = (
+            0.40 * cost_score +
+            0.30 * reliability +
+            0.20 * (1.0 - wear_penalty) +
+            0.10 * (1.0 - issues_penalty)
+        )
+
+        return np.clip(final_score, 0.0, 1.0).tolist()
+
     def _calculate_annual_cost(
         self,
         marca: str,
@@ -380,6 +467,10 @@ class MaintenanceAgent(BaseAgent):
 
         return 0.5
 
+    def _get_cache_key_context(self):
+        """Ano de referência (idade do veículo) entra na chave de cache"""
+        return {"current_year": self.current_year}
+
     def _get_cache_ttl(self) -> int:
         """
         TTL do cache: 30 dias (custos de manutenção são estáveis)
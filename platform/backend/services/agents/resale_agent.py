@@ -11,8 +11,10 @@ Calcula score de revenda baseado em:
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+
+import numpy as np
 from models.car import Car
 from models.user_profile import UserProfile
 from services.agents.base_agent import BaseAgent
@@ -113,6 +115,10 @@ class ResaleAgent(BaseAgent):
         ]
     }
 
+    # Campos que alteram o score (chave de cache): não depende do perfil
+    PROFILE_KEY_FIELDS = ()
+    CAR_KEY_FIELDS = ("marca", "modelo", "ano", "quilometragem", "categoria")
+
     def __init__(self, cache_manager=None):
         """
         Inicializa o ResaleAgent
@@ -206,6 +212,82 @@ class ResaleAgent(BaseAgent):
             logger.error(f"[ResaleAgent] Erro para {car.nome}: {e}")
             return self._get_fallback_score(car)
 
+    async def calculate_scores_batch(
+        self,
+        cars: List[Car],
+        profile: UserProfile
+    ) -> List[float]:
+        """
+        Versão vetorizada de calculate_score() para todos os candidatos
+
+        Retenção da marca, demanda da categoria e penalização por km são
+        consultas às tabelas montadas em arrays. A curva de depreciação e o
+        ajuste de mercado são calculados uma vez por idade / modelo distintos.
+
+        Args:
+            cars: Veículos a serem avaliados
+            profile: Perfil do usuário
+
+        Returns:
+            List[float]: Scores (mesmos valores de calculate_score)
+        """
+        if not cars:
+            return []
+
+        brand_retention = np.array(
+            [self._get_brand_value_retention(car.marca) for car in cars],
+            dtype=float
+        )
+        market_demand = np.array(
+            [self._get_market_demand(car.categoria) for car in cars],
+            dtype=float
+        )
+
+        ages, age_index = np.unique(
+            [self.current_year - car.ano for car in cars],
+            return_inverse=True
+        )
+        age_depreciation = np.array(
+            [self._calculate_age_depreciation(int(age)) for age in ages],
+            dtype=float
+        )[age_index]
+
+        km = np.array([car.quilometragem for car in cars], dtype=float)
+        ranges = self.MILEAGE_PENALTY["ranges"]
+        mileage_penalty = np.array([penalty for _, _, penalty in ranges])[
+            np.searchsorted([max_km for _, max_km, _ in ranges[:-1]], km, side='right')
+        ]
+        # Mesmo fallback de _calculate_mileage_penalty (fora de todas as faixas)
+        mileage_penalty = np.where(km < 0, 0.40, mileage_penalty)
+
+        base_score = (
+            0.35 * brand_retention +
+            0.25 * (1.0 - age_depreciation) +
+            0.15 * market_demand +
+            0.25 * (1.0 - mileage_penalty)
+        )
+
+        # Ajuste de mercado (SLM), um por modelo
+        if self.enable_market_intel:
+            adjustments = {
+                modelo: self._get_market_adjustment(modelo)
+                for modelo in {car.modelo for car in cars}
+            }
+            adjustment = np.array([adjustments[car.modelo] for car in cars], dtype=float)
+            base_score = base_score * (1.0 + adjustment)
+
+        return np.clip(base_score, 0.0, 1.0).tolist()
+
+    def _get_market_adjustment(self, modelo: str) -> float:
+        """Ajuste de mercado do modelo (0.0 = sem métricas)"""
+        market_metrics = self.market_intelligence.get_market_metrics(modelo)
+        if not market_metrics:
+            return 0.0
+
+        resale_factor = market_metrics.get('resale_factor', 1.0)
+        sentiment = market_metrics.get('sentiment_score', 0.0)
+        return (resale_factor - 1.0) + (sentiment * 0.1)
+
     def _get_brand_value_retention(self, marca: str) -> float:
         """
         Obtém taxa de retenção de valor da marca
@@ -347,6 +429,10 @@ class ResaleAgent(BaseAgent):
 
         return 0.5
 
+    def _get_cache_key_context(self):
+        """Ano de referência (idade do veículo) entra na chave de cache"""
+        return {"current_year": self.current_year}
+
     def _get_cache_ttl(self) -> int:
         """
         TTL do cache: 14 dias (dados de mercado mudam mensalmente)
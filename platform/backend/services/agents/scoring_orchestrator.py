@@ -3,6 +3,7 @@ Scoring Agent Orchestrator - Coordenador central de agentes de scoring
 
 Responsável por:
 - Coordenar execução paralela de múltiplos agentes
+- Scoring em lote de vários carros (multi-get no cache)
 - Agregar resultados com pesos otimizados
 - Gerenciar fallbacks quando agentes falham
 - Coletar métricas de performance
@@ -11,7 +12,7 @@ Responsável por:
 import asyncio
 import time
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 from datetime import datetime
 
 from models.car import Car
@@ -109,16 +110,7 @@ class ScoringAgentOrchestrator:
         start_time = time.time()
 
         try:
-            # Determinar quais agentes executar
-            if agent_names is None:
-                agent_names = list(self.agents.keys())
-
-            # Filtrar apenas agentes registrados
-            agents_to_run = {
-                name: self.agents[name]
-                for name in agent_names
-                if name in self.agents
-            }
+            agents_to_run = self._select_agents(agent_names)
 
             if not agents_to_run:
                 logger.warning(
@@ -163,6 +155,211 @@ class ScoringAgentOrchestrator:
 
             return self._get_empty_result()
 
+    async def calculate_advanced_scores_batch(
+        self,
+        cars: List[Car],
+        profile: UserProfile,
+        agent_names: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Calcula scores avançados de vários carros para o mesmo perfil
+
+        Em vez de uma coroutine e uma leitura de cache por (carro, agente):
+        1. Monta as chaves de todos os agentes x carros e faz um único
+           get_many (MGET no Redis)
+        2. Cada agente recebe só os carros sem cache em uma chamada de
+           calculate_scores_batch (vetorizada nos agentes baseados em tabelas)
+        3. Scores novos são gravados com set_many (um pipeline por agente)
+
+        Args:
+            cars: Veículos a serem avaliados
+            profile: Perfil do usuário
+            agent_names: Lista de agentes a executar (None = todos)
+
+        Returns:
+            list: Um resultado por carro (na ordem de cars), no mesmo formato
+                de calculate_advanced_scores
+        """
+        if not cars:
+            return []
+
+        start_time = time.time()
+
+        try:
+            agents_to_run = self._select_agents(agent_names)
+
+            if not agents_to_run:
+                logger.warning(
+                    f"[Orchestrator] Nenhum agente disponível para {len(cars)} carros"
+                )
+                return [self._get_empty_result() for _ in cars]
+
+            # 1. Um único multi-get para todas as chaves
+            keys = {
+                name: agent._build_cache_keys(cars, profile)
+                for name, agent in agents_to_run.items()
+            }
+            flat_keys = [key for name in agents_to_run for key in keys[name]]
+
+            if self.cache_manager:
+                cached = await self.cache_manager.get_many(flat_keys)
+            else:
+                cached = [None] * len(flat_keys)
+
+            n = len(cars)
+            cached_by_agent = {
+                name: cached[i * n:(i + 1) * n]
+                for i, name in enumerate(agents_to_run)
+            }
+
+            # 2. Calcular faltantes, um lote por agente
+            batches = [
+                self._score_agent_batch(
+                    name, agent, cars, profile, keys[name], cached_by_agent[name]
+                )
+                for name, agent in agents_to_run.items()
+            ]
+            if self.enable_parallel and len(batches) > 1:
+                batch_results = await asyncio.gather(*batches)
+            else:
+                batch_results = [await batch for batch in batches]
+
+            # 3. Montar resultado por carro
+            execution_time_ms = (time.time() - start_time) * 1000
+            timestamp = datetime.now().isoformat()
+            agents_used = list(agents_to_run.keys())
+
+            results = []
+            for i in range(n):
+                scores = {}
+                failed_agents = []
+                cache_hits = 0
+
+                for name, (agent_scores, failed) in zip(agents_used, batch_results):
+                    scores[name] = agent_scores[i]
+                    if i in failed:
+                        failed_agents.append(name)
+                    elif cached_by_agent[name][i] is not None:
+                        cache_hits += 1
+
+                results.append({
+                    'scores': scores,
+                    'metadata': {
+                        'agents_used': list(agents_used),
+                        'execution_time_ms': round(execution_time_ms, 2),
+                        'cache_hits': cache_hits,
+                        'failed_agents': failed_agents,
+                        'timestamp': timestamp
+                    }
+                })
+
+            for _ in range(n):
+                self._record_orchestration_metrics(
+                    success=True,
+                    latency_ms=execution_time_ms / n
+                )
+
+            return results
+
+        except Exception as e:
+            logger.error(
+                f"[Orchestrator] Erro na orquestração em lote ({len(cars)} carros): {e}"
+            )
+
+            latency_ms = (time.time() - start_time) * 1000
+            for _ in cars:
+                self._record_orchestration_metrics(
+                    success=False,
+                    latency_ms=latency_ms / len(cars)
+                )
+
+            return [self._get_empty_result() for _ in cars]
+
+    async def _score_agent_batch(
+        self,
+        name: str,
+        agent: Any,
+        cars: List[Car],
+        profile: UserProfile,
+        keys: List[str],
+        cached: List[Optional[float]]
+    ) -> Tuple[List[float], Set[int]]:
+        """
+        Scores de um agente para todos os carros (cache + lote dos faltantes)
+
+        Args:
+            name: Nome do agente no orquestrador
+            agent: Instância do agente
+            cars: Veículos
+            profile: Perfil do usuário
+            keys: Chaves de cache (na ordem de cars)
+            cached: Valores do multi-get (None = cache miss)
+
+        Returns:
+            tuple: (scores na ordem de cars, índices que usaram fallback por falha)
+        """
+        start_time = time.time()
+        scores = list(cached)
+        missing = [i for i, value in enumerate(cached) if value is None]
+        failed: Set[int] = set()
+
+        if missing:
+            try:
+                computed = await agent.calculate_scores_batch(
+                    [cars[i] for i in missing],
+                    profile
+                )
+
+                fresh = {}
+                for i, score in zip(missing, computed):
+                    if not agent._validate_score(score):
+                        logger.warning(
+                            f"[{agent.name}] Score inválido {score} para "
+                            f"{cars[i].nome}, usando fallback"
+                        )
+                        score = agent._get_fallback_score(cars[i])
+                    scores[i] = score
+                    fresh[keys[i]] = score
+
+                if self.cache_manager:
+                    await self.cache_manager.set_many(fresh, ttl=agent._get_cache_ttl())
+
+            except Exception as e:
+                logger.warning(f"[Orchestrator] Agente {name} falhou no lote: {e}")
+                for i in missing:
+                    scores[i] = self._get_fallback_score(name, cars[i])
+                    failed.add(i)
+
+        # Métricas do agente (latência do lote dividida entre os carros)
+        latency_ms = (time.time() - start_time) * 1000 / len(cars)
+        for i, value in enumerate(cached):
+            agent._record_metrics(
+                success=i not in failed,
+                latency_ms=latency_ms,
+                cache_hit=value is not None
+            )
+
+        return scores, failed
+
+    def _select_agents(self, agent_names: Optional[List[str]]) -> Dict[str, Any]:
+        """
+        Agentes registrados a executar
+
+        Args:
+            agent_names: Lista de agentes (None = todos)
+
+        Returns:
+            dict: {nome: agente}, apenas agentes registrados
+        """
+        if agent_names is None:
+            agent_names = list(self.agents.keys())
+
+        return {
+            name: self.agents[name]
+            for name in agent_names
+            if name in self.agents
+        }
+
     async def _execute_parallel(
         self,
         car: Car,
@@ -14,7 +14,7 @@ from models.car import Car
 from models.user_profile import UserProfile
 from services.agents.base_agent import BaseAgent
 from services.interaction_service import InteractionService
-from services.semantic_analysis_service import SemanticAnalysisService
+from services.semantic_analysis_service import get_semantic_analysis_service
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +40,8 @@ class WeightOptimizerAgent(BaseAgent):
         self.interaction_service = interaction_service or InteractionService()
         
         try:
-            self.semantic_analyzer = SemanticAnalysisService()
+            # Compartilhado entre agentes: análises memoizadas por perfil
+            self.semantic_analyzer = get_semantic_analysis_service()
             self.enable_semantic = True
         except Exception as e:
             logger.warning(f"SemanticAnalysisService not available: {e}")
@@ -1,4 +1,6 @@
+from .car_lookup import CarLookup
 from .car_metrics import CarMetricsCalculator
 from .fuel_price_service import FuelPriceService
+from .inventory_index import InventoryIndex
 
-__all__ = ["CarMetricsCalculator", "FuelPriceService"]
+__all__ = ["CarLookup", "CarMetricsCalculator", "FuelPriceService", "InventoryIndex"]
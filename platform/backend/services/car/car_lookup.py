@@ -0,0 +1,118 @@
+"""
+Índices hash do inventário para consultas pontuais da API
+
+Complementa o InventoryIndex (colunar, usado no scoring) com dicionários
+mantidos incrementalmente:
+
+- id -> linha
+- dealership_id -> ids de linha
+- marca (minúscula) -> ids de linha
+- categoria (minúscula) -> ids de linha
+
+Os ids de linha são posições em `cars` (a mesma lista do engine), então
+listas de linhas já saem na ordem do inventário. `cars` pode ser qualquer
+sequência indexável (ex.: LazyCarList do inventário compartilhado).
+"""
+
+from bisect import insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models.car import Car
+
+
+class CarLookup:
+    """
+    Índices hash de carros, atualizados a cada inclusão/alteração
+
+    Inclusões (`add`) e substituições (`replace`) são O(1) amortizado;
+    remoções não são suportadas incrementalmente (as linhas mudariam) e
+    exigem reconstrução.
+    """
+
+    def __init__(self, cars: Optional[List[Car]] = None, keys: Optional[Iterable[Tuple[str, str, str, str]]] = None):
+        """
+        Args:
+            cars: Lista do inventário (compartilhada com o engine)
+            keys: (id, dealership_id, marca, categoria) de cada linha; quando
+                informado, os índices são montados sem acessar os objetos Car
+        """
+        self.cars: Sequence[Car] = cars if cars is not None else []
+        self.row_by_id: Dict[str, int] = {}
+        self.rows_by_dealership: Dict[str, List[int]] = {}
+        self.rows_by_marca: Dict[str, List[int]] = {}
+        self.rows_by_categoria: Dict[str, List[int]] = {}
+
+        if keys is None:
+            keys = ((c.id, c.dealership_id, c.marca, c.categoria) for c in self.cars)
+        for row, car_keys in enumerate(keys):
+            self._index_keys(row, *car_keys)
+        self.size = len(self.cars)
+
+    def matches(self, cars: List[Car]) -> bool:
+        """Verifica se os índices ainda correspondem à lista de carros informada"""
+        return cars is self.cars and len(cars) == self.size
+
+    def add(self, car: Car) -> int:
+        """Anexar um carro à lista e aos índices; retorna sua linha"""
+        row = len(self.cars)
+        self.cars.append(car)
+        self._index(car, row)
+        self.size = len(self.cars)
+        return row
+
+    def replace(self, car: Car) -> int:
+        """Substituir um carro existente (mesmo id), reindexando suas chaves"""
+        row = self.row_by_id.get(car.id)
+        if row is None:
+            raise KeyError(car.id)
+
+        old = self.cars[row]
+        self._unindex(old, row)
+        self.cars[row] = car
+        self._index(car, row)
+        return row
+
+    def get(self, car_id: str) -> Optional[Car]:
+        """Carro pelo id (None se não existir)"""
+        row = self.row_by_id.get(car_id)
+        return None if row is None else self.cars[row]
+
+    def take(self, rows: Iterable[int]) -> List[Car]:
+        """Materializar os objetos Car para os ids de linha informados"""
+        return [self.cars[row] for row in rows]
+
+    def dealership_rows(self, dealership_id: str) -> List[int]:
+        return self.rows_by_dealership.get(dealership_id, [])
+
+    def marca_rows(self, marca: str) -> List[int]:
+        return self.rows_by_marca.get(marca.lower(), [])
+
+    def categoria_rows(self, categoria: str) -> List[int]:
+        return self.rows_by_categoria.get(categoria.lower(), [])
+
+    def count_by_dealership(self, dealership_id: str) -> int:
+        return len(self.dealership_rows(dealership_id))
+
+    def _index(self, car: Car, row: int):
+        self._index_keys(row, car.id, car.dealership_id, car.marca, car.categoria)
+
+    def _index_keys(self, row: int, car_id: str, dealership_id: str, marca: str, categoria: str):
+        # Ids repetidos: vale a primeira ocorrência (como a busca linear)
+        self.row_by_id.setdefault(car_id, row)
+        # insort mantém as linhas ordenadas (append no caso comum de add)
+        insort(self.rows_by_dealership.setdefault(dealership_id, []), row)
+        insort(self.rows_by_marca.setdefault(marca.lower(), []), row)
+        insort(self.rows_by_categoria.setdefault(categoria.lower(), []), row)
+
+    def _unindex(self, car: Car, row: int):
+        for index, key in (
+            (self.rows_by_dealership, car.dealership_id),
+            (self.rows_by_marca, car.marca.lower()),
+            (self.rows_by_categoria, car.categoria.lower()),
+        ):
+            rows = index.get(key)
+            if rows is None:
+                continue
+            rows.remove(row)
+            if not rows:
+                del index[key]
@@ -0,0 +1,390 @@
+"""
+Índice colunar do inventário para filtragem vetorizada
+
+Constrói, uma única vez por carga de inventário, arrays NumPy com as colunas
+usadas pelos filtros eliminatórios do UnifiedRecommendationEngine. Assim a
+cadeia filter_by_* vira uma única passada de máscara booleana que devolve os
+ids de linha dos candidatos, sem criar listas intermediárias de objetos Car.
+
+Os agregados do inventário (estatísticas, marcas, categorias) também saem
+das colunas, sem materializar os Car (ver `summary`).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.car import Car
+from models.user_profile import UserProfile
+from utils.geo_distance import get_city_coordinates
+
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class CategoricalColumn:
+    """
+    Coluna categórica codificada como inteiros
+
+    Cada valor distinto recebe um código; valores vazios recebem -1 e
+    nunca casam com nenhum filtro (mesma semântica das list comprehensions
+    originais, que exigiam o campo preenchido).
+    """
+
+    MISSING = -1
+
+    def __init__(self, values: Iterable[Optional[str]]):
+        self.vocabulary: List[str] = []
+        self.lookup: Dict[str, int] = {}
+
+        codes = []
+        for value in values:
+            if not value:
+                codes.append(self.MISSING)
+                continue
+            code = self.lookup.get(value)
+            if code is None:
+                code = len(self.vocabulary)
+                self.lookup[value] = code
+                self.vocabulary.append(value)
+            codes.append(code)
+
+        self.codes = np.asarray(codes, dtype=np.int32)
+
+    @classmethod
+    def from_codes(cls, codes: np.ndarray, vocabulary: List[str]) -> "CategoricalColumn":
+        """Reconstruir a coluna a partir de códigos já calculados (ex.: arquivo mapeado)"""
+        column = cls.__new__(cls)
+        column.vocabulary = list(vocabulary)
+        column.lookup = {value: code for code, value in enumerate(column.vocabulary)}
+        column.codes = codes
+        return column
+
+    def _codes_for(self, rows: Optional[np.ndarray]) -> np.ndarray:
+        return self.codes if rows is None else self.codes[rows]
+
+    def equals(self, value: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Máscara das linhas cujo valor é exatamente `value`"""
+        codes = self._codes_for(rows)
+        code = self.lookup.get(value)
+        if code is None:
+            return np.zeros(len(codes), dtype=bool)
+        return codes == code
+
+    def isin(self, values: Iterable[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Máscara das linhas cujo valor está em `values`"""
+        codes = self._codes_for(rows)
+        wanted = [self.lookup[v] for v in values if v in self.lookup]
+        if not wanted:
+            return np.zeros(len(codes), dtype=bool)
+        return np.isin(codes, wanted)
+
+    def contains(self, substring: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Máscara das linhas cujo valor contém `substring`"""
+        return self.isin([v for v in self.vocabulary if substring in v], rows)
+
+    def map_values(
+        self,
+        mapping: Dict[str, float],
+        default: float,
+        rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Mapear cada linha para `mapping[valor]` (ou `default`) via tabela por código"""
+        table = np.array(
+            [mapping.get(v, default) for v in self.vocabulary] + [default],
+            dtype=np.float64,
+        )
+        # Código -1 (valor ausente) cai na última posição da tabela
+        return table[self._codes_for(rows)]
+
+    def value_counts(self, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Contagem por valor (ordem de primeira ocorrência), ignorando ausentes"""
+        codes = self.codes if mask is None else self.codes[mask]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.vocabulary))
+        return {value: int(n) for value, n in zip(self.vocabulary, counts) if n}
+
+
+class InventoryIndex:
+    """
+    Índice colunar imutável sobre uma lista de carros
+
+    As linhas seguem a ordem de `cars`, então os ids devolvidos por
+    `candidate_ids` preservam a mesma ordem da filtragem sequencial.
+    """
+
+    # Colunas de score pré-calculadas (usadas pelo scoring em lote)
+    SCORE_COLUMNS = (
+        "score_familia",
+        "score_economia",
+        "score_performance",
+        "score_conforto",
+        "score_seguranca",
+        "indice_revenda",
+        "indice_confiabilidade",
+    )
+
+    # Demais colunas numéricas e colunas categóricas (usadas na exportação)
+    NUMERIC_COLUMNS = (
+        "preco",
+        "ano",
+        "quilometragem",
+        "latitude",
+        "longitude",
+        "custo_manutencao_anual",
+        "disponivel",
+    )
+    CATEGORICAL_COLUMNS = ("marca", "modelo", "categoria", "combustivel", "cambio", "state", "city")
+
+    def __init__(self, cars: List[Car]):
+        self.cars = cars
+        self.size = len(cars)
+        self.row_by_id: Dict[str, int] = {c.id: row for row, c in enumerate(cars)}
+
+        # Colunas numéricas
+        self.preco = np.fromiter((c.preco for c in cars), dtype=np.float64, count=self.size)
+        self.ano = np.fromiter((c.ano for c in cars), dtype=np.int32, count=self.size)
+        self.quilometragem = np.fromiter(
+            (c.quilometragem for c in cars), dtype=np.int64, count=self.size
+        )
+        self.latitude = np.fromiter(
+            (np.nan if c.dealership_latitude is None else c.dealership_latitude for c in cars),
+            dtype=np.float64,
+            count=self.size,
+        )
+        self.longitude = np.fromiter(
+            (np.nan if c.dealership_longitude is None else c.dealership_longitude for c in cars),
+            dtype=np.float64,
+            count=self.size,
+        )
+
+        self.scores: Dict[str, np.ndarray] = {
+            name: np.fromiter((getattr(c, name) for c in cars), dtype=np.float64, count=self.size)
+            for name in self.SCORE_COLUMNS
+        }
+        self.custo_manutencao_anual = np.fromiter(
+            (np.nan if c.custo_manutencao_anual is None else c.custo_manutencao_anual for c in cars),
+            dtype=np.float64,
+            count=self.size,
+        )
+        self.disponivel = np.fromiter((bool(c.disponivel) for c in cars), dtype=bool, count=self.size)
+
+        # Colunas categóricas (estado/cidade já normalizados como nos filtros)
+        self.marca = CategoricalColumn(c.marca for c in cars)
+        self.modelo = CategoricalColumn(c.modelo for c in cars)
+        self.categoria = CategoricalColumn(c.categoria for c in cars)
+        self.combustivel = CategoricalColumn(c.combustivel for c in cars)
+        self.cambio = CategoricalColumn(c.cambio for c in cars)
+        self.state = CategoricalColumn(
+            c.dealership_state.upper() if c.dealership_state else None for c in cars
+        )
+        self.city = CategoricalColumn(
+            c.dealership_city.lower() if c.dealership_city else None for c in cars
+        )
+        self._summary: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_columns(
+        cls,
+        cars: Sequence[Car],
+        ids: Sequence[str],
+        numeric: Dict[str, np.ndarray],
+        categorical: Dict[str, CategoricalColumn]
+    ) -> "InventoryIndex":
+        """
+        Montar o índice sobre colunas já prontas, sem iterar os objetos Car
+
+        Usado pelo inventário compartilhado: as colunas vêm de arquivos
+        mapeados em memória e `cars` materializa os Car sob demanda.
+        """
+        index = cls.__new__(cls)
+        index.cars = cars
+        index.size = len(ids)
+        index.row_by_id = {car_id: row for row, car_id in enumerate(ids)}
+
+        for name in cls.NUMERIC_COLUMNS:
+            setattr(index, name, numeric[name])
+        index.scores = {name: numeric[name] for name in cls.SCORE_COLUMNS}
+        for name in cls.CATEGORICAL_COLUMNS:
+            setattr(index, name, categorical[name])
+        index._summary = None
+        return index
+
+    def numeric_columns(self) -> Dict[str, np.ndarray]:
+        """Colunas numéricas (inclusive scores) por nome"""
+        columns = {name: getattr(self, name) for name in self.NUMERIC_COLUMNS}
+        columns.update(self.scores)
+        return columns
+
+    def categorical_columns(self) -> Dict[str, CategoricalColumn]:
+        """Colunas categóricas por nome"""
+        return {name: getattr(self, name) for name in self.CATEGORICAL_COLUMNS}
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Agregados do inventário, calculados uma vez por índice
+
+        - total_cars / available_cars
+        - cars_by_category: todos os carros
+        - cars_by_brand, prices, categories, brands, brands_models: só os
+          disponíveis
+        """
+        if self._summary is not None:
+            return self._summary
+
+        available = np.asarray(self.disponivel, dtype=bool)
+        prices = np.asarray(self.preco)[available]
+
+        pairs = np.stack([self.marca.codes[available], self.modelo.codes[available]], axis=1)
+        pairs = pairs[(pairs >= 0).all(axis=1)]
+        brands_models: Dict[str, set] = {}
+        for marca_code, modelo_code in np.unique(pairs, axis=0):
+            brands_models.setdefault(self.marca.vocabulary[marca_code], set()).add(
+                self.modelo.vocabulary[modelo_code]
+            )
+
+        self._summary = {
+            "total_cars": self.size,
+            "available_cars": int(available.sum()),
+            "cars_by_category": self.categoria.value_counts(),
+            "cars_by_brand": self.marca.value_counts(available),
+            "prices": {
+                "avg": float(prices.mean()) if len(prices) else 0,
+                "min": float(prices.min()) if len(prices) else 0,
+                "max": float(prices.max()) if len(prices) else 0,
+            },
+            "categories": sorted(self.categoria.value_counts(available)),
+            "brands": sorted(self.marca.value_counts(available)),
+            "brands_models": {
+                marca: sorted(modelos) for marca, modelos in sorted(brands_models.items())
+            },
+        }
+        return self._summary
+
+    def rows_where(
+        self,
+        rows: Optional[np.ndarray] = None,
+        preco_min: Optional[float] = None,
+        preco_max: Optional[float] = None,
+        available_only: bool = True
+    ) -> np.ndarray:
+        """Ids de linha (em ordem) dentro de `rows` que passam nos filtros de preço/disponibilidade"""
+        rows = np.arange(self.size) if rows is None else np.asarray(rows, dtype=np.intp)
+        mask = np.ones(len(rows), dtype=bool)
+        if available_only:
+            mask &= np.asarray(self.disponivel)[rows]
+        if preco_min:
+            mask &= np.asarray(self.preco)[rows] >= preco_min
+        if preco_max:
+            mask &= np.asarray(self.preco)[rows] <= preco_max
+        return rows[mask]
+
+    def matches(self, cars: List[Car]) -> bool:
+        """Verifica se o índice ainda corresponde à lista de carros informada"""
+        return cars is self.cars and len(cars) == self.size
+
+    def take(self, row_ids: Sequence[int]) -> List[Car]:
+        """Materializar os objetos Car para os ids de linha informados"""
+        return [self.cars[i] for i in row_ids]
+
+    def rows_for(self, cars: Iterable[Car]) -> np.ndarray:
+        """Ids de linha dos carros informados (na mesma ordem)"""
+        return np.fromiter((self.row_by_id[c.id] for c in cars), dtype=np.intp)
+
+    def filter_mask(self, profile: UserProfile) -> np.ndarray:
+        """
+        Aplicar todos os filtros eliminatórios de uma só vez
+
+        Equivalente à sequência filter_by_budget, filter_by_year, filter_by_km,
+        filter_by_state, filter_by_city, filter_by_radius e
+        filter_by_preferences do UnifiedRecommendationEngine.
+        """
+        # Orçamento (sempre aplicado)
+        mask = (
+            (self.preco > 0)
+            & (self.preco >= profile.orcamento_min)
+            & (self.preco <= profile.orcamento_max)
+        )
+
+        # Faixa de anos
+        if profile.ano_minimo:
+            mask &= self.ano >= profile.ano_minimo
+        if profile.ano_maximo:
+            mask &= self.ano <= profile.ano_maximo
+
+        # Quilometragem máxima
+        if profile.km_maxima:
+            mask &= self.quilometragem <= profile.km_maxima
+
+        # Localização
+        if profile.state:
+            mask &= self.state.equals(profile.state.upper())
+        if profile.city:
+            mask &= self.city.equals(profile.city.lower())
+        if profile.raio_maximo_km and profile.city:
+            radius_mask = self.radius_mask(profile.city, profile.raio_maximo_km)
+            if radius_mask is not None:
+                mask &= radius_mask
+
+        # Preferências obrigatórias
+        if profile.marcas_preferidas:
+            mask &= self.marca.isin(profile.marcas_preferidas)
+        if profile.marcas_rejeitadas:
+            mask &= ~self.marca.isin(profile.marcas_rejeitadas)
+        if profile.tipos_preferidos:
+            mask &= self.categoria.isin(profile.tipos_preferidos)
+        if profile.combustivel_preferido:
+            mask &= self.combustivel.equals(profile.combustivel_preferido)
+        if profile.cambio_preferido:
+            mask &= self.cambio.contains(profile.cambio_preferido)
+
+        return mask
+
+    def candidate_ids(self, profile: UserProfile) -> np.ndarray:
+        """Ids de linha (em ordem) dos carros que passam nos filtros eliminatórios"""
+        return np.flatnonzero(self.filter_mask(profile))
+
+    def radius_mask(self, user_city: str, raio_km: int) -> Optional[np.ndarray]:
+        """
+        Máscara de concessionárias dentro do raio (Haversine vetorizado)
+
+        Retorna None quando a cidade do usuário não tem coordenadas conhecidas,
+        caso em que o filtro de raio não é aplicado.
+        """
+        user_coords = get_city_coordinates(user_city)
+        if not user_coords:
+            print(f"[AVISO] Coordenadas não encontradas para: {user_city}")
+            return None
+
+        distances = haversine_distances(user_coords, self.latitude, self.longitude)
+        # NaN (sem coordenadas ou coordenadas inválidas) compara como False
+        return distances <= raio_km
+
+
+def haversine_distances(
+    origin: Tuple[float, float],
+    latitudes: np.ndarray,
+    longitudes: np.ndarray
+) -> np.ndarray:
+    """
+    Distâncias em km de `origin` até cada coordenada (NaN se inválida)
+
+    Mesma fórmula de utils.geo_distance.haversine_distance, aplicada a arrays.
+    """
+    lat1, lon1 = origin
+    if not (-90 <= lat1 <= 90 and -180 <= lon1 <= 180):
+        return np.full(len(latitudes), np.nan)
+
+    valid = (
+        (latitudes >= -90) & (latitudes <= 90)
+        & (longitudes >= -180) & (longitudes <= 180)
+    )
+
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(latitudes)
+    dlat = lat2_rad - lat1_rad
+    dlon = np.radians(longitudes) - np.radians(lon1)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return np.where(valid, EARTH_RADIUS_KM * c, np.nan)
@@ -0,0 +1,98 @@
+"""
+Snapshot binário do inventário enriquecido
+
+Cada start de worker relia o dealerships.json, revalidava todos os carros
+via Pydantic e recalculava métricas (CarMetricsCalculator). O snapshot
+guarda o resultado já enriquecido e validado (concessionárias + carros)
+num pickle versionado; o próximo start carrega tudo de uma vez.
+
+A chave do snapshot combina:
+- SNAPSHOT_VERSION (incrementar ao mudar o enriquecimento em load_all_cars)
+- hash dos campos de Car e Dealership (mudança de modelo invalida)
+- hash do conteúdo dos arquivos de origem
+
+Qualquer divergência (ou arquivo corrompido) faz o engine cair no
+caminho completo e regravar o snapshot.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Iterable, List, Optional, Tuple
+
+from models.car import Car
+from models.dealership import Dealership
+
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILENAME = "inventory_snapshot.pkl"
+
+
+def source_fingerprint(source_paths: Iterable[str]) -> Optional[str]:
+    """
+    Impressão digital das fontes do inventário
+
+    Retorna None se algum arquivo de origem não existir (sem snapshot).
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{SNAPSHOT_VERSION}".encode())
+
+    # Campos + tipos + defaults (model_json_schema custaria mais que a própria carga)
+    for model in (Car, Dealership):
+        for name, field in model.model_fields.items():
+            digest.update(f"{model.__name__}.{name}:{field.annotation!r}={field.default!r}".encode("utf-8"))
+
+    for path in source_paths:
+        if not os.path.exists(path):
+            return None
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def load_snapshot(path: str, fingerprint: str) -> Optional[Tuple[List[Dealership], List[Car]]]:
+    """
+    Carregar (concessionárias, carros) do snapshot
+
+    Retorna None se o arquivo não existir, estiver corrompido ou tiver
+    sido gerado a partir de outra versão das fontes.
+    """
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        print(f"[SNAPSHOT] ⚠️ Snapshot ilegível ({e}), ignorando")
+        return None
+
+    if not isinstance(payload, dict) or payload.get("fingerprint") != fingerprint:
+        return None
+
+    return payload["dealerships"], payload["cars"]
+
+
+def save_snapshot(path: str, fingerprint: str, dealerships: List[Dealership], cars: List[Car]):
+    """Gravar o snapshot de forma atômica (arquivo temporário + rename)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "fingerprint": fingerprint,
+        "dealerships": dealerships,
+        "cars": cars,
+    }
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"[SNAPSHOT] ⚠️ Erro ao gravar snapshot: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
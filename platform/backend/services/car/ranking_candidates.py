@@ -0,0 +1,69 @@
+"""
+Conjunto de candidatos de um ranking, reaproveitável entre rodadas
+
+Tudo o que o UnifiedRecommendationEngine.rank calcula antes de combinar os
+sub-scores depende do perfil, exceto das prioridades: filtros eliminatórios,
+filtros de contexto, TCO, capacidade financeira, priorização por localização
+e os sub-scores de categoria, preferências e posição no orçamento. Quando só
+as prioridades mudam (refinamento por feedback), uma nova rodada reaproveita
+este conjunto e apenas recalcula o sub-score de prioridades e a ordenação.
+"""
+
+import json
+from typing import List, Optional
+
+import numpy as np
+
+from models.car import Car
+from models.user_profile import TCOBreakdown, UserProfile
+from services.car.inventory_index import InventoryIndex
+
+
+# Campos do perfil que não afetam filtros nem sub-scores pré-calculados
+WEIGHT_ONLY_FIELDS = {"prioridades"}
+
+
+def candidates_key(profile: UserProfile) -> str:
+    """Chave do perfil sem as prioridades (mesma chave = mesmos candidatos)"""
+    return json.dumps(
+        profile.model_dump(mode="json", exclude=WEIGHT_ONLY_FIELDS),
+        sort_keys=True,
+        default=str
+    )
+
+
+class RankingCandidates:
+    """
+    Candidatos disponíveis (na ordem do ranking antes dos scores), com TCO e
+    sub-scores independentes das prioridades
+    """
+
+    def __init__(
+        self,
+        key: str,
+        index: InventoryIndex,
+        cars: List[Car],
+        tcos: List[Optional[TCOBreakdown]],
+        rows: np.ndarray,
+        category_scores: np.ndarray,
+        preferences_scores: np.ndarray,
+        budget_scores: np.ndarray,
+        suitability: Optional[np.ndarray] = None
+    ):
+        self.key = key
+        self.index = index
+        self.cars = cars
+        self.tcos = tcos
+        self.rows = rows
+        self.category_scores = category_scores
+        self.preferences_scores = preferences_scores
+        self.budget_scores = budget_scores
+        # Adequação comercial por carro (uso comercial); None = sem ajuste
+        self.suitability = suitability
+
+    def __len__(self) -> int:
+        return len(self.cars)
+
+    def matches(self, profile: UserProfile, index: InventoryIndex) -> bool:
+        """Reaproveitável para este perfil e inventário atual?"""
+        return index is self.index and candidates_key(profile) == self.key
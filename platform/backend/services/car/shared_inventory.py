@@ -0,0 +1,244 @@
+"""
+Inventário compartilhado entre workers (arquivos mapeados em memória)
+
+Cada worker do uvicorn/gunicorn montava sua própria cópia de `all_cars`
+(objetos Pydantic) e do índice colunar, então a memória crescia linearmente
+com o número de workers. Aqui o primeiro worker publica o inventário num
+diretório de arquivos somente leitura:
+
+- <coluna>.npy          colunas numéricas e códigos categóricos
+- records.bin           JSON de cada carro, concatenados
+- offsets.npy           início de cada registro em records.bin (n + 1)
+- meta.json             fingerprint, vocabulários, chaves e concessionárias
+
+Os demais workers fazem `np.load(mmap_mode="r")`: as páginas vêm do page
+cache do SO, compartilhadas entre processos (zero-copy). Objetos Car só são
+construídos para as linhas efetivamente acessadas (LazyCarList); filtros e
+agregados (disponibilidade, preço, categoria, marca...) usam as colunas do
+InventoryIndex, então passar por `all_cars` inteiro deve ser evitado.
+
+Para memória compartilhada de fato, aponte INVENTORY_SHARED_DIR para um
+tmpfs (ex.: /dev/shm/facilIAuto).
+"""
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from models.car import Car
+from models.dealership import Dealership
+from services.car.car_lookup import CarLookup
+from services.car.inventory_index import CategoricalColumn, InventoryIndex
+
+
+SHARED_DIRNAME = "shared_inventory"
+META_FILENAME = "meta.json"
+RECORDS_FILENAME = "records.bin"
+OFFSETS_FILENAME = "offsets.npy"
+
+# Incrementar ao mudar as colunas gravadas (versões antigas são republicadas)
+SHARED_FORMAT_VERSION = 2
+
+
+class LazyCarList(Sequence[Car]):
+    """
+    Sequência somente leitura de Car decodificados sob demanda
+
+    Cada acesso decodifica o registro JSON da linha a partir do arquivo
+    mapeado; um LRU pequeno evita redecodificar as linhas mais acessadas
+    sem deixar a memória crescer com o inventário.
+    """
+
+    def __init__(self, records: np.ndarray, offsets: np.ndarray, cache_size: int = 1024):
+        self.records = records
+        self.offsets = offsets
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, Car]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: Union[int, slice]) -> Union[Car, List[Car]]:
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+
+        size = len(self)
+        if row < 0:
+            row += size
+        if not 0 <= row < size:
+            raise IndexError("LazyCarList index out of range")
+
+        with self._lock:
+            car = self._cache.get(row)
+            if car is not None:
+                self._cache.move_to_end(row)
+                return car
+
+        car = self._decode(row)
+
+        if self.cache_size > 0:
+            with self._lock:
+                self._cache[row] = car
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return car
+
+    def __iter__(self) -> Iterator[Car]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def _decode(self, row: int) -> Car:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return Car.model_validate_json(self.records[start:end].tobytes())
+
+
+class SharedInventory:
+    """Inventário anexado a partir do diretório compartilhado"""
+
+    def __init__(
+        self,
+        dealerships: List[Dealership],
+        cars: LazyCarList,
+        index: InventoryIndex,
+        lookup: CarLookup
+    ):
+        self.dealerships = dealerships
+        self.cars = cars
+        self.index = index
+        self.lookup = lookup
+
+
+def _version_dir(directory: str, fingerprint: str) -> str:
+    return os.path.join(directory, f"{fingerprint[:16]}.v{SHARED_FORMAT_VERSION}")
+
+
+def publish_shared_inventory(
+    directory: str,
+    fingerprint: str,
+    dealerships: List[Dealership],
+    cars: List[Car],
+    index: InventoryIndex
+) -> bool:
+    """
+    Gravar o inventário no diretório compartilhado (uma vez por fingerprint)
+
+    A versão é escrita num diretório temporário e renomeada de forma
+    atômica; se outro worker publicou antes, o temporário é descartado.
+    Versões antigas são removidas (workers que ainda as mapeiam seguem
+    funcionando, pois o SO só libera os arquivos após o munmap).
+
+    Returns:
+        True se a versão do fingerprint está disponível ao final
+    """
+    target = _version_dir(directory, fingerprint)
+    if os.path.exists(os.path.join(target, META_FILENAME)):
+        return True
+
+    tmp_dir = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        for name, column in index.numeric_columns().items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(column))
+        vocabularies = {}
+        for name, column in index.categorical_columns().items():
+            np.save(os.path.join(tmp_dir, f"{name}.codes.npy"), np.ascontiguousarray(column.codes))
+            vocabularies[name] = column.vocabulary
+
+        offsets = np.zeros(len(cars) + 1, dtype=np.int64)
+        with open(os.path.join(tmp_dir, RECORDS_FILENAME), "wb") as f:
+            for row, car in enumerate(cars):
+                record = car.model_dump_json().encode("utf-8")
+                f.write(record)
+                offsets[row + 1] = offsets[row] + len(record)
+        np.save(os.path.join(tmp_dir, OFFSETS_FILENAME), offsets)
+
+        meta = {
+            "fingerprint": fingerprint,
+            "size": len(cars),
+            "vocabularies": vocabularies,
+            "keys": [[c.id, c.dealership_id, c.marca, c.categoria] for c in cars],
+            # Carros já estão em records.bin; não duplicar em cada worker
+            "dealerships": [
+                d.model_copy(update={"carros": []}).model_dump(mode="json") for d in dealerships
+            ],
+        }
+        with open(os.path.join(tmp_dir, META_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        try:
+            os.rename(tmp_dir, target)
+        except OSError:
+            # Outro worker publicou a mesma versão primeiro
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception as e:
+        print(f"[SHARED] ⚠️ Erro ao publicar inventário compartilhado: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return False
+
+    _remove_stale_versions(directory, keep=os.path.basename(target))
+    return os.path.exists(os.path.join(target, META_FILENAME))
+
+
+def _remove_stale_versions(directory: str, keep: str):
+    for entry in os.listdir(directory):
+        if entry != keep and not entry.endswith(".tmp"):
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+
+def attach_shared_inventory(
+    directory: str,
+    fingerprint: str,
+    cache_size: int = 1024
+) -> Optional[SharedInventory]:
+    """
+    Anexar (somente leitura, zero-copy) a versão publicada do inventário
+
+    Retorna None se a versão do fingerprint ainda não foi publicada ou
+    estiver ilegível.
+    """
+    version_dir = _version_dir(directory, fingerprint)
+    meta_path = os.path.join(version_dir, META_FILENAME)
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") != fingerprint:
+            return None
+
+        def _load(filename: str) -> np.ndarray:
+            return np.load(os.path.join(version_dir, filename), mmap_mode="r")
+
+        numeric = {
+            name: _load(f"{name}.npy")
+            for name in InventoryIndex.NUMERIC_COLUMNS + InventoryIndex.SCORE_COLUMNS
+        }
+        categorical = {
+            name: CategoricalColumn.from_codes(_load(f"{name}.codes.npy"), meta["vocabularies"][name])
+            for name in InventoryIndex.CATEGORICAL_COLUMNS
+        }
+
+        offsets = _load(OFFSETS_FILENAME)
+        if meta["size"] == 0:
+            records = np.zeros(0, dtype=np.uint8)
+        else:
+            records = np.memmap(os.path.join(version_dir, RECORDS_FILENAME), dtype=np.uint8, mode="r")
+    except Exception as e:
+        print(f"[SHARED] ⚠️ Inventário compartilhado ilegível ({e}), ignorando")
+        return None
+
+    cars = LazyCarList(records, offsets, cache_size=cache_size)
+    keys: List[Tuple[str, str, str, str]] = [tuple(k) for k in meta["keys"]]
+    index = InventoryIndex.from_columns(cars, [k[0] for k in keys], numeric, categorical)
+    lookup = CarLookup(cars, keys=keys)
+    dealerships = [Dealership(**d) for d in meta["dealerships"]]
+
+    return SharedInventory(dealerships, cars, index, lookup)
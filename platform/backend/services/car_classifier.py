@@ -3,15 +3,80 @@ Sistema de Classificação Inteligente de Carros
 Classifica veículos por categoria baseado no nome/modelo e infere características típicas
 """
 
-from typing import Dict, List, Tuple
+from bisect import bisect_right
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
 import re
 
 
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Regex em forma de trie (prefixos compartilhados) que casa, em cada
+    posição, a MAIOR das palavras que começa ali
+    """
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Palavra termina aqui mas pode continuar: opcional guloso (tenta a maior primeiro)
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
 class CarClassifier:
     """
     Classificador inteligente de carros por categoria
+    
+    ⚡ Por padrão usa um autômato único com todas as palavras-chave (motos,
+    indicadores de carro e MODEL_PATTERNS): uma varredura do texto marca os
+    grupos presentes e a precedência (Moto > Pickup > Van > SUV > Sedan >
+    Compacto > Hatch) é aplicada sobre esses grupos. `use_automaton=False`
+    mantém a verificação original, palavra a palavra.
     """
     
+    # Marcas que só fabricam motos no Brasil
+    MOTO_ONLY_BRANDS = ['yamaha', 'kawasaki', 'suzuki', 'ducati', 'triumph', 
+                        'ktm', 'harley-davidson', 'bmw motorrad', 'royal enfield',
+                        'benelli', 'dafra', 'shineray', 'traxx', 'kasinski']
+    
+    # Palavras-chave diretas de motos
+    MOTO_KEYWORDS = ['moto', 'motorcycle', 'bike', 'scooter', 'motocicleta', 
+                     'cilindrada', ' cc ', 'trail', 'enduro', 'custom']
+    
+    # Palavras que indicam que é um carro, não moto
+    CAR_INDICATORS = ['hybrid', 'cvt', 'automatic', 'turbo', 'flex', 'sedan', 
+                      'hatch', 'suv', 'pickup', 'wagon', 'sport']
+    
+    # Modelos típicos de motos
+    MOTO_MODELS = [
+        # Honda motos
+        'cb ', 'cb-', 'cbr', 'cb125', 'cb300', 'cb500', 'cb650', 'cb1000',
+        'crf', 'xre', 'bros', 'biz', 'pop', 'titan', 'fan',
+        # Yamaha motos (excluir 'mt' genérico, usar apenas específicos)
+        'mt-07', 'mt-09', 'mt-03', 'mt 07', 'mt 09', 'mt 03',
+        'xj', 'xtz', 'ybr', 'fazer', 'yzf', 'r1', 'r3', 'r6',
+        'neo', 'nmax', 'crosser', 'lander', 'tenere',  # Scooters e trail
+        # Kawasaki
+        'ninja', 'z650', 'z900', 'zx', 'versys',
+        # Suzuki motos
+        'gsxr', 'gsx', 'v-strom', 'bandit', 'intruder',
+        # BMW motos
+        'r1200', 'f800', 'g310', 'gs', 'adventure',
+        # Scooters
+        'pcx', 'sh', 'lead', 'burgman'
+    ]
+    
+    # Ordem de especificidade dos MODEL_PATTERNS
+    CATEGORY_PRECEDENCE = ['Pickup', 'Van', 'SUV', 'Sedan', 'Compacto', 'Hatch']
+    
     # Mapeamento de padrões de modelo → categoria
     MODEL_PATTERNS = {
         'SUV': [
@@ -84,6 +149,62 @@ class CarClassifier:
         'xlt', 'xls', 's.design', 'r-design', 'sport', 'gtline'
     ]
     
+    def __init__(self, use_automaton: bool = True):
+        self.use_automaton = use_automaton
+        self._build_automaton()
+    
+    def _build_automaton(self):
+        """Compilar todas as palavras-chave num único autômato (regex em trie)"""
+        groups: Dict[str, set] = {}
+        
+        def tag(words, group):
+            for word in words:
+                groups.setdefault(word, set()).add(group)
+        
+        tag(self.MOTO_KEYWORDS, 'moto_keyword')
+        tag(self.CAR_INDICATORS, 'car_indicator')
+        tag(self.MOTO_MODELS, 'moto_model')
+        tag(['focus'], 'focus')
+        for category, patterns in self.MODEL_PATTERNS.items():
+            tag(patterns, category)
+        
+        # O autômato devolve só a maior palavra em cada posição; as menores que
+        # começam ali são prefixos dela, então herdam seus grupos
+        self._groups_by_match: Dict[str, FrozenSet[str]] = {
+            word: frozenset().union(*(
+                word_groups for other, word_groups in groups.items() if word.startswith(other)
+            ))
+            for word in groups
+        }
+        self._automaton = re.compile('(?=(' + _trie_regex(groups) + '))')
+    
+    def _match_groups(self, text: str) -> set:
+        """Grupos de palavras-chave presentes em `text` (uma varredura)"""
+        found = set()
+        for match in self._automaton.finditer(text):
+            found |= self._groups_by_match[match.group(1)]
+        return found
+    
+    def _decide(self, found: set, ano: Optional[int], marca_lower: str) -> str:
+        """Aplicar a precedência sobre os grupos encontrados"""
+        # IMPORTANTE: Filtrar motos PRIMEIRO (não são carros)
+        if marca_lower in self.MOTO_ONLY_BRANDS:
+            return 'Moto'
+        if 'moto_keyword' in found:
+            return 'Moto'
+        if 'car_indicator' not in found and 'moto_model' in found:
+            return 'Moto'
+        
+        for category in self.CATEGORY_PRECEDENCE:
+            # Caso especial: Ford Focus 2009-2013 era sedan no Brasil (antes dos padrões Sedan)
+            if category == 'Sedan' and 'focus' in found and ano and 2009 <= ano <= 2013:
+                return 'Sedan'
+            if category in found:
+                return category
+        
+        # Default: Hatch (maioria dos carros populares)
+        return 'Hatch'
+    
     def classify(self, nome: str, modelo: str, ano: int = None, marca: str = None) -> str:
         """
         Classificar categoria baseado no nome/modelo
@@ -97,6 +218,60 @@ class CarClassifier:
         Returns:
             Categoria: SUV, Sedan, Pickup, Hatch, Compacto, Van, Moto
         """
+        if not self.use_automaton:
+            return self._classify_linear(nome, modelo, ano, marca)
+        
+        search_text = f"{nome} {modelo}".lower()
+        return self._decide(self._match_groups(search_text), ano, (marca or '').lower())
+    
+    def classify_many(self, cars: Iterable[Mapping]) -> List[str]:
+        """
+        ⚡ Classificar um inventário inteiro numa única varredura
+        
+        Os textos (únicos) são concatenados com um separador que nenhuma
+        palavra-chave contém e o autômato percorre tudo de uma vez.
+        
+        Args:
+            cars: Dicts no formato do estoque (nome, modelo, ano, marca);
+                  sem 'modelo', usa o 'nome' (como os scripts de reclassificação)
+        
+        Returns:
+            Categorias na mesma ordem de `cars`
+        """
+        cars = list(cars)
+        texts = [
+            f"{car.get('nome', '')} {car.get('modelo', car.get('nome', ''))}".lower()
+            for car in cars
+        ]
+        if not self.use_automaton:
+            return [
+                self._classify_linear(
+                    car.get('nome', ''), car.get('modelo', car.get('nome', '')),
+                    car.get('ano'), car.get('marca')
+                )
+                for car in cars
+            ]
+        
+        unique = list(dict.fromkeys(texts))
+        starts = []
+        offset = 0
+        for text in unique:
+            starts.append(offset)
+            offset += len(text) + 1
+        
+        found_by_text = [set() for _ in unique]
+        for match in self._automaton.finditer('\0'.join(unique)):
+            row = bisect_right(starts, match.start()) - 1
+            found_by_text[row] |= self._groups_by_match[match.group(1)]
+        
+        found_by_text = dict(zip(unique, found_by_text))
+        return [
+            self._decide(found_by_text[text], car.get('ano'), (car.get('marca') or '').lower())
+            for car, text in zip(cars, texts)
+        ]
+    
+    def _classify_linear(self, nome: str, modelo: str, ano: int = None, marca: str = None) -> str:
+        """Classificação original: uma verificação `in` por palavra-chave"""
         # Normalizar para lowercase para comparação
         search_text = f"{nome} {modelo}".lower()
         marca_lower = (marca or '').lower()
@@ -104,16 +279,11 @@ class CarClassifier:
         # IMPORTANTE: Filtrar motos PRIMEIRO (não são carros)
         
         # 1. Marcas que só fabricam motos no Brasil
-        moto_only_brands = ['yamaha', 'kawasaki', 'suzuki', 'ducati', 'triumph', 
-                           'ktm', 'harley-davidson', 'bmw motorrad', 'royal enfield',
-                           'benelli', 'dafra', 'shineray', 'traxx', 'kasinski']
-        if marca_lower in moto_only_brands:
+        if marca_lower in self.MOTO_ONLY_BRANDS:
             return 'Moto'
         
         # 2. Palavras-chave diretas de motos
-        moto_keywords = ['moto', 'motorcycle', 'bike', 'scooter', 'motocicleta', 
-                        'cilindrada', ' cc ', 'trail', 'enduro', 'custom']
-        if any(palavra in search_text for palavra in moto_keywords):
+        if any(palavra in search_text for palavra in self.MOTO_KEYWORDS):
             return 'Moto'
         
         # 3. Modelos típicos de motos
@@ -121,30 +291,11 @@ class CarClassifier:
         # MT pode ser "Manual Transmission", CVT é "Continuously Variable Transmission"
         
         # Palavras que indicam que é um carro, não moto
-        car_indicators = ['hybrid', 'cvt', 'automatic', 'turbo', 'flex', 'sedan', 
-                         'hatch', 'suv', 'pickup', 'wagon', 'sport']
-        is_likely_car = any(indicator in search_text for indicator in car_indicators)
+        is_likely_car = any(indicator in search_text for indicator in self.CAR_INDICATORS)
         
         # Se tem indicadores de carro, não verificar modelos de moto
         if not is_likely_car:
-            moto_models = [
-                # Honda motos
-                'cb ', 'cb-', 'cbr', 'cb125', 'cb300', 'cb500', 'cb650', 'cb1000',
-                'crf', 'xre', 'bros', 'biz', 'pop', 'titan', 'fan',
-                # Yamaha motos (excluir 'mt' genérico, usar apenas específicos)
-                'mt-07', 'mt-09', 'mt-03', 'mt 07', 'mt 09', 'mt 03',
-                'xj', 'xtz', 'ybr', 'fazer', 'yzf', 'r1', 'r3', 'r6',
-                'neo', 'nmax', 'crosser', 'lander', 'tenere',  # Scooters e trail
-                # Kawasaki
-                'ninja', 'z650', 'z900', 'zx', 'versys',
-                # Suzuki motos
-                'gsxr', 'gsx', 'v-strom', 'bandit', 'intruder',
-                # BMW motos
-                'r1200', 'f800', 'g310', 'gs', 'adventure',
-                # Scooters
-                'pcx', 'sh', 'lead', 'burgman'
-            ]
-            if any(model in search_text for model in moto_models):
+            if any(model in search_text for model in self.MOTO_MODELS):
                 return 'Moto'
         
         # Buscar padrões em ordem de especificidade
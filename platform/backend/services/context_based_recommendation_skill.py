@@ -14,6 +14,8 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import difflib
 
+import numpy as np
+
 from models.car import Car
 from models.user_profile import UserProfile
 from services.unified_recommendation_engine import UnifiedRecommendationEngine
@@ -62,9 +64,10 @@ class ContextBasedRecommendationSkill:
     para recomendar carros baseado no contexto de uso
     """
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", recommendation_engine: Optional[UnifiedRecommendationEngine] = None):
         self.data_dir = data_dir
-        self.recommendation_engine = UnifiedRecommendationEngine(data_dir)
+        # Reusar o engine da API evita uma segunda cópia do inventário por worker
+        self.recommendation_engine = recommendation_engine or UnifiedRecommendationEngine(data_dir)
         self.app_transport_validator = AppTransportValidator(data_dir)
         self.usage_profiles = {}
         self.search_patterns = {}
@@ -247,11 +250,8 @@ class ContextBasedRecommendationSkill:
         if context.profile_match and context.profile_match in self.usage_profiles:
             usage_profile = self.usage_profiles[context.profile_match]
             
-        # 3. Obter carros candidatos
-        all_cars = self.recommendation_engine.all_cars
-        
-        # 4. Aplicar filtros básicos baseados nas entidades extraídas
-        filtered_cars = self._apply_entity_filters(all_cars, context)
+        # 3-4. Carros candidatos com os filtros básicos das entidades extraídas
+        filtered_cars = self._apply_entity_filters(context)
         
         # 5. Calcular scores contextuais
         contextual_recommendations = []
@@ -286,36 +286,34 @@ class ContextBasedRecommendationSkill:
         
         return contextual_recommendations[:max_results]
         
-    def _apply_entity_filters(self, cars: List[Car], context: SearchContext) -> List[Car]:
-        """Aplica filtros baseados nas entidades extraídas"""
-        filtered_cars = cars.copy()
+    def _apply_entity_filters(self, context: SearchContext) -> List[Car]:
+        """
+        Aplica filtros baseados nas entidades extraídas
+        
+        ⚡ Filtra pelas colunas do índice do engine: só os carros que passam
+        são materializados (importante com o inventário compartilhado).
+        """
+        index = self.recommendation_engine.get_inventory_index()
         entities = context.extracted_entities
+        mask = np.ones(index.size, dtype=bool)
         
         # Filtro por marcas
         if 'marcas' in entities:
-            marcas_lower = [m.lower() for m in entities['marcas']]
-            filtered_cars = [
-                car for car in filtered_cars 
-                if car.marca.lower() in marcas_lower
-            ]
+            marcas_lower = {m.lower() for m in entities['marcas']}
+            mask &= index.marca.isin(
+                [marca for marca in index.marca.vocabulary if marca.lower() in marcas_lower]
+            )
             
         # Filtro por anos
         if 'anos' in entities:
-            anos = entities['anos']
-            filtered_cars = [
-                car for car in filtered_cars 
-                if car.ano in anos
-            ]
+            mask &= np.isin(index.ano, list(entities['anos']))
             
         # Filtro por valores
         if 'valores' in entities and len(entities['valores']) >= 1:
             max_valor = max(entities['valores'])
-            filtered_cars = [
-                car for car in filtered_cars 
-                if car.preco <= max_valor
-            ]
+            mask &= index.preco <= max_valor
             
-        return filtered_cars
+        return index.take(np.flatnonzero(mask))
         
     def _calculate_base_score(self, car: Car, context: SearchContext, user_data: Dict[str, Any]) -> float:
         """Calcula score base do carro"""
@@ -558,9 +556,12 @@ class ContextBasedRecommendationSkill:
         return is_valid, accepted_category or "nenhuma", all_categories
         
 
-def create_context_skill(data_dir: str = "data") -> ContextBasedRecommendationSkill:
+def create_context_skill(
+    data_dir: str = "data",
+    recommendation_engine: Optional[UnifiedRecommendationEngine] = None
+) -> ContextBasedRecommendationSkill:
     """Factory function para criar a skill"""
-    return ContextBasedRecommendationSkill(data_dir)
+    return ContextBasedRecommendationSkill(data_dir, recommendation_engine)
 
 
 # Exemplo de uso
@@ -0,0 +1,133 @@
+"""
+🤖 ML System: Agregados incrementais de interações
+
+Antes, cada GET /api/ml/stats relia todas as interações, reconvertia cada
+timestamp com fromisoformat e remontava os conjuntos de sessões e carros.
+InteractionAggregates é atualizado a cada evento gravado e guarda:
+
+- contadores por tipo, soma/contagem de durações e última interação
+- índices sessão -> posições e carro -> posições (os conjuntos únicos são
+  as chaves, então as contagens são exatas, sem HyperLogLog)
+
+As posições são opacas para o agregado: o log JSONL usa o offset em bytes
+da linha; varreduras em memória usam o índice na lista.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models.interaction import InteractionStats, InteractionType
+
+
+def parse_interaction_timestamp(value) -> Optional[datetime]:
+    """Timestamp ISO (aceita sufixo Z) ou None se ausente/inválido"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class InteractionAggregates:
+    """Estatísticas e índices mantidos evento a evento"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_type: Dict[str, int] = {}
+        self.duration_sum = 0
+        self.duration_count = 0
+        self.last_interaction: Optional[datetime] = None
+        self.sessions: Dict[str, List[int]] = {}
+        self.cars: Dict[str, List[int]] = {}
+
+    def add(self, record: Dict, position: int):
+        """Incorporar um evento persistido na posição informada"""
+        self.total += 1
+
+        interaction_type = record.get('interaction_type')
+        self.by_type[interaction_type] = self.by_type.get(interaction_type, 0) + 1
+
+        self.sessions.setdefault(record.get('session_id'), []).append(position)
+        self.cars.setdefault(record.get('car_id'), []).append(position)
+
+        duration = record.get('duration_seconds')
+        if duration is not None:
+            self.duration_sum += duration
+            self.duration_count += 1
+
+        timestamp = parse_interaction_timestamp(record.get('timestamp'))
+        if timestamp is not None:
+            try:
+                if self.last_interaction is None or timestamp > self.last_interaction:
+                    self.last_interaction = timestamp
+            except TypeError:
+                pass  # mistura de timestamps com e sem fuso (mesmo descarte do cálculo antigo)
+
+    def positions(self, session_id: Optional[str] = None, car_id: Optional[str] = None) -> List[int]:
+        """Posições (em ordem de gravação) dos eventos da sessão e/ou carro"""
+        if session_id is not None and car_id is not None:
+            by_car = set(self.cars.get(car_id, ()))
+            return [p for p in self.sessions.get(session_id, ()) if p in by_car]
+        if session_id is not None:
+            return list(self.sessions.get(session_id, ()))
+        if car_id is not None:
+            return list(self.cars.get(car_id, ()))
+        raise ValueError("Informe session_id e/ou car_id")
+
+    def to_stats(self) -> InteractionStats:
+        """Converter para o modelo da API (O(1))"""
+        if not self.total:
+            return InteractionStats()
+
+        return InteractionStats(
+            total_interactions=self.total,
+            click_count=self.by_type.get(InteractionType.CLICK.value, 0),
+            view_details_count=self.by_type.get(InteractionType.VIEW_DETAILS.value, 0),
+            whatsapp_contact_count=self.by_type.get(InteractionType.WHATSAPP_CONTACT.value, 0),
+            unique_sessions=len(self.sessions),
+            unique_cars=len(self.cars),
+            avg_duration_seconds=(
+                self.duration_sum / self.duration_count if self.duration_count else None
+            ),
+            last_interaction=self.last_interaction
+        )
+
+    def checkpoint_state(self) -> Dict:
+        """
+        Estado para o checkpoint, capturado sob o lock em O(chaves)
+
+        As listas de posições só crescem (append), então basta guardar o
+        tamanho de cada uma; to_dict(state) as corta depois, fora do lock.
+        """
+        return {
+            "total": self.total,
+            "by_type": dict(self.by_type),
+            "duration_sum": self.duration_sum,
+            "duration_count": self.duration_count,
+            "last_interaction": self.last_interaction.isoformat() if self.last_interaction else None,
+            "sessions": {key: len(positions) for key, positions in self.sessions.items()},
+            "cars": {key: len(positions) for key, positions in self.cars.items()},
+        }
+
+    def to_dict(self, state: Optional[Dict] = None) -> Dict:
+        """Formato persistido (JSON) do checkpoint (do estado atual ou de `state`)"""
+        if state is None:
+            state = self.checkpoint_state()
+        return {
+            **state,
+            "sessions": {key: self.sessions[key][:n] for key, n in state["sessions"].items()},
+            "cars": {key: self.cars[key][:n] for key, n in state["cars"].items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "InteractionAggregates":
+        aggregates = cls()
+        aggregates.total = data["total"]
+        aggregates.by_type = dict(data["by_type"])
+        aggregates.duration_sum = data["duration_sum"]
+        aggregates.duration_count = data["duration_count"]
+        aggregates.last_interaction = parse_interaction_timestamp(data.get("last_interaction"))
+        aggregates.sessions = {k: list(v) for k, v in data["sessions"].items()}
+        aggregates.cars = {k: list(v) for k, v in data["cars"].items()}
+        return aggregates
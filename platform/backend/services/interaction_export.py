@@ -0,0 +1,236 @@
+"""
+🤖 ML System: Exportação incremental de interações
+
+Encoders em streaming para /api/ml/export-data: cada formato consome um
+iterável de interações e produz blocos de bytes, sem montar o corpo
+inteiro em memória.
+
+Formatos:
+- json:    envelope legado ({"status", "data": {"interactions": [...]}, ...})
+- ndjson:  uma interação por linha
+- csv:     colunas achatadas (user_preferences.*, car_snapshot.*)
+- parquet: row groups por lote (requer pyarrow, opcional)
+
+Cursor: posição opaca devolvida pelo backend (`InteractionStorage.scan`),
+codificada junto com o nome do backend para não ser reaproveitada entre
+backends diferentes.
+"""
+
+import base64
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+EXPORT_FORMATS = ("json", "ndjson", "csv", "parquet")
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Colunas achatadas (csv/parquet) e seus tipos
+EXPORT_COLUMNS: List[Tuple[str, str]] = [
+    ("id", "string"),
+    ("session_id", "string"),
+    ("car_id", "string"),
+    ("interaction_type", "string"),
+    ("timestamp", "string"),
+    ("duration_seconds", "int"),
+    ("recommendation_position", "int"),
+    ("score", "float"),
+    ("user_preferences.budget", "float"),
+    ("user_preferences.usage", "string"),
+    ("user_preferences.priorities", "json"),
+    ("car_snapshot.marca", "string"),
+    ("car_snapshot.modelo", "string"),
+    ("car_snapshot.ano", "int"),
+    ("car_snapshot.preco", "float"),
+    ("car_snapshot.categoria", "string"),
+    ("car_snapshot.combustivel", "string"),
+    ("car_snapshot.cambio", "string"),
+    ("car_snapshot.quilometragem", "int"),
+]
+
+# Tamanho alvo de cada bloco enviado ao cliente
+CHUNK_BYTES = 64 * 1024
+PARQUET_ROW_GROUP = 5000
+
+
+def encode_cursor(backend: str, position: int) -> str:
+    """Cursor opaco para retomar a exportação após `position`"""
+    return base64.urlsafe_b64encode(f"{backend}:{position}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, backend: str) -> int:
+    """Posição do cursor; ValueError se inválido ou de outro backend"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        name, position = base64.urlsafe_b64decode(padded.encode()).decode().split(":", 1)
+        position = int(position)
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+    if name != backend or position < 0:
+        raise ValueError("Cursor inválido para este armazenamento")
+    return position
+
+
+def flatten_interaction(record: Dict) -> Dict[str, Any]:
+    """Achatar uma interação nas EXPORT_COLUMNS (objetos aninhados viram prefixo.campo)"""
+    row = {}
+    for column, kind in EXPORT_COLUMNS:
+        value: Any = record
+        for key in column.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        if kind == "json" and value is not None:
+            value = json.dumps(value, ensure_ascii=False)
+        row[column] = value
+    return row
+
+
+def _chunked(pieces: Iterable[bytes]) -> Iterator[bytes]:
+    """Agrupar pedaços pequenos em blocos de ~CHUNK_BYTES"""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def iter_ndjson(records: Iterable[Dict]) -> Iterator[bytes]:
+    return _chunked(
+        (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8") for record in records
+    )
+
+
+def iter_csv(records: Iterable[Dict]) -> Iterator[bytes]:
+    def _rows() -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=[column for column, _ in EXPORT_COLUMNS])
+
+        writer.writeheader()
+        for record in records:
+            writer.writerow(flatten_interaction(record))
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+
+    return _chunked(_rows())
+
+
+def iter_json_envelope(
+    records: Iterable[Dict],
+    statistics: Dict[str, Any],
+    next_cursor: Optional[str] = None
+) -> Iterator[bytes]:
+    """
+    Envelope JSON legado, escrito em streaming
+
+    `total_interactions` só é conhecido ao final, então vem depois de `data`
+    (a ordem das chaves não muda o documento).
+    """
+    def _pieces() -> Iterator[bytes]:
+        yield (
+            '{"status": "success", '
+            f'"exported_at": {json.dumps(datetime.now().isoformat())}, '
+            '"data": {"interactions": ['
+        ).encode("utf-8")
+
+        total = 0
+        for record in records:
+            prefix = ", " if total else ""
+            yield (prefix + json.dumps(record, ensure_ascii=False)).encode("utf-8")
+            total += 1
+
+        tail = {
+            "total_interactions": total,
+            "next_cursor": next_cursor,
+            "metadata": {"version": "1.0", "format": "json", "encoding": "utf-8"},
+        }
+        yield (
+            f'], "statistics": {json.dumps(statistics)}}}, '
+            + json.dumps(tail, ensure_ascii=False)[1:]
+        ).encode("utf-8")
+
+    return _chunked(_pieces())
+
+
+class _StreamSink(io.RawIOBase):
+    """Destino do ParquetWriter que entrega os bytes conforme são escritos"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Offsets do rodapé Parquet são absolutos: não podem voltar a zero
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    types = {"string": pa.string(), "json": pa.string(), "int": pa.int64(), "float": pa.float64()}
+    return pa.schema([(column, types[kind]) for column, kind in EXPORT_COLUMNS])
+
+
+def iter_parquet(records: Iterable[Dict], row_group_size: int = PARQUET_ROW_GROUP) -> Iterator[bytes]:
+    """Parquet em streaming: um row group a cada `row_group_size` interações"""
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("Exportação Parquet requer pyarrow (pip install pyarrow)")
+
+    schema = _parquet_schema()
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema)
+    batch: List[Dict] = []
+
+    for record in records:
+        batch.append(flatten_interaction(record))
+        if len(batch) >= row_group_size:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            batch = []
+            yield sink.drain()
+
+    if batch:
+        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compressão gzip incremental (Content-Encoding: gzip)"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -8,13 +8,18 @@ Autor: AI Engineer
 Data: Outubro 2024
 """
 
-import json
 import os
-from typing import List, Dict, Optional
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 
 from models.interaction import InteractionEvent, InteractionStats, InteractionType
+from services.interaction_storage import (
+    DEFAULT_STORAGE_BACKEND,
+    InteractionStorage,
+    create_storage,
+    import_legacy_json,
+)
 
 
 class InteractionService:
@@ -22,49 +27,58 @@ class InteractionService:
     Serviço para gerenciar interações dos usuários com veículos.
     
     Responsabilidades:
-    - Salvar eventos de interação em arquivo JSON
+    - Salvar eventos de interação (backend plugável, ver interaction_storage)
     - Recuperar interações para treinamento de ML
     - Calcular estatísticas de uso
     - Garantir integridade dos dados
     """
     
-    def __init__(self, data_dir: str = "data/interactions"):
+    def __init__(self, data_dir: Optional[str] = None, backend: Optional[str] = None):
         """
         Inicializa o serviço de interações.
         
         Args:
-            data_dir: Diretório onde os dados serão armazenados
+            data_dir: Diretório onde os dados serão armazenados;
+                padrão: INTERACTIONS_DATA_DIR ou "data/interactions"
+            backend: "json" (legado), "jsonl" (log append-only) ou "sqlite";
+                padrão: INTERACTION_STORAGE_BACKEND ou DEFAULT_STORAGE_BACKEND
         """
-        self.data_dir = Path(data_dir)
-        self.interactions_file = self.data_dir / "user_interactions.json"
+        self.data_dir = Path(data_dir or os.getenv("INTERACTIONS_DATA_DIR", "data/interactions"))
         
         # Criar diretório se não existir
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
-        # Inicializar arquivo se não existir
-        if not self.interactions_file.exists():
-            self._initialize_file()
+        backend = backend or os.getenv("INTERACTION_STORAGE_BACKEND", DEFAULT_STORAGE_BACKEND)
+        self.storage: InteractionStorage = create_storage(backend, self.data_dir)
+        self.interactions_file = self.storage.path
+        
+        # ⚡ Primeira subida com backend novo: importar o JSON legado
+        legacy_file = self.data_dir / "user_interactions.json"
+        if backend != "json" and legacy_file.exists():
+            try:
+                migrated = import_legacy_json(legacy_file, self.storage)
+                if migrated:
+                    print(f"[OK] {migrated} interações migradas de {legacy_file} para o backend {backend}")
+            except Exception as e:
+                print(f"[ERRO] Falha ao migrar interações legadas: {e}")
     
-    def _initialize_file(self):
-        """Inicializa arquivo de interações com estrutura vazia"""
-        initial_data = {
-            "interactions": [],
-            "metadata": {
-                "created_at": datetime.now().isoformat(),
-                "last_updated": datetime.now().isoformat(),
-                "total_count": 0,
-                "version": "1.0"
-            }
-        }
-        
-        with open(self.interactions_file, 'w', encoding='utf-8') as f:
-            json.dump(initial_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"[OK] Arquivo de interações inicializado: {self.interactions_file}")
+    def _event_to_dict(self, event: InteractionEvent) -> Dict:
+        """Serializar o evento no formato persistido (timestamp ISO)"""
+        event_dict = event.dict()
+        
+        # Converter datetime para string ISO
+        if isinstance(event_dict.get('timestamp'), datetime):
+            event_dict['timestamp'] = event_dict['timestamp'].isoformat()
+        
+        # Enum -> valor (mesmo resultado do json.dump do formato legado)
+        if isinstance(event_dict.get('interaction_type'), InteractionType):
+            event_dict['interaction_type'] = event_dict['interaction_type'].value
+        
+        return event_dict
     
     def save_interaction(self, event: InteractionEvent) -> bool:
         """
-        Salva um evento de interação no arquivo JSON.
+        Salva um evento de interação no backend configurado.
         
         Args:
             event: Evento de interação a ser salvo
@@ -73,30 +87,7 @@ class InteractionService:
             True se salvou com sucesso, False caso contrário
         """
         try:
-            # Carregar dados existentes
-            with open(self.interactions_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Converter evento para dict
-            event_dict = event.dict()
-            
-            # Converter datetime para string ISO
-            if isinstance(event_dict.get('timestamp'), datetime):
-                event_dict['timestamp'] = event_dict['timestamp'].isoformat()
-            
-            # Adicionar ID único
-            event_dict['id'] = f"int_{len(data['interactions']) + 1:06d}"
-            
-            # Adicionar à lista
-            data['interactions'].append(event_dict)
-            
-            # Atualizar metadata
-            data['metadata']['last_updated'] = datetime.now().isoformat()
-            data['metadata']['total_count'] = len(data['interactions'])
-            
-            # Salvar de volta
-            with open(self.interactions_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.storage.append(self._event_to_dict(event))
             
             print(f"[OK] Interação salva: {event.interaction_type} - Car: {event.car_id}")
             return True
@@ -113,15 +104,32 @@ class InteractionService:
             Lista de dicionários com todas as interações
         """
         try:
-            with open(self.interactions_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            return data.get('interactions', [])
+            return self.storage.get_all()
             
         except Exception as e:
             print(f"[ERRO] Falha ao carregar interações: {e}")
             return []
     
+    def scan_interactions(
+        self,
+        after: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        interaction_types: Optional[Collection[str]] = None
+    ) -> Iterator[Tuple[int, Dict]]:
+        """
+        ⚡ Percorrer interações em streaming (exportação paginada)
+        
+        Filtros de período [since, until) e tipo são aplicados no backend;
+        cada item traz a posição para retomar a varredura depois dele.
+        """
+        return self.storage.scan(
+            after=after,
+            since=since,
+            until=until,
+            interaction_types=interaction_types
+        )
+    
     def get_interactions_count(self) -> int:
         """
         Retorna o total de interações coletadas.
@@ -130,15 +138,20 @@ class InteractionService:
             Número total de interações
         """
         try:
-            with open(self.interactions_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            return data.get('metadata', {}).get('total_count', 0)
+            return self.storage.count()
             
         except Exception as e:
             print(f"[ERRO] Falha ao contar interações: {e}")
             return 0
     
+    def flush(self):
+        """Garantir durabilidade das escritas pendentes (fsync em lote)"""
+        self.storage.flush()
+    
+    def close(self):
+        """Liberar o backend (arquivos/conexões)"""
+        self.storage.close()
+    
     def get_stats(self) -> InteractionStats:
         """
         Calcula e retorna estatísticas agregadas das interações.
@@ -147,62 +160,8 @@ class InteractionService:
             Objeto InteractionStats com estatísticas calculadas
         """
         try:
-            interactions = self.get_all_interactions()
-            
-            if not interactions:
-                return InteractionStats()
-            
-            # Contadores
-            click_count = 0
-            view_details_count = 0
-            whatsapp_contact_count = 0
-            unique_sessions = set()
-            unique_cars = set()
-            durations = []
-            last_interaction = None
-            
-            for interaction in interactions:
-                # Contar por tipo
-                interaction_type = interaction.get('interaction_type')
-                if interaction_type == InteractionType.CLICK:
-                    click_count += 1
-                elif interaction_type == InteractionType.VIEW_DETAILS:
-                    view_details_count += 1
-                elif interaction_type == InteractionType.WHATSAPP_CONTACT:
-                    whatsapp_contact_count += 1
-                
-                # Coletar IDs únicos
-                unique_sessions.add(interaction.get('session_id'))
-                unique_cars.add(interaction.get('car_id'))
-                
-                # Coletar durações
-                duration = interaction.get('duration_seconds')
-                if duration is not None:
-                    durations.append(duration)
-                
-                # Última interação
-                timestamp_str = interaction.get('timestamp')
-                if timestamp_str:
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        if last_interaction is None or timestamp > last_interaction:
-                            last_interaction = timestamp
-                    except:
-                        pass
-            
-            # Calcular média de duração
-            avg_duration = sum(durations) / len(durations) if durations else None
-            
-            return InteractionStats(
-                total_interactions=len(interactions),
-                click_count=click_count,
-                view_details_count=view_details_count,
-                whatsapp_contact_count=whatsapp_contact_count,
-                unique_sessions=len(unique_sessions),
-                unique_cars=len(unique_cars),
-                avg_duration_seconds=avg_duration,
-                last_interaction=last_interaction
-            )
+            # ⚡ jsonl/sqlite: agregados incrementais (O(1)); json legado: varredura
+            return self.storage.stats()
             
         except Exception as e:
             print(f"[ERRO] Falha ao calcular estatísticas: {e}")
@@ -218,8 +177,11 @@ class InteractionService:
         Returns:
             Lista de interações da sessão
         """
-        interactions = self.get_all_interactions()
-        return [i for i in interactions if i.get('session_id') == session_id]
+        try:
+            return self.storage.find(session_id=session_id)
+        except Exception as e:
+            print(f"[ERRO] Falha ao carregar interações: {e}")
+            return []
     
     def get_interactions_by_car(self, car_id: str) -> List[Dict]:
         """
@@ -231,8 +193,11 @@ class InteractionService:
         Returns:
             Lista de interações com o carro
         """
-        interactions = self.get_all_interactions()
-        return [i for i in interactions if i.get('car_id') == car_id]
+        try:
+            return self.storage.find(car_id=car_id)
+        except Exception as e:
+            print(f"[ERRO] Falha ao carregar interações: {e}")
+            return []
     
     def get_interactions_for_training(self, min_count: int = 500) -> Optional[List[Dict]]:
         """
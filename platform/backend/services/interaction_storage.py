@@ -0,0 +1,816 @@
+"""
+🤖 ML System: Backends de armazenamento de interações
+
+O InteractionService original relia o user_interactions.json inteiro,
+anexava um evento e regravava o arquivo (indent=2) a cada clique: O(N) por
+escrita, corrida entre workers e IDs por `len(...) + 1`.
+
+Backends disponíveis (INTERACTION_STORAGE_BACKEND):
+- "json":   formato legado (arquivo único), mantido por compatibilidade
+- "jsonl":  log append-only (uma linha por evento), lock de arquivo,
+            alocador de IDs monotônico e fsync em lotes (padrão)
+- "sqlite": SQLite embutido (WAL), com índices por sessão e carro
+
+Todos devolvem as interações como dicts no mesmo formato do legado
+(`id` = "int_000001", timestamp ISO).
+
+`scan` percorre as interações de forma incremental (memória constante),
+com filtros de período/tipo aplicados no próprio backend e uma posição
+opaca para retomar a leitura (paginação por cursor).
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+
+from models.interaction import InteractionStats, InteractionType
+from services.interaction_aggregates import InteractionAggregates, parse_interaction_timestamp
+
+try:
+    import fcntl
+except ImportError:  # Windows: apenas o lock entre threads
+    fcntl = None
+
+
+def format_interaction_id(seq: int) -> str:
+    """ID público da interação a partir do número de sequência"""
+    return f"int_{seq:06d}"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Comparar timestamps com e sem fuso: converte os com fuso para UTC ingênuo"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def record_matches(
+    record: Dict,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    interaction_types: Optional[Collection[str]] = None
+) -> bool:
+    """Filtro de período [since, until) e tipo de interação"""
+    if interaction_types and record.get('interaction_type') not in interaction_types:
+        return False
+
+    if since is None and until is None:
+        return True
+
+    timestamp = parse_interaction_timestamp(record.get('timestamp'))
+    if timestamp is None:
+        return False
+    timestamp = _naive_utc(timestamp)
+    if since is not None and timestamp < _naive_utc(since):
+        return False
+    if until is not None and timestamp >= _naive_utc(until):
+        return False
+    return True
+
+
+class InteractionStorage:
+    """
+    Interface dos backends de interações
+
+    `append` recebe o evento já serializado (dict sem `id`) e devolve o
+    ID atribuído. `find` tem implementação padrão por varredura; backends
+    com índices a sobrescrevem.
+    """
+
+    name = "base"
+
+    def append(self, record: Dict) -> str:
+        raise NotImplementedError
+
+    def iter_all(self) -> Iterator[Dict]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def get_all(self) -> List[Dict]:
+        return list(self.iter_all())
+
+    def find(self, session_id: Optional[str] = None, car_id: Optional[str] = None) -> List[Dict]:
+        return [
+            record for record in self.iter_all()
+            if (session_id is None or record.get("session_id") == session_id)
+            and (car_id is None or record.get("car_id") == car_id)
+        ]
+
+    def scan(
+        self,
+        after: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        interaction_types: Optional[Collection[str]] = None
+    ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Percorrer as interações filtradas, em ordem de gravação
+
+        Yields:
+            (posição para retomar após este registro, registro)
+        """
+        for position, record in enumerate(self.iter_all()):
+            if after is not None and position < after:
+                continue
+            if record_matches(record, since, until, interaction_types):
+                yield position + 1, record
+
+    def is_valid_position(self, position: int) -> bool:
+        """Se `position` pode ser usada como `after` em `scan` (cursor de exportação)"""
+        return position >= 0
+
+    def stats(self) -> InteractionStats:
+        """Estatísticas agregadas (padrão: varredura completa)"""
+        aggregates = InteractionAggregates()
+        for position, record in enumerate(self.iter_all()):
+            aggregates.add(record, position)
+        return aggregates.to_stats()
+
+    def flush(self):
+        """Forçar durabilidade das escritas pendentes"""
+
+    def exclusive(self):
+        """
+        Lock exclusivo entre processos (padrão: flock em `<path>.lock`)
+
+        Usado por operações do tipo "verificar e gravar", como a importação
+        do JSON legado.
+        """
+        return _LockFile(Path(f"{self.path}.lock"))
+
+    def close(self):
+        self.flush()
+
+
+class JSONFileStorage(InteractionStorage):
+    """Formato legado: um único JSON reescrito a cada evento (O(N) por escrita)"""
+
+    name = "json"
+
+    def __init__(self, data_dir: Path):
+        self.path = Path(data_dir) / "user_interactions.json"
+        self._lock = threading.Lock()
+
+        if not self.path.exists():
+            self._initialize_file()
+
+    def _initialize_file(self):
+        initial_data = {
+            "interactions": [],
+            "metadata": {
+                "created_at": datetime.now().isoformat(),
+                "last_updated": datetime.now().isoformat(),
+                "total_count": 0,
+                "version": "1.0"
+            }
+        }
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(initial_data, f, indent=2, ensure_ascii=False)
+
+        print(f"[OK] Arquivo de interações inicializado: {self.path}")
+
+    def _load(self) -> Dict:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def append(self, record: Dict) -> str:
+        with self._lock:
+            data = self._load()
+
+            record = dict(record)
+            record['id'] = format_interaction_id(len(data['interactions']) + 1)
+            data['interactions'].append(record)
+
+            data['metadata']['last_updated'] = datetime.now().isoformat()
+            data['metadata']['total_count'] = len(data['interactions'])
+
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+
+        return record['id']
+
+    def iter_all(self) -> Iterator[Dict]:
+        return iter(self._load().get('interactions', []))
+
+    def count(self) -> int:
+        return self._load().get('metadata', {}).get('total_count', 0)
+
+
+class JSONLLogStorage(InteractionStorage):
+    """
+    Log append-only em JSONL, seguro entre threads e processos
+
+    - Cada evento é uma linha gravada com um único write() em O_APPEND
+    - Um lock de arquivo (fcntl.flock) serializa os writers de todos os
+      workers; o ID é o número da linha, então é monotônico e sem buracos
+    - Cada writer lembra até onde já leu o log e, ao pegar o lock, só
+      incorpora (nos agregados) o trecho anexado por outros processos
+    - fsync em lotes: a cada `fsync_every` eventos ou `fsync_interval`
+      segundos (o write já vai para o page cache imediatamente)
+    - Agregados + índices por sessão/carro (offset em bytes de cada linha)
+      ficam num checkpoint ao lado do log, regravado por uma thread em
+      segundo plano a cada `checkpoint_interval` segundos, no flush e no
+      close; na abertura só o trecho posterior ao checkpoint é lido. O
+      append nunca grava o checkpoint, e a gravação não segura o lock de
+      arquivo (só captura o estado sob o lock da thread, em O(chaves))
+    """
+
+    name = "jsonl"
+    CHECKPOINT_VERSION = 1
+
+    def __init__(
+        self,
+        data_dir: Path,
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0,
+        checkpoint_interval: float = 30.0
+    ):
+        self.path = Path(data_dir) / "user_interactions.jsonl"
+        self.lock_path = Path(data_dir) / "user_interactions.lock"
+        self.checkpoint_path = Path(data_dir) / "user_interactions.aggregates.json"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.checkpoint_interval = checkpoint_interval
+
+        self._lock = threading.RLock()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._file_lock = _FileLock(self._lock, self._lock_fd)
+
+        # Posição até onde o log já foi incorporado aos agregados
+        self._offset = 0
+        self._aggregates = InteractionAggregates()
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._checkpoint_offset = 0
+        self._checkpoint_lock = threading.Lock()
+        self._checkpointer: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        with self._locked():
+            self._load_checkpoint()
+            self._catch_up()
+            self._repair_torn_tail()
+
+    def _repair_torn_tail(self):
+        """
+        Descartar uma linha final incompleta (crash no meio do write)
+
+        Sem isso o próximo append em O_APPEND seria colado nela. Seguro sob
+        o lock: writers vivos nunca deixam linhas pela metade.
+        """
+        size = os.fstat(self._fd).st_size
+        if size > self._offset:
+            print(f"[AVISO] {self.path}: {size - self._offset} bytes de linha incompleta descartados")
+            os.ftruncate(self._fd, self._offset)
+
+    def _locked(self):
+        return self._file_lock
+
+    def exclusive(self):
+        """O próprio lock do log (reentrante: append/count podem ser chamados dentro)"""
+        return self._locked()
+
+    def _load_checkpoint(self):
+        """Retomar agregados do checkpoint, se ainda for um prefixo válido do log"""
+        if not self.checkpoint_path.exists():
+            return
+
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+
+            offset = checkpoint["offset"]
+            if checkpoint.get("version") != self.CHECKPOINT_VERSION or not self.is_valid_position(offset):
+                return
+
+            self._aggregates = InteractionAggregates.from_dict(checkpoint["aggregates"])
+            self._offset = self._checkpoint_offset = offset
+        except Exception as e:
+            print(f"[AVISO] Checkpoint de interações ignorado ({e}), recalculando")
+            self._aggregates = InteractionAggregates()
+            self._offset = self._checkpoint_offset = 0
+
+    def _save_checkpoint(self):
+        """
+        Gravar agregados (atômico: temporário + rename)
+
+        Não é chamado sob o lock: o estado é capturado sob o lock da thread
+        (sem o flock, então outros processos não esperam) e a serialização
+        e a escrita acontecem fora dele.
+        """
+        with self._checkpoint_lock:
+            with self._lock:
+                if self._offset == self._checkpoint_offset:
+                    return
+                offset = self._offset
+                state = self._aggregates.checkpoint_state()
+
+            # Nome único: outros storages do mesmo processo gravam o mesmo checkpoint
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.checkpoint_path.parent, prefix=f"{self.checkpoint_path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        "version": self.CHECKPOINT_VERSION,
+                        "offset": offset,
+                        "aggregates": self._aggregates.to_dict(state),
+                    }, f, ensure_ascii=False)
+                os.replace(tmp_path, self.checkpoint_path)
+                self._checkpoint_offset = offset
+            except Exception as e:
+                print(f"[ERRO] Falha ao gravar checkpoint de interações: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def _ensure_checkpointer(self):
+        """Iniciar a thread de checkpoint no primeiro append"""
+        if self._checkpointer is not None or self._stopped.is_set():
+            return
+        self._checkpointer = threading.Thread(
+            target=self._run_checkpointer, name="interactions-checkpoint", daemon=True
+        )
+        self._checkpointer.start()
+
+    def _run_checkpointer(self):
+        while not self._stopped.wait(self.checkpoint_interval):
+            self._save_checkpoint()
+
+    def _catch_up(self):
+        """Incorporar linhas anexadas (por este ou outros processos) desde a última leitura"""
+        size = os.fstat(self._fd).st_size
+        if size <= self._offset:
+            return
+
+        # Leitura em blocos: na primeira abertura o log inteiro é lido
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            pending = b""
+            position = self._offset
+            remaining = size - self._offset
+            while remaining > 0:
+                chunk = f.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+
+                lines = (pending + chunk).split(b"\n")
+                # Último pedaço: linha incompleta (ou vazio se terminou em \n)
+                pending = lines.pop()
+                for line in lines:
+                    self._aggregates.add(json.loads(line), position)
+                    position += len(line) + 1
+
+        self._offset = position
+
+    def append(self, record: Dict) -> str:
+        with self._locked():
+            self._catch_up()
+
+            record = dict(record)
+            record['id'] = format_interaction_id(self._aggregates.total + 1)
+            line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+            os.write(self._fd, line)
+            self._aggregates.add(record, self._offset)
+            self._offset += len(line)
+
+            self._unsynced += 1
+            now = time.monotonic()
+            if self._unsynced >= self.fsync_every or now - self._last_fsync >= self.fsync_interval:
+                self._fsync()
+            self._ensure_checkpointer()
+
+        return record['id']
+
+    def _fsync(self):
+        os.fsync(self._fd)
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def iter_all(self) -> Iterator[Dict]:
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # escrita em andamento / truncada
+                yield json.loads(line)
+
+    def scan(
+        self,
+        after: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        interaction_types: Optional[Collection[str]] = None
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Leitura sequencial a partir do offset em bytes `after` (seek direto)"""
+        if after is not None and not self.is_valid_position(after):
+            raise ValueError(f"Offset {after} não é início de linha em {self.path}")
+
+        with open(self.path, 'rb') as f:
+            position = after or 0
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # escrita em andamento / truncada
+                position += len(line)
+                record = json.loads(line)
+                if record_matches(record, since, until, interaction_types):
+                    yield position, record
+
+    def is_valid_position(self, position: int) -> bool:
+        """Offset dentro do log e no início de uma linha (logo após uma quebra de linha)"""
+        if position < 0 or position > os.fstat(self._fd).st_size:
+            return False
+        return position == 0 or os.pread(self._fd, 1, position - 1) == b"\n"
+
+    def find(self, session_id: Optional[str] = None, car_id: Optional[str] = None) -> List[Dict]:
+        """Eventos da sessão e/ou carro via índice: O(k) leituras posicionais"""
+        with self._locked():
+            self._catch_up()
+            positions = self._aggregates.positions(session_id=session_id, car_id=car_id)
+
+        records = []
+        with open(self.path, 'rb') as f:
+            for position in positions:
+                f.seek(position)
+                records.append(json.loads(f.readline()))
+        return records
+
+    def count(self) -> int:
+        with self._locked():
+            self._catch_up()
+            return self._aggregates.total
+
+    def stats(self) -> InteractionStats:
+        with self._locked():
+            self._catch_up()
+            return self._aggregates.to_stats()
+
+    def flush(self):
+        with self._locked():
+            if self._unsynced:
+                self._fsync()
+        self._save_checkpoint()
+
+    def close(self):
+        self._stopped.set()
+        if self._checkpointer is not None:
+            self._checkpointer.join(timeout=5)
+        self.flush()
+        os.close(self._fd)
+        os.close(self._lock_fd)
+
+
+class _FileLock:
+    """
+    Lock entre threads (threading.RLock) + entre processos (flock)
+
+    Reentrante na mesma thread: o flock é pego na primeira entrada e
+    liberado na última saída.
+    """
+
+    def __init__(self, thread_lock: threading.RLock, fd: int):
+        self.thread_lock = thread_lock
+        self.fd = fd
+        self._depth = 0
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        self._depth += 1
+        if self._depth == 1 and fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0 and fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.thread_lock.release()
+
+
+class _LockFile:
+    """flock exclusivo num arquivo de lock, aberto só enquanto é segurado"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        os.close(self._fd)  # fechar o descritor libera o flock
+        self._fd = None
+
+
+class SQLiteStorage(InteractionStorage):
+    """
+    SQLite embutido (WAL)
+
+    O ID vem do INTEGER PRIMARY KEY AUTOINCREMENT (monotônico mesmo com
+    vários processos); sessão e carro são indexados para as consultas.
+    Triggers mantêm os agregados (totais, contagem por tipo, sessões e
+    carros únicos) na mesma transação do INSERT, então `stats` é O(1).
+    """
+
+    name = "sqlite"
+
+    def __init__(self, data_dir: Path):
+        self.path = Path(data_dir) / "user_interactions.sqlite3"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS interactions (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT,
+                car_id TEXT,
+                interaction_type TEXT,
+                timestamp TEXT,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_interactions_session ON interactions(session_id);
+            CREATE INDEX IF NOT EXISTS idx_interactions_car ON interactions(car_id);
+            CREATE INDEX IF NOT EXISTS idx_interactions_timestamp ON interactions(timestamp);
+
+            CREATE TABLE IF NOT EXISTS interaction_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total INTEGER NOT NULL DEFAULT 0,
+                duration_sum REAL NOT NULL DEFAULT 0,
+                duration_count INTEGER NOT NULL DEFAULT 0,
+                unique_sessions INTEGER NOT NULL DEFAULT 0,
+                unique_cars INTEGER NOT NULL DEFAULT 0,
+                last_timestamp TEXT
+            );
+            CREATE TABLE IF NOT EXISTS interaction_type_counts (
+                interaction_type TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS interaction_sessions (session_id TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS interaction_cars (car_id TEXT PRIMARY KEY);
+
+            CREATE TRIGGER IF NOT EXISTS trg_interactions_aggregate AFTER INSERT ON interactions
+            BEGIN
+                UPDATE interaction_totals SET
+                    total = total + 1,
+                    duration_sum = duration_sum + COALESCE(json_extract(NEW.payload, '$.duration_seconds'), 0),
+                    duration_count = duration_count + (json_extract(NEW.payload, '$.duration_seconds') IS NOT NULL),
+                    last_timestamp = CASE
+                        WHEN last_timestamp IS NULL OR NEW.timestamp > last_timestamp THEN NEW.timestamp
+                        ELSE last_timestamp
+                    END
+                WHERE id = 1;
+                INSERT INTO interaction_type_counts VALUES (NEW.interaction_type, 1)
+                    ON CONFLICT(interaction_type) DO UPDATE SET count = count + 1;
+                INSERT OR IGNORE INTO interaction_sessions VALUES (NEW.session_id);
+                INSERT OR IGNORE INTO interaction_cars VALUES (NEW.car_id);
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_interaction_sessions_count AFTER INSERT ON interaction_sessions
+            BEGIN
+                UPDATE interaction_totals SET unique_sessions = unique_sessions + 1 WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_interaction_cars_count AFTER INSERT ON interaction_cars
+            BEGIN
+                UPDATE interaction_totals SET unique_cars = unique_cars + 1 WHERE id = 1;
+            END;
+            """
+        )
+        self._backfill_aggregates()
+
+    def _backfill_aggregates(self):
+        """Calcular os agregados uma única vez para bancos criados antes dos triggers"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._conn.execute("SELECT 1 FROM interaction_totals WHERE id = 1").fetchone() is None:
+                self._conn.execute(
+                    """
+                    INSERT INTO interaction_totals (id, total, duration_sum, duration_count, last_timestamp)
+                    SELECT 1, COUNT(*),
+                           COALESCE(SUM(json_extract(payload, '$.duration_seconds')), 0),
+                           COUNT(json_extract(payload, '$.duration_seconds')),
+                           MAX(timestamp)
+                    FROM interactions
+                    """
+                )
+                self._conn.execute(
+                    "INSERT INTO interaction_type_counts "
+                    "SELECT interaction_type, COUNT(*) FROM interactions GROUP BY interaction_type"
+                )
+                # Os triggers de sessões/carros incrementam os contadores únicos
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO interaction_sessions SELECT DISTINCT session_id FROM interactions"
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO interaction_cars SELECT DISTINCT car_id FROM interactions"
+                )
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+
+    def append(self, record: Dict) -> str:
+        record = {k: v for k, v in record.items() if k != 'id'}
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO interactions (session_id, car_id, interaction_type, timestamp, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    record.get('session_id'),
+                    record.get('car_id'),
+                    record.get('interaction_type'),
+                    record.get('timestamp'),
+                    json.dumps(record, ensure_ascii=False),
+                ),
+            )
+            self._conn.commit()
+        return format_interaction_id(cursor.lastrowid)
+
+    def _select(self, where: str = "", params: tuple = ()) -> Iterator[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT seq, payload FROM interactions {where} ORDER BY seq", params
+            ).fetchall()
+        for seq, payload in rows:
+            record = json.loads(payload)
+            record['id'] = format_interaction_id(seq)
+            yield record
+
+    def iter_all(self) -> Iterator[Dict]:
+        return self._select()
+
+    def find(self, session_id: Optional[str] = None, car_id: Optional[str] = None) -> List[Dict]:
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if car_id is not None:
+            clauses.append("car_id = ?")
+            params.append(car_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return list(self._select(where, tuple(params)))
+
+    def scan(
+        self,
+        after: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        interaction_types: Optional[Collection[str]] = None
+    ) -> Iterator[Tuple[int, Dict]]:
+        """
+        Filtros empurrados para o SQL (seq, tipo e faixa de timestamp)
+
+        Usa uma conexão própria (leitores não bloqueiam o writer no WAL) e
+        lê em lotes com fetchmany. A comparação de timestamps em texto é só
+        um pré-filtro; o filtro exato roda sobre o timestamp convertido.
+        """
+        clauses, params = ["seq > ?"], [after or 0]
+        if interaction_types:
+            clauses.append(f"interaction_type IN ({', '.join('?' for _ in interaction_types)})")
+            params.extend(interaction_types)
+        if since is not None:
+            # Margem de 1 dia cobre diferenças de fuso entre o texto e o filtro
+            clauses.append("timestamp >= ?")
+            params.append((_naive_utc(since) - timedelta(days=1)).isoformat())
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append((_naive_utc(until) + timedelta(days=1)).isoformat())
+
+        # StreamingResponse avança o gerador em threads diferentes do pool
+        conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        try:
+            cursor = conn.execute(
+                f"SELECT seq, payload FROM interactions WHERE {' AND '.join(clauses)} ORDER BY seq",
+                params,
+            )
+            while True:
+                rows = cursor.fetchmany(500)
+                if not rows:
+                    break
+                for seq, payload in rows:
+                    record = json.loads(payload)
+                    record['id'] = format_interaction_id(seq)
+                    if record_matches(record, since, until, interaction_types):
+                        yield seq, record
+        finally:
+            conn.close()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT total FROM interaction_totals WHERE id = 1").fetchone()[0]
+
+    def stats(self) -> InteractionStats:
+        with self._lock:
+            total, duration_sum, duration_count, unique_sessions, unique_cars, last_timestamp = self._conn.execute(
+                "SELECT total, duration_sum, duration_count, unique_sessions, unique_cars, last_timestamp "
+                "FROM interaction_totals WHERE id = 1"
+            ).fetchone()
+            by_type = dict(self._conn.execute(
+                "SELECT interaction_type, count FROM interaction_type_counts"
+            ).fetchall())
+
+        if not total:
+            return InteractionStats()
+
+        return InteractionStats(
+            total_interactions=total,
+            click_count=by_type.get(InteractionType.CLICK.value, 0),
+            view_details_count=by_type.get(InteractionType.VIEW_DETAILS.value, 0),
+            whatsapp_contact_count=by_type.get(InteractionType.WHATSAPP_CONTACT.value, 0),
+            unique_sessions=unique_sessions,
+            unique_cars=unique_cars,
+            avg_duration_seconds=duration_sum / duration_count if duration_count else None,
+            last_interaction=parse_interaction_timestamp(last_timestamp)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+DEFAULT_STORAGE_BACKEND = "jsonl"
+
+STORAGE_BACKENDS = {
+    JSONFileStorage.name: JSONFileStorage,
+    JSONLLogStorage.name: JSONLLogStorage,
+    SQLiteStorage.name: SQLiteStorage,
+}
+
+
+def create_storage(backend: str, data_dir: Path) -> InteractionStorage:
+    """Instanciar o backend pelo nome ("json", "jsonl" ou "sqlite")"""
+    try:
+        storage_cls = STORAGE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Backend de interações desconhecido: {backend} "
+            f"(use um de {sorted(STORAGE_BACKENDS)})"
+        )
+    return storage_cls(Path(data_dir))
+
+
+def read_legacy_interactions(json_path: Path) -> List[Dict]:
+    """
+    Ler as interações do user_interactions.json legado
+
+    Tolera lixo após o documento (efeito das regravações concorrentes do
+    formato antigo): lê o primeiro objeto JSON válido e avisa.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    data, end = json.JSONDecoder().raw_decode(content)
+    if content[end:].strip():
+        print(f"[AVISO] {json_path}: conteúdo extra após o JSON ignorado ({len(content) - end} bytes)")
+
+    return data.get('interactions', [])
+
+
+def migrate_legacy_json(json_path: Path, storage: InteractionStorage) -> int:
+    """
+    Copiar as interações do JSON legado para outro backend
+
+    Os IDs são reatribuídos pelo backend na mesma ordem (int_000001, ...).
+
+    Returns:
+        Número de interações migradas
+    """
+    interactions = read_legacy_interactions(json_path)
+    for record in interactions:
+        storage.append(record)
+    storage.flush()
+    return len(interactions)
+
+
+def import_legacy_json(json_path: Path, storage: InteractionStorage) -> int:
+    """
+    Importar o JSON legado uma única vez, mesmo com vários workers subindo juntos
+
+    Sob o lock exclusivo do backend: confere de novo se o arquivo ainda
+    existe e se o destino está vazio, migra e renomeia o legado para
+    `<nome>.migrated`, para que nunca seja importado de novo.
+
+    Returns:
+        Número de interações migradas (0 se outro processo já migrou)
+    """
+    json_path = Path(json_path)
+    with storage.exclusive():
+        if not json_path.exists() or storage.count() > 0:
+            return 0
+        migrated = migrate_legacy_json(json_path, storage)
+        json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+    return migrated
@@ -0,0 +1,176 @@
+"""
+Cache de justificativas LLM
+
+Carros populares e perfis quase idênticos se repetem o tempo todo; sem
+cache, cada repetição paga uma chamada completa ao LLM. A chave é
+endereçada pelo conteúdo relevante do prompt:
+
+    justification:v<versão do prompt>:<car id>:<assinatura do perfil>:<posição>
+
+Camadas:
+1. Memória local (LRU + TTL, limitada por tamanho) - usada pelo caminho
+   síncrono e pelo modo lote
+2. Redis via CacheManager (opcional) - compartilhado entre workers, usado
+   pelo modo lote (async)
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from models.car import Car
+from models.user_profile import UserProfile
+from services.agents.cache_manager import CacheManager
+from services.llm_prompts import PROMPT_TEMPLATE_VERSION
+
+
+# Largura das faixas de orçamento (R$) usadas na assinatura do perfil
+BUDGET_BAND = 10000
+
+
+def profile_signature(profile: UserProfile) -> str:
+    """
+    Assinatura normalizada do perfil para o cache
+
+    Considera apenas o que muda o texto da justificativa: uso principal,
+    prioridades altas (>= 4), faixa de orçamento, estado e composição
+    da família. Perfis que diferem só em detalhes irrelevantes para o
+    prompt compartilham a mesma entrada.
+    """
+    prioridades = getattr(profile, 'prioridades', None) or {}
+    top_priorities = ",".join(sorted(k for k, v in prioridades.items() if v >= 4))
+
+    parts = [
+        profile.uso_principal or "",
+        top_priorities,
+        str(int(profile.orcamento_min // BUDGET_BAND)),
+        str(int(profile.orcamento_max // BUDGET_BAND)),
+        (profile.state or "").upper(),
+        str(profile.tamanho_familia),
+        "1" if getattr(profile, 'tem_criancas', False) else "0",
+    ]
+
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+
+class JustificationCache:
+    """
+    Cache de justificativas em duas camadas (local + Redis opcional)
+
+    A camada local é um LRU com TTL seguro para múltiplas threads; a
+    camada Redis reaproveita o CacheManager dos agentes.
+    """
+
+    KEY_PREFIX = "justification"
+
+    def __init__(
+        self,
+        max_size: int = 5000,
+        ttl_seconds: int = 86400,
+        cache_manager: Optional[CacheManager] = None
+    ):
+        """
+        Args:
+            max_size: Máximo de justificativas na memória local
+            ttl_seconds: Tempo de vida de cada entrada (local e Redis)
+            cache_manager: CacheManager com Redis (opcional)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.cache_manager = cache_manager
+
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.remote_hits = 0
+
+    def make_key(self, car: Car, profile: UserProfile, position: int) -> str:
+        """Chave da justificativa de `car` na posição `position` para `profile`"""
+        return (
+            f"{self.KEY_PREFIX}:v{PROMPT_TEMPLATE_VERSION}:{car.id}:"
+            f"{profile_signature(profile)}:{position}"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Busca na memória local (marca como usada recentemente)"""
+        value = self._get_local(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        """Armazena na memória local, descartando a menos usada se exceder o limite"""
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Busca na memória local e, se não achar, no Redis (promovendo para local)"""
+        value = self._get_local(key)
+
+        if value is None and self.cache_manager is not None:
+            remote = await self.cache_manager.get(key)
+            if isinstance(remote, str):
+                value = remote
+                self.set(key, value)
+                with self._lock:
+                    self.remote_hits += 1
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    async def aset(self, key: str, value: str):
+        """Armazena na memória local e no Redis (se configurado)"""
+        self.set(key, value)
+        if self.cache_manager is not None:
+            await self.cache_manager.set(key, value, ttl=self.ttl_seconds)
+
+    def clear(self):
+        """Limpa a memória local e as estatísticas"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.remote_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expiry = entry
+            if time.time() > expiry:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do cache"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "remote_hits": self.remote_hits,
+            "hit_rate": round(self.hits / total, 3) if total > 0 else 0.0
+        }
@@ -8,22 +8,25 @@ Estratégia de 3 níveis:
 3. Templates (fallback final): Sempre funciona, baseado em regras
 """
 
-from typing import Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
 import time
 import logging
 import re
+import threading
 
 # Imports opcionais (graceful degradation)
 try:
-    from groq import Groq
+    from groq import Groq, AsyncGroq
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
     logging.warning("⚠️ Groq SDK não instalado. Instale com: pip install groq")
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
@@ -31,6 +34,8 @@ except ImportError:
 
 from models.car import Car
 from models.user_profile import UserProfile
+from services.agents.cache_manager import CacheManager
+from services.justification_cache import JustificationCache
 from services.llm_prompts import (
     SYSTEM_PROMPT_DIDATICO,
     USER_PROMPT_TEMPLATE,
@@ -61,7 +66,10 @@ class LLMJustificationService:
         primary_model: str = "llama-3.1-8b-instant",
         fallback_provider: str = "openai",
         fallback_model: str = "gpt-4o-mini",
-        enable_cache: bool = True
+        enable_cache: bool = True,
+        max_concurrency: Optional[int] = None,
+        batch_deadline_seconds: Optional[float] = None,
+        justification_cache: Optional[JustificationCache] = None
     ):
         """
         Inicializa serviço de justificativas LLM
@@ -71,20 +79,42 @@ class LLMJustificationService:
             primary_model: Modelo primário ('llama-3.1-8b-instant')
             fallback_provider: Provedor de fallback ('openai')
             fallback_model: Modelo de fallback ('gpt-4o-mini')
-            enable_cache: Habilita cache de respostas (futuro)
+            enable_cache: Habilita cache de justificativas geradas pelo LLM
+            max_concurrency: Máximo de chamadas LLM simultâneas no modo lote
+                (padrão: env LLM_MAX_CONCURRENCY ou 5)
+            batch_deadline_seconds: Prazo total do modo lote em segundos
+                (padrão: env LLM_BATCH_DEADLINE_SECONDS ou 12)
+            justification_cache: Cache a usar (padrão: criado a partir do env
+                JUSTIFICATION_CACHE_SIZE, JUSTIFICATION_CACHE_TTL e
+                JUSTIFICATION_CACHE_REDIS_URL)
         """
         self.enable_cache = enable_cache
+        self.cache: Optional[JustificationCache] = None
+        if enable_cache:
+            self.cache = (
+                justification_cache if justification_cache is not None
+                else self._build_cache_from_env()
+            )
+
+        # Limites do modo lote (generate_justifications_batch)
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "5"))
+        self.batch_deadline_seconds = batch_deadline_seconds or float(
+            os.getenv("LLM_BATCH_DEADLINE_SECONDS", "12")
+        )
 
         # === NÍVEL 1: Groq + Llama (Primário) ===
         self.primary_provider = primary_provider
         self.primary_model = primary_model
         self.primary_client = None
+        self.primary_async_client = None
 
         if primary_provider == "groq" and GROQ_AVAILABLE:
             groq_api_key = os.getenv("GROQ_API_KEY")
             if groq_api_key:
                 try:
                     self.primary_client = Groq(api_key=groq_api_key)
+                    # Cliente async: usado no modo lote sem ocupar threads
+                    self.primary_async_client = AsyncGroq(api_key=groq_api_key)
                     logger.info(f"✅ Provedor primário habilitado: Groq {primary_model}")
                 except Exception as e:
                     logger.error(f"❌ Erro ao inicializar Groq: {e}")
@@ -95,19 +125,22 @@ class LLMJustificationService:
         self.fallback_provider = fallback_provider
         self.fallback_model = fallback_model
         self.fallback_client = None
+        self.fallback_async_client = None
 
         if fallback_provider == "openai" and OPENAI_AVAILABLE:
             openai_api_key = os.getenv("OPENAI_API_KEY")
             if openai_api_key:
                 try:
                     self.fallback_client = OpenAI(api_key=openai_api_key)
+                    self.fallback_async_client = AsyncOpenAI(api_key=openai_api_key)
                     logger.info(f"✅ Fallback habilitado: OpenAI {fallback_model}")
                 except Exception as e:
                     logger.error(f"❌ Erro ao inicializar OpenAI: {e}")
             else:
                 logger.warning("⚠️ OPENAI_API_KEY não configurada")
 
-        # Métricas de uso
+        # Métricas de uso (atualizadas também pelas threads do executor)
+        self._metrics_lock = threading.Lock()
         self.metrics = {
             "total_calls": 0,
             "primary_calls": 0,
@@ -115,6 +148,7 @@ class LLMJustificationService:
             "fallback_calls": 0,
             "fallback_success": 0,
             "template_fallback": 0,
+            "deadline_fallback": 0,
             "total_latency_primary": 0.0,
             "total_latency_fallback": 0.0,
         }
@@ -126,6 +160,24 @@ class LLMJustificationService:
                 "Usando apenas templates."
             )
 
+    @staticmethod
+    def _build_cache_from_env() -> JustificationCache:
+        """Cria o cache de justificativas (Redis opcional via JUSTIFICATION_CACHE_REDIS_URL)"""
+        max_size = int(os.getenv("JUSTIFICATION_CACHE_SIZE", "5000"))
+        redis_url = os.getenv("JUSTIFICATION_CACHE_REDIS_URL")
+
+        cache_manager = None
+        if redis_url:
+            cache_manager = CacheManager(redis_url=redis_url, local_cache_max_size=max_size)
+            if not cache_manager.redis_available:
+                cache_manager = None
+
+        return JustificationCache(
+            max_size=max_size,
+            ttl_seconds=int(os.getenv("JUSTIFICATION_CACHE_TTL", "86400")),
+            cache_manager=cache_manager
+        )
+
     def generate_justification(
         self,
         car: Car,
@@ -151,7 +203,39 @@ class LLMJustificationService:
         Returns:
             Justificativa em português (2-3 frases, 150-300 caracteres)
         """
-        self.metrics["total_calls"] += 1
+        # Cache: mesmo carro, perfil equivalente e mesma posição
+        cache_key = self.cache.make_key(car, profile, position) if self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        justification, from_llm = self._generate(
+            car, profile, score, position, total_results, tco_breakdown
+        )
+
+        # Apenas textos do LLM são cacheados (templates são baratos)
+        if cache_key is not None and from_llm:
+            self.cache.set(cache_key, justification)
+
+        return justification
+
+    def _generate(
+        self,
+        car: Car,
+        profile: UserProfile,
+        score: float,
+        position: int,
+        total_results: int,
+        tco_breakdown: Dict
+    ) -> Tuple[str, bool]:
+        """
+        Gera justificativa pelos 3 níveis (Groq -> OpenAI -> template)
+
+        Returns:
+            (justificativa, True se veio de um LLM)
+        """
+        self._record(total_calls=1)
 
         # Construir prompt uma vez
         prompt = self._build_prompt(
@@ -166,18 +250,16 @@ class LLMJustificationService:
                 latency = time.time() - start_time
 
                 if self._validate_output(result):
-                    self.metrics["primary_calls"] += 1
-                    self.metrics["primary_success"] += 1
-                    self.metrics["total_latency_primary"] += latency
+                    self._record(primary_calls=1, primary_success=1, total_latency_primary=latency)
 
                     logger.debug(
                         f"✅ Justificativa via Groq ({latency:.2f}s) "
                         f"para {car.nome}"
                     )
-                    return self._simplify_text(result)
+                    return self._simplify_text(result), True
 
             except Exception as e:
-                self.metrics["primary_calls"] += 1
+                self._record(primary_calls=1)
                 logger.warning(
                     f"❌ Groq falhou para {car.nome}: {e}",
                     extra={"car_id": car.id, "error": str(e)}
@@ -191,18 +273,91 @@ class LLMJustificationService:
                 latency = time.time() - start_time
 
                 if self._validate_output(result):
-                    self.metrics["fallback_calls"] += 1
-                    self.metrics["fallback_success"] += 1
-                    self.metrics["total_latency_fallback"] += latency
+                    self._record(fallback_calls=1, fallback_success=1, total_latency_fallback=latency)
 
                     logger.info(
                         f"✅ Justificativa via OpenAI fallback ({latency:.2f}s) "
                         f"para {car.nome}"
                     )
-                    return self._simplify_text(result)
+                    return self._simplify_text(result), True
+
+            except Exception as e:
+                self._record(fallback_calls=1)
+                logger.warning(
+                    f"❌ OpenAI fallback falhou para {car.nome}: {e}",
+                    extra={"car_id": car.id, "error": str(e)}
+                )
+
+        # === NÍVEL 3: Fallback para templates ===
+        logger.info(f"⚠️ Usando template fallback para {car.nome}")
+        self._record(template_fallback=1)
+        return self._generate_template_fallback(car, profile, score, tco_breakdown), False
+
+    async def _agenerate(
+        self,
+        car: Car,
+        profile: UserProfile,
+        score: float,
+        position: int,
+        total_results: int,
+        tco_breakdown: Dict
+    ) -> Tuple[str, bool]:
+        """
+        Versão async de _generate (clientes AsyncGroq/AsyncOpenAI)
+
+        Não ocupa threads enquanto espera o provedor; cancelar a task
+        cancela a requisição HTTP.
+
+        Returns:
+            (justificativa, True se veio de um LLM)
+        """
+        self._record(total_calls=1)
+
+        prompt = self._build_prompt(
+            car, profile, score, position, total_results, tco_breakdown
+        )
+
+        # === NÍVEL 1: Groq + Llama (primário) ===
+        if self.primary_async_client:
+            try:
+                start_time = time.time()
+                result = await self._acall_groq(prompt)
+                latency = time.time() - start_time
+
+                if self._validate_output(result):
+                    self._record(primary_calls=1, primary_success=1, total_latency_primary=latency)
+
+                    logger.debug(
+                        f"✅ Justificativa via Groq async ({latency:.2f}s) "
+                        f"para {car.nome}"
+                    )
+                    return self._simplify_text(result), True
+
+            except Exception as e:
+                self._record(primary_calls=1)
+                logger.warning(
+                    f"❌ Groq falhou para {car.nome}: {e}",
+                    extra={"car_id": car.id, "error": str(e)}
+                )
+
+        # === NÍVEL 2: OpenAI (fallback) ===
+        if self.fallback_async_client:
+            try:
+                start_time = time.time()
+                result = await self._acall_openai(prompt)
+                latency = time.time() - start_time
+
+                if self._validate_output(result):
+                    self._record(fallback_calls=1, fallback_success=1, total_latency_fallback=latency)
+
+                    logger.info(
+                        f"✅ Justificativa via OpenAI async fallback ({latency:.2f}s) "
+                        f"para {car.nome}"
+                    )
+                    return self._simplify_text(result), True
 
             except Exception as e:
-                self.metrics["fallback_calls"] += 1
+                self._record(fallback_calls=1)
                 logger.warning(
                     f"❌ OpenAI fallback falhou para {car.nome}: {e}",
                     extra={"car_id": car.id, "error": str(e)}
@@ -210,8 +365,176 @@ class LLMJustificationService:
 
         # === NÍVEL 3: Fallback para templates ===
         logger.info(f"⚠️ Usando template fallback para {car.nome}")
-        self.metrics["template_fallback"] += 1
-        return self._generate_template_fallback(car, profile, score, tco_breakdown)
+        self._record(template_fallback=1)
+        return self._generate_template_fallback(car, profile, score, tco_breakdown), False
+
+    @property
+    def has_async_clients(self) -> bool:
+        """True se algum provedor tem cliente async configurado"""
+        return bool(self.primary_async_client or self.fallback_async_client)
+
+    async def generate_justifications_batch(
+        self,
+        requests: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+        async_clients: bool = True
+    ) -> List[str]:
+        """
+        Gera justificativas para vários carros concorrentemente
+
+        Ver iter_justifications; aqui o resultado é coletado na mesma
+        ordem de `requests`.
+
+        Args:
+            requests: Lista de dicts com os argumentos de generate_justification
+                (car, profile, score, position, total_results, tco_breakdown)
+            max_concurrency: Limite de chamadas simultâneas (padrão do serviço)
+            deadline_seconds: Prazo total em segundos (padrão do serviço)
+            async_clients: False = só clientes síncronos em threads e cache
+                local (ver iter_justifications)
+
+        Returns:
+            Justificativas na mesma ordem de `requests`
+        """
+        results: List[Optional[str]] = [None] * len(requests)
+        async for index, justification in self.iter_justifications(
+            requests, max_concurrency, deadline_seconds, async_clients
+        ):
+            results[index] = justification
+        return results
+
+    async def iter_justifications(
+        self,
+        requests: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+        async_clients: bool = True
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Gera justificativas concorrentemente, entregando cada uma ao ficar pronta
+
+        Primeiro consulta o cache (memória local e Redis, se configurado);
+        os demais são gerados com no máximo `max_concurrency` chamadas
+        simultâneas - via clientes async quando disponíveis, senão em
+        threads. Itens que não terminarem dentro de `deadline_seconds`
+        (prazo total do lote) recebem a justificativa template; chamadas
+        atrasadas são canceladas (ou, em threads, terminam em segundo
+        plano) sem segurar a resposta.
+
+        Com `async_clients=False` nada ligado a um event loop é usado
+        (clientes AsyncGroq/AsyncOpenAI, Redis async do cache): é o modo do
+        caminho síncrono, que roda cada lote num event loop descartável.
+
+        Yields:
+            (índice em `requests`, justificativa), na ordem de conclusão
+        """
+        if not requests:
+            return
+
+        # 1. Cache (local -> Redis)
+        cache_keys: List[Optional[str]] = [None] * len(requests)
+        misses = list(range(len(requests)))
+        if self.cache is not None:
+            cache_keys = [
+                self.cache.make_key(r["car"], r["profile"], r["position"]) for r in requests
+            ]
+            if async_clients:
+                cached = await asyncio.gather(*(self.cache.aget(key) for key in cache_keys))
+            else:
+                cached = [self.cache.get(key) for key in cache_keys]
+            misses = []
+            for i, value in enumerate(cached):
+                if value is None:
+                    misses.append(i)
+                else:
+                    yield i, value
+
+        if not misses:
+            return
+
+        # 2. Gerar os demais concorrentemente, com prazo total
+        concurrency = max_concurrency or self.max_concurrency
+        deadline = deadline_seconds if deadline_seconds is not None else self.batch_deadline_seconds
+
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline
+        semaphore = asyncio.Semaphore(concurrency)
+
+        # Sem clientes async (SDK ausente, clientes injetados ou caminho
+        # síncrono): threads num executor próprio do lote, que não esperamos
+        # ao sair
+        executor = None
+        if not (async_clients and self.has_async_clients):
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="llm-justification")
+
+        async def _generate(request: Dict[str, Any]) -> Tuple[str, bool]:
+            async with semaphore:
+                if executor is None:
+                    return await self._agenerate(**request)
+                return await loop.run_in_executor(
+                    executor, lambda: self._generate(**request)
+                )
+
+        index_by_task = {asyncio.ensure_future(_generate(requests[i])): i for i in misses}
+        pending = set(index_by_task)
+
+        try:
+            while pending:
+                timeout = deadline_at - loop.time()
+                if timeout <= 0:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    i = index_by_task[task]
+
+                    if task.exception() is None:
+                        justification, from_llm = task.result()
+                        # Apenas textos do LLM são cacheados (templates são baratos)
+                        if self.cache is not None and from_llm:
+                            if async_clients:
+                                await self.cache.aset(cache_keys[i], justification)
+                            else:
+                                self.cache.set(cache_keys[i], justification)
+                        yield i, justification
+                        continue
+
+                    logger.warning(
+                        f"❌ Justificativa falhou para {requests[i]['car'].nome}: {task.exception()}"
+                    )
+                    yield i, self._batch_template_fallback(requests[i])
+
+            # 3. Prazo esgotado: template para o que ficou pendente
+            for task in sorted(pending, key=index_by_task.get):
+                task.cancel()
+                i = index_by_task[task]
+                self._record(deadline_fallback=1)
+                logger.info(
+                    f"⏱️ Prazo de {deadline:.1f}s esgotado para {requests[i]['car'].nome}; usando template"
+                )
+                yield i, self._batch_template_fallback(requests[i])
+            pending = set()
+
+        finally:
+            # Consumidor desistiu (ex.: cliente desconectou) ou lote encerrado
+            for task in pending:
+                task.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _batch_template_fallback(self, request: Dict[str, Any]) -> str:
+        """Justificativa template para um item do lote que não foi gerado pelo LLM"""
+        self._record(template_fallback=1)
+        return self._generate_template_fallback(
+            request["car"],
+            request["profile"],
+            request["score"],
+            request.get("tco_breakdown") or {}
+        )
 
     def _build_prompt(
         self,
@@ -368,6 +691,36 @@ class LLMJustificationService:
 
         return response.choices[0].message.content.strip()
 
+    async def _acall_groq(self, prompt: str, timeout: int = 8) -> str:
+        """Versão async de _call_groq"""
+        response = await self.primary_async_client.chat.completions.create(
+            model=self.primary_model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT_DIDATICO},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=250,
+            temperature=0.7,
+            timeout=timeout
+        )
+
+        return response.choices[0].message.content.strip()
+
+    async def _acall_openai(self, prompt: str, timeout: int = 10) -> str:
+        """Versão async de _call_openai"""
+        response = await self.fallback_async_client.chat.completions.create(
+            model=self.fallback_model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT_DIDATICO},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=250,
+            temperature=0.7,
+            timeout=timeout
+        )
+
+        return response.choices[0].message.content.strip()
+
     def _validate_output(self, text: str) -> bool:
         """
         Valida se output do LLM é adequado
@@ -483,6 +836,12 @@ class LLMJustificationService:
 
         return ". ".join(parts) + "."
 
+    def _record(self, **increments: float) -> None:
+        """Soma incrementos às métricas sob lock (chamado de várias threads)"""
+        with self._metrics_lock:
+            for name, value in increments.items():
+                self.metrics[name] += value
+
     def get_metrics(self) -> Dict:
         """
         Retorna métricas de uso do serviço
@@ -490,7 +849,9 @@ class LLMJustificationService:
         Returns:
             Dict com métricas agregadas
         """
-        total_calls = self.metrics["total_calls"]
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        total_calls = metrics["total_calls"]
 
         if total_calls == 0:
             return {
@@ -499,30 +860,45 @@ class LLMJustificationService:
                 "fallback_usage_rate": 0.0,
                 "template_usage_rate": 0.0,
                 "avg_latency_primary": 0.0,
-                "avg_latency_fallback": 0.0
+                "avg_latency_fallback": 0.0,
+                "deadline_fallbacks": metrics["deadline_fallback"],
+                **self._cache_metrics()
             }
 
-        primary_calls = self.metrics["primary_calls"]
-        fallback_calls = self.metrics["fallback_calls"]
+        primary_calls = metrics["primary_calls"]
+        fallback_calls = metrics["fallback_calls"]
 
         return {
             "total_calls": total_calls,
             "primary_success_rate": (
-                self.metrics["primary_success"] / primary_calls
+                metrics["primary_success"] / primary_calls
                 if primary_calls > 0 else 0.0
             ),
             "fallback_usage_rate": fallback_calls / total_calls,
             "fallback_success_rate": (
-                self.metrics["fallback_success"] / fallback_calls
+                metrics["fallback_success"] / fallback_calls
                 if fallback_calls > 0 else 0.0
             ),
-            "template_usage_rate": self.metrics["template_fallback"] / total_calls,
+            "template_usage_rate": metrics["template_fallback"] / total_calls,
             "avg_latency_primary": (
-                self.metrics["total_latency_primary"] / self.metrics["primary_success"]
-                if self.metrics["primary_success"] > 0 else 0.0
+                metrics["total_latency_primary"] / metrics["primary_success"]
+                if metrics["primary_success"] > 0 else 0.0
             ),
             "avg_latency_fallback": (
-                self.metrics["total_latency_fallback"] / self.metrics["fallback_success"]
-                if self.metrics["fallback_success"] > 0 else 0.0
-            )
+                metrics["total_latency_fallback"] / metrics["fallback_success"]
+                if metrics["fallback_success"] > 0 else 0.0
+            ),
+            "deadline_fallbacks": metrics["deadline_fallback"],
+            **self._cache_metrics()
+        }
+
+    def _cache_metrics(self) -> Dict:
+        """Métricas do cache de justificativas (zeradas se desabilitado)"""
+        stats = self.cache.get_stats() if self.cache is not None else {}
+        return {
+            "cache_hits": stats.get("hits", 0),
+            "cache_misses": stats.get("misses", 0),
+            "cache_remote_hits": stats.get("remote_hits", 0),
+            "cache_hit_rate": stats.get("hit_rate", 0.0),
+            "cache_size": stats.get("size", 0),
         }
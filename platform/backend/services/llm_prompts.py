@@ -5,6 +5,10 @@ Este módulo contém todos os prompts usados para gerar justificativas
 de recomendação de veículos usando linguagem simples e sem jargões técnicos.
 """
 
+# Versão dos prompts - incrementar ao alterar SYSTEM_PROMPT_DIDATICO,
+# USER_PROMPT_TEMPLATE ou CONTEXT_HINTS (invalida o cache de justificativas)
+PROMPT_TEMPLATE_VERSION = "1"
+
 # =============================================================================
 # PROMPT SYSTEM - Instruções base para o LLM
 # =============================================================================
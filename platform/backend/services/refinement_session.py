@@ -0,0 +1,139 @@
+"""
+📊 FASE 2: Sessões de refinamento no servidor
+
+Cada rodada de /refine-recommendations só altera as prioridades do perfil
+(FeedbackEngine.update_profile_from_weights). A sessão guarda, entre rodadas:
+
+- os candidatos da rodada anterior (RankingCandidates: filtros, TCO e
+  sub-scores que não dependem das prioridades)
+- as justificativas já geradas, por carro
+
+Assim uma nova rodada só recalcula o sub-score de prioridades e a ordenação,
+e só gera justificativas para carros que entraram no top N. Se o perfil
+mudar além das prioridades, ou o inventário for alterado, os candidatos são
+recalculados.
+
+Sessões ficam em memória do worker (LRU limitado + expiração por inatividade).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from models.user_profile import UserProfile
+from services.car.ranking_candidates import RankingCandidates
+
+
+class RefinementSession:
+    """Estado de uma sessão de refinamento (por user_id + session_id)"""
+
+    def __init__(self, user_id: str, session_id: str):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.candidates: Optional[RankingCandidates] = None
+        self.justifications: Dict[str, str] = {}
+        self.rounds = 0
+        self.reused_rounds = 0
+        self.last_used = time.monotonic()
+
+    def reset(self, candidates: Optional[RankingCandidates]):
+        """Novos candidatos: justificativas anteriores deixam de valer"""
+        self.candidates = candidates
+        self.justifications = {}
+
+    def rank(self, engine, profile: UserProfile, limit: int, score_threshold: float) -> List[Dict]:
+        """
+        Ranking da rodada (CPU-bound: executar no pool do engine)
+
+        Reaproveita os candidatos da rodada anterior quando só as prioridades
+        mudaram; senão refaz filtros e TCO (engine.prepare_ranking).
+        """
+        self.rounds += 1
+        candidates = self.candidates
+        if candidates is not None and candidates.matches(profile, engine.get_inventory_index()):
+            self.reused_rounds += 1
+        else:
+            candidates = engine.prepare_ranking(profile)
+            self.reset(candidates)
+
+        if candidates is None:
+            return []
+        return engine.rank_candidates(
+            candidates, profile, limit=limit, score_threshold=score_threshold
+        )
+
+    async def justify(self, engine, recommendations: List[Dict], profile: UserProfile) -> int:
+        """
+        Preencher 'justificativa' reaproveitando as já geradas na sessão
+
+        Returns:
+            Quantidade de justificativas novas (carros que entraram no top N)
+        """
+        missing = [
+            i for i, rec in enumerate(recommendations)
+            if rec['car'].id not in self.justifications
+        ]
+        if missing:
+            generated = await engine.generate_justifications_batch(recommendations, profile, indexes=missing)
+            for i in missing:
+                self.justifications[recommendations[i]['car'].id] = generated[i]
+
+        for rec in recommendations:
+            rec['justificativa'] = self.justifications[rec['car'].id]
+        return len(missing)
+
+
+class RefinementSessionStore:
+    """
+    Sessões de refinamento em memória
+
+    Args:
+        max_sessions: Limite de sessões (LRU); REFINEMENT_MAX_SESSIONS
+        ttl_seconds: Expiração por inatividade; REFINEMENT_SESSION_TTL
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        if max_sessions is None:
+            max_sessions = int(os.getenv("REFINEMENT_MAX_SESSIONS", "1000"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("REFINEMENT_SESSION_TTL", "1800"))
+
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[Tuple[str, str], RefinementSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, user_id: str, session_id: str) -> RefinementSession:
+        """Sessão existente (renovada) ou uma nova, vazia"""
+        key = (user_id, session_id)
+        now = time.monotonic()
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None and now - session.last_used > self.ttl_seconds:
+                session = None
+
+            if session is None:
+                session = RefinementSession(user_id, session_id)
+                self._sessions[key] = session
+            self._sessions.move_to_end(key)
+            session.last_used = now
+
+            # Descartar expiradas (mais antigas primeiro) e excedentes
+            while self._sessions:
+                oldest_key, oldest = next(iter(self._sessions.items()))
+                expired = now - oldest.last_used > self.ttl_seconds
+                if not expired and len(self._sessions) <= self.max_sessions:
+                    break
+                del self._sessions[oldest_key]
+
+        return session
+
+    def discard(self, user_id: str, session_id: str):
+        with self._lock:
+            self._sessions.pop((user_id, session_id), None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
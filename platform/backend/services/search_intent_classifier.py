@@ -6,13 +6,15 @@ para melhorar a precisão da detecção de contexto
 🤖 Agent Skills Framework - NLP Component
 """
 
+import os
 import re
 import json
 from typing import Dict, List, Optional, Tuple, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 import difflib
-from collections import defaultdict, Counter
+import threading
+from collections import defaultdict, Counter, OrderedDict
 
 
 class IntentCategory(Enum):
@@ -52,6 +54,26 @@ class IntentAnalysis:
     priority_factors: Dict[str, float]
 
 
+# Palavras importantes para classificação
+IMPORTANT_WORDS = frozenset([
+    'economico', 'barato', 'caro', 'luxo', 'premium', 'basico',
+    'novo', 'usado', 'seminovo', 'zero', 'primeiro',
+    'rapido', 'lento', 'potente', 'forte', 'fraco',
+    'grande', 'pequeno', 'medio', 'compacto', 'espacoso',
+    'confortavel', 'simples', 'automatico', 'manual',
+    'moderno', 'antigo', 'tecnologia', 'conectado'
+])
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+# Pesos de cada grupo de padrões no score da intenção
+PATTERN_GROUP_WEIGHTS = (
+    ('primary_patterns', 1.0),
+    ('context_patterns', 0.5),
+    ('negative_patterns', -0.8),
+)
+
+
 class SearchIntentClassifier:
     """
     Classificador de intenção de busca com múltiplas técnicas:
@@ -59,9 +81,14 @@ class SearchIntentClassifier:
     - Análise de co-ocorrência  
     - Detecção de entidades
     - Inferência de persona
+    
+    ⚡ Os padrões são compilados uma vez no __init__ e cada intenção tem uma
+    alternação única com todos os seus padrões: uma busca nela descarta de
+    uma vez as intenções sem nenhum match (a maioria, numa query curta).
+    Análises recentes ficam num LRU (`cache_size`, INTENT_CACHE_SIZE).
     """
     
-    def __init__(self):
+    def __init__(self, cache_size: Optional[int] = None):
         self.intent_patterns = {}
         self.entity_patterns = {}
         self.keyword_weights = {}
@@ -71,6 +98,35 @@ class SearchIntentClassifier:
         self._initialize_patterns()
         self._initialize_entities()
         self._initialize_personas()
+        self._compile_patterns()
+        
+        if cache_size is None:
+            cache_size = int(os.getenv("INTENT_CACHE_SIZE", "1024"))
+        self.cache_size = cache_size
+        self._analysis_cache: "OrderedDict[str, IntentAnalysis]" = OrderedDict()
+        # Rotas síncronas rodam no threadpool do FastAPI
+        self._cache_lock = threading.Lock()
+        
+    def _compile_patterns(self):
+        """Pré-compilar padrões de intenção e entidades"""
+        self._compiled_intents = []
+        for intent, patterns in self.intent_patterns.items():
+            groups = [
+                (re.compile(pattern, re.IGNORECASE), group_weight)
+                for group, group_weight in PATTERN_GROUP_WEIGHTS
+                for pattern in patterns.get(group, [])
+            ]
+            # Alguma alternativa casa em algum ponto <=> a união casa (search tenta todas as posições)
+            union = re.compile(
+                '|'.join(f'(?:{pattern.pattern})' for pattern, _ in groups),
+                re.IGNORECASE
+            )
+            self._compiled_intents.append((intent, patterns.get('weight', 1.0), union, groups))
+        
+        self._compiled_entities = [
+            (entity_type, re.compile(config['pattern'], re.IGNORECASE), config['extract_func'])
+            for entity_type, config in self.entity_patterns.items()
+        ]
         
     def _initialize_patterns(self):
         """Inicializa padrões avançados de intenção"""
@@ -237,8 +293,30 @@ class SearchIntentClassifier:
             user_context: Contexto adicional do usuário
             
         Returns:
-            IntentAnalysis com intenção classificada
+            IntentAnalysis com intenção classificada (instância compartilhada
+            pelo cache quando não há user_context: tratar como somente leitura)
         """
+        if user_context or self.cache_size <= 0:
+            return self._classify(query, user_context)
+        
+        with self._cache_lock:
+            analysis = self._analysis_cache.get(query)
+            if analysis is not None:
+                self._analysis_cache.move_to_end(query)
+                return analysis
+        
+        # Classificação fora do lock (threads concorrentes na mesma query
+        # calculam o mesmo resultado)
+        analysis = self._classify(query, None)
+        with self._cache_lock:
+            self._analysis_cache[query] = analysis
+            self._analysis_cache.move_to_end(query)
+            while len(self._analysis_cache) > self.cache_size:
+                self._analysis_cache.popitem(last=False)
+        return analysis
+        
+    def _classify(self, query: str, user_context: Optional[Dict]) -> IntentAnalysis:
+        """Análise completa (sem cache)"""
         query_lower = query.lower()
         
         # 1. Calcular scores para cada intenção
@@ -287,26 +365,17 @@ class SearchIntentClassifier:
         """Calcula scores para cada categoria de intenção"""
         scores = defaultdict(float)
         
-        for intent, patterns in self.intent_patterns.items():
-            score = 0.0
+        for intent, weight, union, patterns in self._compiled_intents:
+            if union.search(query) is None:
+                scores[intent] = 0.0
+                continue
             
-            # Padrões primários
-            for pattern in patterns.get('primary_patterns', []):
-                matches = len(re.findall(pattern, query, re.IGNORECASE))
-                score += matches * 1.0
-                
-            # Padrões de contexto (peso menor)
-            for pattern in patterns.get('context_patterns', []):
-                matches = len(re.findall(pattern, query, re.IGNORECASE))
-                score += matches * 0.5
-                
-            # Padrões negativos (reduzem score)
-            for pattern in patterns.get('negative_patterns', []):
-                matches = len(re.findall(pattern, query, re.IGNORECASE))
-                score -= matches * 0.8
+            # Primários somam 1.0, contexto 0.5 e negativos reduzem 0.8 por match
+            score = 0.0
+            for pattern, group_weight in patterns:
+                score += len(pattern.findall(query)) * group_weight
                 
             # Aplicar peso da intenção
-            weight = patterns.get('weight', 1.0)
             scores[intent] = max(0.0, score * weight)
             
         # Normalizar scores
@@ -321,12 +390,8 @@ class SearchIntentClassifier:
         """Extrai todas as entidades da query"""
         entities = []
         
-        for entity_type, config in self.entity_patterns.items():
-            pattern = config['pattern']
-            extract_func = config['extract_func']
-            
-            matches = re.finditer(pattern, query, re.IGNORECASE)
-            for match in matches:
+        for entity_type, pattern, extract_func in self._compiled_entities:
+            for match in pattern.finditer(query):
                 entity_value = extract_func(match.group())
                 if entity_value:
                     entities.append(EntityMatch(
@@ -341,18 +406,8 @@ class SearchIntentClassifier:
         
     def _extract_keywords(self, query: str) -> List[str]:
         """Extrai palavras-chave importantes"""
-        # Palavras importantes para classificação
-        important_words = [
-            'economico', 'barato', 'caro', 'luxo', 'premium', 'basico',
-            'novo', 'usado', 'seminovo', 'zero', 'primeiro',
-            'rapido', 'lento', 'potente', 'forte', 'fraco',
-            'grande', 'pequeno', 'medio', 'compacto', 'espacoso',
-            'confortavel', 'simples', 'automatico', 'manual',
-            'moderno', 'antigo', 'tecnologia', 'conectado'
-        ]
-        
-        words = re.findall(r'\b\w+\b', query.lower())
-        keywords = [word for word in words if word in important_words]
+        words = WORD_PATTERN.findall(query.lower())
+        keywords = [word for word in words if word in IMPORTANT_WORDS]
         
         return keywords
         
@@ -503,9 +558,9 @@ class SearchIntentClassifier:
 
 
 # Factory function
-def create_intent_classifier() -> SearchIntentClassifier:
+def create_intent_classifier(cache_size: Optional[int] = None) -> SearchIntentClassifier:
     """Cria uma instância do classificador"""
-    return SearchIntentClassifier()
+    return SearchIntentClassifier(cache_size=cache_size)
 
 
 # Exemplo de uso e testes
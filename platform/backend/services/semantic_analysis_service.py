@@ -1,11 +1,21 @@
 """
 Service for Semantic Analysis of User Profiles using SLMs (Connectionist Intelligence)
+
+⚡ analyze_profile é memoizado por assinatura canônica do perfil (com TTL).
+Num cache miss a resposta é imediata (tabela de warm-start ou heurística)
+e a chamada ao SLM roda em background, preenchendo o cache; perfis
+equivalentes em voo compartilham a mesma chamada (single-flight).
 """
 
+import hashlib
 import json
 import logging
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
 
 # Reusing providers setup from LLMJustificationService structure logic
 try:
@@ -24,6 +34,88 @@ from models.user_profile import UserProfile
 
 logger = logging.getLogger(__name__)
 
+
+# Muda quando o prompt/parse mudam: invalida as análises memoizadas
+SEMANTIC_PROMPT_VERSION = 1
+
+# Orçamentos na mesma faixa compartilham a análise
+SEMANTIC_BUDGET_BAND = 10000
+
+# Prioridade do questionário -> peso semântico
+PRIORITY_TO_SEMANTIC = {
+    "economia": "economy",
+    "espaco": "space",
+    "performance": "performance",
+    "conforto": "comfort",
+    "seguranca": "safety",
+    "revenda": "resale",
+    "confiabilidade": "reliability",
+    "custo_manutencao": "economy",
+}
+
+# Ajustes típicos por uso principal (base da tabela de warm-start)
+USAGE_WARM_START = {
+    "familia": {"safety": 0.15, "space": 0.15, "comfort": 0.05},
+    "trabalho": {"economy": 0.15, "reliability": 0.10},
+    "primeiro_carro": {"economy": 0.10, "safety": 0.10, "reliability": 0.05},
+    "comercial": {"reliability": 0.15, "space": 0.10, "economy": 0.10},
+    "lazer": {"comfort": 0.10, "performance": 0.10},
+    "transporte_passageiros": {"economy": 0.15, "reliability": 0.15, "comfort": 0.05},
+}
+
+
+def _build_warm_start_table() -> Dict[Tuple[str, Optional[str]], Dict[str, float]]:
+    """
+    Ajustes pré-calculados para (uso principal, prioridade principal)
+
+    Cobre as combinações mais comuns do questionário; a prioridade
+    principal reforça o peso semântico correspondente.
+    """
+    table = {}
+    for uso, base in USAGE_WARM_START.items():
+        table[(uso, None)] = dict(base)
+        for prioridade, semantic_key in PRIORITY_TO_SEMANTIC.items():
+            adjustment = dict(base)
+            adjustment[semantic_key] = round(min(0.2, adjustment.get(semantic_key, 0.0) + 0.1), 2)
+            table[(uso, prioridade)] = adjustment
+    return table
+
+
+WARM_START_ADJUSTMENTS = _build_warm_start_table()
+
+
+def main_priority(profile: UserProfile) -> Optional[str]:
+    """Prioridade mais alta (>= 4) do perfil; empate -> ordem alfabética"""
+    prioridades = getattr(profile, 'prioridades', None) or {}
+    candidates = [(-v, k) for k, v in prioridades.items() if isinstance(v, (int, float)) and v >= 4]
+    return min(candidates)[1] if candidates else None
+
+
+def profile_signature(profile: UserProfile) -> str:
+    """
+    Assinatura canônica do perfil para a análise semântica
+
+    Considera os campos usados no prompt; orçamento em faixas de
+    SEMANTIC_BUDGET_BAND e prioridades ordenadas.
+    """
+    prioridades = getattr(profile, 'prioridades', None) or {}
+    payload = {
+        "v": SEMANTIC_PROMPT_VERSION,
+        "uso": profile.uso_principal,
+        "familia": getattr(profile, 'tamanho_familia', None),
+        "criancas": bool(getattr(profile, 'tem_criancas', False)),
+        "orcamento": [
+            int(profile.orcamento_min // SEMANTIC_BUDGET_BAND),
+            int(profile.orcamento_max // SEMANTIC_BUDGET_BAND),
+        ],
+        "prioridades": sorted(prioridades.items()),
+        "primeiro_carro": bool(getattr(profile, 'primeiro_carro', False)),
+        "km_diario": getattr(profile, 'km_diario', None),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
 class SemanticAnalysisService:
     """
     Analyzes user profiles and unstructured text to infer hidden preferences/weights using SLMs.
@@ -52,13 +144,42 @@ class SemanticAnalysisService:
         primary_provider: str = "groq",
         primary_model: str = "llama-3.1-8b-instant",
         fallback_provider: str = "openai",
-        fallback_model: str = "gpt-4o-mini"
+        fallback_model: str = "gpt-4o-mini",
+        cache_ttl_seconds: Optional[float] = None,
+        cache_max_size: Optional[int] = None
     ):
+        """
+        Args:
+            cache_ttl_seconds: Validade de uma análise do SLM; SEMANTIC_CACHE_TTL
+            cache_max_size: Máximo de perfis memoizados (LRU); SEMANTIC_CACHE_SIZE
+        """
         self.primary_client = None
         self.fallback_client = None
         self.primary_model = primary_model
         self.fallback_model = fallback_model
 
+        if cache_ttl_seconds is None:
+            cache_ttl_seconds = float(os.getenv("SEMANTIC_CACHE_TTL", str(6 * 3600)))
+        if cache_max_size is None:
+            cache_max_size = int(os.getenv("SEMANTIC_CACHE_SIZE", "2048"))
+
+        self.cache_ttl_seconds = cache_ttl_seconds
+        # Falha dos dois provedores: guardar a heurística por pouco tempo
+        self.failure_ttl_seconds = float(os.getenv("SEMANTIC_CACHE_FAILURE_TTL", "300"))
+        self.cache_max_size = cache_max_size
+
+        self._cache: "OrderedDict[str, Tuple[Dict[str, float], float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'llm_calls': 0,
+            'warm_start': 0,
+        }
+
         # Initialize clients (similar to LLMJustificationService)
         if primary_provider == "groq" and GROQ_AVAILABLE:
             api_key = os.getenv("GROQ_API_KEY")
@@ -76,12 +197,102 @@ class SemanticAnalysisService:
                 except Exception as e:
                     logger.error(f"Failed to init OpenAI: {e}")
 
-    def analyze_profile(self, profile: UserProfile) -> Dict[str, float]:
+    def analyze_profile(self, profile: UserProfile, wait: bool = False) -> Dict[str, float]:
         """
         Analyzes the structured profile to infer implicit weights.
+
+        Memoizado por profile_signature. Num miss, retorna na hora o ajuste
+        da tabela de warm-start (ou a heurística) e agenda a chamada ao SLM
+        em background; com wait=True aguarda o resultado (compartilhando a
+        chamada em voo, se houver).
         """
+        if not self.primary_client and not self.fallback_client:
+            return self._heuristic_fallback(profile)
+
+        key = profile_signature(profile)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return dict(cached)
+
+        future = self._submit(key, profile)
+        if wait:
+            return dict(future.result())
+
+        warm = WARM_START_ADJUSTMENTS.get((profile.uso_principal, main_priority(profile)))
+        if warm is not None:
+            with self._lock:
+                self.stats['warm_start'] += 1
+            return dict(warm)
+        return self._heuristic_fallback(profile)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Estatísticas da memoização (hits, misses, chamadas coalescidas...)"""
+        with self._lock:
+            return {
+                **self.stats,
+                'size': len(self._cache),
+                'inflight': len(self._inflight),
+            }
+
+    def _get_cached(self, key: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                del self._cache[key]
+                entry = None
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def _submit(self, key: str, profile: UserProfile) -> Future:
+        """Agenda a análise pelo SLM (uma por assinatura em voo)"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("SEMANTIC_LLM_WORKERS", "2")),
+                    thread_name_prefix="semantic-slm"
+                )
+            future = self._executor.submit(self._fill, key, profile)
+            self._inflight[key] = future
+            return future
+
+    def _fill(self, key: str, profile: UserProfile) -> Dict[str, float]:
+        """Chama o SLM e grava o resultado no cache"""
+        try:
+            result = self._analyze_with_llm(profile)
+            if result is None:
+                result = self._heuristic_fallback(profile)
+                ttl = self.failure_ttl_seconds
+            else:
+                ttl = self.cache_ttl_seconds
+
+            with self._lock:
+                self._cache[key] = (result, time.monotonic() + ttl)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_max_size:
+                    self._cache.popitem(last=False)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _analyze_with_llm(self, profile: UserProfile) -> Optional[Dict[str, float]]:
+        """Primário, depois fallback; None se os dois falharem"""
         prompt = self._build_profile_prompt(profile)
-        
+
+        with self._lock:
+            self.stats['llm_calls'] += 1
+
         # Try Primary
         if self.primary_client:
             try:
@@ -98,8 +309,7 @@ class SemanticAnalysisService:
             except Exception as e:
                 logger.warning(f"Fallback SLM failed: {e}")
 
-        # Final Fallback: Return neutral adjustment
-        return self._heuristic_fallback(profile)
+        return None
 
     def _build_profile_prompt(self, profile: UserProfile) -> str:
         """Converts profile to a descriptive narrative for the SLM."""
@@ -152,3 +362,20 @@ class SemanticAnalysisService:
             weights['economy'] = 0.1
             weights['reliability'] = 0.1
         return weights
+
+
+# Instância compartilhada (cache único por processo)
+_semantic_service_instance = None
+_semantic_service_lock = threading.Lock()
+
+
+def get_semantic_analysis_service() -> SemanticAnalysisService:
+    """Retorna instância singleton do SemanticAnalysisService"""
+    global _semantic_service_instance
+
+    if _semantic_service_instance is None:
+        with _semantic_service_lock:
+            if _semantic_service_instance is None:
+                _semantic_service_instance = SemanticAnalysisService()
+
+    return _semantic_service_instance
@@ -12,11 +12,28 @@ Author: FacilIAuto
 Date: 2025-11-05
 """
 
-from typing import Dict, Optional, Any, Tuple, List
+from typing import Dict, Optional, Any, Tuple, List, Sequence, Hashable
+from collections import OrderedDict
+from datetime import datetime
 import asyncio
+import threading
+
+import numpy as np
 from pydantic import BaseModel
 
 
+# Colunas do array estruturado retornado por TCOCalculator.calculate_tco_many
+TCO_DTYPE = np.dtype([
+    ("financing_monthly", np.float64),
+    ("fuel_monthly", np.float64),
+    ("maintenance_monthly", np.float64),
+    ("insurance_monthly", np.float64),
+    ("ipva_monthly", np.float64),
+    ("total_monthly", np.float64),
+    ("maintenance_factor", np.float64),
+])
+
+
 class TCOBreakdown(BaseModel):
     """Detalhamento do custo total de propriedade"""
     financing_monthly: float        # Parcela do financiamento
@@ -160,6 +177,25 @@ class TCOCalculator:
         "TO": 0.025
     }
     
+    # Ajustes de manutenção por quilometragem (fator -> metadados)
+    MILEAGE_ADJUSTMENTS = {
+        1.5: {
+            "factor": 1.5,
+            "reason": "Quilometragem alta (100k-150k km)"
+        },
+        2.0: {
+            "factor": 2.0,
+            "reason": "Quilometragem muito alta (>150k km)"
+        }
+    }
+    
+    # Multiplicadores de seguro por perfil do segurado
+    INSURANCE_PROFILE_MULTIPLIERS = {
+        "standard": 1.0,
+        "young": 1.3,      # Jovens pagam mais
+        "senior": 0.9      # Idosos pagam menos
+    }
+    
     def __init__(
         self,
         down_payment_percent: float = 0.20,
@@ -255,16 +291,10 @@ class TCOCalculator:
             return base_maintenance, None
         elif mileage <= 150000:
             adjusted = base_maintenance * 1.5
-            return adjusted, {
-                "factor": 1.5,
-                "reason": "Quilometragem alta (100k-150k km)"
-            }
+            return adjusted, dict(self.MILEAGE_ADJUSTMENTS[1.5])
         else:
             adjusted = base_maintenance * 2.0
-            return adjusted, {
-                "factor": 2.0,
-                "reason": "Quilometragem muito alta (>150k km)"
-            }
+            return adjusted, dict(self.MILEAGE_ADJUSTMENTS[2.0])
     
     def calculate_tco(
         self,
@@ -321,19 +351,53 @@ class TCOCalculator:
         
         total = financing + fuel + maintenance + insurance + ipva
         
-        # Construir assumptions com transparência total
-        # Garantir que percentuais sejam exibidos corretamente (0-100)
-        down_payment_display = self.down_payment_percent
+        assumptions = self._build_assumptions(
+            self.down_payment_percent,
+            self.financing_months,
+            self.annual_interest_rate,
+            fuel_efficiency_km_per_liter,
+            mileage_adjustment
+        )
+        
+        # Restaurar valores originais
+        self.down_payment_percent = original_down
+        self.financing_months = original_months
+        self.annual_interest_rate = original_rate
+        
+        return TCOBreakdown(
+            financing_monthly=round(financing, 2),
+            fuel_monthly=round(fuel, 2),
+            maintenance_monthly=round(maintenance, 2),
+            insurance_monthly=round(insurance, 2),
+            ipva_monthly=round(ipva, 2),
+            total_monthly=round(total, 2),
+            assumptions=assumptions
+        )
+    
+    def _build_assumptions(
+        self,
+        down_payment_percent: float,
+        financing_months: int,
+        annual_interest_rate: float,
+        fuel_efficiency_km_per_liter: float,
+        mileage_adjustment: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Monta as premissas do cálculo com transparência total
+        
+        Garante que percentuais sejam exibidos corretamente (0-100)
+        """
+        down_payment_display = down_payment_percent
         if down_payment_display <= 1.0:
             down_payment_display = down_payment_display * 100
         
-        interest_rate_display = self.annual_interest_rate
+        interest_rate_display = annual_interest_rate
         if interest_rate_display <= 1.0:
             interest_rate_display = interest_rate_display * 100
         
         assumptions = {
             "down_payment_percent": round(down_payment_display, 1),
-            "financing_months": self.financing_months,
+            "financing_months": financing_months,
             "annual_interest_rate": round(interest_rate_display, 1),
             "monthly_km": self.monthly_km,
             "fuel_price_per_liter": self.fuel_price_per_liter,
@@ -345,19 +409,136 @@ class TCOCalculator:
         if mileage_adjustment:
             assumptions["maintenance_adjustment"] = mileage_adjustment
         
-        # Restaurar valores originais
-        self.down_payment_percent = original_down
-        self.financing_months = original_months
-        self.annual_interest_rate = original_rate
+        return assumptions
+    
+    def calculate_tco_many(
+        self,
+        prices: Sequence[float],
+        categories: Sequence[str],
+        efficiencies: Sequence[float],
+        ages: Sequence[int],
+        mileages: Sequence[int]
+    ) -> np.ndarray:
+        """
+        Calcula TCO para vários carros de uma vez (vetorizado)
+        
+        Mesmas regras de calculate_tco, aplicadas como expressões NumPy
+        sobre todos os carros. Os termos de financiamento são validados
+        uma única vez.
+        
+        Args:
+            prices: Preços dos carros
+            categories: Categorias dos carros
+            efficiencies: Consumos (km/L)
+            ages: Idades em anos
+            mileages: Quilometragens atuais
+            
+        Returns:
+            Array estruturado (TCO_DTYPE) com os custos mensais arredondados
+            e o fator de ajuste de manutenção por quilometragem
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        efficiencies = np.asarray(efficiencies, dtype=np.float64)
+        ages = np.asarray(ages, dtype=np.float64)
+        mileages = np.asarray(mileages, dtype=np.float64)
+        
+        down_payment, months, annual_rate = self.validate_financing_terms(
+            self.down_payment_percent,
+            self.financing_months,
+            self.annual_interest_rate
+        )
+        
+        # Financiamento (Tabela Price) - fator calculado uma única vez
+        monthly_rate = annual_rate / 12
+        if monthly_rate > 0:
+            growth = (1 + monthly_rate) ** months
+            price_factor = (monthly_rate * growth) / (growth - 1)
+        else:
+            price_factor = 1 / months
+        financing = prices * (1 - down_payment) * price_factor
+        
+        # Combustível (consumo <= 0 => custo zero)
+        fuel = np.zeros(len(prices))
+        np.divide(
+            self.monthly_km * self.fuel_price_per_liter,
+            efficiencies,
+            out=fuel,
+            where=efficiencies > 0
+        )
+        
+        # Tabelas por categoria resolvidas uma vez por categoria distinta
+        unique_categories, category_codes = np.unique(
+            np.asarray(categories, dtype=str), return_inverse=True
+        )
+        base_maintenance_costs = np.array(
+            [self.MAINTENANCE_COSTS.get(c, 2000) for c in unique_categories], dtype=np.float64
+        )[category_codes]
+        insurance_rates = np.array(
+            [self.INSURANCE_RATES.get(c, 0.045) for c in unique_categories], dtype=np.float64
+        )[category_codes]
+        
+        # Manutenção (idade + quilometragem)
+        base_maintenance = base_maintenance_costs * (1 + ages * 0.10) / 12
+        maintenance_factor = np.where(
+            mileages <= 100000, 1.0, np.where(mileages <= 150000, 1.5, 2.0)
+        )
+        maintenance = base_maintenance * maintenance_factor
+        
+        # Seguro e IPVA
+        multiplier = self.INSURANCE_PROFILE_MULTIPLIERS.get(self.user_profile, 1.0)
+        insurance = prices * insurance_rates * multiplier / 12
+        ipva = prices * self.IPVA_RATES.get(self.state, 0.04) / 12
+        
+        total = financing + fuel + maintenance + insurance + ipva
+        
+        result = np.empty(len(prices), dtype=TCO_DTYPE)
+        result["financing_monthly"] = np.round(financing, 2)
+        result["fuel_monthly"] = np.round(fuel, 2)
+        result["maintenance_monthly"] = np.round(maintenance, 2)
+        result["insurance_monthly"] = np.round(insurance, 2)
+        result["ipva_monthly"] = np.round(ipva, 2)
+        result["total_monthly"] = np.round(total, 2)
+        result["maintenance_factor"] = maintenance_factor
+        
+        return result
+    
+    def breakdown_from_row(
+        self,
+        row: np.void,
+        fuel_efficiency_km_per_liter: float
+    ) -> TCOBreakdown:
+        """
+        Converte uma linha de calculate_tco_many em TCOBreakdown
+        
+        Args:
+            row: Linha do array estruturado (TCO_DTYPE)
+            fuel_efficiency_km_per_liter: Consumo usado no cálculo
+            
+        Returns:
+            TCOBreakdown equivalente ao retornado por calculate_tco
+        """
+        down_payment, months, annual_rate = self.validate_financing_terms(
+            self.down_payment_percent,
+            self.financing_months,
+            self.annual_interest_rate
+        )
+        
+        mileage_adjustment = self.MILEAGE_ADJUSTMENTS.get(float(row["maintenance_factor"]))
         
         return TCOBreakdown(
-            financing_monthly=round(financing, 2),
-            fuel_monthly=round(fuel, 2),
-            maintenance_monthly=round(maintenance, 2),
-            insurance_monthly=round(insurance, 2),
-            ipva_monthly=round(ipva, 2),
-            total_monthly=round(total, 2),
-            assumptions=assumptions
+            financing_monthly=float(row["financing_monthly"]),
+            fuel_monthly=float(row["fuel_monthly"]),
+            maintenance_monthly=float(row["maintenance_monthly"]),
+            insurance_monthly=float(row["insurance_monthly"]),
+            ipva_monthly=float(row["ipva_monthly"]),
+            total_monthly=float(row["total_monthly"]),
+            assumptions=self._build_assumptions(
+                down_payment,
+                months,
+                annual_rate,
+                fuel_efficiency_km_per_liter,
+                dict(mileage_adjustment) if mileage_adjustment else None
+            )
         )
     
     def calculate_financing_monthly(self, car_price: float) -> float:
@@ -450,13 +631,7 @@ class TCOCalculator:
         base_rate = self.INSURANCE_RATES.get(car_category, 0.045)
         
         # Ajuste por perfil do segurado
-        profile_multipliers = {
-            "standard": 1.0,
-            "young": 1.3,      # Jovens pagam mais
-            "senior": 0.9      # Idosos pagam menos
-        }
-        
-        multiplier = profile_multipliers.get(self.user_profile, 1.0)
+        multiplier = self.INSURANCE_PROFILE_MULTIPLIERS.get(self.user_profile, 1.0)
         
         annual_cost = car_price * base_rate * multiplier
         monthly_cost = annual_cost / 12
@@ -603,3 +778,120 @@ class TCOCalculator:
             
         results = await asyncio.gather(*tasks)
         return results
+
+
+class TCORequestContext:
+    """
+    Contexto de TCO resolvido uma única vez por requisição
+    
+    Guarda preço do combustível e termos de financiamento já previstos para
+    o perfil, além de uma calculadora configurada com eles. Todos os carros
+    da mesma requisição compartilham este contexto.
+    """
+    
+    def __init__(
+        self,
+        state: str,
+        fuel_price_per_liter: float,
+        annual_interest_rate: float,
+        down_payment_percent: float,
+        financing_months: int = 60,
+        monthly_km: int = 1000,
+        user_profile: str = "standard",
+        reference_year: Optional[int] = None
+    ):
+        self.state = state
+        self.fuel_price_per_liter = fuel_price_per_liter
+        self.annual_interest_rate = annual_interest_rate
+        self.down_payment_percent = down_payment_percent
+        self.financing_months = financing_months
+        self.monthly_km = monthly_km
+        self.user_profile = user_profile
+        self.reference_year = reference_year or datetime.now().year
+        
+        self.calculator = TCOCalculator(
+            down_payment_percent=down_payment_percent,
+            financing_months=financing_months,
+            annual_interest_rate=annual_interest_rate,
+            monthly_km=monthly_km,
+            fuel_price_per_liter=fuel_price_per_liter,
+            state=state,
+            user_profile=user_profile
+        )
+    
+    def cache_key(self, car_id: str) -> Tuple[Hashable, ...]:
+        """
+        Chave do cache de TCO para um carro neste contexto
+        
+        Inclui todos os parâmetros da calculadora (combustível, prazo, km
+        mensal, perfil) e o ano de referência para que mudanças nesses
+        valores não reaproveitem resultados antigos.
+        """
+        return (
+            car_id,
+            self.state,
+            self.annual_interest_rate,
+            self.down_payment_percent,
+            self.financing_months,
+            self.monthly_km,
+            self.user_profile,
+            self.fuel_price_per_liter,
+            self.reference_year
+        )
+
+
+class TCOCache:
+    """
+    Cache LRU limitado de TCOBreakdown
+    
+    Chaveado por (car id, estado, taxa, entrada, ...) - ver
+    TCORequestContext.cache_key. Perfis repetidos pulam o cálculo.
+    Seguro para uso a partir de múltiplas threads.
+    """
+    
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[Hashable, ...], TCOBreakdown]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[TCOBreakdown]:
+        """Obtém valor e marca como usado recentemente"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Tuple[Hashable, ...], value: TCOBreakdown):
+        """Armazena valor, descartando o menos usado se exceder o limite"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Limpa o cache e as estatísticas"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do cache"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total > 0 else 0.0
+        }
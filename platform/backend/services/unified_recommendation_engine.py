@@ -3,20 +3,40 @@ Sistema de Recomendação Unificado - Agrega carros de TODAS as concessionárias
 🤖 AI Engineer: FASE 1 - Filtros avançados implementados
 """
 
+import asyncio
+import functools
 import json
 import os
-from typing import List, Dict, Optional, Tuple, Any
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Dict, Optional, Sequence, Tuple, Any
+
+import numpy as np
 
 from models.car import Car
 from models.user_profile import UserProfile, TCOBreakdown
 from models.dealership import Dealership
 from utils.geo_distance import calculate_distance, get_city_coordinates
 from services.car.car_metrics import CarMetricsCalculator
+from services.car.car_lookup import CarLookup
+from services.car.inventory_index import InventoryIndex
+from services.car.ranking_candidates import RankingCandidates, candidates_key
+from services.car.inventory_snapshot import (
+    SNAPSHOT_FILENAME,
+    load_snapshot,
+    save_snapshot,
+    source_fingerprint
+)
+from services.car.shared_inventory import (
+    SHARED_DIRNAME,
+    LazyCarList,
+    attach_shared_inventory,
+    publish_shared_inventory
+)
 from services.app_transport_validator import validator as app_transport_validator
 from services.commercial_vehicle_validator import validator as commercial_vehicle_validator
-from services.tco_calculator import TCOCalculator
-from services.car.fuel_price_service import FuelPriceService
+from services.tco_calculator import TCOCache, TCORequestContext
+from services.car.fuel_price_service import fuel_price_service
 from services.llm_justification_service import LLMJustificationService
 
 
@@ -25,10 +45,93 @@ class UnifiedRecommendationEngine:
     Engine de recomendação que busca carros em TODAS as concessionárias ativas
     """
     
+    # Adequação da categoria ao uso (valores refinados por perfil)
+    USO_CATEGORIA_MAP: Dict[str, Dict[str, float]] = {
+        "familia": {
+            "SUV": 0.95,      # Ideal - espaço + segurança
+            "Van": 0.90,      # Muito bom - máximo espaço
+            "Sedan": 0.75,    # Bom, mas menos espaço
+            "Hatch": 0.40,    # Inadequado para família
+            "Pickup": 0.35,   # Inadequado
+            "Compacto": 0.20  # Muito inadequado
+        },
+        "primeiro_carro": {
+            "Hatch": 0.95,    # Ideal - fácil dirigir
+            "Compacto": 0.95, # Ideal - econômico
+            "Sedan": 0.55,    # Grande demais
+            "SUV": 0.30,      # Inadequado
+            "Pickup": 0.20,   # Muito inadequado
+            "Van": 0.15       # Completamente inadequado
+        },
+        "trabalho": {
+            "Sedan": 0.95,    # Ideal - profissional
+            "Hatch": 0.85,    # Bom - econômico
+            "Compacto": 0.75, # Bom para cidade
+            "SUV": 0.50,      # Consome muito
+            "Pickup": 0.40,   # Não profissional
+            "Van": 0.30       # Inadequado
+        },
+        "comercial": {
+            "Furgão": 0.95,   # Ideal - volume e proteção de carga
+            "Van": 0.95,      # Ideal - volume
+            "Pickup Pequena": 0.90,  # Muito bom - caçamba para carga
+            "Utilitário": 0.85,  # Bom - versátil
+            "Pickup": 0.30,   # Inadequado - geralmente são pickups médias/grandes de lazer
+            "SUV": 0.20,      # Inadequado - não é comercial
+            "Sedan": 0.15,    # Muito inadequado
+            "Hatch": 0.10,    # Muito inadequado
+            "Compacto": 0.10  # Muito inadequado
+        },
+        "lazer": {
+            "SUV": 0.95,      # Ideal - aventura/off-road
+            "Pickup": 0.85,   # Muito bom - off-road
+            "Van": 0.70,      # Bom para viagens
+            "Sedan": 0.55,    # Limitado
+            "Hatch": 0.40,    # Inadequado
+            "Compacto": 0.30  # Muito inadequado
+        },
+        "transporte_passageiros": {
+            "Sedan": 0.95,    # Ideal - UberX/99Pop/Comfort
+            "SUV": 0.90,      # Muito bom - Uber Comfort/Black
+            "Hatch": 0.70,    # Bom - UberX/99Pop (alguns modelos)
+            "Compacto": 0.50, # Limitado - Apenas alguns aceitos
+            "Van": 0.40,      # Inadequado para app (muito grande)
+            "Pickup": 0.20    # Inadequado
+        }
+    }
+
+    # Prioridade do usuário -> coluna de score do carro
+    PRIORITY_SCORE_FIELDS: Dict[str, str] = {
+        "economia": "score_economia",
+        "espaco": "score_familia",  # Espaço correlaciona com família
+        "performance": "score_performance",
+        "conforto": "score_conforto",
+        "seguranca": "score_seguranca",
+        # 📊 FASE 3: Métricas avançadas
+        "revenda": "indice_revenda",
+        "confiabilidade": "indice_confiabilidade",
+    }
+
+    # 📊 FASE 3: Custos de referência para normalizar manutenção
+    MIN_MAINTENANCE_COST = 1500  # R$ 1.500/ano (muito barato)
+    MAX_MAINTENANCE_COST = 8000  # R$ 8.000/ano (muito caro)
+
     def __init__(self, data_dir: str = "data", use_llm: bool = True):
         self.data_dir = data_dir
         self.dealerships: List[Dealership] = []
-        self.all_cars: List[Car] = []
+        self.all_cars: Sequence[Car] = []  # list ou LazyCarList (inventário compartilhado)
+        self.inventory_index: Optional[InventoryIndex] = None
+        self.car_lookup: Optional[CarLookup] = None
+        # ⚡ Snapshot binário do inventário enriquecido (start rápido)
+        self.use_snapshot = os.getenv("INVENTORY_SNAPSHOT_ENABLED", "true").lower() == "true"
+        # ⚡ Inventário em arquivos mapeados, compartilhado entre workers (opt-in)
+        self.use_shared_inventory = os.getenv("INVENTORY_SHARED_MEMORY", "false").lower() == "true"
+        self.tco_cache = TCOCache(max_size=int(os.getenv("TCO_CACHE_SIZE", "10000")))
+        # Pool limitado para o trabalho CPU-bound do caminho async (arank)
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("RECOMMENDATION_CPU_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            thread_name_prefix="recommendation-cpu"
+        )
         self.metrics_calculator = CarMetricsCalculator()  # 📊 FASE 3
 
         # 🤖 FASE 1: Inicializar LLM service para justificativas inteligentes
@@ -51,9 +154,12 @@ class UnifiedRecommendationEngine:
         else:
             print("[ENGINE] LLM justification service desabilitado (use_llm=False)")
 
-        # Carregar dados
-        self.load_dealerships()
-        self.load_all_cars()
+        # Carregar dados (⚡ inventário compartilhado / snapshot binário quando as fontes não mudaram)
+        if not self.attach_shared_inventory():
+            if not self.load_inventory_snapshot():
+                self.load_dealerships()
+                self.load_all_cars()
+            self.publish_shared_inventory()
 
         # 🤖 FASE 6: Inicializar Orquestrador de Agentes e Agentes Especializados
         from services.agents import (
@@ -95,6 +201,8 @@ class UnifiedRecommendationEngine:
     def load_all_cars(self):
         """Carregar carros de TODAS as concessionárias ativas"""
         self.all_cars = []
+        # ⚡ Índices hash (id, concessionária, marca, categoria) mantidos a cada inclusão
+        self.car_lookup = CarLookup(self.all_cars)
         
         for dealership in self.dealerships:
             if not dealership.active:
@@ -152,14 +260,174 @@ class UnifiedRecommendationEngine:
                         car_dict['custo_manutencao_anual'] = metrics['custo_manutencao_anual']
                     
                     car = Car(**car_dict)
-                    self.all_cars.append(car)
+                    self.car_lookup.add(car)
                 except Exception as e:
                     print(f"[ERRO] Erro ao carregar carro: {e}")
                     continue
             
-            print(f"[OK] {dealership.name}: {len([c for c in self.all_cars if c.dealership_id == dealership.id])} carros")
+            print(f"[OK] {dealership.name}: {self.car_lookup.count_by_dealership(dealership.id)} carros")
         
         print(f"[OK] Total: {len(self.all_cars)} carros de {len(self.dealerships)} concessionarias")
+
+        # ⚡ Índice colunar para filtragem vetorizada (construído uma vez por carga)
+        self.inventory_index = InventoryIndex(self.all_cars)
+
+        # ⚡ Gravar snapshot para os próximos starts
+        self.save_inventory_snapshot()
+
+    def _snapshot_sources(self) -> Tuple[str, List[str]]:
+        """Caminho do snapshot e arquivos de origem do inventário"""
+        snapshot_path = os.path.join(self.data_dir, "cache", SNAPSHOT_FILENAME)
+        return snapshot_path, [os.path.join(self.data_dir, "dealerships.json")]
+
+    def load_inventory_snapshot(self) -> bool:
+        """
+        Carregar concessionárias e carros enriquecidos do snapshot binário
+
+        Returns:
+            True se carregou; False se desabilitado, ausente ou desatualizado
+            (o chamador deve seguir pelo caminho completo)
+        """
+        if not self.use_snapshot:
+            return False
+
+        snapshot_path, sources = self._snapshot_sources()
+        fingerprint = source_fingerprint(sources)
+        if fingerprint is None:
+            return False
+
+        start = time.perf_counter()
+        loaded = load_snapshot(snapshot_path, fingerprint)
+        if loaded is None:
+            print("[SNAPSHOT] Snapshot ausente ou desatualizado, carregando das fontes")
+            return False
+
+        self.dealerships, self.all_cars = loaded
+        self.car_lookup = CarLookup(self.all_cars)
+        self.inventory_index = InventoryIndex(self.all_cars)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"[SNAPSHOT] ✅ {len(self.all_cars)} carros de {len(self.dealerships)} "
+            f"concessionarias carregados do snapshot em {elapsed_ms:.1f}ms"
+        )
+        return True
+
+    def save_inventory_snapshot(self):
+        """Gravar o inventário atual (já enriquecido) no snapshot binário"""
+        if not self.use_snapshot:
+            return
+
+        snapshot_path, sources = self._snapshot_sources()
+        fingerprint = source_fingerprint(sources)
+        if fingerprint is None:
+            return
+
+        save_snapshot(snapshot_path, fingerprint, self.dealerships, self.all_cars)
+
+    def _shared_inventory_dir(self) -> str:
+        return os.getenv("INVENTORY_SHARED_DIR") or os.path.join(self.data_dir, "cache", SHARED_DIRNAME)
+
+    def attach_shared_inventory(self) -> bool:
+        """
+        Anexar o inventário publicado por outro worker (zero-copy)
+
+        `all_cars` passa a ser uma LazyCarList: os Car só são construídos
+        para as linhas acessadas; índices colunares apontam para o mmap.
+
+        Returns:
+            True se anexou; False se desabilitado ou ainda não publicado
+        """
+        if not self.use_shared_inventory:
+            return False
+
+        _, sources = self._snapshot_sources()
+        fingerprint = source_fingerprint(sources)
+        if fingerprint is None:
+            return False
+
+        shared = attach_shared_inventory(
+            self._shared_inventory_dir(),
+            fingerprint,
+            cache_size=int(os.getenv("INVENTORY_SHARED_CACHE_SIZE", "1024"))
+        )
+        if shared is None:
+            return False
+
+        self.dealerships = shared.dealerships
+        self.all_cars = shared.cars
+        self.inventory_index = shared.index
+        self.car_lookup = shared.lookup
+        print(f"[SHARED] ✅ {len(self.all_cars)} carros anexados do inventário compartilhado")
+        return True
+
+    def publish_shared_inventory(self):
+        """Publicar o inventário carregado e passar a usar a versão mapeada"""
+        if not self.use_shared_inventory:
+            return
+
+        _, sources = self._snapshot_sources()
+        fingerprint = source_fingerprint(sources)
+        if fingerprint is None:
+            return
+
+        published = publish_shared_inventory(
+            self._shared_inventory_dir(),
+            fingerprint,
+            self.dealerships,
+            self.all_cars,
+            self.get_inventory_index()
+        )
+        # Descartar a cópia privada em favor das páginas compartilhadas
+        if published:
+            self.attach_shared_inventory()
+
+    def _detach_shared_inventory(self):
+        """Copiar o inventário compartilhado para uma lista privada antes de alterá-lo"""
+        if isinstance(self.all_cars, LazyCarList):
+            self.all_cars = list(self.all_cars)
+            self.car_lookup = CarLookup(self.all_cars)
+            self.inventory_index = None
+
+    def get_inventory_index(self) -> InventoryIndex:
+        """
+        Obter o índice colunar do inventário atual
+
+        Reconstrói o índice se `all_cars` tiver sido substituído ou alterado
+        em tamanho desde a última construção.
+        """
+        if self.inventory_index is None or not self.inventory_index.matches(self.all_cars):
+            self.inventory_index = InventoryIndex(self.all_cars)
+        return self.inventory_index
+
+    def get_car_lookup(self) -> CarLookup:
+        """
+        Obter os índices hash do inventário atual
+
+        Reconstrói se `all_cars` tiver sido substituído ou alterado fora de
+        add_car/update_car.
+        """
+        if self.car_lookup is None or not self.car_lookup.matches(self.all_cars):
+            self.car_lookup = CarLookup(self.all_cars)
+        return self.car_lookup
+
+    def get_car(self, car_id: str) -> Optional[Car]:
+        """Carro pelo id (O(1)); None se não existir"""
+        return self.get_car_lookup().get(car_id)
+
+    def add_car(self, car: Car):
+        """Incluir um carro no inventário, atualizando os índices hash"""
+        self._detach_shared_inventory()
+        self.get_car_lookup().add(car)
+        # Índice colunar é reconstruído sob demanda (tamanho mudou)
+
+    def update_car(self, car: Car):
+        """Substituir um carro existente (mesmo id), atualizando os índices"""
+        self._detach_shared_inventory()
+        self.get_car_lookup().replace(car)
+        # Colunas e TCOs memorizados podem ter mudado (preço, ano, ...)
+        self.inventory_index = None
+        self.tco_cache.clear()
     
     def filter_by_budget(self, cars: List[Car], profile: UserProfile) -> List[Car]:
         """
@@ -462,6 +730,129 @@ class UnifiedRecommendationEngine:
         
         return max(0.0, min(1.0, final_score))
 
+    def score_batch(self, candidate_ids: np.ndarray, profile: UserProfile) -> np.ndarray:
+        """
+        ⚡ Versão em lote de calculate_match_score
+
+        Calcula os pesos dinâmicos uma única vez e avalia os quatro sub-scores
+        como expressões vetorizadas sobre as colunas do índice do inventário.
+
+        Args:
+            candidate_ids: Ids de linha no índice (InventoryIndex)
+            profile: Perfil do usuário
+
+        Returns:
+            Array de scores (0.0 a 1.0) na mesma ordem de candidate_ids
+        """
+        index = self.get_inventory_index()
+        rows = np.asarray(candidate_ids, dtype=np.intp)
+
+        return self._combine_scores(
+            self._score_category_batch(index, rows, profile),
+            self._score_priorities_batch(index, rows, profile),
+            self._score_preferences_batch(index, rows, profile),
+            self._score_budget_position_batch(index, rows, profile),
+            profile,
+            self._commercial_suitability_batch(index, rows, profile)
+        )
+
+    def _commercial_suitability_batch(
+        self, index: InventoryIndex, rows: np.ndarray, profile: UserProfile
+    ) -> Optional[np.ndarray]:
+        """Adequação comercial por linha (None fora do uso comercial)"""
+        if profile.uso_principal == "comercial" and hasattr(self, '_commercial_suitability_cache'):
+            return np.array([
+                self._commercial_suitability_cache.get(index.cars[row].id, {}).get("score", 1.0)
+                for row in rows
+            ], dtype=np.float64)
+        return None
+
+    def _combine_scores(
+        self,
+        category_scores: np.ndarray,
+        priorities_scores: np.ndarray,
+        preferences_scores: np.ndarray,
+        budget_scores: np.ndarray,
+        profile: UserProfile,
+        suitability: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Média ponderada dos sub-scores com os pesos dinâmicos do perfil"""
+        weights = self.get_dynamic_weights(profile)
+
+        score = (
+            category_scores * weights['category']
+            + priorities_scores * weights['priorities']
+            + preferences_scores * weights['preferences']
+            + budget_scores * weights['budget']
+        )
+        weights_sum = weights['category'] + weights['priorities'] + weights['preferences'] + weights['budget']
+        final_scores = score / weights_sum if weights_sum > 0 else np.zeros(len(category_scores))
+
+        # 🚚 AJUSTE COMERCIAL: Penalizar veículos inadequados
+        if suitability is not None:
+            final_scores = final_scores * suitability
+
+        return np.clip(final_scores, 0.0, 1.0)
+
+    def _score_category_batch(self, index: InventoryIndex, rows: np.ndarray, profile: UserProfile) -> np.ndarray:
+        """Versão vetorizada de score_category_by_usage"""
+        mapping = self.USO_CATEGORIA_MAP.get(profile.uso_principal, {})
+        return index.categoria.map_values(mapping, 0.5, rows)
+
+    def _score_priorities_batch(self, index: InventoryIndex, rows: np.ndarray, profile: UserProfile) -> np.ndarray:
+        """Versão vetorizada de score_priorities"""
+        total_score = np.zeros(len(rows))
+        total_weight = 0.0
+
+        for priority, user_value in profile.prioridades.items():
+            if priority in self.PRIORITY_SCORE_FIELDS:
+                car_scores = index.scores[self.PRIORITY_SCORE_FIELDS[priority]][rows]
+            elif priority == "custo_manutencao":
+                car_scores = self._normalize_maintenance_cost_batch(index.custo_manutencao_anual[rows])
+            else:
+                continue
+
+            # Normalizar user_value (1-5) para 0-1
+            normalized_weight = user_value / 5.0
+            total_score += car_scores * normalized_weight
+            total_weight += normalized_weight
+
+        if total_weight > 0:
+            return total_score / total_weight
+        return np.full(len(rows), 0.5)
+
+    def _normalize_maintenance_cost_batch(self, costs: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de _normalize_maintenance_cost (NaN = custo desconhecido)"""
+        normalized = 1.0 - (costs - self.MIN_MAINTENANCE_COST) / (self.MAX_MAINTENANCE_COST - self.MIN_MAINTENANCE_COST)
+        return np.where(np.isnan(costs), 0.5, np.clip(normalized, 0.0, 1.0))
+
+    def _score_preferences_batch(self, index: InventoryIndex, rows: np.ndarray, profile: UserProfile) -> np.ndarray:
+        """Versão vetorizada de score_preferences"""
+        score = np.full(len(rows), 0.5)
+
+        if profile.marcas_preferidas:
+            score += 0.3 * index.marca.isin(profile.marcas_preferidas, rows)
+        if profile.marcas_rejeitadas:
+            score -= 0.5 * index.marca.isin(profile.marcas_rejeitadas, rows)
+        if profile.tipos_preferidos:
+            score += 0.2 * index.categoria.isin(profile.tipos_preferidos, rows)
+        if profile.combustivel_preferido:
+            score += 0.1 * index.combustivel.equals(profile.combustivel_preferido, rows)
+
+        return np.clip(score, 0.0, 1.0)
+
+    def _score_budget_position_batch(self, index: InventoryIndex, rows: np.ndarray, profile: UserProfile) -> np.ndarray:
+        """Versão vetorizada de score_budget_position"""
+        prices = index.preco[rows]
+        budget_range = profile.orcamento_max - profile.orcamento_min
+
+        if budget_range == 0:
+            return (prices == profile.orcamento_max).astype(np.float64)
+
+        middle = (profile.orcamento_min + profile.orcamento_max) / 2
+        normalized_distance = np.abs(prices - middle) / (budget_range / 2)
+        return np.maximum(0.0, 1.0 - normalized_distance)
+
     async def calculate_advanced_match_score(self, car: Car, profile: UserProfile) -> Dict[str, Any]:
         """
         🤖 FASE 6: Cálculo de score avançado usando Orchestrator e Agentes
@@ -567,64 +958,7 @@ class UnifiedRecommendationEngine:
         Score baseado na adequação da categoria ao uso
         Valores refinados para matching mais preciso por perfil
         """
-        uso_categoria_map = {
-            "familia": {
-                "SUV": 0.95,      # Ideal - espaço + segurança
-                "Van": 0.90,      # Muito bom - máximo espaço
-                "Sedan": 0.75,    # Bom, mas menos espaço
-                "Hatch": 0.40,    # Inadequado para família
-                "Pickup": 0.35,   # Inadequado
-                "Compacto": 0.20  # Muito inadequado
-            },
-            "primeiro_carro": {
-                "Hatch": 0.95,    # Ideal - fácil dirigir
-                "Compacto": 0.95, # Ideal - econômico
-                "Sedan": 0.55,    # Grande demais
-                "SUV": 0.30,      # Inadequado
-                "Pickup": 0.20,   # Muito inadequado
-                "Van": 0.15       # Completamente inadequado
-            },
-            "trabalho": {
-                "Sedan": 0.95,    # Ideal - profissional
-                "Hatch": 0.85,    # Bom - econômico
-                "Compacto": 0.75, # Bom para cidade
-                "SUV": 0.50,      # Consome muito
-                "Pickup": 0.40,   # Não profissional
-                "Van": 0.30       # Inadequado
-            },
-            "comercial": {
-                "Furgão": 0.95,   # Ideal - volume e proteção de carga
-                "Van": 0.95,      # Ideal - volume
-                "Pickup Pequena": 0.90,  # Muito bom - caçamba para carga
-                "Utilitário": 0.85,  # Bom - versátil
-                "Pickup": 0.30,   # Inadequado - geralmente são pickups médias/grandes de lazer
-                "SUV": 0.20,      # Inadequado - não é comercial
-                "Sedan": 0.15,    # Muito inadequado
-                "Hatch": 0.10,    # Muito inadequado
-                "Compacto": 0.10  # Muito inadequado
-            },
-            "lazer": {
-                "SUV": 0.95,      # Ideal - aventura/off-road
-                "Pickup": 0.85,   # Muito bom - off-road
-                "Van": 0.70,      # Bom para viagens
-                "Sedan": 0.55,    # Limitado
-                "Hatch": 0.40,    # Inadequado
-                "Compacto": 0.30  # Muito inadequado
-            },
-            "transporte_passageiros": {
-                "Sedan": 0.95,    # Ideal - UberX/99Pop/Comfort
-                "SUV": 0.90,      # Muito bom - Uber Comfort/Black
-                "Hatch": 0.70,    # Bom - UberX/99Pop (alguns modelos)
-                "Compacto": 0.50, # Limitado - Apenas alguns aceitos
-                "Van": 0.40,      # Inadequado para app (muito grande)
-                "Pickup": 0.20    # Inadequado
-            }
-        }
-        
-        uso = profile.uso_principal
-        categoria = car.categoria
-        
-        return uso_categoria_map.get(uso, {}).get(categoria, 0.5)
+        return self.USO_CATEGORIA_MAP.get(profile.uso_principal, {}).get(car.categoria, 0.5)
     
     def score_priorities(self, car: Car, profile: UserProfile) -> float:
         """Score baseado nas prioridades do usuário"""
@@ -632,16 +966,10 @@ class UnifiedRecommendationEngine:
         
         # Mapear prioridades para scores do carro
         priority_scores = {
-            "economia": car.score_economia,
-            "espaco": car.score_familia,  # Espaço correlaciona com família
-            "performance": car.score_performance,
-            "conforto": car.score_conforto,
-            "seguranca": car.score_seguranca,
-            # 📊 FASE 3: Métricas avançadas
-            "revenda": car.indice_revenda,
-            "confiabilidade": car.indice_confiabilidade,
-            "custo_manutencao": self._normalize_maintenance_cost(car.custo_manutencao_anual)
+            priority: getattr(car, field)
+            for priority, field in self.PRIORITY_SCORE_FIELDS.items()
         }
+        priority_scores["custo_manutencao"] = self._normalize_maintenance_cost(car.custo_manutencao_anual)
         
         total_score = 0.0
         total_weight = 0.0
@@ -665,9 +993,8 @@ class UnifiedRecommendationEngine:
         if cost is None:
             return 0.5
         
-        # Custos de referência
-        MIN_COST = 1500  # R$ 1.500/ano (muito barato)
-        MAX_COST = 8000  # R$ 8.000/ano (muito caro)
+        MIN_COST = self.MIN_MAINTENANCE_COST
+        MAX_COST = self.MAX_MAINTENANCE_COST
         
         # Inverter: custo baixo = score alto
         if cost <= MIN_COST:
@@ -941,10 +1268,135 @@ class UnifiedRecommendationEngine:
         
         return efficiency_by_category.get(category, 11.0)  # Default: 11 km/L
     
+    def _get_fuel_efficiency(self, car: Car) -> float:
+        """
+        Consumo do carro (km/L)
+        Prioridade: consumo_cidade > consumo_estrada > consumo > estimativa por categoria
+        """
+        return (
+            getattr(car, 'consumo_cidade', None) or
+            getattr(car, 'consumo_estrada', None) or
+            getattr(car, 'consumo', None) or
+            self._estimate_fuel_efficiency_by_category(car.categoria)
+        )
+    
+    def build_tco_context(self, profile: UserProfile) -> TCORequestContext:
+        """
+        Resolver, uma única vez por requisição, os parâmetros de TCO do perfil
+        
+        Busca o preço do combustível e prevê os termos de financiamento
+        (FinancingAgent) para que todos os carros compartilhem o resultado.
+        
+        Args:
+            profile: Perfil do usuário
+            
+        Returns:
+            TCORequestContext com calculadora configurada
+        """
+        state = profile.state or "SP"
+        
+        # Obter preço atualizado do combustível
+        # Busca de: variável de ambiente > cache > API > padrão
+        fuel_price = fuel_price_service.get_current_price(state=state)
+        
+        # 🤖 AI Engineer: Usar FinancingAgent para prever taxas personalizadas (SLM)
+        predicted_rate = 0.24  # Default fallback
+        predicted_down = 0.20  # Default fallback
+        
+        try:
+            if hasattr(self, 'financing_agent'):
+                # Prever termos baseados no perfil (Renda, Score estimado)
+                terms = self.financing_agent.predict_terms(profile)
+                predicted_rate = terms.get('annual_interest_rate', 0.24)
+                predicted_down = terms.get('min_down_payment', 0.20)
+        except Exception as e:
+            print(f"[AVISO] Erro no FinancingAgent: {e}. Usando defaults.")
+        
+        return TCORequestContext(
+            state=state,
+            fuel_price_per_liter=fuel_price,
+            annual_interest_rate=predicted_rate,
+            down_payment_percent=predicted_down,
+            financing_months=60,
+            monthly_km=1000,  # Padrão, pode ser ajustado baseado no perfil
+            user_profile="standard"
+        )
+    
+    def calculate_tco_for_cars(
+        self,
+        cars: List[Car],
+        profile: UserProfile,
+        context: Optional[TCORequestContext] = None
+    ) -> List[Optional[TCOBreakdown]]:
+        """
+        Calcula TCO para vários carros de uma vez
+        
+        Resultados já calculados para o mesmo (carro, estado, taxa, entrada)
+        vêm do cache LRU; os demais são calculados em lote pelo
+        TCOCalculator.calculate_tco_many.
+        
+        Args:
+            cars: Carros para calcular TCO
+            profile: Perfil do usuário
+            context: Contexto da requisição (criado se não informado)
+            
+        Returns:
+            Lista de TCOBreakdown (ou None em caso de falha) na ordem de `cars`
+        """
+        if not cars:
+            return []
+        
+        try:
+            if context is None:
+                context = self.build_tco_context(profile)
+        except Exception as e:
+            print(f"[ERRO] Falha ao preparar contexto de TCO: {e}")
+            return [None] * len(cars)
+        
+        results: List[Optional[TCOBreakdown]] = [None] * len(cars)
+        missing = []
+        for position, car in enumerate(cars):
+            cached = self.tco_cache.get(context.cache_key(car.id))
+            if cached is not None:
+                results[position] = cached
+            else:
+                missing.append(position)
+        
+        if not missing:
+            return results
+        
+        missing_cars = [cars[position] for position in missing]
+        try:
+            efficiencies = [self._get_fuel_efficiency(car) for car in missing_cars]
+            rows = context.calculator.calculate_tco_many(
+                prices=[car.preco for car in missing_cars],
+                categories=[car.categoria for car in missing_cars],
+                efficiencies=efficiencies,
+                ages=[context.reference_year - car.ano for car in missing_cars],
+                mileages=[getattr(car, 'quilometragem', 0) or 0 for car in missing_cars]
+            )
+            breakdowns = [
+                context.calculator.breakdown_from_row(row, efficiency)
+                for row, efficiency in zip(rows, efficiencies)
+            ]
+        except Exception as e:
+            # Um carro inválido não derruba o lote: calcular um a um
+            print(f"[AVISO] Falha no TCO em lote ({len(missing_cars)} carros): {e}. Calculando por carro.")
+            for position, car in zip(missing, missing_cars):
+                results[position] = self.calculate_tco_for_car(car, profile, context)
+            return results
+        
+        for position, car, tco in zip(missing, missing_cars, breakdowns):
+            self.tco_cache.set(context.cache_key(car.id), tco)
+            results[position] = tco
+        
+        return results
+    
     def calculate_tco_for_car(
         self,
         car: Car,
-        profile: UserProfile
+        profile: UserProfile,
+        context: Optional[TCORequestContext] = None
     ) -> Optional[TCOBreakdown]:
         """
         Calcula TCO (Total Cost of Ownership) para um carro específico
@@ -952,68 +1404,27 @@ class UnifiedRecommendationEngine:
         Args:
             car: Carro para calcular TCO
             profile: Perfil do usuário (para obter estado, km mensal, etc)
+            context: Contexto da requisição (criado se não informado)
             
         Returns:
             TCOBreakdown com detalhamento de custos ou None se não for possível calcular
         """
         try:
-            # Obter consumo do carro (km/L)
-            # Prioridade: consumo_cidade > consumo_estrada > consumo > estimativa por categoria
-            fuel_efficiency = (
-                getattr(car, 'consumo_cidade', None) or 
-                getattr(car, 'consumo_estrada', None) or 
-                getattr(car, 'consumo', None) or
-                self._estimate_fuel_efficiency_by_category(car.categoria)
-            )
-            
-            # Calcular idade do carro
-            current_year = datetime.now().year
-            car_age = current_year - car.ano
-            
-            # Obter quilometragem do carro (com fallback para 0 se não disponível)
-            car_mileage = getattr(car, 'quilometragem', 0) or 0
+            if context is None:
+                context = self.build_tco_context(profile)
             
-            # Obter preço atualizado do combustível
-            # Busca de: variável de ambiente > cache > API > padrão
-            fuel_price = fuel_price_service.get_current_price(state=profile.state or "SP")
+            cached = self.tco_cache.get(context.cache_key(car.id))
+            if cached is not None:
+                return cached
             
-            # Criar calculadora de TCO com parâmetros do usuário
-            # 🤖 AI Engineer: Usar FinancingAgent para prever taxas personalizadas (SLM)
-            predicted_rate = 0.24  # Default fallback
-            predicted_down = 0.20  # Default fallback
-            
-            try:
-                if hasattr(self, 'financing_agent'):
-                    # Prever termos baseados no perfil (Renda, Score estimado)
-                    terms = self.financing_agent.predict_terms(profile)
-                    predicted_rate = terms.get('annual_interest_rate', 0.24)
-                    predicted_down = terms.get('min_down_payment', 0.20)
-                    # Opcional: Logar se a taxa for diferente do padrão
-                    if predicted_rate != 0.24:
-                        # Debug leve para confirmar funcionamento
-                        pass 
-            except Exception as e:
-                print(f"[AVISO] Erro no FinancingAgent: {e}. Usando defaults.")
-
-            calculator = TCOCalculator(
-                down_payment_percent=predicted_down,
-                financing_months=60,
-                annual_interest_rate=predicted_rate,
-                monthly_km=1000,  # Padrão, pode ser ajustado baseado no perfil
-                fuel_price_per_liter=fuel_price,
-                state=profile.state or "SP",
-                user_profile="standard"
-            )
-            
-            # Calcular TCO com quilometragem para ajuste de manutenção
-            tco = calculator.calculate_tco(
+            tco = context.calculator.calculate_tco(
                 car_price=car.preco,
                 car_category=car.categoria,
-                fuel_efficiency_km_per_liter=fuel_efficiency,
-                car_age=car_age,
-                car_mileage=car_mileage  # Passar quilometragem para ajuste
+                fuel_efficiency_km_per_liter=self._get_fuel_efficiency(car),
+                car_age=context.reference_year - car.ano,
+                car_mileage=getattr(car, 'quilometragem', 0) or 0
             )
-            
+            self.tco_cache.set(context.cache_key(car.id), tco)
             return tco
         
         except Exception as e:
@@ -1212,7 +1623,53 @@ class UnifiedRecommendationEngine:
         score_threshold: float = 0.2
     ) -> List[Dict]:
         """
-        Gerar recomendações de TODAS as concessionárias
+        Gerar recomendações de TODAS as concessionárias, com justificativas
+
+        Ranking via rank(); as justificativas do top N são geradas
+        concorrentemente (prazo total; atrasadas caem no template).
+
+        Returns:
+            Lista de dicionários com car, score, match_percentage, justificativa
+        """
+        top_n = self.rank(profile, limit=limit, score_threshold=score_threshold)
+
+        # 16. 🤖 FASE 1: Gerar justificativas com LLM (após ranking para ter posição)
+        # Clientes síncronos em threads: os async ficam presos ao loop onde
+        # foram usados pela primeira vez, e aqui cada chamada tem loop novo
+        justifications = self._run_coroutine(
+            self.generate_justifications_batch(top_n, profile, async_clients=False)
+        )
+        for rec, justification in zip(top_n, justifications):
+            rec['justificativa'] = justification
+
+        return top_n
+
+    async def arank(
+        self,
+        profile: UserProfile,
+        limit: int = 10,
+        score_threshold: float = 0.2
+    ) -> List[Dict]:
+        """Versão async de rank(): executa no pool de CPU limitado"""
+        return await self.run_in_cpu_pool(
+            self.rank, profile, limit=limit, score_threshold=score_threshold
+        )
+
+    async def run_in_cpu_pool(self, func, *args, **kwargs):
+        """Executar trabalho CPU-bound no pool limitado do engine"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.cpu_executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def rank(
+        self,
+        profile: UserProfile,
+        limit: int = 10,
+        score_threshold: float = 0.2
+    ) -> List[Dict]:
+        """
+        Ranquear carros de TODAS as concessionárias (sem justificativas)
         🤖 AI Engineer (FASE 1): Filtros avançados aplicados
         
         🔥 REGRA CRÍTICA: Todo filtro opcional, quando selecionado, torna-se OBRIGATÓRIO
@@ -1230,52 +1687,46 @@ class UnifiedRecommendationEngine:
         10. Câmbio preferido (se especificado - APENAS esse câmbio)
         
         Returns:
-            Lista de dicionários com car, score, match_percentage, justificativa
+            Top N como dicionários com car, score, match_percentage, TCO e
+            saúde financeira ('justificativa' ainda None)
         """
-        # 1. Filtrar por orçamento (hard constraint)
-        filtered_cars = self.filter_by_budget(self.all_cars, profile)
-        
-        print(f"[FILTRO] Após orçamento: {len(filtered_cars)} carros")
-        
-        # 2. 🤖 FASE 1: Filtrar por faixa de anos
-        filtered_cars = self.filter_by_year(filtered_cars, profile.ano_minimo, profile.ano_maximo)
-        if profile.ano_minimo and profile.ano_maximo:
-            print(f"[FILTRO] Após ano {profile.ano_minimo}-{profile.ano_maximo}: {len(filtered_cars)} carros")
-            # 🐛 DEBUG: Verificar se há carros fora da faixa
-            anos_invalidos = [c for c in filtered_cars if c.ano < profile.ano_minimo or c.ano > profile.ano_maximo]
-            if anos_invalidos:
-                print(f"[BUG] ❌ {len(anos_invalidos)} carros FORA da faixa após filtro!")
-                for car in anos_invalidos[:3]:
-                    print(f"  - {car.nome} ({car.ano})")
-        elif profile.ano_minimo:
-            print(f"[FILTRO] Após ano >= {profile.ano_minimo}: {len(filtered_cars)} carros")
-        elif profile.ano_maximo:
-            print(f"[FILTRO] Após ano <= {profile.ano_maximo}: {len(filtered_cars)} carros")
-        
-        # 3. 🤖 FASE 1: Filtrar por quilometragem máxima
-        filtered_cars = self.filter_by_km(filtered_cars, profile.km_maxima)
-        if profile.km_maxima:
-            print(f"[FILTRO] Após km <= {profile.km_maxima}: {len(filtered_cars)} carros")
-        
-        # 4. 📊 FASE 1: Filtrar por must-haves
+        candidates = self.prepare_ranking(profile)
+        if candidates is None:
+            return []
+
+        return self.rank_candidates(
+            candidates, profile, limit=limit, score_threshold=score_threshold
+        )
+
+    def prepare_ranking(self, profile: UserProfile) -> Optional[RankingCandidates]:
+        """
+        Etapas do rank() que não dependem das prioridades do perfil
+
+        Filtros eliminatórios e de contexto, TCO, capacidade financeira,
+        priorização por localização e sub-scores de categoria, preferências e
+        orçamento. O resultado pode ser reaproveitado por rank_candidates()
+        enquanto só as prioridades mudarem (ver RankingCandidates.matches).
+
+        Returns:
+            RankingCandidates, ou None se nenhum carro passar pelos filtros
+        """
+        # 1-6. ⚡ Filtros eliminatórios em uma única passada vetorizada
+        # (orçamento, anos, km, estado, cidade, raio e preferências - mesmas
+        # regras de filter_by_budget ... filter_by_preferences)
+        index = self.get_inventory_index()
+        candidate_ids = index.candidate_ids(profile)
+        filtered_cars = index.take(candidate_ids)
+
+        print(f"[FILTRO] Após filtros eliminatórios: {len(filtered_cars)} carros (de {index.size} totais)")
+
+        if not filtered_cars:
+            print(f"[AVISO] Nenhum carro encontrado para os filtros (orçamento R$ {profile.orcamento_min:,.2f} - R$ {profile.orcamento_max:,.2f})")
+
+        # 6.5. 📊 FASE 1: Filtrar por must-haves (apenas sobre os candidatos)
         filtered_cars = self.filter_by_must_haves(filtered_cars, profile.must_haves)
         if profile.must_haves:
             print(f"[FILTRO] Após must-haves {profile.must_haves}: {len(filtered_cars)} carros")
         
-        # 4.5. 📍 Filtrar por estado (se especificado)
-        filtered_cars = self.filter_by_state(filtered_cars, profile.state)
-        
-        # 4.6. 📍 Filtrar por cidade (se especificado)
-        filtered_cars = self.filter_by_city(filtered_cars, profile.city)
-        
-        # 5. 💻 FASE 1: Filtrar por raio geográfico
-        filtered_cars = self.filter_by_radius(filtered_cars, profile.city, profile.raio_maximo_km)
-        if profile.raio_maximo_km:
-            print(f"[FILTRO] Após raio {profile.raio_maximo_km}km: {len(filtered_cars)} carros")
-        
-        # 6. 🔥 NOVO: Filtrar por preferências (marcas, tipos, combustível, câmbio)
-        filtered_cars = self.filter_by_preferences(filtered_cars, profile)
-        
         # 7. Filtro de contexto: família com crianças
         filtered_cars = self.filter_by_family_context(filtered_cars, profile)
         
@@ -1293,20 +1744,20 @@ class UnifiedRecommendationEngine:
             # Se nenhum carro atende aos filtros, retornar lista vazia
             # O frontend deve mostrar mensagem apropriada
             print("[AVISO] Nenhum carro após filtros. Retornando lista vazia.")
-            return []
+            return None
         
         # 11. 💰 Calcular TCO para cada carro (Requirement 6.2)
-        cars_with_tco = []
-        for car in filtered_cars:
-            tco = self.calculate_tco_for_car(car, profile)
-            cars_with_tco.append((car, tco))
+        # Combustível e financiamento resolvidos uma vez; cálculo em lote + cache LRU
+        tco_context = self.build_tco_context(profile)
+        tcos = self.calculate_tco_for_cars(filtered_cars, profile, tco_context)
+        cars_with_tco = list(zip(filtered_cars, tcos))
         
         # 12. 💰 Filtrar por capacidade financeira (Requirement 6.3)
         cars_with_tco = self.filter_by_financial_capacity(cars_with_tco, profile)
         
         if not cars_with_tco:
             print("[AVISO] Nenhum carro após filtro de capacidade financeira. Retornando lista vazia.")
-            return []
+            return None
         
         # 13. Priorizar por localização (se especificado)
         if profile.city and profile.priorizar_proximas:
@@ -1321,89 +1772,126 @@ class UnifiedRecommendationEngine:
             car_to_tco = {car.id: tco for car, tco in cars_with_tco}
             cars_with_tco = [(car, car_to_tco[car.id]) for car in prioritized_cars]
         
+        # Sub-scores independentes das prioridades (calculados uma vez)
+        available = [(car, tco) for car, tco in cars_with_tco if car.disponivel]
+        cars = [car for car, _ in available]
+        rows = index.rows_for(cars)
+
+        return RankingCandidates(
+            key=candidates_key(profile),
+            index=index,
+            cars=cars,
+            tcos=[tco for _, tco in available],
+            rows=rows,
+            category_scores=self._score_category_batch(index, rows, profile),
+            preferences_scores=self._score_preferences_batch(index, rows, profile),
+            budget_scores=self._score_budget_position_batch(index, rows, profile),
+            suitability=self._commercial_suitability_batch(index, rows, profile)
+        )
+
+    def rank_candidates(
+        self,
+        candidates: RankingCandidates,
+        profile: UserProfile,
+        limit: int = 10,
+        score_threshold: float = 0.2
+    ) -> List[Dict]:
+        """
+        Etapas do rank() que dependem das prioridades: sub-score de
+        prioridades, score final, bônus financeiro e ordenação
+
+        Returns:
+            Top N no mesmo formato de rank()
+        """
+        # ⚡ Score base em lote (só o sub-score de prioridades é recalculado)
+        base_scores = self._combine_scores(
+            candidates.category_scores,
+            self._score_priorities_batch(candidates.index, candidates.rows, profile),
+            candidates.preferences_scores,
+            candidates.budget_scores,
+            profile,
+            candidates.suitability
+        )
+
         # 14. Calcular scores com bonus financeiro
-        scored_cars = []
-        for car, tco in cars_with_tco:
-            if not car.disponivel:
-                continue
-            
-            # Score base
-            base_score = self.calculate_match_score(car, profile)
-            
+        ranked = []
+        for position, (tco, base_score) in enumerate(zip(candidates.tcos, base_scores)):
             # Aplicar bonus financeiro (Requirement 6.3)
-            final_score = self.apply_financial_bonus(base_score, tco, profile)
-            
+            final_score = self.apply_financial_bonus(float(base_score), tco, profile)
             if final_score >= score_threshold:
-                # Validar status do orçamento usando novo método
-                # IMPORTANTE: Só validar se usuário informou capacidade financeira
-                fits_budget = None
-                budget_status_message = "Orçamento não informado"
-                
-                # Verificar explicitamente se usuário informou renda
-                if tco and profile.financial_capacity and profile.financial_capacity.is_disclosed:
-                    fits_budget, budget_status_message = self.validate_budget_status(tco, profile)
-                # Se não informou, fits_budget permanece None
-                
-                # Calcular percentual da renda (para compatibilidade)
-                budget_percentage = None
-                if tco and profile.financial_capacity and profile.financial_capacity.is_disclosed:
-                    income_range = profile.financial_capacity.monthly_income_range
-                    if income_range:
-                        # Calcular renda média
-                        income_brackets = {
-                            "0-3000": (0, 3000),
-                            "3000-5000": (3000, 5000),
-                            "5000-8000": (5000, 8000),
-                            "8000-12000": (8000, 12000),
-                            "12000+": (12000, 16000)
-                        }
-                        if income_range in income_brackets:
-                            min_income, max_income = income_brackets[income_range]
-                            avg_income = (min_income + max_income) / 2
-                            budget_percentage = (tco.total_monthly / avg_income) * 100
-                
-                # Avaliar saúde financeira
-                financial_health = None
-                if tco:
-                    financial_health = self.assess_financial_health(tco, profile)
-                
-                scored_cars.append({
-                    'car': car,
-                    'score': final_score,
-                    'match_percentage': int(final_score * 100),
-                    'justificativa': None,  # Será preenchido depois do ranking
-                    'tco_breakdown': tco,  # Requirement 6.4
-                    'fits_budget': fits_budget,
-                    'budget_percentage': budget_percentage,
-                    'financial_health': financial_health  # NEW: Financial health indicator
-                })
-        
-        # 15. Ordenar por score
-        scored_cars.sort(key=lambda x: x['score'], reverse=True)
+                ranked.append((final_score, position))
+
+        # 15. Ordenar por score (estável: empates mantêm a ordem dos candidatos)
+        ranked.sort(key=lambda x: x[0], reverse=True)
+
+        scored_cars = [
+            self._build_recommendation(candidates.cars[position], candidates.tcos[position], final_score, profile)
+            for final_score, position in ranked[:limit]
+        ]
 
         # 🐛 DEBUG: Verificar anos antes de retornar
         if profile.ano_minimo or profile.ano_maximo:
             print(f"\n[DEBUG] Verificando anos antes de retornar {len(scored_cars)} carros:")
-            for rec in scored_cars[:limit]:
+            for rec in scored_cars:
                 car = rec['car']
                 status = "✅" if (not profile.ano_minimo or car.ano >= profile.ano_minimo) and (not profile.ano_maximo or car.ano <= profile.ano_maximo) else "❌"
                 print(f"  {status} {car.nome} ({car.ano}) - Score: {rec['score']:.2f}")
 
-        # 16. 🤖 FASE 1: Gerar justificativas com LLM (após ranking para ter posição)
-        top_n = scored_cars[:limit]
-        for i, rec in enumerate(top_n):
-            rec['justificativa'] = self.generate_justification(
-                car=rec['car'],
-                profile=profile,
-                score=rec['score'],
-                position=i + 1,  # 1-based
-                total_results=len(top_n),
-                tco_breakdown=rec.get('tco_breakdown')
-            )
-
         # 5. Retornar top N
-        return top_n
+        return scored_cars
     
+    def _build_recommendation(
+        self,
+        car: Car,
+        tco: Optional[TCOBreakdown],
+        final_score: float,
+        profile: UserProfile
+    ) -> Dict:
+        """Montar o item do ranking (orçamento e saúde financeira do carro)"""
+        # Validar status do orçamento usando novo método
+        # IMPORTANTE: Só validar se usuário informou capacidade financeira
+        fits_budget = None
+        budget_status_message = "Orçamento não informado"
+        
+        # Verificar explicitamente se usuário informou renda
+        if tco and profile.financial_capacity and profile.financial_capacity.is_disclosed:
+            fits_budget, budget_status_message = self.validate_budget_status(tco, profile)
+        # Se não informou, fits_budget permanece None
+        
+        # Calcular percentual da renda (para compatibilidade)
+        budget_percentage = None
+        if tco and profile.financial_capacity and profile.financial_capacity.is_disclosed:
+            income_range = profile.financial_capacity.monthly_income_range
+            if income_range:
+                # Calcular renda média
+                income_brackets = {
+                    "0-3000": (0, 3000),
+                    "3000-5000": (3000, 5000),
+                    "5000-8000": (5000, 8000),
+                    "8000-12000": (8000, 12000),
+                    "12000+": (12000, 16000)
+                }
+                if income_range in income_brackets:
+                    min_income, max_income = income_brackets[income_range]
+                    avg_income = (min_income + max_income) / 2
+                    budget_percentage = (tco.total_monthly / avg_income) * 100
+        
+        # Avaliar saúde financeira
+        financial_health = None
+        if tco:
+            financial_health = self.assess_financial_health(tco, profile)
+        
+        return {
+            'car': car,
+            'score': final_score,
+            'match_percentage': int(final_score * 100),
+            'justificativa': None,  # Será preenchido depois do ranking
+            'tco_breakdown': tco,  # Requirement 6.4
+            'fits_budget': fits_budget,
+            'budget_percentage': budget_percentage,
+            'financial_health': financial_health  # NEW: Financial health indicator
+        }
+
     def generate_justification(
         self,
         car: Car,
@@ -1433,31 +1921,13 @@ class UnifiedRecommendationEngine:
         # 🤖 FASE 1: Tentar usar LLM service
         if self.llm_service:
             try:
-                # Converter TCOBreakdown para dict se necessário
-                tco_dict = {}
-                if tco_breakdown:
-                    if isinstance(tco_breakdown, dict):
-                        tco_dict = tco_breakdown
-                    elif hasattr(tco_breakdown, 'dict'):
-                        tco_dict = tco_breakdown.dict()
-                    else:
-                        # Extrair atributos manualmente
-                        tco_dict = {
-                            'total_mensal': getattr(tco_breakdown, 'total_monthly', 0),
-                            'financiamento': getattr(tco_breakdown, 'monthly_installment', 0),
-                            'combustivel': getattr(tco_breakdown, 'monthly_fuel', 0),
-                            'manutencao': getattr(tco_breakdown, 'monthly_maintenance', 0),
-                            'seguro': getattr(tco_breakdown, 'monthly_insurance', 0),
-                            'ipva': getattr(tco_breakdown, 'monthly_ipva', 0),
-                        }
-
                 justification = self.llm_service.generate_justification(
                     car=car,
                     profile=profile,
                     score=score,
                     position=position,
                     total_results=total_results,
-                    tco_breakdown=tco_dict
+                    tco_breakdown=self._tco_to_dict(tco_breakdown)
                 )
 
                 return justification
@@ -1469,6 +1939,119 @@ class UnifiedRecommendationEngine:
         # Fallback: Template-based justification (código original)
         return self._generate_justification_template(car, profile, score)
 
+    async def generate_justifications_batch(
+        self,
+        recommendations: List[Dict],
+        profile: UserProfile,
+        indexes: Optional[Sequence[int]] = None,
+        async_clients: bool = True
+    ) -> List[Optional[str]]:
+        """
+        Gerar justificativas para o top N de uma vez
+
+        Args:
+            indexes: Gerar só para estas posições de `recommendations`
+                     (as demais ficam None); None = todas
+            async_clients: False = clientes LLM síncronos e cache local
+                     (caminho síncrono, sem event loop próprio)
+
+        Returns:
+            Justificativas na mesma ordem de `recommendations`
+        """
+        results: List[Optional[str]] = [None] * len(recommendations)
+        async for index, justification in self.iter_justifications(
+            recommendations, profile, indexes, async_clients
+        ):
+            results[index] = justification
+        return results
+
+    async def iter_justifications(
+        self,
+        recommendations: List[Dict],
+        profile: UserProfile,
+        indexes: Optional[Sequence[int]] = None,
+        async_clients: bool = True
+    ) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Gerar justificativas do top N, entregando cada uma ao ficar pronta
+
+        🤖 FASE 1: As chamadas ao LLM rodam concorrentemente (limite e prazo
+        definidos no LLMJustificationService). Sem LLM, usa templates.
+
+        Args:
+            recommendations: Recomendações já ordenadas (com car, score, tco_breakdown)
+            profile: Perfil do usuário
+            indexes: Posições a justificar (None = todas); a posição no
+                     ranking continua relativa à lista completa
+            async_clients: False = clientes LLM síncronos e cache local
+
+        Yields:
+            (índice em `recommendations`, justificativa), na ordem de conclusão
+        """
+        if indexes is None:
+            indexes = range(len(recommendations))
+
+        if not self.llm_service:
+            for i in indexes:
+                rec = recommendations[i]
+                yield i, self._generate_justification_template(rec['car'], profile, rec['score'])
+            return
+
+        requests = [
+            {
+                'car': recommendations[i]['car'],
+                'profile': profile,
+                'score': recommendations[i]['score'],
+                'position': i + 1,  # 1-based
+                'total_results': len(recommendations),
+                'tco_breakdown': self._tco_to_dict(recommendations[i].get('tco_breakdown')),
+            }
+            for i in indexes
+        ]
+
+        async for request_index, justification in self.llm_service.iter_justifications(
+            requests, async_clients=async_clients
+        ):
+            yield indexes[request_index], justification
+
+    @staticmethod
+    def _run_coroutine(coro):
+        """
+        Executar uma corrotina a partir do caminho síncrono do recommend()
+
+        Se já houver um event loop rodando nesta thread (ex.: chamado de dentro
+        de um endpoint async), executa em uma thread auxiliar com loop próprio.
+        O loop é descartado ao final: a corrotina não pode usar clientes
+        async compartilhados (ver async_clients em iter_justifications).
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+
+    @staticmethod
+    def _tco_to_dict(tco_breakdown) -> Dict:
+        """Converter TCOBreakdown para dict (formato esperado pelo LLM service)"""
+        if not tco_breakdown:
+            return {}
+        if isinstance(tco_breakdown, dict):
+            return tco_breakdown
+        if hasattr(tco_breakdown, 'dict'):
+            return tco_breakdown.dict()
+
+        # Extrair atributos manualmente
+        return {
+            'total_mensal': getattr(tco_breakdown, 'total_monthly', 0),
+            'financiamento': getattr(tco_breakdown, 'monthly_installment', 0),
+            'combustivel': getattr(tco_breakdown, 'monthly_fuel', 0),
+            'manutencao': getattr(tco_breakdown, 'monthly_maintenance', 0),
+            'seguro': getattr(tco_breakdown, 'monthly_insurance', 0),
+            'ipva': getattr(tco_breakdown, 'monthly_ipva', 0),
+        }
+
     def _generate_justification_template(
         self,
         car: Car,
@@ -1500,12 +2083,7 @@ class UnifiedRecommendationEngine:
         # Economia: verificar consumo REAL, não apenas score relativo
         if profile.prioridades.get("economia", 0) >= 4 and car.score_economia > 0.7:
             # Obter consumo real do carro (mesma lógica do TCO)
-            consumo_estimado = (
-                getattr(car, 'consumo_cidade', None) or
-                getattr(car, 'consumo_estrada', None) or
-                getattr(car, 'consumo', None) or
-                self._estimate_fuel_efficiency_by_category(car.categoria)
-            )
+            consumo_estimado = self._get_fuel_efficiency(car)
 
             # Só mencionar "excelente economia" se consumo for realmente bom (>= 12 km/L)
             if consumo_estimado >= 12:
@@ -1549,11 +2127,13 @@ class UnifiedRecommendationEngine:
     
     def get_stats(self) -> Dict:
         """Estatísticas gerais da plataforma"""
+        # ⚡ Contagens de carros vêm das colunas do índice (sem decodificar Car)
+        summary = self.get_inventory_index().summary()
         return {
             "total_dealerships": len(self.dealerships),
             "active_dealerships": len([d for d in self.dealerships if d.active]),
-            "total_cars": len(self.all_cars),
-            "available_cars": len([c for c in self.all_cars if c.disponivel]),
+            "total_cars": summary["total_cars"],
+            "available_cars": summary["available_cars"],
             "dealerships_by_state": self._group_by_state(),
             "cars_by_category": self._group_by_category()
         }
@@ -1567,8 +2147,5 @@ class UnifiedRecommendationEngine:
     
     def _group_by_category(self) -> Dict[str, int]:
         """Agrupar carros por categoria"""
-        result = {}
-        for car in self.all_cars:
-            result[car.categoria] = result.get(car.categoria, 0) + 1
-        return result
+        return dict(self.get_inventory_index().summary()["cars_by_category"])
 
@@ -2,18 +2,37 @@
 Pytest configuration and shared fixtures
 """
 import pytest
+import shutil
 import sys
 import os
+import tempfile
 
 # Adicionar backend ao path
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
+# Engines criados pelos testes (inclusive o de api.main, no import) não
+# gravam snapshot/inventário compartilhado em data/cache do repositório.
+# Os testes dessas features ativam de novo apontando data_dir para tmp_path.
+os.environ["INVENTORY_SNAPSHOT_ENABLED"] = "false"
+os.environ["INVENTORY_SHARED_MEMORY"] = "false"
+
+# Nem as interações: o InteractionService de api.main (criado no import,
+# com migração do JSON legado) usa um diretório temporário
+_interactions_dir = tempfile.mkdtemp(prefix="facilIAuto-interactions-")
+os.environ["INTERACTIONS_DATA_DIR"] = _interactions_dir
+
 from models.car import Car
 from models.dealership import Dealership
 from models.user_profile import UserProfile
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _remove_interactions_dir():
+    yield
+    shutil.rmtree(_interactions_dir, ignore_errors=True)
+
+
 @pytest.fixture
 def sample_dealership():
     """Concessionária de exemplo"""
@@ -84,6 +103,78 @@ def sample_user_profile():
     )
 
 
+def _car_fields(i: int) -> dict:
+    """Campos padrão do i-ésimo carro das fábricas abaixo"""
+    return dict(
+        id=f"car_{i:03d}",
+        dealership_id="dealer_0",
+        nome=f"Carro {i}",
+        marca="Fiat",
+        modelo=f"Modelo{i}",
+        ano=2020,
+        preco=40000 + i * 1000,
+        quilometragem=10000,
+        combustivel="Flex",
+        categoria="Hatch",
+        dealership_name="Loja",
+        dealership_city="São Paulo",
+        dealership_state="SP",
+        dealership_phone="(11) 0000-0000",
+        dealership_whatsapp="5511000000000",
+    )
+
+
+@pytest.fixture
+def make_car():
+    """
+    Fábrica de carros: make_car(i, **campos)
+
+    id "car_{i:03d}" e demais campos padrão (_car_fields), sobrescritos
+    pelos campos informados.
+    """
+    def _make(i: int = 0, **fields) -> Car:
+        return Car(**{**_car_fields(i), **fields})
+    return _make
+
+
+@pytest.fixture
+def make_inventory(make_car):
+    """
+    Fábrica de inventários: make_inventory(n, **colunas)
+
+    Cada coluna é uma lista (repetida em ciclo pelo índice do carro) ou uma
+    função do índice; campos não informados usam os padrões de make_car.
+    """
+    def _make(n: int, **columns) -> list:
+        return [
+            make_car(i, **{
+                name: value(i) if callable(value) else value[i % len(value)]
+                for name, value in columns.items()
+            })
+            for i in range(n)
+        ]
+    return _make
+
+
+@pytest.fixture
+def profile_defaults():
+    """Campos base de make_profile (módulos de teste podem sobrescrever esta fixture)"""
+    return dict(
+        orcamento_min=50000,
+        orcamento_max=100000,
+        uso_principal="familia",
+        state="SP",
+    )
+
+
+@pytest.fixture
+def make_profile(profile_defaults):
+    """Fábrica de perfis: make_profile(**campos) sobre profile_defaults"""
+    def _make(**overrides) -> UserProfile:
+        return UserProfile(**{**profile_defaults, **overrides})
+    return _make
+
+
 @pytest.fixture
 def multiple_cars(sample_dealership):
     """Lista de múltiplos carros para testes"""
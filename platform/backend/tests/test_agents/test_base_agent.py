@@ -258,3 +258,113 @@ class TestBaseAgent:
         metrics_after = agent.get_metrics()
         assert metrics_after['total_calls'] == 0
         assert metrics_after['success_calls'] == 0
+
+
+class TestCacheKeys:
+    """Chaves de cache estáveis, versionadas e completas"""
+
+    @pytest.fixture
+    def car(self):
+        return Car(
+            id="car-key-1",
+            nome="Toyota Corolla XEi",
+            marca="Toyota",
+            modelo="Corolla",
+            ano=2021,
+            preco=110000,
+            quilometragem=40000,
+            combustivel="Flex",
+            categoria="Sedan",
+            consumo_cidade=11.5,
+            dealership_id="dealer-1",
+            dealership_name="Concessionária Teste",
+            dealership_city="São Paulo",
+            dealership_state="SP",
+            dealership_phone="(11) 9999-9999",
+            dealership_whatsapp="5511999999999"
+        )
+
+    @pytest.fixture
+    def profile(self):
+        return UserProfile(
+            orcamento_min=60000,
+            orcamento_max=120000,
+            uso_principal="familia",
+            state="SP"
+        )
+
+    def test_key_is_stable_across_processes(self, car, profile):
+        """O digest não depende do hash() randomizado por processo"""
+        import os
+        import subprocess
+        import sys
+
+        backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        script = (
+            "import json, sys\n"
+            "from models.car import Car\n"
+            "from models.user_profile import UserProfile\n"
+            "from services.agents.economy_agent import EconomyAgent\n"
+            "car, profile = json.loads(sys.argv[1]), json.loads(sys.argv[2])\n"
+            "print(EconomyAgent()._build_cache_key(Car(**car), UserProfile(**profile)))\n"
+        )
+        args = [car.model_dump_json(), profile.model_dump_json()]
+
+        keys = set()
+        for seed in ("1", "2"):
+            result = subprocess.run(
+                [sys.executable, "-c", script, *args],
+                capture_output=True, text=True, check=True, cwd=backend_dir,
+                env={**os.environ, "PYTHONHASHSEED": seed}
+            )
+            keys.add(result.stdout.strip().splitlines()[-1])
+
+        assert len(keys) == 1
+
+    def test_default_key_covers_whole_profile(self, car, profile):
+        """Sem escopo declarado, perfis com prioridades diferentes não colidem"""
+        agent = ConcreteAgent()
+        other = profile.model_copy(update={"prioridades": {**profile.prioridades, "economia": 5}})
+
+        assert agent._build_cache_key(car, profile) != agent._build_cache_key(car, other)
+
+    def test_scoped_keys_only_use_declared_fields(self, car, profile):
+        from services.agents.economy_agent import EconomyAgent
+        from services.agents.maintenance_agent import MaintenanceAgent
+
+        economy = EconomyAgent()
+        maintenance = MaintenanceAgent()
+
+        priorities_changed = profile.model_copy(update={"prioridades": {**profile.prioridades, "economia": 5}})
+        state_changed = profile.model_copy(update={"state": "RJ"})
+
+        # Economia lê o estado (preço do combustível), não as prioridades
+        assert economy._build_cache_key(car, profile) == economy._build_cache_key(car, priorities_changed)
+        assert economy._build_cache_key(car, profile) != economy._build_cache_key(car, state_changed)
+
+        # Manutenção não depende do perfil, mas depende do carro
+        assert maintenance._build_cache_key(car, profile) == maintenance._build_cache_key(car, state_changed)
+        older = car.model_copy(update={"ano": 2015})
+        assert maintenance._build_cache_key(car, profile) != maintenance._build_cache_key(older, profile)
+
+    def test_version_invalidates_keys(self, car, profile):
+        agent = ConcreteAgent()
+        key_v1 = agent._build_cache_key(car, profile)
+
+        class ConcreteAgentV2(ConcreteAgent):
+            CACHE_KEY_VERSION = 2
+
+        key_v2 = ConcreteAgentV2()._build_cache_key(car, profile)
+
+        assert key_v1 != key_v2
+        assert key_v2.startswith("TestAgent:v2:car-key-1:")
+
+    def test_batch_keys_match_single_keys(self, car, profile):
+        from services.agents.resale_agent import ResaleAgent
+
+        agent = ResaleAgent()
+        cars = [car, car.model_copy(update={"id": "car-key-2", "quilometragem": 90000})]
+
+        assert agent._build_cache_keys(cars, profile) == [
+            agent._build_cache_key(c, profile) for c in cars
+        ]
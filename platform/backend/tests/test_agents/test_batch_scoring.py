@@ -0,0 +1,243 @@
+"""
+Testes do scoring em lote (calculate_scores_batch / calculate_advanced_scores_batch)
+"""
+
+import itertools
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from services.agents.base_agent import BaseAgent
+from services.agents.cache_manager import CacheManager
+from services.agents.economy_agent import EconomyAgent
+from services.agents.maintenance_agent import MaintenanceAgent
+from services.agents.resale_agent import ResaleAgent
+from services.agents.scoring_orchestrator import ScoringAgentOrchestrator
+from models.car import Car
+from models.user_profile import UserProfile
+
+
+CURRENT_YEAR = datetime.now().year
+
+
+def _make_car(i, marca, categoria, combustivel, idade, km, consumo):
+    return Car(
+        id=f"car-{i}",
+        nome=f"{marca} {categoria} {i}",
+        marca=marca,
+        modelo=f"Modelo {categoria}",
+        ano=CURRENT_YEAR - idade,
+        preco=80000,
+        quilometragem=km,
+        combustivel=combustivel,
+        categoria=categoria,
+        consumo_cidade=consumo.get("cidade"),
+        consumo_estrada=consumo.get("estrada"),
+        consumo=consumo.get("medio"),
+        score_economia=0.7,
+        dealership_id="dealer-1",
+        dealership_name="Concessionária Teste",
+        dealership_city="São Paulo",
+        dealership_state="SP",
+        dealership_phone="(11) 9999-9999",
+        dealership_whatsapp="5511999999999"
+    )
+
+
+@pytest.fixture(scope="module")
+def candidates():
+    """Grade de carros cobrindo tabelas, faixas e limites das funções por partes"""
+    marcas = ["Toyota", "Volkswagen", "Jeep", "Land Rover", "Marca Desconhecida"]
+    categorias = ["Hatch", "SUV", "Pickup Grande", "Categoria Nova"]
+    combustiveis = ["Flex", "Etanol", "Diesel", "Elétrico", "Outro"]
+    idades = [-1, 0, 2, 3, 5, 12, 15, 18, 25]
+    kms = [0, 29999, 30000, 50000, 60000, 99999, 100000, 150000, 200000, 350000]
+    consumos = [
+        {"cidade": 14.2},
+        {"estrada": 9.0},
+        {"medio": 7.0},
+        {},
+        {"cidade": 25.0},
+    ]
+
+    combos = itertools.product(marcas, categorias, combustiveis, idades, kms, consumos)
+    # Amostra determinística (a grade completa tem ~45 mil combinações)
+    return [
+        _make_car(i, *combo)
+        for i, combo in enumerate(combos)
+        if i % 37 == 0
+    ]
+
+
+PROFILES = [
+    UserProfile(orcamento_min=50000, orcamento_max=100000, uso_principal="familia"),
+    UserProfile(orcamento_min=30000, orcamento_max=60000, uso_principal="transporte_passageiros", state="RJ"),
+    UserProfile(orcamento_min=30000, orcamento_max=60000, uso_principal="lazer"),
+    # Atributos opcionais lidos pelos agentes via hasattr/getattr
+    SimpleNamespace(uso_principal="trabalho", orcamento_min=0, orcamento_max=1, state="SP", monthly_km=4000, renda_mensal=2500),
+    SimpleNamespace(uso_principal="trabalho", orcamento_min=0, orcamento_max=1, state="SP", monthly_km=300, renda_mensal=30000),
+    SimpleNamespace(uso_principal="comercial", orcamento_min=0, orcamento_max=1, state="MG", monthly_km=None, renda_mensal=9000),
+]
+
+
+class TestAgentBatchParity:
+    """calculate_scores_batch deve reproduzir calculate_score carro a carro"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("agent_cls", [EconomyAgent, MaintenanceAgent, ResaleAgent])
+    @pytest.mark.parametrize("profile", PROFILES)
+    async def test_batch_matches_scalar(self, agent_cls, profile, candidates):
+        agent = agent_cls()
+
+        batch = await agent.calculate_scores_batch(candidates, profile)
+        scalar = [await agent.calculate_score(car, profile) for car in candidates]
+
+        assert len(candidates) > 1000
+        assert batch == pytest.approx(scalar, abs=1e-12)
+        assert all(isinstance(score, float) for score in batch)
+
+    @pytest.mark.asyncio
+    async def test_resale_market_adjustment(self, candidates):
+        agent = ResaleAgent()
+        if not agent.enable_market_intel:
+            pytest.skip("MarketIntelligenceService indisponível")
+
+        agent.market_intelligence.knowledge_base["Modelo SUV"] = {
+            "resale_factor": 1.1,
+            "sentiment_score": -0.5
+        }
+        profile = PROFILES[0]
+
+        batch = await agent.calculate_scores_batch(candidates, profile)
+        scalar = [await agent.calculate_score(car, profile) for car in candidates]
+
+        assert batch == pytest.approx(scalar, abs=1e-12)
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        for agent in (EconomyAgent(), MaintenanceAgent(), ResaleAgent()):
+            assert await agent.calculate_scores_batch([], PROFILES[0]) == []
+
+
+class CountingCacheManager(CacheManager):
+    """CacheManager local que conta as chamadas em lote"""
+
+    def __init__(self):
+        super().__init__(redis_url=None, enable_redis=False)
+        self.get_many_calls = 0
+        self.get_calls = 0
+
+    async def get_many(self, keys):
+        self.get_many_calls += 1
+        return await super().get_many(keys)
+
+    async def get(self, key):
+        self.get_calls += 1
+        return await super().get(key)
+
+
+class ExplodingAgent(BaseAgent):
+    """Agente cujo lote falha"""
+
+    async def calculate_score(self, car, profile):
+        return 0.9
+
+    async def calculate_scores_batch(self, cars, profile):
+        raise RuntimeError("falha no lote")
+
+
+class TestOrchestratorBatch:
+    """Testes de ScoringAgentOrchestrator.calculate_advanced_scores_batch"""
+
+    @pytest.fixture
+    def cache_manager(self):
+        return CountingCacheManager()
+
+    @pytest.fixture
+    def orchestrator(self, cache_manager):
+        orchestrator = ScoringAgentOrchestrator(cache_manager=cache_manager)
+        orchestrator.register_agent("economy", EconomyAgent())
+        orchestrator.register_agent("maintenance", MaintenanceAgent())
+        orchestrator.register_agent("resale", ResaleAgent())
+        return orchestrator
+
+    @pytest.mark.asyncio
+    async def test_matches_single_car_api(self, orchestrator, candidates):
+        cars = candidates[:200]
+        profile = PROFILES[0]
+
+        batch = await orchestrator.calculate_advanced_scores_batch(cars, profile)
+
+        single_orchestrator = ScoringAgentOrchestrator(
+            cache_manager=CacheManager(redis_url=None, enable_redis=False)
+        )
+        for name, agent in orchestrator.agents.items():
+            single_orchestrator.register_agent(name, agent.__class__())
+
+        assert len(batch) == len(cars)
+        for car, result in zip(cars, batch):
+            single = await single_orchestrator.calculate_advanced_scores(car, profile)
+            assert result['scores'] == pytest.approx(single['scores'], abs=1e-12)
+            assert result['metadata']['agents_used'] == ["economy", "maintenance", "resale"]
+            assert result['metadata']['failed_agents'] == []
+
+    @pytest.mark.asyncio
+    async def test_single_multi_get_and_cache_hits(self, orchestrator, cache_manager, candidates):
+        cars = candidates[:50]
+        profile = PROFILES[1]
+
+        first = await orchestrator.calculate_advanced_scores_batch(cars, profile)
+        assert cache_manager.get_many_calls == 1
+        assert cache_manager.get_calls == 0
+        assert cache_manager.stats['total_gets'] == 3 * len(cars)
+        assert all(r['metadata']['cache_hits'] == 0 for r in first)
+
+        second = await orchestrator.calculate_advanced_scores_batch(cars, profile)
+        assert cache_manager.get_many_calls == 2
+        assert all(r['metadata']['cache_hits'] == 3 for r in second)
+        assert [r['scores'] for r in second] == [r['scores'] for r in first]
+
+        economy_metrics = orchestrator.agents["economy"].get_metrics()
+        assert economy_metrics['total_calls'] == 2 * len(cars)
+        assert economy_metrics['cache_hits'] == len(cars)
+
+    @pytest.mark.asyncio
+    async def test_only_missing_cars_are_computed(self, orchestrator, candidates):
+        cars = candidates[:20]
+        profile = PROFILES[0]
+        await orchestrator.calculate_advanced_scores_batch(cars[:10], profile)
+
+        computed = []
+        maintenance = orchestrator.agents["maintenance"]
+        original = maintenance.calculate_scores_batch
+
+        async def spy(batch_cars, batch_profile):
+            computed.extend(car.id for car in batch_cars)
+            return await original(batch_cars, batch_profile)
+
+        maintenance.calculate_scores_batch = spy
+        await orchestrator.calculate_advanced_scores_batch(cars, profile)
+
+        assert computed == [car.id for car in cars[10:]]
+
+    @pytest.mark.asyncio
+    async def test_failing_agent_uses_fallback(self, orchestrator, candidates):
+        orchestrator.register_agent("economy", ExplodingAgent(name="economy"))
+        cars = candidates[:5]
+
+        results = await orchestrator.calculate_advanced_scores_batch(cars, PROFILES[0])
+
+        for car, result in zip(cars, results):
+            assert result['metadata']['failed_agents'] == ["economy"]
+            assert result['scores']['economy'] == car.score_economia
+            assert 0.0 <= result['scores']['maintenance'] <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_empty_inputs(self, orchestrator, candidates):
+        assert await orchestrator.calculate_advanced_scores_batch([], PROFILES[0]) == []
+
+        results = await orchestrator.calculate_advanced_scores_batch(
+            candidates[:3], PROFILES[0], agent_names=["inexistente"]
+        )
+        assert [r['scores'] for r in results] == [{}, {}, {}]
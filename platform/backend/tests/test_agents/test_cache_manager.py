@@ -189,3 +189,219 @@ class TestCacheManager:
         # Redis não deve estar disponível
         assert cache.redis_available is False
         assert cache.redis_client is None
+
+    @pytest.mark.asyncio
+    async def test_get_many_and_set_many(self, cache_manager):
+        """Testa leitura/escrita em lote no cache local"""
+        await cache_manager.set_many({"a": 0.1, "b": 0.2}, ttl=3600)
+        await cache_manager.set("c", 0.3, ttl=3600)
+
+        values = await cache_manager.get_many(["a", "x", "c", "b"])
+
+        assert values == [0.1, None, 0.3, 0.2]
+        assert cache_manager.stats['total_gets'] == 4
+        assert cache_manager.stats['local_hits'] == 3
+        assert cache_manager.stats['local_misses'] == 1
+        assert cache_manager.stats['total_sets'] == 3
+
+    @pytest.mark.asyncio
+    async def test_get_many_uses_single_redis_mget(self):
+        """Faltantes locais são buscadas no Redis com um único MGET"""
+
+        class FakePipeline:
+            def __init__(self, store):
+                self.store = store
+                self.commands = []
+
+            def setex(self, key, ttl, value):
+                self.commands.append((key, value))
+
+            async def execute(self):
+                self.store.update(self.commands)
+
+        class FakeRedis:
+            def __init__(self):
+                self.store = {"r1": "0.42"}
+                self.mget_calls = []
+
+            async def mget(self, keys):
+                self.mget_calls.append(list(keys))
+                return [self.store.get(k) for k in keys]
+
+            def pipeline(self, transaction=True):
+                return FakePipeline(self.store)
+
+        cache = CacheManager(redis_url=None, enable_redis=False)
+        cache.redis_client = FakeRedis()
+        cache.redis_available = True
+        await cache.set_many({"local": 0.9}, ttl=3600)
+
+        values = await cache.get_many(["local", "r1", "r2"])
+
+        assert values == [0.9, 0.42, None]
+        assert cache.redis_client.mget_calls == [["r1", "r2"]]
+        assert cache.redis_client.store["local"] == "0.9"
+        assert cache.stats['redis_hits'] == 1
+        assert cache.stats['redis_misses'] == 1
+        # Promovido para o cache local
+        assert await cache.get_many(["r1"]) == [0.42]
+        assert len(cache.redis_client.mget_calls) == 1
+
+
+class TestLocalCacheLRU:
+    """Testes do LRU local (recência, orçamento de bytes, expiração, TinyLFU)"""
+
+    @pytest.mark.asyncio
+    async def test_read_refreshes_recency(self):
+        """Leitura marca a chave como recente: a evicção leva a menos usada"""
+        cache = CacheManager(redis_url=None, enable_redis=False, local_cache_max_size=3)
+        for key in ("a", "b", "c"):
+            await cache.set(key, key, ttl=3600)
+
+        await cache.get("a")
+        await cache.set("d", "d", ttl=3600)
+
+        assert list(cache.local_cache) == ["c", "a", "d"]
+        assert await cache.get("b") is None
+        assert cache.get_stats()['evictions'] == 1
+
+    @pytest.mark.asyncio
+    async def test_eviction_ignores_ttl(self):
+        """Evicção por recência, não pela expiração mais próxima"""
+        cache = CacheManager(redis_url=None, enable_redis=False, local_cache_max_size=2)
+        await cache.set("longo", 1, ttl=86400)
+        await cache.set("curto", 2, ttl=60)
+        await cache.set("novo", 3, ttl=60)
+
+        assert "longo" not in cache.local_cache
+        assert "curto" in cache.local_cache
+
+    @pytest.mark.asyncio
+    async def test_byte_budget(self):
+        """Orçamento de bytes limita o cache mesmo abaixo do limite de itens"""
+        value = "x" * 1000
+        entry_size = CacheManager._estimate_entry_size("key00", value)
+        cache = CacheManager(
+            redis_url=None,
+            enable_redis=False,
+            local_cache_max_size=1000,
+            local_cache_max_bytes=entry_size * 5
+        )
+
+        for i in range(20):
+            await cache.set(f"key{i:02d}", value, ttl=3600)
+
+        stats = cache.get_stats()
+        assert len(cache.local_cache) == 5
+        assert stats['local_bytes'] <= stats['local_max_bytes']
+        assert stats['local_bytes'] == sum(cache._entry_sizes.values())
+        assert stats['evictions'] == 15
+        assert list(cache.local_cache) == [f"key{i}" for i in range(15, 20)]
+
+        # Entrada maior que o orçamento inteiro não entra
+        await cache.set("enorme", "y" * entry_size * 10, ttl=3600)
+        assert "enorme" not in cache.local_cache
+        assert cache.get_stats()['admission_rejections'] == 1
+
+    @pytest.mark.asyncio
+    async def test_overwrite_and_delete_keep_byte_accounting(self):
+        cache = CacheManager(redis_url=None, enable_redis=False)
+        await cache.set("k", "a" * 10, ttl=3600)
+        await cache.set("k", "a" * 500, ttl=3600)
+        assert cache.local_cache_bytes == CacheManager._estimate_entry_size("k", "a" * 500)
+
+        await cache.delete("k")
+        assert cache.local_cache_bytes == 0
+
+        await cache.set("k2", [1, 2, 3], ttl=3600)
+        await cache.clear()
+        assert cache.local_cache_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_lazy_and_periodic_expiration(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(time, "time", lambda: now[0])
+
+        cache = CacheManager(
+            redis_url=None,
+            enable_redis=False,
+            expiry_sweep_interval=60
+        )
+        await cache.set("lida", 1, ttl=10)
+        await cache.set("esquecida", 2, ttl=10)
+        await cache.set("viva", 3, ttl=3600)
+
+        now[0] += 30
+        # Expiração lazy na leitura
+        assert await cache.get("lida") is None
+        assert "esquecida" in cache.local_cache
+
+        # Varredura periódica no próximo set após o intervalo
+        now[0] += 60
+        await cache.set("outra", 4, ttl=3600)
+
+        assert "esquecida" not in cache.local_cache
+        assert "viva" in cache.local_cache
+        assert cache.get_stats()['expirations'] == 2
+        assert cache.local_cache_bytes == sum(cache._entry_sizes.values())
+
+    @pytest.mark.asyncio
+    async def test_tinylfu_protects_hot_keys(self):
+        """Chaves vistas uma vez não expulsam scores populares"""
+        cache = CacheManager(
+            redis_url=None,
+            enable_redis=False,
+            local_cache_max_size=100,
+            enable_admission=True
+        )
+        hot = [f"hot{i}" for i in range(100)]
+        for key in hot:
+            await cache.set(key, 0.9, ttl=3600)
+        for _ in range(5):
+            for key in hot:
+                assert await cache.get(key) == 0.9
+
+        # Varredura de chaves únicas
+        for i in range(300):
+            await cache.set(f"scan{i}", 0.1, ttl=3600)
+
+        survivors = set(cache.local_cache) & set(hot)
+        assert len(survivors) >= 95
+        stats = cache.get_stats()
+        assert stats['admission_rejections'] >= 295
+        assert stats['admission_policy'] == 'tinylfu'
+
+        # Uma chave que passa a ser popular acaba admitida
+        for _ in range(10):
+            await cache.get("nova")
+        await cache.set("nova", 0.5, ttl=3600)
+        assert "nova" in cache.local_cache
+
+    @pytest.mark.asyncio
+    async def test_without_admission_scan_flushes_cache(self):
+        cache = CacheManager(
+            redis_url=None,
+            enable_redis=False,
+            local_cache_max_size=10,
+            enable_admission=False
+        )
+        for i in range(10):
+            await cache.set(f"hot{i}", 0.9, ttl=3600)
+        for i in range(20):
+            await cache.set(f"scan{i}", 0.1, ttl=3600)
+
+        assert not any(key.startswith("hot") for key in cache.local_cache)
+        assert cache.get_stats()['admission_policy'] == 'lru'
+
+    def test_frequency_sketch_aging(self):
+        from services.agents.cache_manager import FrequencySketch
+
+        sketch = FrequencySketch(capacity=4)
+        for _ in range(20):
+            sketch.increment("popular")
+        assert sketch.estimate("popular") == FrequencySketch.MAX_COUNT
+        assert sketch.estimate("ausente") == 0
+
+        for i in range(sketch.sample_size):
+            sketch.increment(f"k{i}")
+        assert sketch.estimate("popular") < FrequencySketch.MAX_COUNT
@@ -0,0 +1,70 @@
+"""
+Testes do caminho async da API (limite de concorrência por worker)
+"""
+import asyncio
+import inspect
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Setup path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+import api.main as api_main
+from api.main import app
+
+
+PROFILE = {
+    "orcamento_min": 50000,
+    "orcamento_max": 100000,
+    "uso_principal": "familia",
+    "state": "SP",
+}
+
+
+@pytest.fixture
+def client():
+    """Cliente de teste da API (um único event loop, como em um worker real)"""
+    with TestClient(app) as client:
+        yield client
+
+
+class TestAsyncRequestPath:
+    """Handlers async e limite de concorrência"""
+
+    @pytest.mark.parametrize("handler", [
+        "recommend_cars",
+        "recommend_cars_api",
+        "refine_recommendations",
+        "contextual_search",
+        "list_cars",
+    ])
+    def test_handlers_are_async(self, handler):
+        assert inspect.iscoroutinefunction(getattr(api_main, handler))
+
+    def test_saturated_worker_returns_503(self, client, monkeypatch):
+        monkeypatch.setattr(api_main, "recommendation_slots", asyncio.Semaphore(0))
+        monkeypatch.setattr(api_main, "RECOMMENDATION_QUEUE_TIMEOUT", 0.05)
+
+        assert client.post("/recommend", json=PROFILE).status_code == 503
+        assert client.post("/recommend/stream", json=PROFILE).status_code == 503
+        assert client.get("/search/contextual", params={"query": "carro para uber"}).status_code == 503
+
+    def test_slot_released_after_request(self, client, monkeypatch):
+        slots = asyncio.Semaphore(1)
+        monkeypatch.setattr(api_main, "recommendation_slots", slots)
+
+        for _ in range(3):
+            assert client.post("/recommend", json=PROFILE).status_code == 200
+
+        assert not slots.locked()
+
+    def test_list_cars_filters(self, client):
+        response = client.get("/cars", params={"preco_max": 80000, "limit": 20})
+
+        assert response.status_code == 200
+        cars = response.json()
+        assert len(cars) <= 20
+        assert all(car["preco"] <= 80000 and car["disponivel"] for car in cars)
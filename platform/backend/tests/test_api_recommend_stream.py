@@ -0,0 +1,97 @@
+"""
+Testes do endpoint de recomendações em streaming (NDJSON)
+"""
+import json
+import pytest
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Setup path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from api.main import app
+
+
+PROFILE = {
+    "orcamento_min": 50000,
+    "orcamento_max": 100000,
+    "uso_principal": "familia",
+    "state": "SP",
+    "prioridades": {"economia": 4, "espaco": 5, "seguranca": 5},
+    "financial_capacity": {
+        "monthly_income_range": "8000-12000",
+        "max_monthly_tco": 3000,
+        "is_disclosed": True
+    }
+}
+
+
+@pytest.fixture
+def client():
+    """Cliente de teste da API"""
+    return TestClient(app)
+
+
+def _events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+class TestRecommendStream:
+    """Testes de /recommend/stream e /api/recommend/stream"""
+
+    @pytest.mark.parametrize("path", ["/recommend/stream", "/api/recommend/stream"])
+    def test_ranking_then_justifications_then_done(self, client, path):
+        response = client.post(path, json=PROFILE)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        events = _events(response)
+        ranking, justifications, done = events[0], events[1:-1], events[-1]
+
+        assert ranking["event"] == "ranking"
+        assert done == {"event": "done"}
+
+        recommendations = ranking["recommendations"]
+        assert ranking["total_recommendations"] == len(recommendations)
+        for rec in recommendations:
+            assert rec["justification"] is None
+            assert "tco_breakdown" in rec
+            assert "financial_health" in rec
+
+        # Uma justificativa por carro, cada uma apontando para sua posição
+        assert sorted(e["index"] for e in justifications) == list(range(len(recommendations)))
+        for event in justifications:
+            assert event["event"] == "justification"
+            assert event["car_id"] == recommendations[event["index"]]["car"]["id"]
+            assert event["justification"]
+
+    def test_ranking_matches_recommend(self, client):
+        streamed = _events(client.post("/recommend/stream", json=PROFILE))[0]
+        regular = client.post("/recommend", json=PROFILE).json()
+
+        assert [r["car"]["id"] for r in streamed["recommendations"]] == [
+            r["car"]["id"] for r in regular["recommendations"]
+        ]
+        assert [r["match_score"] for r in streamed["recommendations"]] == pytest.approx(
+            [r["match_score"] for r in regular["recommendations"]]
+        )
+
+    def test_invalid_budget_returns_400(self, client):
+        profile = {**PROFILE, "orcamento_min": 100000, "orcamento_max": 50000}
+
+        response = client.post("/recommend/stream", json=profile)
+
+        assert response.status_code == 400
+
+    def test_no_results_streams_message(self, client):
+        profile = {**PROFILE, "orcamento_min": 1000, "orcamento_max": 1500, "state": None}
+        profile.pop("financial_capacity")
+
+        events = _events(client.post("/recommend/stream", json=profile))
+
+        assert [e["event"] for e in events] == ["ranking", "done"]
+        assert events[0]["total_recommendations"] == 0
+        assert events[0]["message"]
@@ -0,0 +1,154 @@
+"""
+Testes dos índices hash do inventário (CarLookup)
+"""
+import pytest
+
+from services.car.car_lookup import CarLookup
+from services.unified_recommendation_engine import UnifiedRecommendationEngine
+
+
+MARCAS = ["Fiat", "Toyota", "Honda", "Volkswagen"]
+CATEGORIAS = ["Hatch", "Sedan", "SUV"]
+
+INVENTORY_COLUMNS = dict(
+    dealership_id=lambda i: f"dealer_{i % 3}",
+    marca=MARCAS,
+    categoria=lambda i: CATEGORIAS[(i // 2) % len(CATEGORIAS)],
+    disponivel=lambda i: i % 7 != 0,
+)
+
+
+class TestCarLookup:
+    """Construção e manutenção incremental"""
+
+    def test_indexes_match_linear_scans(self, make_inventory):
+        cars = make_inventory(40, **INVENTORY_COLUMNS)
+        lookup = CarLookup(cars)
+
+        for car in cars:
+            assert lookup.get(car.id) is car
+
+        assert lookup.take(lookup.dealership_rows("dealer_1")) == [
+            c for c in cars if c.dealership_id == "dealer_1"
+        ]
+        assert lookup.take(lookup.marca_rows("TOYOTA")) == [
+            c for c in cars if c.marca.lower() == "toyota"
+        ]
+        assert lookup.take(lookup.categoria_rows("suv")) == [
+            c for c in cars if c.categoria.lower() == "suv"
+        ]
+        assert lookup.get("inexistente") is None
+        assert lookup.marca_rows("Inexistente") == []
+
+    def test_add_is_incremental(self, make_car, make_inventory):
+        cars = make_inventory(5, **INVENTORY_COLUMNS)
+        lookup = CarLookup(cars)
+
+        row = lookup.add(make_car(99, dealership_id="dealer_new", marca="Jeep"))
+
+        assert row == 5
+        assert cars[row].id == "car_099"
+        assert lookup.matches(cars)
+        assert lookup.count_by_dealership("dealer_new") == 1
+        assert lookup.marca_rows("jeep") == [5]
+
+    def test_replace_reindexes_and_keeps_order(self, make_car, make_inventory):
+        cars = make_inventory(10, **INVENTORY_COLUMNS)
+        lookup = CarLookup(cars)
+        old_marca = cars[2].marca
+
+        updated = make_car(2, dealership_id=cars[2].dealership_id, marca="Fiat", categoria=cars[2].categoria)
+        lookup.replace(updated)
+
+        assert lookup.get("car_002") is updated
+        assert 2 not in lookup.marca_rows(old_marca)
+        fiat_rows = lookup.marca_rows("Fiat")
+        assert 2 in fiat_rows
+        assert fiat_rows == sorted(fiat_rows)
+        assert lookup.take(fiat_rows) == [c for c in cars if c.marca == "Fiat"]
+
+    def test_replace_unknown_car(self, make_car, make_inventory):
+        with pytest.raises(KeyError):
+            CarLookup(make_inventory(3, **INVENTORY_COLUMNS)).replace(make_car(50))
+
+    def test_duplicate_id_keeps_first(self, make_car):
+        first, second = make_car(1, marca="Fiat"), make_car(1, marca="Toyota")
+        lookup = CarLookup([first, second])
+
+        assert lookup.get("car_001") is first
+        assert lookup.matches(lookup.cars)
+
+
+class TestEngineLookup:
+    """Integração com o UnifiedRecommendationEngine"""
+
+    @pytest.fixture
+    def engine(self, tmp_path, make_inventory):
+        engine = UnifiedRecommendationEngine(data_dir=str(tmp_path), use_llm=False)
+        engine.all_cars = make_inventory(40, **INVENTORY_COLUMNS)
+        return engine
+
+    def test_lookup_rebuilt_when_inventory_replaced(self, engine):
+        assert engine.get_car("car_005").id == "car_005"
+
+        engine.all_cars = engine.all_cars[:3]
+
+        assert engine.get_car("car_005") is None
+        assert engine.get_car("car_002") is engine.all_cars[2]
+
+    def test_add_car_visible_to_index_and_scoring(self, engine, make_car):
+        lookup = engine.get_car_lookup()
+        engine.add_car(make_car(200, marca="Jeep"))
+
+        assert engine.get_car_lookup() is lookup
+        assert engine.get_car("car_200") is engine.all_cars[-1]
+        assert engine.get_inventory_index().size == len(engine.all_cars)
+
+    def test_update_car_invalidates_columns(self, engine, make_car):
+        index = engine.get_inventory_index()
+        original = engine.get_car("car_004")
+
+        engine.update_car(make_car(4, dealership_id=original.dealership_id, preco=999999))
+
+        assert engine.get_car("car_004").preco == 999999
+        assert engine.get_inventory_index() is not index
+        assert engine.get_inventory_index().preco[4] == 999999
+
+
+class TestListCarsParity:
+    """Listagem /cars via índices vs. filtros lineares originais"""
+
+    @staticmethod
+    def _reference(cars, dealership_id, marca, categoria, preco_min, preco_max, limit):
+        if dealership_id:
+            cars = [c for c in cars if c.dealership_id == dealership_id]
+        if marca:
+            cars = [c for c in cars if c.marca.lower() == marca.lower()]
+        if categoria:
+            cars = [c for c in cars if c.categoria.lower() == categoria.lower()]
+        if preco_min:
+            cars = [c for c in cars if c.preco >= preco_min]
+        if preco_max:
+            cars = [c for c in cars if c.preco <= preco_max]
+        cars = [c for c in cars if c.disponivel]
+        return cars[:limit]
+
+    @pytest.mark.parametrize("filters", [
+        (None, None, None, None, None, 50),
+        ("dealer_1", None, None, None, None, 50),
+        (None, "honda", None, None, None, 50),
+        (None, None, "SUV", 45000, None, 50),
+        ("dealer_2", "Fiat", "hatch", None, 70000, 50),
+        ("dealer_0", None, None, None, None, 3),
+        ("dealer_inexistente", None, None, None, None, 50),
+    ])
+    def test_matches_linear_filters(self, monkeypatch, filters, make_inventory):
+        import api.main as api_main
+
+        engine = UnifiedRecommendationEngine(data_dir="/nonexistent", use_llm=False)
+        engine.all_cars = make_inventory(40, **INVENTORY_COLUMNS)
+        monkeypatch.setattr(api_main, "engine", engine)
+
+        actual = api_main._list_cars_impl(*filters)
+
+        assert [c.id for c in actual] == [c.id for c in self._reference(engine.all_cars, *filters)]
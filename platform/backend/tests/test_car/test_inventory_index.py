@@ -0,0 +1,212 @@
+"""
+Testes do índice colunar do inventário (filtragem vetorizada)
+
+Garantem que a máscara única do InventoryIndex produz exatamente os mesmos
+carros, na mesma ordem, que a cadeia sequencial de filter_by_*.
+"""
+import pytest
+
+from models.user_profile import UserProfile
+from services.car.inventory_index import InventoryIndex, haversine_distances
+from services.unified_recommendation_engine import UnifiedRecommendationEngine
+from utils.geo_distance import haversine_distance
+
+
+CITIES = [
+    ("São Paulo", "SP", -23.5505, -46.6333),
+    ("Campinas", "SP", -22.9099, -47.0626),
+    ("Rio de Janeiro", "RJ", -22.9068, -43.1729),
+    ("Belo Horizonte", "MG", None, None),
+]
+
+
+MARCAS = ["Fiat", "Toyota", "Honda", "Volkswagen", "Chevrolet"]
+CATEGORIAS = ["Hatch", "Sedan", "SUV", "Pickup", "Compacto"]
+
+# Colunas do inventário sintético (make_inventory, em conftest.py)
+INVENTORY_COLUMNS = dict(
+    dealership_id=lambda i: f"dealer_{i % len(CITIES)}",
+    marca=MARCAS,
+    ano=lambda i: 2012 + (i % 12),
+    preco=lambda i: 30000 + (i * 2500),
+    quilometragem=lambda i: 5000 + (i * 3000),
+    combustivel=["Flex", "Gasolina", "Diesel"],
+    cambio=["Manual", "Automático", "Automático CVT", None],
+    categoria=lambda i: CATEGORIAS[(i // 2) % len(CATEGORIAS)],
+    dealership_name=lambda i: f"Loja {CITIES[i % len(CITIES)][0]}",
+    dealership_city=[city for city, _, _, _ in CITIES],
+    dealership_state=[state for _, state, _, _ in CITIES],
+    dealership_latitude=[lat for _, _, lat, _ in CITIES],
+    dealership_longitude=[lon for _, _, _, lon in CITIES],
+)
+
+
+def _sequential_filters(engine, cars, profile):
+    """Cadeia original de filtros eliminatórios"""
+    filtered = engine.filter_by_budget(cars, profile)
+    filtered = engine.filter_by_year(filtered, profile.ano_minimo, profile.ano_maximo)
+    filtered = engine.filter_by_km(filtered, profile.km_maxima)
+    filtered = engine.filter_by_state(filtered, profile.state)
+    filtered = engine.filter_by_city(filtered, profile.city)
+    filtered = engine.filter_by_radius(filtered, profile.city, profile.raio_maximo_km)
+    filtered = engine.filter_by_preferences(filtered, profile)
+    return filtered
+
+
+@pytest.fixture
+def engine(tmp_path, make_inventory):
+    engine = UnifiedRecommendationEngine(data_dir=str(tmp_path), use_llm=False)
+    engine.all_cars = make_inventory(60, **INVENTORY_COLUMNS)
+    return engine
+
+
+PROFILES = [
+    dict(orcamento_min=0, orcamento_max=10_000_000),
+    dict(orcamento_min=50000, orcamento_max=120000),
+    dict(orcamento_min=40000, orcamento_max=150000, ano_minimo=2016, ano_maximo=2020),
+    dict(orcamento_min=40000, orcamento_max=150000, km_maxima=90000),
+    dict(orcamento_min=0, orcamento_max=500000, state="sp"),
+    dict(orcamento_min=0, orcamento_max=500000, city="SÃO PAULO", state="SP"),
+    dict(orcamento_min=0, orcamento_max=500000, city="São Paulo", raio_maximo_km=120),
+    dict(orcamento_min=0, orcamento_max=500000, city="Cidade Desconhecida", raio_maximo_km=50),
+    dict(orcamento_min=0, orcamento_max=500000, marcas_preferidas=["Fiat", "Honda"]),
+    dict(orcamento_min=0, orcamento_max=500000, marcas_rejeitadas=["Fiat", "Marca Inexistente"]),
+    dict(orcamento_min=0, orcamento_max=500000, tipos_preferidos=["SUV", "Sedan"]),
+    dict(orcamento_min=0, orcamento_max=500000, combustivel_preferido="Diesel"),
+    dict(orcamento_min=0, orcamento_max=500000, cambio_preferido="Automático"),
+    dict(orcamento_min=0, orcamento_max=500000, cambio_preferido="CVT", state="RJ"),
+    dict(orcamento_min=60000, orcamento_max=60000),
+    dict(orcamento_min=0, orcamento_max=500000, state="AM"),
+]
+
+
+class TestInventoryIndexParity:
+    """Máscara vetorizada vs. filtros sequenciais"""
+
+    @pytest.mark.parametrize("profile_kwargs", PROFILES)
+    def test_candidates_match_sequential_filters(self, engine, profile_kwargs):
+        profile = UserProfile(uso_principal="trabalho", **profile_kwargs)
+
+        expected = _sequential_filters(engine, engine.all_cars, profile)
+        index = engine.get_inventory_index()
+        actual = index.take(index.candidate_ids(profile))
+
+        assert [c.id for c in actual] == [c.id for c in expected]
+
+
+class TestInventoryIndex:
+    """Comportamento do índice"""
+
+    def test_index_built_on_load(self, engine):
+        assert engine.inventory_index is not None
+
+    def test_index_rebuilt_when_inventory_replaced(self, engine):
+        index = engine.get_inventory_index()
+        assert index.size == len(engine.all_cars)
+
+        engine.all_cars = engine.all_cars[:10]
+        rebuilt = engine.get_inventory_index()
+
+        assert rebuilt is not index
+        assert rebuilt.size == 10
+
+    def test_index_reused_when_inventory_unchanged(self, engine):
+        assert engine.get_inventory_index() is engine.get_inventory_index()
+
+    def test_empty_inventory(self):
+        index = InventoryIndex([])
+        profile = UserProfile(orcamento_min=0, orcamento_max=100000, uso_principal="familia")
+
+        assert len(index.candidate_ids(profile)) == 0
+
+    def test_haversine_matches_scalar(self):
+        import numpy as np
+
+        origin = (-23.5505, -46.6333)
+        lats = np.array([-22.9068, -23.5629, np.nan, 95.0])
+        lons = np.array([-43.1729, -46.6544, -46.0, -46.0])
+
+        distances = haversine_distances(origin, lats, lons)
+
+        assert distances[0] == pytest.approx(haversine_distance(*origin, lats[0], lons[0]))
+        assert distances[1] == pytest.approx(haversine_distance(*origin, lats[1], lons[1]))
+        assert np.isnan(distances[2])
+        assert np.isnan(distances[3])
+
+    def test_recommend_respects_hard_constraints(self, engine):
+        profile = UserProfile(
+            orcamento_min=40000,
+            orcamento_max=150000,
+            uso_principal="trabalho",
+            state="SP",
+            ano_minimo=2015,
+            marcas_rejeitadas=["Fiat"],
+        )
+
+        results = engine.recommend(profile, limit=50, score_threshold=0.0)
+
+        assert results
+        for rec in results:
+            car = rec['car']
+            assert 40000 <= car.preco <= 150000
+            assert car.dealership_state == "SP"
+            assert car.ano >= 2015
+            assert car.marca != "Fiat"
+
+
+class TestInventorySummary:
+    """Agregados calculados pelas colunas (sem iterar os Car)"""
+
+    @pytest.fixture
+    def cars(self, make_inventory):
+        cars = make_inventory(40, **INVENTORY_COLUMNS)
+        # Alguns indisponíveis e modelos repetidos por marca
+        for i, car in enumerate(cars):
+            car.disponivel = i % 3 != 0
+            car.modelo = f"Modelo{i % 4}"
+        return cars
+
+    def test_matches_list_based_aggregates(self, cars):
+        summary = InventoryIndex(cars).summary()
+        available = [c for c in cars if c.disponivel]
+        prices = [c.preco for c in available]
+
+        by_category = {}
+        for car in cars:
+            by_category[car.categoria] = by_category.get(car.categoria, 0) + 1
+        by_brand = {}
+        for car in available:
+            by_brand[car.marca] = by_brand.get(car.marca, 0) + 1
+        brands_models = {}
+        for car in available:
+            brands_models.setdefault(car.marca, set()).add(car.modelo)
+
+        assert summary["total_cars"] == len(cars)
+        assert summary["available_cars"] == len(available)
+        assert summary["cars_by_category"] == by_category
+        assert summary["cars_by_brand"] == by_brand
+        assert summary["prices"]["avg"] == pytest.approx(sum(prices) / len(prices))
+        assert summary["prices"]["min"] == min(prices)
+        assert summary["prices"]["max"] == max(prices)
+        assert summary["categories"] == sorted({c.categoria for c in available})
+        assert summary["brands"] == sorted(by_brand)
+        assert summary["brands_models"] == {
+            marca: sorted(modelos) for marca, modelos in sorted(brands_models.items())
+        }
+
+    def test_rows_where(self, cars):
+        index = InventoryIndex(cars)
+
+        rows = index.rows_where(preco_min=40000, preco_max=80000)
+
+        assert [cars[i].id for i in rows] == [
+            c.id for c in cars if c.disponivel and 40000 <= c.preco <= 80000
+        ]
+        assert list(index.rows_where([0, 1, 2, 3], available_only=False)) == [0, 1, 2, 3]
+
+    def test_empty_inventory(self):
+        summary = InventoryIndex([]).summary()
+
+        assert summary["total_cars"] == 0
+        assert summary["prices"] == {"avg": 0, "min": 0, "max": 0}
+        assert summary["brands_models"] == {}
@@ -0,0 +1,101 @@
+"""
+Testes do snapshot binário do inventário enriquecido
+"""
+import json
+import os
+
+import pytest
+
+import services.car.inventory_snapshot as inventory_snapshot
+from services.car.inventory_snapshot import SNAPSHOT_FILENAME, source_fingerprint
+from services.unified_recommendation_engine import UnifiedRecommendationEngine
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Diretório de dados com um recorte do dealerships.json real"""
+    monkeypatch.setenv("INVENTORY_SNAPSHOT_ENABLED", "true")
+
+    with open(os.path.join(BACKEND_DIR, "data", "dealerships.json"), encoding="utf-8") as f:
+        dealerships = json.load(f)
+
+    subset = []
+    for dealership in dealerships:
+        subset.append({**dealership, "carros": dealership["carros"][:5]})
+
+    with open(tmp_path / "dealerships.json", "w", encoding="utf-8") as f:
+        json.dump(subset, f, ensure_ascii=False)
+    return tmp_path
+
+
+def _snapshot_path(data_dir):
+    return data_dir / "cache" / SNAPSHOT_FILENAME
+
+
+def _engine(data_dir):
+    return UnifiedRecommendationEngine(data_dir=str(data_dir), use_llm=False)
+
+
+class TestInventorySnapshot:
+    """Gravação, reuso e invalidação do snapshot"""
+
+    def test_second_start_loads_snapshot(self, data_dir, monkeypatch):
+        cold = _engine(data_dir)
+        assert _snapshot_path(data_dir).exists()
+
+        def _fail(self):
+            raise AssertionError("load_all_cars não deveria rodar com snapshot válido")
+
+        monkeypatch.setattr(UnifiedRecommendationEngine, "load_all_cars", _fail)
+        warm = _engine(data_dir)
+
+        assert [c.model_dump() for c in warm.all_cars] == [c.model_dump() for c in cold.all_cars]
+        assert [d.id for d in warm.dealerships] == [d.id for d in cold.dealerships]
+        # Métricas enriquecidas vêm do snapshot
+        assert [c.indice_confiabilidade for c in warm.all_cars] == [c.indice_confiabilidade for c in cold.all_cars]
+        # Índices reconstruídos sobre a lista carregada
+        assert warm.get_car(cold.all_cars[0].id).id == cold.all_cars[0].id
+        assert warm.get_inventory_index().size == len(warm.all_cars)
+
+    def test_source_change_invalidates_snapshot(self, data_dir):
+        _engine(data_dir)
+
+        with open(data_dir / "dealerships.json", encoding="utf-8") as f:
+            dealerships = json.load(f)
+        dealerships[0]["carros"] = dealerships[0]["carros"][:2]
+        with open(data_dir / "dealerships.json", "w", encoding="utf-8") as f:
+            json.dump(dealerships, f, ensure_ascii=False)
+
+        engine = _engine(data_dir)
+
+        expected = sum(len(d["carros"]) for d in dealerships if d.get("active", True))
+        assert len(engine.all_cars) == expected
+
+    def test_corrupt_snapshot_falls_back(self, data_dir):
+        cold = _engine(data_dir)
+        _snapshot_path(data_dir).write_bytes(b"nao eh um pickle")
+
+        engine = _engine(data_dir)
+
+        assert len(engine.all_cars) == len(cold.all_cars)
+
+    def test_disabled_by_env(self, data_dir, monkeypatch):
+        monkeypatch.setenv("INVENTORY_SNAPSHOT_ENABLED", "false")
+
+        engine = _engine(data_dir)
+
+        assert engine.all_cars
+        assert not _snapshot_path(data_dir).exists()
+
+    def test_fingerprint_tracks_version(self, data_dir, monkeypatch):
+        sources = [str(data_dir / "dealerships.json")]
+        original = source_fingerprint(sources)
+
+        assert source_fingerprint(sources) == original
+        assert source_fingerprint([str(data_dir / "inexistente.json")]) is None
+
+        monkeypatch.setattr(inventory_snapshot, "SNAPSHOT_VERSION", inventory_snapshot.SNAPSHOT_VERSION + 1)
+        assert source_fingerprint(sources) != original
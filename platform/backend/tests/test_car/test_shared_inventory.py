@@ -0,0 +1,153 @@
+"""
+Testes do inventário compartilhado entre workers (arquivos mapeados)
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from models.user_profile import UserProfile
+from services.car.shared_inventory import LazyCarList, SHARED_DIRNAME
+from services.unified_recommendation_engine import UnifiedRecommendationEngine
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Diretório de dados com um recorte do dealerships.json real"""
+    monkeypatch.setenv("INVENTORY_SHARED_MEMORY", "true")
+    monkeypatch.setenv("INVENTORY_SNAPSHOT_ENABLED", "true")
+    monkeypatch.delenv("INVENTORY_SHARED_DIR", raising=False)
+
+    with open(os.path.join(BACKEND_DIR, "data", "dealerships.json"), encoding="utf-8") as f:
+        dealerships = json.load(f)
+
+    subset = [{**d, "carros": d["carros"][:15]} for d in dealerships]
+    with open(tmp_path / "dealerships.json", "w", encoding="utf-8") as f:
+        json.dump(subset, f, ensure_ascii=False)
+    return tmp_path
+
+
+def _engine(data_dir):
+    return UnifiedRecommendationEngine(data_dir=str(data_dir), use_llm=False)
+
+
+def _private_engine(data_dir, monkeypatch):
+    monkeypatch.setenv("INVENTORY_SHARED_MEMORY", "false")
+    engine = _engine(data_dir)
+    monkeypatch.setenv("INVENTORY_SHARED_MEMORY", "true")
+    return engine
+
+
+class TestSharedInventory:
+    """Publicação, anexação e equivalência com o inventário privado"""
+
+    def test_first_worker_publishes_and_uses_mapped_inventory(self, data_dir, monkeypatch):
+        private = _private_engine(data_dir, monkeypatch)
+        engine = _engine(data_dir)
+
+        assert isinstance(engine.all_cars, LazyCarList)
+        assert (data_dir / "cache" / SHARED_DIRNAME).is_dir()
+        assert [c.model_dump() for c in engine.all_cars] == [c.model_dump() for c in private.all_cars]
+
+        index = engine.get_inventory_index()
+        assert isinstance(index.preco, np.memmap)
+        np.testing.assert_array_equal(index.preco, private.get_inventory_index().preco)
+        assert index.marca.vocabulary == private.get_inventory_index().marca.vocabulary
+
+        # Concessionárias sem a cópia embutida dos carros
+        assert [d.id for d in engine.dealerships] == [d.id for d in private.dealerships]
+        assert all(d.carros == [] for d in engine.dealerships)
+
+    def test_other_workers_attach_without_loading(self, data_dir, monkeypatch):
+        first = _engine(data_dir)
+
+        def _fail(self):
+            raise AssertionError("workers seguintes não deveriam carregar o inventário")
+
+        monkeypatch.setattr(UnifiedRecommendationEngine, "load_all_cars", _fail)
+        monkeypatch.setattr(UnifiedRecommendationEngine, "load_inventory_snapshot", _fail)
+        worker = _engine(data_dir)
+
+        assert len(worker.all_cars) == len(first.all_cars)
+        # Nenhum Car construído até alguém acessar uma linha
+        assert len(worker.all_cars._cache) == 0
+
+        car_id = first.all_cars[3].id
+        assert worker.get_car(car_id).id == car_id
+        assert len(worker.all_cars._cache) == 1
+
+    def test_recommendations_match_private_inventory(self, data_dir, monkeypatch):
+        private = _private_engine(data_dir, monkeypatch)
+        shared = _engine(data_dir)
+        profile = UserProfile(
+            orcamento_min=30000,
+            orcamento_max=150000,
+            uso_principal="familia",
+            state="SP",
+            prioridades={"economia": 4, "espaco": 5, "seguranca": 5}
+        )
+
+        expected = private.rank(profile, limit=10)
+        actual = shared.rank(profile, limit=10)
+
+        assert expected
+        assert [r["car"].id for r in actual] == [r["car"].id for r in expected]
+        assert [r["score"] for r in actual] == pytest.approx([r["score"] for r in expected])
+
+    def test_lazy_cache_is_bounded(self, data_dir, monkeypatch):
+        monkeypatch.setenv("INVENTORY_SHARED_CACHE_SIZE", "4")
+        engine = _engine(data_dir)
+
+        cars = list(engine.all_cars)
+
+        assert len(cars) == len(engine.all_cars)
+        assert len(engine.all_cars._cache) == 4
+        assert engine.all_cars[-1].id == cars[-1].id
+        assert [c.id for c in engine.all_cars[1:3]] == [c.id for c in cars[1:3]]
+        with pytest.raises(IndexError):
+            engine.all_cars[len(cars)]
+
+    def test_aggregates_do_not_decode_cars(self, data_dir, monkeypatch):
+        private = _private_engine(data_dir, monkeypatch)
+        engine = _engine(data_dir)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("Car decodificado para um agregado")
+
+        monkeypatch.setattr(LazyCarList, "_decode", _fail)
+        stats = engine.get_stats()
+
+        assert stats["total_cars"] == len(private.all_cars)
+        assert stats["available_cars"] == len([c for c in private.all_cars if c.disponivel])
+        assert stats["cars_by_category"] == private.get_stats()["cars_by_category"]
+
+    def test_add_car_detaches_to_private_copy(self, data_dir):
+        engine = _engine(data_dir)
+        template = engine.all_cars[0]
+
+        engine.add_car(template.model_copy(update={"id": "novo_carro"}))
+
+        assert isinstance(engine.all_cars, list)
+        assert engine.get_car("novo_carro").id == "novo_carro"
+        assert engine.get_inventory_index().size == len(engine.all_cars)
+
+    def test_source_change_publishes_new_version(self, data_dir):
+        _engine(data_dir)
+        shared_dir = data_dir / "cache" / SHARED_DIRNAME
+        old_versions = set(os.listdir(shared_dir))
+
+        with open(data_dir / "dealerships.json", encoding="utf-8") as f:
+            dealerships = json.load(f)
+        dealerships[0]["carros"] = dealerships[0]["carros"][:3]
+        with open(data_dir / "dealerships.json", "w", encoding="utf-8") as f:
+            json.dump(dealerships, f, ensure_ascii=False)
+
+        engine = _engine(data_dir)
+
+        assert isinstance(engine.all_cars, LazyCarList)
+        assert set(os.listdir(shared_dir)).isdisjoint(old_versions)
+        assert engine.car_lookup.count_by_dealership(dealerships[0]["id"]) <= 3
@@ -0,0 +1,108 @@
+"""
+Regressão do CarClassifier com autômato (classify/classify_many) contra a
+verificação original palavra a palavra
+"""
+import glob
+import json
+import os
+
+import pytest
+
+from services.car_classifier import CarClassifier
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _inventory_corpus():
+    """Carros reais de todos os estoques e do dealerships.json"""
+    cars = []
+    paths = glob.glob(os.path.join(BACKEND_DIR, "data", "*_estoque.json"))
+    for path in sorted(paths):
+        with open(path, encoding="utf-8") as f:
+            cars.extend(json.load(f))
+
+    with open(os.path.join(BACKEND_DIR, "data", "dealerships.json"), encoding="utf-8") as f:
+        for dealership in json.load(f):
+            cars.extend(dealership["carros"])
+
+    return [
+        {"nome": c.get("nome", ""), "modelo": c.get("modelo", ""), "ano": c.get("ano"), "marca": c.get("marca")}
+        for c in cars
+    ]
+
+
+def _synthetic_corpus():
+    """Cada palavra-chave isolada, combinada com indicadores de carro e em sobreposições"""
+    keywords = (
+        CarClassifier.MOTO_KEYWORDS + CarClassifier.CAR_INDICATORS + CarClassifier.MOTO_MODELS
+        + [p for patterns in CarClassifier.MODEL_PATTERNS.values() for p in patterns]
+    )
+    cars = []
+    for keyword in keywords:
+        for prefix in ("", "Honda ", "Fiat Turbo "):
+            cars.append({"nome": f"{prefix}{keyword.upper()}", "modelo": keyword, "ano": 2020})
+            cars.append({"nome": f"{prefix}{keyword}s 1.0", "modelo": "", "ano": None})
+    for ano in (2008, 2009, 2013, 2014, None):
+        cars.append({"nome": "Ford Focus", "modelo": "Focus Hatch", "ano": ano})
+        cars.append({"nome": "Ford Focus", "modelo": "Focus", "ano": ano})
+    for marca in CarClassifier.MOTO_ONLY_BRANDS + ["Fiat", None]:
+        cars.append({"nome": "Modelo X", "modelo": "Sedan", "ano": 2020, "marca": marca})
+    cars += [
+        {"nome": "Chevrolet Onix Plus", "modelo": "Onix", "ano": 2022},
+        {"nome": "Hyundai HB20S", "modelo": "HB20S Platinum", "ano": 2023},
+        {"nome": "VW Polo Sedan", "modelo": "Polo", "ano": 2015},
+        {"nome": "Fiat Mobi Like", "modelo": "Mobi", "ano": 2021},
+        {"nome": "Honda CB 500", "modelo": "CB 500", "ano": 2024},
+        {"nome": "Honda City Hatch CVT", "modelo": "City", "ano": 2022},
+        {"nome": "", "modelo": "", "ano": None},
+    ]
+    return cars
+
+
+CORPUS = _inventory_corpus() + _synthetic_corpus()
+
+
+@pytest.fixture(scope="module")
+def linear():
+    return CarClassifier(use_automaton=False)
+
+
+@pytest.fixture(scope="module")
+def automaton():
+    return CarClassifier()
+
+
+def _expected(linear):
+    return [linear.classify(c["nome"], c["modelo"], c["ano"], c.get("marca")) for c in CORPUS]
+
+
+class TestCarClassifierAutomaton:
+
+    def test_corpus_covers_real_inventory(self):
+        assert len(CORPUS) > 500
+
+    def test_classify_matches_linear_path(self, linear, automaton):
+        actual = [automaton.classify(c["nome"], c["modelo"], c["ano"], c.get("marca")) for c in CORPUS]
+
+        mismatches = [
+            (car, exp, got) for car, exp, got in zip(CORPUS, _expected(linear), actual) if exp != got
+        ]
+        assert mismatches == []
+
+    def test_classify_many_matches_linear_path(self, linear, automaton):
+        assert automaton.classify_many(CORPUS) == _expected(linear)
+
+    def test_classify_many_linear_mode(self, linear):
+        assert linear.classify_many(CORPUS) == _expected(linear)
+
+    def test_classify_many_defaults_modelo_to_nome(self, automaton):
+        assert automaton.classify_many([{"nome": "Toyota Hilux SRV"}, {"nome": "Kwid Zen"}]) == \
+            ["Pickup", "Compacto"]
+
+    def test_precedence(self, automaton):
+        # Pickup vence SUV, Van vence Sedan, Compacto vence Hatch
+        assert automaton.classify("Fiat Toro", "Toro Compass") == "Pickup"
+        assert automaton.classify("Chevrolet Spin", "Spin Sedan") == "Van"
+        assert automaton.classify("Renault Kwid", "Kwid Sandero") == "Compacto"
+        assert automaton.classify("Ford Focus", "Focus Hatch", ano=2011) == "Sedan"
@@ -0,0 +1,208 @@
+"""
+Testes da exportação em streaming/paginada de interações (/api/ml/export-data)
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main as api_main
+from services.interaction_export import (
+    EXPORT_COLUMNS,
+    PARQUET_AVAILABLE,
+    decode_cursor,
+    encode_cursor,
+    flatten_interaction,
+    iter_json_envelope,
+)
+from services.interaction_service import InteractionService
+
+
+BACKENDS = ["json", "jsonl", "sqlite"]
+TYPES = ["click", "view_details", "whatsapp_contact"]
+
+
+def _records(n=25):
+    return [
+        {
+            "session_id": f"sess_{i % 4}",
+            "car_id": f"car_{i % 7}",
+            "interaction_type": TYPES[i % 3],
+            "timestamp": f"2025-01-{1 + i % 10:02d}T10:00:00",
+            "duration_seconds": i if i % 2 else None,
+            "user_preferences": {"budget": 90000 + i, "usage": "familia", "priorities": ["espaco"]},
+            "car_snapshot": {"marca": "Fiat", "modelo": f"Modelo {i}", "ano": 2020, "preco": 50000.0},
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(params=BACKENDS)
+def service(request, tmp_path, monkeypatch):
+    service = InteractionService(data_dir=str(tmp_path), backend=request.param)
+    for record in _records():
+        service.storage.append(record)
+    monkeypatch.setattr(api_main, "interaction_service", service)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(api_main.app)
+
+
+class TestStorageScan:
+    """Filtros aplicados no backend e retomada pela posição"""
+
+    def test_filters_by_period_and_type(self, service):
+        since, until = datetime(2025, 1, 3), datetime(2025, 1, 6)
+        scanned = [r for _, r in service.scan_interactions(
+            since=since, until=until, interaction_types={"click"}
+        )]
+
+        expected = [
+            r for r in service.get_all_interactions()
+            if r["interaction_type"] == "click"
+            and since <= datetime.fromisoformat(r["timestamp"]) < until
+        ]
+        assert scanned and [r["id"] for r in scanned] == [r["id"] for r in expected]
+
+    def test_resume_after_position(self, service):
+        scanned = list(service.scan_interactions())
+        position = scanned[9][0]
+
+        resumed = [r["id"] for _, r in service.scan_interactions(after=position)]
+
+        assert resumed == [r["id"] for _, r in scanned[10:]]
+
+
+class TestExportEndpoint:
+
+    def test_cursor_pages_cover_every_interaction_once(self, service, client):
+        ids, cursor, pages = [], None, 0
+        while True:
+            params = {"format": "ndjson", "page_size": 7, "interaction_type": ["click", "view_details"]}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/ml/export-data", params=params)
+            assert response.status_code == 200
+            ids += [json.loads(line)["id"] for line in response.text.splitlines()]
+            pages += 1
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+
+        expected = [
+            r["id"] for r in service.get_all_interactions()
+            if r["interaction_type"] in ("click", "view_details")
+        ]
+        assert ids == expected
+        assert pages == 3
+
+    def test_json_envelope_keeps_legacy_shape(self, service, client):
+        response = client.get("/api/ml/export-data", params={"limit": 5})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "success"
+        assert data["total_interactions"] == 5
+        assert [r["id"] for r in data["data"]["interactions"]] == \
+            [r["id"] for r in service.get_all_interactions()[-5:]]
+        assert data["data"]["statistics"]["total"] == 25
+        assert data["metadata"]["format"] == "json"
+
+    def test_json_page_includes_next_cursor(self, service, client):
+        response = client.get("/api/ml/export-data", params={"page_size": 10})
+
+        data = response.json()
+        assert data["total_interactions"] == 10
+        assert data["next_cursor"] == response.headers["x-next-cursor"]
+
+    def test_csv_flattens_nested_fields(self, service, client):
+        response = client.get("/api/ml/export-data", params={"format": "csv"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 25
+        assert list(rows[0]) == [column for column, _ in EXPORT_COLUMNS]
+        assert rows[3]["car_snapshot.modelo"] == "Modelo 3"
+        assert json.loads(rows[3]["user_preferences.priorities"]) == ["espaco"]
+
+    def test_gzip_stream(self, service, client):
+        response = client.get(
+            "/api/ml/export-data",
+            params={"format": "ndjson", "gzip": "true", "since": "2025-01-05T00:00:00"},
+            headers={"Accept-Encoding": "identity"}
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        # httpx descomprime conforme o Content-Encoding
+        lines = response.text.splitlines()
+        assert len(lines) == sum(1 for r in _records() if r["timestamp"] >= "2025-01-05")
+        assert all(json.loads(line)["timestamp"] >= "2025-01-05" for line in lines)
+
+    def test_invalid_requests(self, service, client):
+        assert client.get("/api/ml/export-data", params={"format": "xml"}).status_code == 400
+        assert client.get("/api/ml/export-data", params={"cursor": "lixo"}).status_code == 400
+        assert client.get(
+            "/api/ml/export-data", params={"limit": 5, "page_size": 5}
+        ).status_code == 400
+
+    def test_cursor_beyond_or_inside_a_record(self, service, client):
+        backend = service.storage.name
+        if backend == "jsonl":
+            invalid = [7, 10 ** 9]  # offsets em bytes fora do início de uma linha
+        else:
+            invalid = [-1]
+
+        for position in invalid:
+            for params in ({}, {"format": "ndjson"}):
+                response = client.get(
+                    "/api/ml/export-data",
+                    params={**params, "cursor": encode_cursor(backend, position)}
+                )
+                assert response.status_code == 400
+
+    @pytest.mark.skipif(PARQUET_AVAILABLE, reason="pyarrow instalado")
+    def test_parquet_requires_pyarrow(self, service, client):
+        response = client.get("/api/ml/export-data", params={"format": "parquet"})
+        assert response.status_code == 501
+
+    @pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow não instalado")
+    def test_parquet_round_trip(self, service, client):
+        import pyarrow.parquet as pq
+
+        response = client.get("/api/ml/export-data", params={"format": "parquet"})
+
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.num_rows == 25
+        assert table.column("car_snapshot.modelo").to_pylist()[3] == "Modelo 3"
+
+
+class TestExportEncoders:
+
+    def test_cursor_is_bound_to_backend(self):
+        cursor = encode_cursor("jsonl", 1234)
+
+        assert decode_cursor(cursor, "jsonl") == 1234
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "sqlite")
+
+    def test_flatten_missing_nested_fields(self):
+        row = flatten_interaction({"id": "int_000001", "user_preferences": None})
+
+        assert row["id"] == "int_000001"
+        assert row["user_preferences.budget"] is None
+        assert row["car_snapshot.marca"] is None
+
+    def test_streamed_envelope_is_valid_json(self):
+        body = b"".join(iter_json_envelope(iter(_records(3)), {"total": 3}))
+
+        data = json.loads(body)
+        assert data["total_interactions"] == 3
+        assert data["next_cursor"] is None
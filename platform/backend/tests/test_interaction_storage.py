@@ -0,0 +1,368 @@
+"""
+Testes dos backends de armazenamento de interações
+"""
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from models.interaction import InteractionEvent, InteractionType, UserPreferencesSnapshot
+from services.interaction_aggregates import InteractionAggregates
+from services.interaction_service import InteractionService
+from services.interaction_storage import (
+    InteractionStorage,
+    JSONLLogStorage,
+    create_storage,
+    import_legacy_json,
+    migrate_legacy_json
+)
+
+
+BACKENDS = ["json", "jsonl", "sqlite"]
+
+
+def _record(i, session="sess_1", **extra):
+    return {
+        "session_id": session,
+        "car_id": f"car_{i % 3}",
+        "interaction_type": "click",
+        "timestamp": f"2025-01-01T10:00:{i:02d}",
+        "user_preferences": {"budget": 100000, "usage": "urbano", "priorities": []},
+        **extra,
+    }
+
+
+def _mixed_records(n=12):
+    types = ["click", "view_details", "whatsapp_contact"]
+    return [
+        _record(
+            i,
+            session=f"sess_{i % 4}",
+            interaction_type=types[i % 3],
+            duration_seconds=(i * 5 if i % 2 else None),
+            timestamp=f"2025-01-0{1 + i % 5}T10:00:00",
+        )
+        for i in range(n)
+    ]
+
+
+def _event(i):
+    return InteractionEvent(
+        session_id=f"sess_{i % 2}",
+        car_id=f"car_{i}",
+        interaction_type=InteractionType.VIEW_DETAILS,
+        user_preferences=UserPreferencesSnapshot(budget=90000, usage="familia", priorities=["espaco"])
+    )
+
+
+def _append_many(data_dir, worker, count):
+    storage = JSONLLogStorage(data_dir, fsync_every=8)
+    for i in range(count):
+        storage.append(_record(i, session=f"worker_{worker}"))
+    storage.close()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestStorageBackends:
+    """Contrato comum dos backends"""
+
+    def test_append_assigns_sequential_ids(self, tmp_path, backend):
+        storage = create_storage(backend, tmp_path)
+
+        ids = [storage.append(_record(i)) for i in range(5)]
+
+        assert ids == [f"int_{i:06d}" for i in range(1, 6)]
+        assert storage.count() == 5
+        records = storage.get_all()
+        assert [r["id"] for r in records] == ids
+        assert records[2]["timestamp"] == "2025-01-01T10:00:02"
+        storage.close()
+
+    def test_find_by_session_and_car(self, tmp_path, backend):
+        storage = create_storage(backend, tmp_path)
+        for i in range(6):
+            storage.append(_record(i, session=f"sess_{i % 2}"))
+
+        assert [r["id"] for r in storage.find(session_id="sess_1")] == ["int_000002", "int_000004", "int_000006"]
+        assert [r["id"] for r in storage.find(car_id="car_0")] == ["int_000001", "int_000004"]
+        assert storage.find(session_id="sess_0", car_id="car_2") == [storage.get_all()[2]]
+        storage.close()
+
+    def test_stats_match_full_scan(self, tmp_path, backend):
+        storage = create_storage(backend, tmp_path)
+        for record in _mixed_records():
+            storage.append(record)
+
+        stats = storage.stats()
+
+        assert stats == InteractionStorage.stats(storage)
+        assert stats.total_interactions == 12
+        assert (stats.click_count, stats.view_details_count, stats.whatsapp_contact_count) == (4, 4, 4)
+        assert (stats.unique_sessions, stats.unique_cars) == (4, 3)
+        assert stats.avg_duration_seconds == pytest.approx(30.0)
+        assert stats.last_interaction.isoformat() == "2025-01-05T10:00:00"
+        storage.close()
+
+    def test_service_roundtrip(self, tmp_path, backend):
+        service = InteractionService(data_dir=str(tmp_path), backend=backend)
+
+        for i in range(4):
+            assert service.save_interaction(_event(i)) is True
+
+        assert service.get_interactions_count() == 4
+        assert [i["car_id"] for i in service.get_interactions_by_session("sess_1")] == ["car_1", "car_3"]
+        assert service.get_interactions_by_car("car_2")[0]["interaction_type"] == "view_details"
+        assert service.get_stats().view_details_count == 4
+        service.close()
+
+
+class TestJSONLLog:
+    """Particularidades do log append-only"""
+
+    def test_two_writers_share_id_sequence(self, tmp_path):
+        first, second = JSONLLogStorage(tmp_path), JSONLLogStorage(tmp_path)
+
+        ids = [first.append(_record(0)), second.append(_record(1)), first.append(_record(2))]
+
+        assert ids == ["int_000001", "int_000002", "int_000003"]
+        assert first.count() == second.count() == 3
+        first.close()
+        second.close()
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="flock indisponível no Windows")
+    def test_concurrent_processes_never_reuse_ids(self, tmp_path):
+        ctx = multiprocessing.get_context("fork")
+        workers = [ctx.Process(target=_append_many, args=(tmp_path, w, 50)) for w in range(4)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+
+        storage = JSONLLogStorage(tmp_path)
+        ids = [r["id"] for r in storage.iter_all()]
+
+        assert storage.count() == 200
+        assert ids == [f"int_{i:06d}" for i in range(1, 201)]
+        storage.close()
+
+    def test_torn_tail_is_discarded(self, tmp_path):
+        storage = JSONLLogStorage(tmp_path)
+        storage.append(_record(0))
+        storage.close()
+        with open(tmp_path / "user_interactions.jsonl", "ab") as f:
+            f.write(b'{"session_id": "sess_')
+
+        storage = JSONLLogStorage(tmp_path)
+        new_id = storage.append(_record(1))
+
+        assert new_id == "int_000002"
+        assert [r["id"] for r in storage.iter_all()] == ["int_000001", "int_000002"]
+        storage.close()
+
+
+    def test_scan_rejects_offset_inside_a_line(self, tmp_path):
+        storage = JSONLLogStorage(tmp_path)
+        storage.append(_record(0))
+        storage.append(_record(1))
+        after_first = next(storage.scan())[0]
+
+        assert storage.is_valid_position(0)
+        assert storage.is_valid_position(after_first)
+        assert not storage.is_valid_position(7)
+        assert not storage.is_valid_position(10 ** 9)
+        assert [r["id"] for _, r in storage.scan(after=after_first)] == ["int_000002"]
+        with pytest.raises(ValueError):
+            list(storage.scan(after=7))
+        storage.close()
+
+
+class TestAggregates:
+    """Persistência e consistência dos agregados incrementais"""
+
+    def test_jsonl_reopen_resumes_from_checkpoint(self, tmp_path):
+        storage = JSONLLogStorage(tmp_path)
+        for record in _mixed_records(6):
+            storage.append(record)
+        storage.close()
+        assert (tmp_path / "user_interactions.aggregates.json").exists()
+
+        # Se o log fosse relido do início, a primeira linha (corrompida) quebraria a abertura
+        log = tmp_path / "user_interactions.jsonl"
+        content = log.read_bytes()
+        first_line_end = content.index(b"\n")
+        log.write_bytes(b"x" * first_line_end + content[first_line_end:])
+
+        reopened = JSONLLogStorage(tmp_path)
+        for record in _mixed_records(12)[6:]:
+            reopened.append(record)
+
+        assert reopened.stats().total_interactions == 12
+        assert [r["id"] for r in reopened.find(session_id="sess_3")] == ["int_000004", "int_000008", "int_000012"]
+        reopened.close()
+
+    def test_jsonl_append_does_not_write_checkpoint(self, tmp_path):
+        storage = JSONLLogStorage(tmp_path, checkpoint_interval=3600)
+        for record in _mixed_records(6):
+            storage.append(record)
+
+        assert not (tmp_path / "user_interactions.aggregates.json").exists()
+        storage.flush()
+        assert (tmp_path / "user_interactions.aggregates.json").exists()
+        storage.close()
+
+    def test_jsonl_checkpoint_written_in_background(self, tmp_path):
+        storage = JSONLLogStorage(tmp_path, checkpoint_interval=0.05)
+        for record in _mixed_records(6):
+            storage.append(record)
+
+        checkpoint = tmp_path / "user_interactions.aggregates.json"
+        deadline = time.monotonic() + 5
+        while not checkpoint.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert json.loads(checkpoint.read_text(encoding="utf-8"))["aggregates"]["total"] == 6
+        storage.close()
+
+    def test_storages_of_one_process_checkpoint_side_by_side(self, tmp_path):
+        # API e WeightOptimizerAgent abrem cada um o seu storage no mesmo diretório
+        storages = [JSONLLogStorage(tmp_path, checkpoint_interval=3600) for _ in range(2)]
+
+        def _append_and_checkpoint(storage):
+            for record in _mixed_records(20):
+                storage.append(record)
+                storage.flush()
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(_append_and_checkpoint, storages))
+
+        for storage in storages:
+            storage.close()
+
+        assert not list(tmp_path.glob("*.tmp"))
+        reopened = JSONLLogStorage(tmp_path)
+        assert reopened.count() == 40
+        assert reopened.stats() == InteractionStorage.stats(reopened)
+        reopened.close()
+
+    def test_checkpoint_state_is_a_prefix(self):
+        aggregates = InteractionAggregates()
+        for position, record in enumerate(_mixed_records(4)):
+            aggregates.add(record, position)
+        state = aggregates.checkpoint_state()
+
+        for position, record in enumerate(_mixed_records(8)[4:], start=4):
+            aggregates.add(record, position)
+        data = aggregates.to_dict(state)
+
+        assert data["total"] == 4
+        assert sum(len(p) for p in data["sessions"].values()) == 4
+        assert all(p < 4 for positions in data["cars"].values() for p in positions)
+
+    def test_jsonl_stale_checkpoint_is_ignored(self, tmp_path):
+        storage = JSONLLogStorage(tmp_path)
+        for record in _mixed_records(6):
+            storage.append(record)
+        storage.close()
+
+        # Log substituído por um menor: checkpoint aponta além do fim
+        (tmp_path / "user_interactions.jsonl").write_bytes(b"")
+        reopened = JSONLLogStorage(tmp_path)
+        reopened.append(_record(0))
+
+        assert reopened.count() == 1
+        assert reopened.stats().unique_sessions == 1
+        reopened.close()
+
+    def test_jsonl_aggregates_include_other_writers(self, tmp_path):
+        reader, writer = JSONLLogStorage(tmp_path), JSONLLogStorage(tmp_path)
+
+        for record in _mixed_records(5):
+            writer.append(record)
+
+        assert reader.stats() == writer.stats()
+        assert [r["id"] for r in reader.find(car_id="car_1")] == ["int_000002", "int_000005"]
+        reader.close()
+        writer.close()
+
+    def test_sqlite_backfills_databases_without_aggregates(self, tmp_path):
+        storage = create_storage("sqlite", tmp_path)
+        for record in _mixed_records():
+            storage.append(record)
+        # Simular banco criado antes das tabelas de agregados
+        storage._conn.executescript(
+            """
+            DROP TRIGGER trg_interactions_aggregate;
+            DROP TABLE interaction_totals;
+            DROP TABLE interaction_type_counts;
+            DROP TABLE interaction_sessions;
+            DROP TABLE interaction_cars;
+            """
+        )
+        storage.close()
+
+        reopened = create_storage("sqlite", tmp_path)
+        reopened.append(_record(99, session="sess_nova"))
+
+        stats = reopened.stats()
+        assert stats == InteractionStorage.stats(reopened)
+        assert stats.unique_sessions == 5
+        reopened.close()
+
+
+class TestLegacyMigration:
+    """Migração do user_interactions.json legado"""
+
+    def _write_legacy(self, tmp_path, trailing=""):
+        records = [{**_record(i), "id": "int_000001"} for i in range(3)]
+        content = json.dumps({"interactions": records, "metadata": {"total_count": 3}}, indent=2)
+        (tmp_path / "user_interactions.json").write_text(content + trailing, encoding="utf-8")
+
+    def test_migration_reassigns_ids_and_tolerates_garbage(self, tmp_path):
+        # Sobras de regravações concorrentes do formato antigo
+        self._write_legacy(tmp_path, trailing='\n  ],\n  "metadata": {}\n}')
+        storage = create_storage("sqlite", tmp_path)
+
+        migrated = migrate_legacy_json(tmp_path / "user_interactions.json", storage)
+
+        assert migrated == 3
+        assert [r["id"] for r in storage.get_all()] == ["int_000001", "int_000002", "int_000003"]
+        storage.close()
+
+    def test_service_imports_legacy_file_once(self, tmp_path):
+        self._write_legacy(tmp_path)
+
+        service = InteractionService(data_dir=str(tmp_path), backend="jsonl")
+        service.save_interaction(_event(9))
+        service.close()
+        reopened = InteractionService(data_dir=str(tmp_path), backend="jsonl")
+
+        assert reopened.get_interactions_count() == 4
+        assert reopened.get_all_interactions()[-1]["id"] == "int_000004"
+        reopened.close()
+        assert not (tmp_path / "user_interactions.json").exists()
+        assert (tmp_path / "user_interactions.json.migrated").exists()
+
+    @pytest.mark.parametrize("backend", ["jsonl", "sqlite"])
+    def test_workers_starting_together_import_once(self, tmp_path, backend):
+        # Dois workers que abriram o backend antes de qualquer migração
+        self._write_legacy(tmp_path)
+        storages = [create_storage(backend, tmp_path) for _ in range(2)]
+        assert all(storage.count() == 0 for storage in storages)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            migrated = list(pool.map(
+                lambda storage: import_legacy_json(tmp_path / "user_interactions.json", storage),
+                storages
+            ))
+
+        assert sorted(migrated) == [0, 3]
+        assert [storage.count() for storage in storages] == [3, 3]
+        for storage in storages:
+            storage.close()
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            InteractionService(data_dir=str(tmp_path), backend="parquet")
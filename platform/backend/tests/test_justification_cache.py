@@ -0,0 +1,192 @@
+"""
+Testes do cache de justificativas LLM
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from services.agents.cache_manager import CacheManager
+from services.justification_cache import JustificationCache, profile_signature
+from services.llm_justification_service import LLMJustificationService
+
+
+LLM_TEXT = (
+    "O Fiat Argo é econômico e cabe no seu orçamento, com custo mensal "
+    "tranquilo e boa confiabilidade para o dia a dia."
+)
+
+
+# Carro dos testes: make_car (conftest.py) com estes campos
+ARGO = dict(
+    nome="Fiat Argo",
+    marca="Fiat",
+    modelo="Argo",
+    ano=2022,
+    preco=70000,
+    quilometragem=15000,
+)
+
+
+@pytest.fixture
+def profile_defaults():
+    return dict(
+        orcamento_min=50000,
+        orcamento_max=90000,
+        uso_principal="familia",
+        state="SP",
+        prioridades={"economia": 5, "seguranca": 4, "conforto": 2},
+    )
+
+
+def _llm_client():
+    client = MagicMock()
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = LLM_TEXT
+    client.chat.completions.create.return_value = response
+    return client
+
+
+def _service(cache):
+    service = LLMJustificationService(justification_cache=cache)
+    service.primary_client = _llm_client()
+    service.fallback_client = None
+    return service
+
+
+def _request(car, profile, position=1):
+    return {
+        "car": car,
+        "profile": profile,
+        "score": 0.8,
+        "position": position,
+        "total_results": 5,
+        "tco_breakdown": {},
+    }
+
+
+class TestProfileSignature:
+    """Assinatura normalizada do perfil"""
+
+    def test_equivalent_profiles_share_signature(self, make_profile):
+        a = make_profile(orcamento_max=91000, prioridades={"seguranca": 5, "economia": 4, "espaco": 1}, state="sp")
+        b = make_profile(orcamento_max=95000, prioridades={"economia": 4, "seguranca": 4})
+
+        assert profile_signature(a) == profile_signature(b)
+
+    @pytest.mark.parametrize("overrides", [
+        dict(uso_principal="trabalho"),
+        dict(orcamento_max=120000),
+        dict(state="RJ"),
+        dict(prioridades={"performance": 5}),
+    ])
+    def test_relevant_changes_change_signature(self, overrides, make_profile):
+        assert profile_signature(make_profile()) != profile_signature(make_profile(**overrides))
+
+
+class TestJustificationCache:
+    """Camada local (LRU + TTL)"""
+
+    def test_key_includes_version_car_and_position(self, make_car, make_profile):
+        cache = JustificationCache()
+        key = cache.make_key(make_car(1, **ARGO), make_profile(), 2)
+
+        assert key.startswith("justification:v")
+        assert ":car_001:" in key
+        assert key.endswith(":2")
+        assert key != cache.make_key(make_car(1, **ARGO), make_profile(), 3)
+
+    def test_prompt_version_changes_key(self, make_car, make_profile):
+        cache = JustificationCache()
+        key = cache.make_key(make_car(1, **ARGO), make_profile(), 1)
+
+        with patch('services.justification_cache.PROMPT_TEMPLATE_VERSION', "999"):
+            assert cache.make_key(make_car(1, **ARGO), make_profile(), 1) != key
+
+    def test_lru_eviction(self):
+        cache = JustificationCache(max_size=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.get("a")  # "a" passa a ser o mais recente
+        cache.set("c", "C")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self):
+        cache = JustificationCache(ttl_seconds=10)
+
+        with patch('services.justification_cache.time.time', return_value=1000.0):
+            cache.set("a", "A")
+        with patch('services.justification_cache.time.time', return_value=1011.0):
+            assert cache.get("a") is None
+
+        assert len(cache) == 0
+
+
+class TestServiceCaching:
+    """Integração com LLMJustificationService"""
+
+    def test_repeat_request_skips_llm(self, make_car, make_profile):
+        service = _service(JustificationCache())
+        car, profile = make_car(1, **ARGO), make_profile()
+
+        first = service.generate_justification(**_request(car, profile))
+        second = service.generate_justification(**_request(car, make_profile(orcamento_max=92000)))
+
+        assert first == second
+        assert service.primary_client.chat.completions.create.call_count == 1
+
+        metrics = service.get_metrics()
+        assert metrics["cache_hits"] == 1
+        assert metrics["cache_misses"] == 1
+
+    def test_template_fallback_is_not_cached(self, make_car, make_profile):
+        service = _service(JustificationCache())
+        service.primary_client = None
+
+        service.generate_justification(**_request(make_car(1, **ARGO), make_profile()))
+
+        assert len(service.cache) == 0
+
+    def test_cache_disabled(self):
+        service = LLMJustificationService(enable_cache=False)
+
+        assert service.cache is None
+        assert service.get_metrics()["cache_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_cache(self, make_car, make_profile):
+        service = _service(JustificationCache())
+        profile = make_profile()
+        requests = [_request(make_car(i, **ARGO), profile, position=i + 1) for i in range(3)]
+
+        await service.generate_justifications_batch(requests)
+        await service.generate_justifications_batch(requests)
+
+        assert service.primary_client.chat.completions.create.call_count == 3
+        assert service.get_metrics()["cache_hits"] == 3
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_shared_between_workers(self, make_car, make_profile):
+        fakeredis = pytest.importorskip("fakeredis")
+
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+        def _worker():
+            manager = CacheManager(enable_redis=False)
+            manager.redis_client = redis_client
+            manager.redis_available = True
+            return _service(JustificationCache(cache_manager=manager))
+
+        worker_a, worker_b = _worker(), _worker()
+        request = _request(make_car(1, **ARGO), make_profile())
+
+        first = await worker_a.generate_justifications_batch([request])
+        second = await worker_b.generate_justifications_batch([request])
+
+        assert first == second
+        assert worker_b.primary_client.chat.completions.create.call_count == 0
+        assert worker_b.get_metrics()["cache_remote_hits"] == 1
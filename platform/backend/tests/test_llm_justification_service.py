@@ -2,6 +2,10 @@
 Testes para LLMJustificationService (Fase 1)
 """
 
+import asyncio
+import threading
+import time
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from services.llm_justification_service import LLMJustificationService
@@ -338,3 +342,265 @@ class TestLLMJustificationService:
 
         # Deve mencionar valores ou custos
         assert "R$" in result or "custo" in result.lower()
+
+
+class _SlowClient:
+    """Cliente fake com latência configurável por carro (chat.completions.create)"""
+
+    def __init__(self, latencies, default_latency=0.2):
+        self.latencies = latencies
+        self.default_latency = default_latency
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self.chat = MagicMock()
+        self.chat.completions.create.side_effect = self._create
+
+    def _create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        name, latency = next(
+            ((name, value) for name, value in self.latencies.items() if name in prompt),
+            ("este carro", self.default_latency)
+        )
+
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(latency)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = (
+            f"O {name} combina espaço, economia e segurança para a sua família, "
+            "com custo mensal que cabe no seu orçamento."
+        )
+        return response
+
+
+class TestGenerateJustificationsBatch:
+    """Testes do modo lote (chamadas concorrentes com prazo)"""
+
+    @staticmethod
+    def _make_car(i):
+        return Car(
+            id=f"batch-car-{i}",
+            nome=f"Carro Lote {i}",
+            marca="Fiat",
+            modelo=f"Modelo{i}",
+            ano=2022,
+            preco=70000,
+            quilometragem=15000,
+            combustivel="Flex",
+            categoria="Hatch",
+            dealership_id="dealer-1",
+            dealership_name="Concessionária Teste",
+            dealership_city="São Paulo",
+            dealership_state="SP",
+            dealership_phone="(11) 9999-9999",
+            dealership_whatsapp="5511999999999"
+        )
+
+    @pytest.fixture
+    def profile(self):
+        return UserProfile(orcamento_min=50000, orcamento_max=90000, uso_principal="familia")
+
+    def _requests(self, n, profile):
+        return [
+            {
+                "car": self._make_car(i),
+                "profile": profile,
+                "score": 0.8,
+                "position": i + 1,
+                "total_results": n,
+                "tco_breakdown": {},
+            }
+            for i in range(n)
+        ]
+
+    def _service(self, client, **kwargs):
+        service = LLMJustificationService(**kwargs)
+        service.primary_client = client
+        service.fallback_client = None
+        return service
+
+    @pytest.mark.asyncio
+    async def test_batch_runs_concurrently(self, profile):
+        client = _SlowClient({}, default_latency=0.2)
+        service = self._service(client, max_concurrency=5)
+
+        start = time.perf_counter()
+        results = await service.generate_justifications_batch(self._requests(5, profile))
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 5
+        # Sequencial levaria ~1s
+        assert elapsed < 0.8
+        assert service.get_metrics()["template_usage_rate"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_respected(self, profile):
+        client = _SlowClient({}, default_latency=0.05)
+        service = self._service(client)
+
+        results = await service.generate_justifications_batch(
+            self._requests(8, profile), max_concurrency=2
+        )
+
+        assert len(results) == 8
+        assert client.max_active <= 2
+
+    @pytest.mark.asyncio
+    async def test_deadline_falls_back_to_template(self, profile):
+        client = _SlowClient({"Carro Lote 1": 2.0}, default_latency=0.01)
+        service = self._service(client)
+        requests = self._requests(3, profile)
+
+        start = time.perf_counter()
+        results = await service.generate_justifications_batch(requests, deadline_seconds=0.5)
+        elapsed = time.perf_counter() - start
+
+        expected_template = service._generate_template_fallback(
+            requests[1]["car"], profile, 0.8, {}
+        )
+
+        assert elapsed < 1.5
+        assert results[1] == expected_template
+        assert results[0] != expected_template
+        assert results[2] != expected_template
+        assert service.get_metrics()["deadline_fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_metrics_count_every_worker_call(self, profile):
+        client = _SlowClient({}, default_latency=0.001)
+        service = self._service(client, max_concurrency=16)
+
+        results = await service.generate_justifications_batch(self._requests(64, profile))
+
+        assert len(results) == 64
+        assert service.metrics["total_calls"] == 64
+        assert service.metrics["primary_calls"] == service.metrics["primary_success"] == 64
+
+    @pytest.mark.asyncio
+    async def test_preserves_request_order(self, profile):
+        # Primeiros carros terminam por último
+        latencies = {f"Carro Lote {i}": 0.05 * (4 - i) for i in range(4)}
+        client = _SlowClient(latencies)
+        service = self._service(client, max_concurrency=4)
+
+        requests = self._requests(4, profile)
+        results = await service.generate_justifications_batch(requests)
+
+        for request, result in zip(requests, results):
+            assert request["car"].nome in result
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        service = LLMJustificationService()
+
+        assert await service.generate_justifications_batch([]) == []
+
+
+class _AsyncSlowClient:
+    """Cliente async fake (AsyncGroq/AsyncOpenAI) com latência por carro"""
+
+    def __init__(self, latencies, default_latency=0.1):
+        self.latencies = latencies
+        self.default_latency = default_latency
+        self.cancelled = 0
+        self.chat = MagicMock()
+        self.chat.completions.create = self._create
+
+    async def _create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        latency = next(
+            (value for name, value in self.latencies.items() if name in prompt),
+            self.default_latency
+        )
+        try:
+            await asyncio.sleep(latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = (
+            "Este carro combina espaço, economia e segurança para a sua família, "
+            "com custo mensal que cabe no seu orçamento."
+        )
+        return response
+
+
+class TestAsyncClients:
+    """Modo lote com clientes async (sem threads)"""
+
+    def _service(self, async_client):
+        service = LLMJustificationService(enable_cache=False)
+        service.primary_client = None
+        service.fallback_client = None
+        service.primary_async_client = async_client
+        return service
+
+    def _requests(self, n):
+        profile = UserProfile(orcamento_min=50000, orcamento_max=90000, uso_principal="familia")
+        return [
+            {
+                "car": TestGenerateJustificationsBatch._make_car(i),
+                "profile": profile,
+                "score": 0.8,
+                "position": i + 1,
+                "total_results": n,
+                "tco_breakdown": {},
+            }
+            for i in range(n)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_uses_async_client_without_threads(self):
+        service = self._service(_AsyncSlowClient({}, default_latency=0.2))
+
+        with patch('services.llm_justification_service.ThreadPoolExecutor') as executor:
+            start = time.perf_counter()
+            results = await service.generate_justifications_batch(self._requests(5))
+            elapsed = time.perf_counter() - start
+
+        executor.assert_not_called()
+        assert len(results) == 5
+        assert elapsed < 0.8
+        assert service.get_metrics()["primary_success_rate"] == 1.0
+
+    def test_sync_path_does_not_use_async_client(self):
+        """recommend() roda cada lote num loop novo: só clientes síncronos"""
+        async_client = _AsyncSlowClient({})
+        async_client.chat.completions.create = MagicMock(side_effect=AssertionError("cliente async usado"))
+        service = self._service(async_client)
+        service.primary_client = _SlowClient({}, default_latency=0.01)
+
+        for _ in range(2):
+            results = asyncio.run(
+                service.generate_justifications_batch(self._requests(3), async_clients=False)
+            )
+            assert len(results) == 3
+
+        async_client.chat.completions.create.assert_not_called()
+        assert service.get_metrics()["primary_success_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_pending_call(self):
+        client = _AsyncSlowClient({"Carro Lote 0": 5.0}, default_latency=0.01)
+        service = self._service(client)
+
+        results = await service.generate_justifications_batch(
+            self._requests(2), deadline_seconds=0.3
+        )
+        await asyncio.sleep(0)
+
+        assert client.cancelled == 1
+        assert service.get_metrics()["deadline_fallbacks"] == 1
+        assert results[0] == service._generate_template_fallback(
+            self._requests(1)[0]["car"], self._requests(1)[0]["profile"], 0.8, {}
+        )
@@ -27,10 +27,19 @@ import os
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, backend_dir)
 
+import api.main as api_main
 from api.main import app
 from services.interaction_service import InteractionService
 
 
+@pytest.fixture(autouse=True)
+def isolated_interaction_service(tmp_path, monkeypatch):
+    """Cada teste grava as interações em um diretório temporário"""
+    service = InteractionService(data_dir=str(tmp_path))
+    monkeypatch.setattr(api_main, "interaction_service", service)
+    return service
+
+
 class TestMLAPIEndpointsE2E:
     """
     Testes E2E para endpoints de ML da API
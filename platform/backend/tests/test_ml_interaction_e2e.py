@@ -50,8 +50,8 @@ class TestInteractionServiceE2E:
     
     @pytest.fixture
     def interaction_service(self, temp_data_dir):
-        """Cria instância do serviço com diretório temporário"""
-        return InteractionService(data_dir=temp_data_dir)
+        """Cria instância do serviço com diretório temporário (formato JSON legado)"""
+        return InteractionService(data_dir=temp_data_dir, backend="json")
     
     @pytest.fixture
     def sample_user_preferences(self):
@@ -0,0 +1,168 @@
+"""
+Testes das sessões de refinamento (candidatos e justificativas entre rodadas)
+"""
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.main as api_main
+from services.refinement_session import RefinementSessionStore
+from services.unified_recommendation_engine import UnifiedRecommendationEngine
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BASE_PROFILE = {
+    "orcamento_min": 40000,
+    "orcamento_max": 150000,
+    "uso_principal": "familia",
+    "state": "SP",
+    "prioridades": {"economia": 4, "espaco": 5, "seguranca": 5, "conforto": 3, "performance": 2},
+}
+
+
+@pytest.fixture
+def profile_defaults():
+    return dict(BASE_PROFILE)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return UnifiedRecommendationEngine(data_dir=os.path.join(BACKEND_DIR, "data"), use_llm=False)
+
+
+def _summary(recommendations):
+    return [(r["car"].id, r["score"]) for r in recommendations]
+
+
+class TestPrepareAndRankCandidates:
+
+    @pytest.mark.parametrize("overrides", [
+        {},
+        {"uso_principal": "comercial"},
+        {"uso_principal": "trabalho", "marcas_preferidas": ["Fiat", "Chevrolet"]},
+        {"ano_minimo": 2018, "prioridades": {"economia": 5}},
+    ])
+    def test_split_matches_rank(self, engine, overrides, make_profile):
+        profile = make_profile(**overrides)
+
+        candidates = engine.prepare_ranking(profile)
+        split = (
+            engine.rank_candidates(candidates, profile, limit=10, score_threshold=0.3)
+            if candidates is not None else []
+        )
+
+        assert _summary(split) == _summary(engine.rank(profile, limit=10, score_threshold=0.3))
+
+    def test_candidates_reusable_only_when_priorities_change(self, engine, make_profile):
+        profile = make_profile()
+        candidates = engine.prepare_ranking(profile)
+        index = engine.get_inventory_index()
+
+        assert len(candidates) > 10
+        assert candidates.matches(make_profile(prioridades={"economia": 1, "espaco": 2}), index)
+        assert not candidates.matches(make_profile(orcamento_max=90000), index)
+        assert not candidates.matches(make_profile(marcas_preferidas=["Fiat"]), index)
+
+
+class TestRefinementSession:
+
+    def test_priority_only_round_reuses_candidates(self, engine, monkeypatch, make_profile):
+        session = RefinementSessionStore().get_or_create("user", "sess")
+        session.rank(engine, make_profile(), limit=10, score_threshold=0.3)
+
+        def _fail(profile):
+            raise AssertionError("rodada só de pesos não deveria refazer filtros/TCO")
+
+        monkeypatch.setattr(engine, "prepare_ranking", _fail)
+        reweighted = make_profile(prioridades={"economia": 5, "espaco": 1, "seguranca": 2})
+        recommendations = session.rank(engine, reweighted, limit=10, score_threshold=0.3)
+        monkeypatch.undo()
+
+        assert session.reused_rounds == 1
+        assert _summary(recommendations) == _summary(engine.rank(reweighted, limit=10, score_threshold=0.3))
+
+    def test_profile_change_recomputes(self, engine, make_profile):
+        session = RefinementSessionStore().get_or_create("user", "sess")
+        session.rank(engine, make_profile(), limit=10, score_threshold=0.3)
+        first = session.candidates
+
+        session.rank(engine, make_profile(orcamento_max=80000), limit=10, score_threshold=0.3)
+
+        assert session.candidates is not first
+        assert session.reused_rounds == 0
+
+    def test_only_new_entries_get_justifications(self, engine, monkeypatch, make_profile):
+        session = RefinementSessionStore().get_or_create("user", "sess")
+        calls = []
+        original = engine.generate_justifications_batch
+
+        async def _spy(recommendations, profile, indexes=None):
+            calls.append(list(indexes))
+            return await original(recommendations, profile, indexes=indexes)
+
+        monkeypatch.setattr(engine, "generate_justifications_batch", _spy)
+
+        profile = make_profile()
+        first = session.rank(engine, profile, limit=5, score_threshold=0.3)
+        assert asyncio.run(session.justify(engine, first, profile)) == len(first)
+
+        second = session.rank(engine, profile, limit=8, score_threshold=0.3)
+        new = asyncio.run(session.justify(engine, second, profile))
+
+        assert new == len(second) - len(first)
+        assert calls[1] == list(range(len(first), len(second)))
+        assert all(rec["justificativa"] for rec in second)
+        assert [r["justificativa"] for r in second[:len(first)]] == [r["justificativa"] for r in first]
+
+
+class TestRefinementSessionStore:
+
+    def test_lru_limit(self):
+        store = RefinementSessionStore(max_sessions=2, ttl_seconds=60)
+
+        a = store.get_or_create("u", "a")
+        store.get_or_create("u", "b")
+        assert store.get_or_create("u", "a") is a
+        store.get_or_create("u", "c")
+
+        assert len(store) == 2
+        assert store.get_or_create("u", "a") is a
+
+    def test_expired_session_is_replaced(self):
+        store = RefinementSessionStore(ttl_seconds=0)
+
+        first = store.get_or_create("u", "a")
+
+        assert store.get_or_create("u", "a") is not first
+
+
+class TestRefineEndpoint:
+
+    def test_second_round_reuses_session(self, engine, monkeypatch):
+        store = RefinementSessionStore()
+        monkeypatch.setattr(api_main, "refinement_sessions", store)
+        monkeypatch.setattr(api_main, "engine", engine)
+        client = TestClient(api_main.app)
+
+        payload = {
+            "user_id": "user_refine",
+            "session_id": "sess_refine",
+            "current_profile": BASE_PROFILE,
+            "feedbacks": [
+                {"user_id": "user_refine", "car_id": "x1", "action": "liked", "car_categoria": "SUV", "car_ano": 2023},
+                {"user_id": "user_refine", "car_id": "x2", "action": "liked", "car_categoria": "SUV", "car_ano": 2023},
+            ],
+        }
+
+        first = client.post("/refine-recommendations", json=payload)
+        second = client.post("/refine-recommendations", json=payload)
+
+        assert first.status_code == second.status_code == 200
+        assert first.json()["recommendations"]
+        session = store.get_or_create("user_refine", "sess_refine")
+        assert session.rounds == 2 and session.reused_rounds == 1
+        assert [r["car"]["id"] for r in second.json()["recommendations"]] == \
+            [r["car"]["id"] for r in first.json()["recommendations"]]
@@ -0,0 +1,135 @@
+"""
+Testes de paridade: score_batch (vetorizado) vs calculate_match_score (escalar)
+"""
+import numpy as np
+import pytest
+
+from models.user_profile import UserProfile
+from services.unified_recommendation_engine import UnifiedRecommendationEngine
+
+
+TOLERANCE = 1e-9
+
+
+MARCAS = ["Fiat", "Toyota", "Honda", "Renault", "Chevrolet", "Peugeot"]
+MODELOS = {
+    "Fiat": ["Strada", "Fiorino", "Toro"],
+    "Toyota": ["Hilux", "Corolla"],
+    "Honda": ["Civic", "HR-V"],
+    "Renault": ["Kangoo", "Master", "Kwid"],
+    "Chevrolet": ["Montana", "Onix"],
+    "Peugeot": ["Partner", "208"],
+}
+
+
+def _modelo(i):
+    modelos = MODELOS[MARCAS[i % len(MARCAS)]]
+    return modelos[i % len(modelos)]
+
+
+# Colunas do inventário sintético (make_inventory, em conftest.py)
+INVENTORY_COLUMNS = dict(
+    dealership_id=["dealer"],
+    marca=MARCAS,
+    modelo=_modelo,
+    ano=lambda i: 2014 + (i % 10),
+    preco=lambda i: 35000 + (i * 1750),
+    quilometragem=lambda i: 10000 + (i * 1500),
+    combustivel=["Flex", "Gasolina", "Diesel"],
+    categoria=["Hatch", "Sedan", "SUV", "Pickup", "Compacto", "Van", "Furgão", "Categoria Nova"],
+    score_familia=lambda i: (i * 7 % 10) / 10,
+    score_economia=lambda i: (i * 3 % 10) / 10,
+    score_performance=lambda i: (i * 5 % 10) / 10,
+    score_conforto=lambda i: (i * 9 % 10) / 10,
+    score_seguranca=lambda i: (i % 10) / 10,
+    indice_revenda=lambda i: (i * 11 % 10) / 10,
+    indice_confiabilidade=lambda i: (i * 13 % 10) / 10,
+    custo_manutencao_anual=[None, 1200.0, 1500.0, 3200.0, 7999.0, 8000.0, 12000.0],
+)
+
+
+@pytest.fixture
+def engine(tmp_path, make_inventory):
+    engine = UnifiedRecommendationEngine(data_dir=str(tmp_path), use_llm=False)
+    engine.all_cars = make_inventory(80, **INVENTORY_COLUMNS)
+    return engine
+
+
+PROFILES = [
+    dict(uso_principal="familia"),
+    dict(uso_principal="primeiro_carro", prioridades={"economia": 5, "confiabilidade": 4}),
+    dict(uso_principal="trabalho", prioridades={"custo_manutencao": 5, "conforto": 1}),
+    dict(uso_principal="lazer", prioridades={"performance": 5, "prioridade_desconhecida": 3}),
+    dict(uso_principal="transporte_passageiros", prioridades={}),
+    dict(uso_principal="uso_desconhecido", prioridades={"economia": 0}),
+    dict(
+        uso_principal="familia",
+        marcas_preferidas=["Toyota", "Honda"],
+        marcas_rejeitadas=["Fiat", "Toyota"],
+        tipos_preferidos=["SUV"],
+        combustivel_preferido="Flex",
+    ),
+    dict(uso_principal="trabalho", orcamento_min=80000, orcamento_max=80000),
+    dict(uso_principal="trabalho", orcamento_min=50000, orcamento_max=90000),
+]
+
+
+class TestScoreBatchParity:
+    """score_batch deve reproduzir o caminho escalar"""
+
+    @pytest.mark.parametrize("profile_kwargs", PROFILES)
+    def test_matches_scalar_path(self, engine, profile_kwargs):
+        kwargs = {"orcamento_min": 30000, "orcamento_max": 200000, **profile_kwargs}
+        profile = UserProfile(**kwargs)
+
+        index = engine.get_inventory_index()
+        rows = np.arange(index.size)
+
+        batch = engine.score_batch(rows, profile)
+        scalar = [engine.calculate_match_score(car, profile) for car in engine.all_cars]
+
+        assert batch.shape == (len(engine.all_cars),)
+        np.testing.assert_allclose(batch, scalar, atol=TOLERANCE)
+
+    def test_subset_preserves_candidate_order(self, engine):
+        profile = UserProfile(orcamento_min=30000, orcamento_max=200000, uso_principal="familia")
+        rows = np.array([42, 3, 17, 3])
+
+        batch = engine.score_batch(rows, profile)
+        scalar = [engine.calculate_match_score(engine.all_cars[r], profile) for r in rows]
+
+        np.testing.assert_allclose(batch, scalar, atol=TOLERANCE)
+
+    def test_commercial_suitability_penalty(self, engine):
+        profile = UserProfile(orcamento_min=30000, orcamento_max=200000, uso_principal="comercial")
+
+        # Popula o cache de adequação comercial como no fluxo de recomendação
+        candidates = engine.filter_by_commercial_use(engine.all_cars, profile)
+        assert candidates
+
+        index = engine.get_inventory_index()
+        rows = index.rows_for(candidates)
+
+        batch = engine.score_batch(rows, profile)
+        scalar = [engine.calculate_match_score(car, profile) for car in candidates]
+
+        np.testing.assert_allclose(batch, scalar, atol=TOLERANCE)
+
+    def test_empty_candidates(self, engine):
+        profile = UserProfile(orcamento_min=30000, orcamento_max=200000, uso_principal="familia")
+
+        assert len(engine.score_batch(np.array([], dtype=np.intp), profile)) == 0
+
+    def test_recommend_scores_match_scalar(self, engine):
+        profile = UserProfile(orcamento_min=30000, orcamento_max=200000, uso_principal="trabalho")
+
+        results = engine.recommend(profile, limit=20, score_threshold=0.0)
+
+        assert results
+        for rec in results:
+            expected = engine.apply_financial_bonus(
+                engine.calculate_match_score(rec['car'], profile),
+                rec['tco_breakdown'],
+                profile
+            )
+            assert rec['score'] == pytest.approx(expected, abs=TOLERANCE)
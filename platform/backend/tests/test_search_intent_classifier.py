@@ -0,0 +1,130 @@
+"""
+Testes do SearchIntentClassifier (padrões pré-compilados e cache de análises)
+"""
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.search_intent_classifier import IntentCategory, SearchIntentClassifier
+
+
+QUERIES = [
+    "preciso de um carro para fazer uber",
+    "Toyota Corolla para trabalho diário",
+    "SUV para família com crianças pequenas",
+    "pickup para entregas na minha empresa",
+    "meu primeiro carro, algo econômico",
+    "carro para viajar no fim de semana",
+    "Honda Civic 2020 até 80 mil reais",
+    "não quero para uber, é pra familia",
+    "hilux para lazer e passeio na praia",
+    "carro economico pra uber e trabalho todo dia",
+    "strada ou saveiro para frete",
+    "hatch flex barato de manter R$ 45.000",
+    "onix",
+    "",
+]
+
+
+def _reference_scores(classifier, query):
+    """Cálculo original: re.findall por padrão, sem pré-compilação"""
+    scores = defaultdict(float)
+    for intent, patterns in classifier.intent_patterns.items():
+        score = 0.0
+        for pattern in patterns.get('primary_patterns', []):
+            score += len(re.findall(pattern, query, re.IGNORECASE)) * 1.0
+        for pattern in patterns.get('context_patterns', []):
+            score += len(re.findall(pattern, query, re.IGNORECASE)) * 0.5
+        for pattern in patterns.get('negative_patterns', []):
+            score -= len(re.findall(pattern, query, re.IGNORECASE)) * 0.8
+        scores[intent] = max(0.0, score * patterns.get('weight', 1.0))
+
+    max_score = max(scores.values()) if scores else 1.0
+    if max_score > 0:
+        for intent in scores:
+            scores[intent] /= max_score
+    return dict(scores)
+
+
+def _reference_entities(classifier, query):
+    entities = []
+    for entity_type, config in classifier.entity_patterns.items():
+        for match in re.finditer(config['pattern'], query, re.IGNORECASE):
+            value = config['extract_func'](match.group())
+            if value:
+                entities.append((entity_type, value, match.start()))
+    return entities
+
+
+@pytest.fixture
+def classifier():
+    return SearchIntentClassifier()
+
+
+class TestCompiledMatcher:
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_scores_match_per_pattern_reference(self, classifier, query):
+        assert classifier._calculate_intent_scores(query.lower()) == \
+            _reference_scores(classifier, query.lower())
+
+    @pytest.mark.parametrize("query", QUERIES)
+    def test_entities_match_reference(self, classifier, query):
+        entities = [(e.type, e.value, e.position) for e in classifier._extract_all_entities(query)]
+        assert entities == _reference_entities(classifier, query)
+
+    def test_classification(self, classifier):
+        analysis = classifier.classify_intent("carro para fazer uber e corridas")
+
+        assert analysis.primary_intent == IntentCategory.UBER_TRANSPORT
+        assert analysis.confidence == 1.0
+
+    def test_keywords(self, classifier):
+        assert classifier._extract_keywords("carro economico e espacoso, NOVO") == \
+            ["economico", "espacoso", "novo"]
+
+
+class TestAnalysisCache:
+
+    def test_repeated_query_is_served_from_cache(self, classifier, monkeypatch):
+        first = classifier.classify_intent("SUV para familia")
+
+        monkeypatch.setattr(classifier, "_classify", lambda *args: pytest.fail("cache não usado"))
+        assert classifier.classify_intent("SUV para familia") is first
+
+    def test_cache_is_bounded_lru(self):
+        classifier = SearchIntentClassifier(cache_size=2)
+
+        classifier.classify_intent("a")
+        classifier.classify_intent("b")
+        classifier.classify_intent("a")
+        classifier.classify_intent("c")
+
+        assert list(classifier._analysis_cache) == ["a", "c"]
+
+    def test_concurrent_eviction(self):
+        """Rotas síncronas chamam de várias threads (threadpool do FastAPI)"""
+        classifier = SearchIntentClassifier(cache_size=4)
+        queries = [f"{QUERIES[i % len(QUERIES)]} {i % 16}" for i in range(2000)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(classifier.classify_intent, queries))
+
+        assert len(results) == len(queries)
+        assert len(classifier._analysis_cache) <= 4
+
+    def test_user_context_bypasses_cache(self, classifier):
+        plain = classifier.classify_intent("carro para familia")
+        with_context = classifier.classify_intent("carro para familia", {"has_children": True})
+
+        assert with_context is not plain
+        assert len(classifier._analysis_cache) == 1
+
+    def test_cache_disabled(self):
+        classifier = SearchIntentClassifier(cache_size=0)
+
+        classifier.classify_intent("uber")
+
+        assert len(classifier._analysis_cache) == 0
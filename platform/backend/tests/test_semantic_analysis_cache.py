@@ -0,0 +1,169 @@
+"""
+Memoização do SemanticAnalysisService.analyze_profile (TTL, single-flight,
+warm-start e preenchimento em background)
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.semantic_analysis_service import (
+    SemanticAnalysisService,
+    WARM_START_ADJUSTMENTS,
+    main_priority,
+    profile_signature,
+)
+
+
+LLM_RESPONSE = '{"safety": 0.25, "space": 0.2, "comfort": 0.1}'
+
+
+@pytest.fixture
+def profile_defaults():
+    return dict(
+        orcamento_min=80000,
+        orcamento_max=120000,
+        uso_principal="familia",
+        tamanho_familia=4,
+        tem_criancas=True,
+    )
+
+
+class FakeSLM:
+    """Substitui _call_llm: conta chamadas e pode segurar a resposta"""
+
+    def __init__(self, response=LLM_RESPONSE, fail=False):
+        self.response = response
+        self.fail = fail
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, client, model, prompt):
+        self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("SLM indisponível")
+        return self.response
+
+
+@pytest.fixture
+def slm():
+    return FakeSLM()
+
+
+@pytest.fixture
+def service(slm):
+    service = SemanticAnalysisService(cache_ttl_seconds=60, cache_max_size=100)
+    service.primary_client = object()
+    service.fallback_client = None
+    service._call_llm = slm
+    return service
+
+
+def test_signature_is_canonical(make_profile):
+    base = make_profile(prioridades={"seguranca": 5, "economia": 3})
+    reordered = make_profile(prioridades={"economia": 3, "seguranca": 5})
+    same_band = make_profile(orcamento_min=81000, orcamento_max=125000, prioridades={"seguranca": 5, "economia": 3})
+    other = make_profile(prioridades={"seguranca": 3, "economia": 5})
+
+    assert profile_signature(base) == profile_signature(reordered)
+    assert profile_signature(base) == profile_signature(same_band)
+    assert profile_signature(base) != profile_signature(other)
+
+
+def test_miss_returns_immediately_and_fills_in_background(service, slm, make_profile):
+    slm.release.clear()
+    profile = make_profile(prioridades={"seguranca": 5})
+
+    start = time.perf_counter()
+    first = service.analyze_profile(profile)
+    assert time.perf_counter() - start < 1.0
+
+    # Resposta imediata = tabela de warm-start (uso + prioridade principal)
+    assert first == WARM_START_ADJUSTMENTS[("familia", "seguranca")]
+
+    slm.release.set()
+    final = service.analyze_profile(profile, wait=True)
+    assert final == {"safety": 0.25, "space": 0.2, "comfort": 0.1}
+
+    # Próximas chamadas: cache
+    assert service.analyze_profile(profile) == final
+    stats = service.get_cache_stats()
+    assert stats['llm_calls'] == 1
+    assert stats['hits'] >= 1
+    assert slm.calls == 1
+
+
+def test_unknown_usage_falls_back_to_heuristic(service, slm, make_profile):
+    slm.release.clear()
+    profile = make_profile(uso_principal="viagem_familia")
+
+    assert main_priority(profile) is None
+    assert service.analyze_profile(profile) == service._heuristic_fallback(profile)
+    slm.release.set()
+
+
+def test_concurrent_equivalent_profiles_share_one_call(service, slm, make_profile):
+    slm.release.clear()
+    profiles = [make_profile(orcamento_max=120000 + i) for i in range(16)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        immediate = list(pool.map(service.analyze_profile, profiles))
+        waiting = [pool.submit(service.analyze_profile, p, True) for p in profiles[:4]]
+        slm.release.set()
+        results = [f.result(timeout=5) for f in waiting]
+
+    assert slm.calls == 1
+    assert service.get_cache_stats()['coalesced'] >= 15
+    assert all(r == {"safety": 0.25, "space": 0.2, "comfort": 0.1} for r in results)
+    assert all(isinstance(r, dict) for r in immediate)
+
+
+def test_ttl_expiry_triggers_new_call(slm, make_profile):
+    service = SemanticAnalysisService(cache_ttl_seconds=0.05)
+    service.primary_client = object()
+    service._call_llm = slm
+    profile = make_profile()
+
+    service.analyze_profile(profile, wait=True)
+    time.sleep(0.1)
+    service.analyze_profile(profile, wait=True)
+
+    assert slm.calls == 2
+
+
+def test_provider_failure_caches_heuristic_briefly(slm, make_profile):
+    slm.fail = True
+    service = SemanticAnalysisService(cache_ttl_seconds=60)
+    service.primary_client = object()
+    service._call_llm = slm
+    profile = make_profile(uso_principal="trabalho")
+
+    result = service.analyze_profile(profile, wait=True)
+
+    assert result == service._heuristic_fallback(profile)
+    assert service.analyze_profile(profile) == result
+    assert slm.calls == 1
+
+
+def test_lru_limit(slm, make_profile):
+    service = SemanticAnalysisService(cache_ttl_seconds=60, cache_max_size=3)
+    service.primary_client = object()
+    service._call_llm = slm
+
+    for i in range(5):
+        service.analyze_profile(make_profile(tamanho_familia=i + 1), wait=True)
+
+    assert service.get_cache_stats()['size'] == 3
+
+
+def test_without_clients_uses_heuristic_synchronously(make_profile):
+    service = SemanticAnalysisService()
+    service.primary_client = None
+    service.fallback_client = None
+    profile = make_profile()
+
+    assert service.analyze_profile(profile) == service._heuristic_fallback(profile)
+    assert service.get_cache_stats()['llm_calls'] == 0
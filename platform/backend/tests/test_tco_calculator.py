@@ -13,8 +13,14 @@ Author: FacilIAuto
 Date: 2025-11-05
 """
 
+import numpy as np
 import pytest
-from services.tco_calculator import TCOCalculator, TCOBreakdown
+from services.tco_calculator import (
+    TCOCalculator,
+    TCOBreakdown,
+    TCOCache,
+    TCORequestContext,
+)
 
 
 class TestFinancingCalculation:
@@ -654,3 +660,134 @@ class TestTCOBreakdownModel:
         assert breakdown.assumptions["down_payment_percent"] == 30
         assert breakdown.assumptions["financing_months"] == 48
         assert breakdown.assumptions["monthly_km"] == 2000
+
+
+class TestCalculateTCOMany:
+    """Testes para cálculo vetorizado de TCO"""
+    
+    CARS = [
+        # (preço, categoria, consumo, idade, km)
+        (45000, "Hatch", 13.5, 1, 20000),
+        (89990, "SUV", 9.5, 3, 100000),
+        (120000, "Pickup", 9.0, 6, 100001),
+        (75000, "Sedan", 11.5, 0, 150000),
+        (64000, "Categoria Desconhecida", 0.0, 9, 150001),
+        (38000, "Furgão", 9.0, 12, 260000),
+    ]
+    
+    @pytest.mark.parametrize("calculator_kwargs", [
+        {},
+        {"down_payment_percent": 0.10, "annual_interest_rate": 0.1788, "state": "RJ"},
+        {"annual_interest_rate": 0.90, "financing_months": 100, "user_profile": "young"},
+        {"fuel_price_per_liter": 6.49, "state": "XX", "user_profile": "senior"},
+    ])
+    def test_matches_scalar_calculation(self, calculator_kwargs):
+        """Testa que o cálculo em lote reproduz calculate_tco"""
+        calculator = TCOCalculator(**calculator_kwargs)
+        prices, categories, efficiencies, ages, mileages = zip(*self.CARS)
+        
+        rows = calculator.calculate_tco_many(prices, categories, efficiencies, ages, mileages)
+        
+        assert len(rows) == len(self.CARS)
+        for row, (price, category, efficiency, age, mileage) in zip(rows, self.CARS):
+            expected = calculator.calculate_tco(
+                car_price=price,
+                car_category=category,
+                fuel_efficiency_km_per_liter=efficiency,
+                car_age=age,
+                car_mileage=mileage
+            )
+            actual = calculator.breakdown_from_row(row, efficiency)
+            
+            for field in ("financing_monthly", "fuel_monthly", "maintenance_monthly",
+                          "insurance_monthly", "ipva_monthly", "total_monthly"):
+                assert getattr(actual, field) == pytest.approx(getattr(expected, field), abs=0.011)
+            assert actual.assumptions == expected.assumptions
+    
+    def test_returns_structured_array(self):
+        """Testa formato do resultado"""
+        calculator = TCOCalculator()
+        
+        rows = calculator.calculate_tco_many([50000], ["Hatch"], [12.0], [2], [160000])
+        
+        assert rows.dtype.names[:6] == (
+            "financing_monthly", "fuel_monthly", "maintenance_monthly",
+            "insurance_monthly", "ipva_monthly", "total_monthly"
+        )
+        assert rows["maintenance_factor"][0] == 2.0
+    
+    def test_empty_input(self):
+        """Testa lista vazia"""
+        calculator = TCOCalculator()
+        
+        rows = calculator.calculate_tco_many([], [], [], [], [])
+        
+        assert len(rows) == 0
+
+
+class TestTCORequestContext:
+    """Testes para o contexto de TCO por requisição"""
+    
+    def test_calculator_uses_resolved_terms(self):
+        context = TCORequestContext(
+            state="MG",
+            fuel_price_per_liter=6.10,
+            annual_interest_rate=0.20,
+            down_payment_percent=0.10
+        )
+        
+        assert context.calculator.state == "MG"
+        assert context.calculator.fuel_price_per_liter == 6.10
+        assert context.calculator.annual_interest_rate == 0.20
+        assert context.calculator.down_payment_percent == 0.10
+    
+    def test_cache_key_varies_with_terms(self):
+        base = dict(state="SP", fuel_price_per_liter=6.17, annual_interest_rate=0.24,
+                    down_payment_percent=0.20, reference_year=2025)
+        
+        key = TCORequestContext(**base).cache_key("car_1")
+        
+        assert key == TCORequestContext(**base).cache_key("car_1")
+        assert key != TCORequestContext(**base).cache_key("car_2")
+        assert key != TCORequestContext(**{**base, "state": "RJ"}).cache_key("car_1")
+        assert key != TCORequestContext(**{**base, "annual_interest_rate": 0.18}).cache_key("car_1")
+        assert key != TCORequestContext(**{**base, "down_payment_percent": 0.30}).cache_key("car_1")
+        assert key != TCORequestContext(**{**base, "financing_months": 48}).cache_key("car_1")
+        assert key != TCORequestContext(**{**base, "monthly_km": 2000}).cache_key("car_1")
+        assert key != TCORequestContext(**{**base, "user_profile": "conservative"}).cache_key("car_1")
+
+
+class TestTCOCache:
+    """Testes para o cache LRU de TCO"""
+    
+    def _breakdown(self, total):
+        return TCOBreakdown(
+            financing_monthly=total, fuel_monthly=0, maintenance_monthly=0,
+            insurance_monthly=0, ipva_monthly=0, total_monthly=total
+        )
+    
+    def test_get_and_set(self):
+        cache = TCOCache(max_size=10)
+        value = self._breakdown(1000)
+        
+        assert cache.get(("a",)) is None
+        cache.set(("a",), value)
+        
+        assert cache.get(("a",)) is value
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+    
+    def test_evicts_least_recently_used(self):
+        cache = TCOCache(max_size=2)
+        cache.set(("a",), self._breakdown(1))
+        cache.set(("b",), self._breakdown(2))
+        
+        # Acessar "a" torna "b" o menos usado
+        cache.get(("a",))
+        cache.set(("c",), self._breakdown(3))
+        
+        assert len(cache) == 2
+        assert cache.get(("b",)) is None
+        assert cache.get(("a",)) is not None
+        assert cache.get(("c",)) is not None
+
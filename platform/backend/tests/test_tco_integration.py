@@ -148,3 +148,78 @@ def test_max_monthly_tco_calculation():
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+def test_tco_context_resolved_once_per_request(monkeypatch):
+    """Preço do combustível e termos de financiamento são resolvidos uma vez por requisição"""
+    engine = UnifiedRecommendationEngine(data_dir="data", use_llm=False)
+    engine.tco_cache.clear()
+    
+    calls = {"terms": 0}
+    original_predict = engine.financing_agent.predict_terms
+    
+    def counting_predict(profile):
+        calls["terms"] += 1
+        return original_predict(profile)
+    
+    monkeypatch.setattr(engine.financing_agent, "predict_terms", counting_predict)
+    
+    profile = UserProfile(
+        orcamento_min=10000,
+        orcamento_max=500000,
+        uso_principal="familia",
+        state="SP"
+    )
+    
+    engine.recommend(profile, limit=3)
+    
+    assert calls["terms"] == 1
+
+
+def test_tco_cache_reused_for_repeat_profiles():
+    """Perfis repetidos reaproveitam o TCO calculado"""
+    engine = UnifiedRecommendationEngine(data_dir="data", use_llm=False)
+    engine.tco_cache.clear()
+    
+    profile = UserProfile(
+        orcamento_min=10000,
+        orcamento_max=500000,
+        uso_principal="familia",
+        state="SP"
+    )
+    cars = engine.all_cars[:5]
+    
+    first = engine.calculate_tco_for_cars(cars, profile)
+    second = engine.calculate_tco_for_cars(cars, profile)
+    
+    assert all(tco is not None for tco in first)
+    assert [t.total_monthly for t in first] == [t.total_monthly for t in second]
+    assert engine.tco_cache.get_stats()["hits"] == len(cars)
+    
+    # Carro individual usa o mesmo caminho
+    single = engine.calculate_tco_for_car(cars[0], profile)
+    assert single is first[0]
+
+
+
+def test_bad_car_only_nulls_its_own_tco():
+    """Um carro inválido não descarta o TCO dos demais nem os acertos de cache"""
+    engine = UnifiedRecommendationEngine(data_dir="data", use_llm=False)
+    engine.tco_cache.clear()
+    
+    profile = UserProfile(
+        orcamento_min=10000,
+        orcamento_max=500000,
+        uso_principal="familia",
+        state="SP"
+    )
+    context = engine.build_tco_context(profile)
+    cars = [car.model_copy() for car in engine.all_cars[:4]]
+    cached = engine.calculate_tco_for_car(cars[0], profile, context)
+    cars[2].preco = "inválido"
+    
+    results = engine.calculate_tco_for_cars(cars, profile, context)
+    
+    assert results[0] is cached
+    assert results[1] is not None and results[3] is not None
+    assert results[2] is None
@@ -4,6 +4,7 @@ from celery import Celery
 from kombu import Exchange, Queue
 
 from config.settings import get_settings
+from src.utils.lanes import lane_queues
 
 settings = get_settings()
 
@@ -57,7 +58,15 @@ celery_app.conf.update(
             routing_key="low_priority",
             queue_arguments={"x-max-priority": 10},
         ),
+        # Per-user lanes for process_message (see src/utils/lanes.py): each
+        # lane is consumed by a single-process worker, so one user's
+        # messages run in order while different lanes run in parallel
+        *(
+            Queue(name, Exchange(name), routing_key=name)
+            for name in lane_queues()
+        ),
     ),
+    task_routes=("src.utils.lanes.route_message_task",),
     task_default_queue="default",
     task_default_exchange="default",
     task_default_routing_key="default",
@@ -39,6 +39,13 @@ class Settings(BaseSettings):
     redis_max_connections: int = 50
     redis_socket_timeout: int = 5
     redis_socket_connect_timeout: int = 5
+    redis_pool_timeout: int = 5  # Wait for a free pooled connection (sync pool)
+    redis_health_check_interval: int = 30
+
+    # Webhook message deduplication
+    message_dedup_ttl_seconds: int = 86400
+    message_dedup_local_size: int = 10000
+    message_dedup_local_ttl_seconds: int = 600
 
     # PostgreSQL
     postgres_url: str
@@ -52,10 +59,15 @@ class Settings(BaseSettings):
     duckdb_path: str = "./data/chatbot.duckdb"
     duckdb_memory_limit: str = "2GB"
     duckdb_threads: int = 4
+    duckdb_flush_batch_size: int = 500  # Buffered rows that trigger a flush
+    duckdb_flush_interval_seconds: float = 2.0
+    duckdb_read_pool_size: int = 4  # Concurrent read connections
+    duckdb_lock_timeout_seconds: float = 5.0  # Wait for another process's file lock
 
     # Celery
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/1"
+    message_lanes: int = 16  # Per-user process_message queues (lane.0 .. lane.N-1)
 
     # Backend API
     backend_api_url: str = "http://localhost:8001"
@@ -64,6 +76,7 @@ class Settings(BaseSettings):
 
     # Session
     session_ttl_seconds: int = 86400
+    session_memory_max_messages: int = 50  # Messages kept in Redis per session
     max_conversation_history: int = 50
 
     # NLP
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Redis overhead per message, fresh clients vs shared pool
+
+Replays the Redis work process_message_task does for each message
+(idempotency EXISTS, debounce SET NX EX, mark processed SET NX EX) in two modes:
+
+- before: every message builds its managers on a new redis.from_url client
+  (what the tasks did before the shared pool)
+- after: managers use the process-wide pooled client (get_sync_redis)
+
+Reports mean/p95 latency per message and the number of TCP connections the
+server accepted (INFO stats total_connections_received).
+
+Requires a reachable Redis (settings.redis_url or --url).
+
+Usage:
+    python scripts/benchmark_redis_pool.py [--messages 2000] [--url redis://localhost:6379/15]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import TYPE_CHECKING
+
+import redis
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if TYPE_CHECKING:
+    from src.utils.idempotency import DebounceManager, IdempotencyManager
+
+
+def _process_message(
+    idempotency_manager: "IdempotencyManager",
+    debounce_manager: "DebounceManager",
+    message_id: str,
+) -> None:
+    """Redis calls of one process_message_task run"""
+    key = f"idempotency:message:{message_id}"
+    idempotency_manager.is_processed(key)
+    debounce_manager.should_process(
+        debounce_manager.generate_debounce_key(user_id=message_id, event_type="message"),
+        window_seconds=2,
+    )
+    idempotency_manager.mark_processed(key, {"status": "success"}, ttl=60)
+
+
+def _run(mode: str, url: str, messages: int) -> dict:
+    from src.utils.idempotency import DebounceManager, IdempotencyManager
+    from src.utils.redis_pool import get_sync_redis
+
+    admin = redis.from_url(url)
+    connections_before = admin.info("stats")["total_connections_received"]
+    latencies = []
+
+    for _ in range(messages):
+        message_id = f"bench-{uuid.uuid4().hex}"
+        start = time.perf_counter()
+
+        if mode == "before":
+            client = redis.from_url(url, decode_responses=True)
+            idempotency_manager = IdempotencyManager(redis_client=client)
+            client = redis.from_url(url, decode_responses=True)
+            debounce_manager = DebounceManager(redis_client=client)
+        else:
+            idempotency_manager = IdempotencyManager(redis_client=get_sync_redis())
+            debounce_manager = DebounceManager(redis_client=get_sync_redis())
+
+        _process_message(idempotency_manager, debounce_manager, message_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    connections = admin.info("stats")["total_connections_received"] - connections_before
+    latencies.sort()
+    return {
+        "mean_ms": statistics.mean(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "connections": connections,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--url", default=None, help="Redis URL (default: settings.redis_url)")
+    args = parser.parse_args()
+
+    if args.url:
+        os.environ["REDIS_URL"] = args.url
+
+    from config.settings import get_settings
+
+    url = get_settings().redis_url
+
+    try:
+        redis.from_url(url).ping()
+    except redis.ConnectionError as e:
+        print(f"Redis unavailable at {url}: {e}")
+        sys.exit(1)
+
+    print(f"Redis: {url} | {args.messages} messages\n")
+    print(f"{'mode':<8} {'mean ms/msg':>12} {'p95 ms/msg':>12} {'connections':>12}")
+    for mode in ("before", "after"):
+        result = _run(mode, url, args.messages)
+        print(
+            f"{mode:<8} {result['mean_ms']:>12.3f} {result['p95_ms']:>12.3f} "
+            f"{result['connections']:>12}"
+        )
+
+    from src.utils.redis_pool import get_redis_pool_stats
+
+    print(f"\nShared pool: {get_redis_pool_stats()['sync']}")
+
+
+if __name__ == "__main__":
+    main()
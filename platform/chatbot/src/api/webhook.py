@@ -10,6 +10,7 @@ from fastapi import APIRouter, Header, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field
 
 from config.settings import get_settings
+from src.utils.message_dedup import get_message_deduplicator
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -78,36 +79,48 @@ def verify_webhook_signature(payload: bytes, signature: str | None) -> bool:
     return is_valid
 
 
-async def is_duplicate_message(message_id: str) -> bool:
+async def get_redis_client():
+    """Shared async Redis client (None if unavailable)."""
+    from src.services.redis_client import get_redis_client as _get_redis_client
+
+    return await _get_redis_client()
+
+
+async def find_duplicate_messages(message_ids: list[str]) -> list[bool]:
     """
-    Check if message has already been processed.
+    Check and claim a batch of message IDs in one pass.
+
+    Repeated IDs and IDs recently seen by this worker are resolved locally;
+    the rest are claimed with one pipelined batch of SET NX EX.
 
     Args:
-        message_id: WhatsApp message ID
+        message_ids: WhatsApp message IDs in payload order
 
     Returns:
-        True if message is duplicate, False otherwise
+        One flag per message ID, True for duplicates
     """
-    # TODO: Implement Redis-based deduplication
-    # For now, return False (no deduplication)
-    from src.services.redis_client import get_redis_client
+    if not message_ids:
+        return []
 
     redis = await get_redis_client()
     if redis is None:
-        logger.warning("Redis not available, skipping deduplication")
-        return False
+        logger.warning("Redis not available, skipping cross-worker deduplication")
 
-    # Check if message_id exists in Redis
-    key = f"msg_processed:{message_id}"
-    exists = await redis.exists(key)
+    return await get_message_deduplicator().find_duplicates(message_ids, redis)
 
-    if exists:
-        logger.info(f"Duplicate message detected: {message_id}")
-        return True
 
-    # Mark message as processed (TTL: 24 hours)
-    await redis.setex(key, 86400, "1")
-    return False
+async def is_duplicate_message(message_id: str) -> bool:
+    """
+    Check if message has already been processed.
+
+    Args:
+        message_id: WhatsApp message ID
+
+    Returns:
+        True if message is duplicate, False otherwise
+    """
+    duplicates = await find_duplicate_messages([message_id])
+    return duplicates[0]
 
 
 @router.get("/whatsapp")
@@ -198,6 +211,8 @@ async def receive_webhook(
 
     # Process webhook entries
     if payload.object == "whatsapp_business_account":
+        messages: list[WhatsAppMessage] = []
+
         for entry in payload.entry:
             # Extract changes
             changes = entry.get("changes", [])
@@ -207,25 +222,12 @@ async def receive_webhook(
                 value = change.get("value", {})
 
                 if field == "messages":
-                    # Process incoming messages
-                    messages = value.get("messages", [])
-
-                    for msg_data in messages:
+                    # Collect incoming messages (deduplicated together below)
+                    for msg_data in value.get("messages", []):
                         try:
-                            message = WhatsAppMessage(**msg_data)
-
-                            # Check for duplicates
-                            if await is_duplicate_message(message.message_id):
-                                logger.info(
-                                    f"Skipping duplicate message: {message.message_id}"
-                                )
-                                continue
-
-                            # Queue message for async processing
-                            await queue_message_processing(message)
-
+                            messages.append(WhatsAppMessage(**msg_data))
                         except Exception as e:
-                            logger.error(f"Failed to process message: {e}")
+                            logger.error(f"Failed to parse message: {e}")
                             # Continue processing other messages
 
                 elif field == "message_status":
@@ -235,6 +237,25 @@ async def receive_webhook(
                         logger.info(f"Message status update: {status_data}")
                         # TODO: Update message status in database
 
+        # Check for duplicates: one batch for the whole payload
+        try:
+            duplicates = await find_duplicate_messages([m.message_id for m in messages])
+        except Exception as e:
+            logger.error(f"Deduplication failed, accepting messages: {e}")
+            duplicates = [False] * len(messages)
+
+        for message, is_duplicate in zip(messages, duplicates):
+            if is_duplicate:
+                logger.info(f"Skipping duplicate message: {message.message_id}")
+                continue
+
+            try:
+                # Queue message for async processing
+                await queue_message_processing(message)
+            except Exception as e:
+                logger.error(f"Failed to process message: {e}")
+                # Continue processing other messages
+
     # Return 200 OK immediately
     return {"status": "ok"}
 
@@ -295,10 +316,9 @@ async def queue_message_processing(message: WhatsAppMessage) -> None:
     try:
         from src.tasks.message_processor import process_message_task
 
-        # Use apply_async for better control
+        # Routed to the sender's lane (src.utils.lanes.route_message_task)
         task = process_message_task.apply_async(
             kwargs=message_data,
-            queue="default",
             priority=5,  # Medium priority
         )
         logger.info(
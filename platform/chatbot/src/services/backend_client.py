@@ -492,7 +492,7 @@ def get_backend_client(
     
     Args:
         base_url: URL base da API
-        redis_client: Cliente Redis
+        redis_client: Cliente Redis (padrão: pool assíncrono compartilhado)
         
     Returns:
         Instância do BackendClient
@@ -500,6 +500,10 @@ def get_backend_client(
     global _backend_client
     
     if _backend_client is None:
+        if redis_client is None:
+            from ..utils.redis_pool import get_async_redis
+
+            redis_client = get_async_redis()
         _backend_client = BackendClient(
             base_url=base_url,
             redis_client=redis_client
@@ -6,41 +6,35 @@ from typing import Optional
 import redis.asyncio as redis
 
 from config.settings import get_settings
+from src.utils.redis_pool import close_redis_pools, get_async_redis
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Global Redis client instance
-_redis_client: Optional[redis.Redis] = None
+# Whether the shared pool has answered a PING in this process
+_connection_checked = False
 
 
 async def get_redis_client() -> Optional[redis.Redis]:
     """
-    Get or create Redis client instance.
+    Get the shared async Redis client (process-wide connection pool).
 
     Returns:
         Redis client or None if connection fails
     """
-    global _redis_client
+    global _connection_checked
 
-    if _redis_client is not None:
-        return _redis_client
+    client = get_async_redis()
+    if _connection_checked:
+        return client
 
     try:
-        _redis_client = redis.from_url(
-            settings.redis_url,
-            encoding="utf-8",
-            decode_responses=True,
-            max_connections=settings.redis_max_connections,
-            socket_timeout=settings.redis_socket_timeout,
-            socket_connect_timeout=settings.redis_socket_connect_timeout,
-        )
-
         # Test connection
-        await _redis_client.ping()
+        await client.ping()
+        _connection_checked = True
         logger.info("Redis connection established")
 
-        return _redis_client
+        return client
 
     except Exception as e:
         logger.error(f"Failed to connect to Redis: {e}")
@@ -48,10 +42,9 @@ async def get_redis_client() -> Optional[redis.Redis]:
 
 
 async def close_redis_client() -> None:
-    """Close Redis client connection."""
-    global _redis_client
+    """Close the shared Redis pools."""
+    global _connection_checked
 
-    if _redis_client is not None:
-        await _redis_client.close()
-        _redis_client = None
-        logger.info("Redis connection closed")
+    await close_redis_pools()
+    _connection_checked = False
+    logger.info("Redis connection closed")
@@ -1,59 +1,106 @@
 """
 Session Manager service using Redis and DuckDB.
 
-Manages conversation sessions with distributed locks, idempotency,
-and asynchronous persistence to DuckDB.
+Manages conversation sessions in Redis (compact hash + capped message list)
+with idempotency, and batched persistence to DuckDB.
 """
 
-import asyncio
 import json
 import time
-from typing import Optional
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 from datetime import datetime
 
 import redis.asyncio as redis
-import duckdb
+
+from config.settings import get_settings
 
 from ..models.session import SessionData, SessionState
+from ..utils.duckdb_writer import get_duckdb_writer
 from ..utils.logger import get_logger
+from ..utils.redis_pool import get_async_redis
+from ..utils.session_codec import (
+    changed_fields,
+    decode_session,
+    encode_session,
+    legacy_session_key,
+    memory_key,
+    messages_to_append,
+    session_key,
+)
 
+settings = get_settings()
 logger = get_logger(__name__)
 
+# Cria a sessão só se o hash ainda não existe (atômico, sem lock)
+# KEYS: hash da sessão, lista de mensagens | ARGV: ttl, campo1, valor1, ...
+CREATE_SESSION_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('DEL', KEYS[2])
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
 
 class SessionManager:
     """
     Gerenciador de sessões com Redis e DuckDB.
     
     Funcionalidades:
-    - Criação e recuperação de sessões com locks distribuídos
+    - Criação atômica e recuperação de sessões
     - Atualização idempotente usando session_id:turn_id
     - Expiração automática com TTL de 24h
-    - Persistência assíncrona no DuckDB
+    - Persistência no DuckDB em lote (DuckDBWriter: abre o arquivo só durante o flush)
+    
+    Layout no Redis (src/utils/session_codec.py): hash sess:{phone} com um
+    campo msgpack por atributo da sessão e lista sess:{phone}:mem com as
+    mensagens (RPUSH/LTRIM). Cada turno grava só os campos alterados e as
+    mensagens novas, então o custo não cresce com a conversa.
     """
     
+    # Sessões com versão lida/gravada conhecida (LRU)
+    MAX_TRACKED_SESSIONS = 10000
+    
     def __init__(
         self,
-        redis_client: redis.Redis,
-        duckdb_path: str = "data/chatbot_context.duckdb"
+        redis_client: Optional[redis.Redis] = None,
+        duckdb_path: str = "data/chatbot_context.duckdb",
+        max_stored_messages: Optional[int] = None
     ):
         """
         Inicializa o SessionManager.
         
         Args:
-            redis_client: Cliente Redis assíncrono
+            redis_client: Cliente Redis assíncrono binário, decode_responses=False
+                (padrão: pool compartilhado)
             duckdb_path: Caminho para o banco DuckDB
+            max_stored_messages: Mensagens mantidas no Redis por sessão
+                (padrão: settings.session_memory_max_messages)
         """
-        self.redis = redis_client
+        self.redis = (
+            redis_client if redis_client is not None
+            else get_async_redis(decode_responses=False)
+        )
+        self.max_stored_messages = max_stored_messages or settings.session_memory_max_messages
+        self._create_script = self.redis.register_script(CREATE_SESSION_SCRIPT)
+        # phone_number -> (objeto SessionData, campos codificados, última
+        # mensagem) da última leitura/escrita. Só vale para aquele mesmo
+        # objeto: outro objeto pode vir de uma leitura antiga, e o Redis pode
+        # ter sido alterado por outro processo desde então.
+        self._stored: "OrderedDict[str, Tuple[weakref.ref, Dict[str, bytes], Optional[bytes]]]" = OrderedDict()
         self.duckdb_path = duckdb_path
+        self.writer = get_duckdb_writer(duckdb_path)
         self._ensure_duckdb_tables()
     
     def _ensure_duckdb_tables(self) -> None:
         """Garante que as tabelas do DuckDB existem."""
         try:
-            conn = duckdb.connect(self.duckdb_path)
-            
             # Tabela de sessões arquivadas
-            conn.execute("""
+            self.writer.execute("""
                 CREATE TABLE IF NOT EXISTS archived_sessions (
                     session_id VARCHAR PRIMARY KEY,
                     phone_number VARCHAR NOT NULL,
@@ -70,7 +117,7 @@ class SessionManager:
             """)
             
             # Tabela de histórico de mensagens
-            conn.execute("""
+            self.writer.execute("""
                 CREATE TABLE IF NOT EXISTS message_history (
                     id INTEGER PRIMARY KEY,
                     session_id VARCHAR NOT NULL,
@@ -82,20 +129,24 @@ class SessionManager:
             """)
             
             # Índices para performance
-            conn.execute("""
+            self.writer.execute("""
                 CREATE INDEX IF NOT EXISTS idx_sessions_phone 
                 ON archived_sessions(phone_number)
             """)
-            conn.execute("""
+            self.writer.execute("""
                 CREATE INDEX IF NOT EXISTS idx_sessions_updated 
                 ON archived_sessions(updated_at)
             """)
-            conn.execute("""
+            self.writer.execute("""
                 CREATE INDEX IF NOT EXISTS idx_messages_session 
                 ON message_history(session_id)
             """)
             
-            conn.close()
+            # Ids de message_history (a coluna id não tem default)
+            self.writer.execute("""
+                CREATE SEQUENCE IF NOT EXISTS message_history_id_seq
+            """)
+            
             logger.info("DuckDB tables initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing DuckDB tables: {e}")
@@ -103,10 +154,10 @@ class SessionManager:
     
     async def get_or_create_session(self, phone_number: str) -> SessionData:
         """
-        Obtém sessão existente ou cria nova com lock distribuído.
+        Obtém sessão existente ou cria nova.
         
-        Usa Redis SET NX (set if not exists) para evitar race conditions
-        quando múltiplas requisições tentam criar a mesma sessão.
+        A criação é atômica (script Lua: só grava se o hash não existe),
+        sem lock nem espera, quando múltiplas requisições tentam criá-la.
         
         Args:
             phone_number: Número de telefone do WhatsApp
@@ -117,71 +168,46 @@ class SessionManager:
         Raises:
             Exception: Se houver erro ao acessar Redis
         """
-        session_key = f"session:{phone_number}"
-        
         try:
             # Tentar obter sessão existente do Redis
-            session_json = await self.redis.get(session_key)
+            session = await self._load_session(phone_number)
             
-            if session_json:
-                session_dict = json.loads(session_json)
-                session = SessionData(**session_dict)
-                
+            if session:
                 # Verificar se expirou
                 if session.is_expired():
                     logger.info(f"Session expired for {phone_number}, creating new one")
                     await self._archive_session(session)
-                    await self.redis.delete(session_key)
+                    await self._delete_session(phone_number)
                 else:
                     logger.info(f"Retrieved existing session for {phone_number}")
                     return session
             
-            # Criar nova sessão com lock distribuído
-            lock_key = f"lock:{session_key}"
-            lock_timeout = 10  # segundos
+            # Criar nova sessão. As mensagens de um usuário já são serializadas
+            # pela fila dele (src/utils/lanes.py); o script cobre chamadas fora
+            # das filas.
+            session_id = f"{phone_number}:{int(time.time())}"
+            session = SessionData(
+                session_id=session_id,
+                phone_number=phone_number,
+                state=SessionState.GREETING
+            )
             
-            # Tentar adquirir lock
-            lock_acquired = await self.redis.set(
-                lock_key,
-                "1",
-                nx=True,  # Set if not exists
-                ex=lock_timeout  # Expira após 10s
+            fields, _ = encode_session(session.model_dump(mode="json"))
+            created = await self._create_script(
+                keys=[session_key(phone_number), memory_key(phone_number)],
+                args=[session.ttl_seconds, *(item for pair in fields.items() for item in pair)]
             )
             
-            if not lock_acquired:
-                # Aguardar lock ser liberado e tentar novamente
-                logger.info(f"Waiting for lock on {phone_number}")
-                await asyncio.sleep(0.1)
-                return await self.get_or_create_session(phone_number)
-            
-            try:
-                # Verificar novamente se sessão foi criada enquanto aguardávamos
-                session_json = await self.redis.get(session_key)
-                if session_json:
-                    session_dict = json.loads(session_json)
-                    return SessionData(**session_dict)
-                
-                # Criar nova sessão
-                session_id = f"{phone_number}:{int(time.time())}"
-                session = SessionData(
-                    session_id=session_id,
-                    phone_number=phone_number,
-                    state=SessionState.GREETING
-                )
-                
-                # Salvar no Redis com TTL
-                await self.redis.setex(
-                    session_key,
-                    session.ttl_seconds,
-                    session.model_dump_json()
-                )
-                
-                logger.info(f"Created new session {session_id} for {phone_number}")
-                return session
-                
-            finally:
-                # Liberar lock
-                await self.redis.delete(lock_key)
+            if not created:
+                # Outra requisição criou a sessão primeiro: usar a dela
+                session = await self._load_session(phone_number)
+                if session:
+                    return session
+                raise RuntimeError(f"Session for {phone_number} vanished after creation")
+            
+            self._remember(session, fields, None)
+            logger.info(f"Created new session {session_id} for {phone_number}")
+            return session
                 
         except Exception as e:
             logger.error(f"Error in get_or_create_session for {phone_number}: {e}")
@@ -192,7 +218,8 @@ class SessionManager:
         Atualiza sessão com idempotência.
         
         Usa session_id:turn_id como chave de idempotência para garantir
-        que cada turno seja processado apenas uma vez.
+        que cada turno seja processado apenas uma vez. Só os campos que
+        mudaram e as mensagens novas vão para o Redis.
         
         Args:
             session: Sessão a ser atualizada
@@ -210,34 +237,26 @@ class SessionManager:
             # Chave de idempotência
             idempotency_key = f"idempotency:{session.get_idempotency_key()}"
             
-            # Verificar se já foi processado
-            already_processed = await self.redis.exists(idempotency_key)
-            if already_processed:
+            # Marcar como processado (TTL de 1 hora); SET NX falha se já foi
+            claimed = await self.redis.set(idempotency_key, "1", nx=True, ex=3600)
+            if not claimed:
                 logger.warning(
                     f"Turn {session.turn_id} for session {session.session_id} "
                     "already processed (idempotent)"
                 )
                 return False
             
-            # Marcar como processado (TTL de 1 hora)
-            await self.redis.setex(idempotency_key, 3600, "1")
-            
             # Atualizar sessão no Redis
-            session_key = f"session:{session.phone_number}"
-            await self.redis.setex(
-                session_key,
-                session.ttl_seconds,
-                session.model_dump_json()
-            )
+            await self._write_session(session)
             
             logger.info(
                 f"Updated session {session.session_id} "
                 f"(turn {session.turn_id}, state: {session.state})"
             )
             
-            # Agendar persistência assíncrona no DuckDB
-            # Nota: Em produção, isso seria feito via Celery task
-            asyncio.create_task(self._save_to_duckdb_async(session))
+            # Persistência no DuckDB em lote: só enfileira (turnos da mesma
+            # sessão até o próximo flush viram uma única linha)
+            self._save_to_duckdb_sync(session)
             
             return True
             
@@ -256,22 +275,17 @@ class SessionManager:
             bool: True se sessão foi expirada, False se não existia
         """
         try:
-            session_key = f"session:{phone_number}"
-            
             # Obter sessão antes de deletar
-            session_json = await self.redis.get(session_key)
-            if not session_json:
+            session = await self._load_session(phone_number)
+            if not session:
                 logger.info(f"No session to expire for {phone_number}")
                 return False
             
-            session_dict = json.loads(session_json)
-            session = SessionData(**session_dict)
-            
             # Arquivar no DuckDB
             await self._archive_session(session)
             
             # Deletar do Redis
-            await self.redis.delete(session_key)
+            await self._delete_session(phone_number)
             
             logger.info(f"Expired and archived session for {phone_number}")
             return True
@@ -291,15 +305,11 @@ class SessionManager:
             SessionData ou None se não existir
         """
         try:
-            session_key = f"session:{phone_number}"
-            session_json = await self.redis.get(session_key)
+            session = await self._load_session(phone_number)
             
-            if not session_json:
+            if not session:
                 return None
             
-            session_dict = json.loads(session_json)
-            session = SessionData(**session_dict)
-            
             # Verificar se expirou
             if session.is_expired():
                 await self.expire_session(phone_number)
@@ -311,61 +321,171 @@ class SessionManager:
             logger.error(f"Error getting session for {phone_number}: {e}")
             return None
     
+    async def _load_session(self, phone_number: str) -> Optional[SessionData]:
+        """
+        Lê hash + lista de mensagens em um único round trip.
+        
+        Args:
+            phone_number: Número de telefone
+            
+        Returns:
+            SessionData ou None se não existir
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(session_key(phone_number))
+        pipe.lrange(memory_key(phone_number), 0, -1)
+        fields, messages = await pipe.execute()
+        
+        if not fields:
+            return await self._migrate_legacy_session(phone_number)
+        
+        fields = {
+            (name.decode("utf-8") if isinstance(name, bytes) else name): value
+            for name, value in fields.items()
+        }
+        session = SessionData.model_validate(decode_session(fields, messages))
+        self._remember(session, fields, messages[-1] if messages else None)
+        return session
+    
+    async def _write_session(self, session: SessionData) -> None:
+        """
+        Grava só o que mudou desde que este objeto foi lido ou gravado.
+        
+        - HSET dos campos cujo valor codificado mudou; todos os campos
+          quando a sessão não foi lida/gravada por este mesmo objeto
+          (são pequenos, e o Redis pode ter outra versão)
+        - RPUSH das mensagens novas + LTRIM para o limite
+        - EXPIRE das duas chaves
+        
+        Tudo em um único MULTI/EXEC.
+        
+        Args:
+            session: Sessão a ser gravada
+        """
+        phone_number = session.phone_number
+        skey, mkey = session_key(phone_number), memory_key(phone_number)
+        
+        fields, messages = encode_session(session.model_dump(mode="json"))
+        stored = self._stored.get(phone_number)
+        if stored is None or stored[0]() is not session:
+            # Sem versão conhecida para este objeto: grava todos os campos,
+            # compara mensagens com a última gravada no Redis
+            previous_fields, last_message = None, await self.redis.lindex(mkey, -1)
+        else:
+            _, previous_fields, last_message = stored
+        
+        changed = changed_fields(fields, previous_fields)
+        append = messages_to_append(messages, last_message)
+        
+        pipe = self.redis.pipeline(transaction=True)
+        if changed:
+            pipe.hset(skey, mapping=changed)
+        if append is None:
+            # Memória foi reiniciada/compactada: reescrever a lista
+            pipe.delete(mkey)
+            append = messages
+        if append:
+            pipe.rpush(mkey, *append[-self.max_stored_messages:])
+            pipe.ltrim(mkey, -self.max_stored_messages, -1)
+        pipe.expire(skey, session.ttl_seconds)
+        pipe.expire(mkey, session.ttl_seconds)
+        await pipe.execute()
+        
+        self._remember(session, fields, messages[-1] if messages else None)
+    
+    async def _delete_session(self, phone_number: str) -> None:
+        """Remove hash e lista de mensagens da sessão."""
+        await self.redis.delete(session_key(phone_number), memory_key(phone_number))
+        self._stored.pop(phone_number, None)
+    
+    async def _migrate_legacy_session(self, phone_number: str) -> Optional[SessionData]:
+        """
+        Converte uma sessão no formato antigo (blob JSON em session:{phone})
+        para o layout de hash + lista.
+        
+        Args:
+            phone_number: Número de telefone
+            
+        Returns:
+            SessionData ou None se não existir sessão antiga
+        """
+        legacy_key = legacy_session_key(phone_number)
+        session_json = await self.redis.get(legacy_key)
+        if not session_json:
+            return None
+        
+        session = SessionData.model_validate_json(session_json)
+        await self._write_session(session)
+        await self.redis.delete(legacy_key)
+        
+        logger.info(f"Migrated session {session.session_id} to hash layout")
+        return session
+    
+    def _remember(
+        self,
+        session: SessionData,
+        fields: Dict[str, bytes],
+        last_message: Optional[bytes]
+    ) -> None:
+        """Guarda a versão lida/gravada deste objeto (para calcular o que mudou)."""
+        phone_number = session.phone_number
+        self._stored[phone_number] = (weakref.ref(session), fields, last_message)
+        self._stored.move_to_end(phone_number)
+        while len(self._stored) > self.MAX_TRACKED_SESSIONS:
+            self._stored.popitem(last=False)
+    
     async def _save_to_duckdb_async(self, session: SessionData) -> None:
         """
         Salva resumo da sessão no DuckDB de forma assíncrona.
         
-        Em produção, isso seria uma Celery task. Por enquanto,
-        executamos em background task.
-        
         Args:
             session: Sessão a ser salva
         """
         try:
-            # Executar em thread separada para não bloquear
-            await asyncio.to_thread(self._save_to_duckdb_sync, session)
+            self._save_to_duckdb_sync(session)
         except Exception as e:
             logger.error(f"Error saving session to DuckDB: {e}")
     
     def _save_to_duckdb_sync(self, session: SessionData) -> None:
         """
-        Salva sessão no DuckDB (versão síncrona).
+        Enfileira a sessão no DuckDBWriter (gravada no próximo flush).
         
         Args:
             session: Sessão a ser salva
         """
         try:
-            conn = duckdb.connect(self.duckdb_path)
-            
-            # Preparar dados
-            user_profile_json = json.dumps(session.user_profile.model_dump())
-            
-            # Upsert na tabela de sessões
-            conn.execute("""
-                INSERT OR REPLACE INTO archived_sessions (
-                    session_id, phone_number, state, turn_id,
-                    user_profile, memory_summary, qualification_score,
-                    completeness, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, [
-                session.session_id,
-                session.phone_number,
-                session.state.value,
-                session.turn_id,
-                user_profile_json,
-                session.memory.summary,
-                session.user_profile.qualification_score,
-                session.user_profile.completeness,
-                session.created_at,
-                session.updated_at
-            ])
-            
-            conn.close()
-            logger.debug(f"Saved session {session.session_id} to DuckDB")
+            self.writer.enqueue_session(self._session_row(session))
+            logger.debug(f"Queued session {session.session_id} for DuckDB")
             
         except Exception as e:
             logger.error(f"Error in _save_to_duckdb_sync: {e}")
     
+    @staticmethod
+    def _session_row(session: SessionData) -> tuple:
+        """Linha de archived_sessions (ordem de SESSION_COLUMNS)."""
+        return (
+            session.session_id,
+            session.phone_number,
+            session.state.value,
+            session.turn_id,
+            json.dumps(session.user_profile.model_dump()),
+            session.memory.summary,
+            session.user_profile.qualification_score,
+            session.user_profile.completeness,
+            session.created_at,
+            session.updated_at
+        )
+    
+    def persist_to_duckdb(self, session: SessionData) -> None:
+        """
+        Grava a sessão no DuckDB imediatamente (enfileira e faz flush).
+        
+        Args:
+            session: Sessão a ser salva
+        """
+        self._save_to_duckdb_sync(session)
+        self.writer.flush()
+    
     async def _archive_session(self, session: SessionData) -> None:
         """
         Arquiva sessão completa no DuckDB incluindo mensagens.
@@ -374,7 +494,7 @@ class SessionManager:
             session: Sessão a ser arquivada
         """
         try:
-            await asyncio.to_thread(self._archive_session_sync, session)
+            self._archive_session_sync(session)
         except Exception as e:
             logger.error(f"Error archiving session: {e}")
     
@@ -382,29 +502,23 @@ class SessionManager:
         """
         Arquiva sessão no DuckDB (versão síncrona).
         
+        Sessão e mensagens entram no mesmo lote; o flush grava a sessão
+        antes das mensagens.
+        
         Args:
             session: Sessão a ser arquivada
         """
         try:
-            conn = duckdb.connect(self.duckdb_path)
-            
-            # Salvar sessão
             self._save_to_duckdb_sync(session)
-            
-            # Salvar mensagens
-            for msg in session.memory.messages:
-                conn.execute("""
-                    INSERT INTO message_history (
-                        session_id, role, content, timestamp
-                    ) VALUES (?, ?, ?, ?)
-                """, [
+            self.writer.enqueue_messages([
+                (
                     session.session_id,
                     msg["role"],
                     msg["content"],
                     datetime.fromisoformat(msg["timestamp"])
-                ])
-            
-            conn.close()
+                )
+                for msg in session.memory.messages
+            ])
             logger.info(f"Archived session {session.session_id} with messages")
             
         except Exception as e:
@@ -422,18 +536,15 @@ class SessionManager:
             Lista de sessões anteriores
         """
         try:
-            conn = duckdb.connect(self.duckdb_path)
-            
-            result = conn.execute("""
-                SELECT session_id, state, qualification_score, 
-                       completeness, created_at, updated_at
-                FROM archived_sessions
-                WHERE phone_number = ?
-                ORDER BY updated_at DESC
-                LIMIT ?
-            """, [phone_number, limit]).fetchall()
-            
-            conn.close()
+            with self.writer.reader() as conn:
+                result = conn.execute("""
+                    SELECT session_id, state, qualification_score, 
+                           completeness, created_at, updated_at
+                    FROM archived_sessions
+                    WHERE phone_number = ?
+                    ORDER BY updated_at DESC
+                    LIMIT ?
+                """, [phone_number, limit]).fetchall()
             
             return [
                 {
@@ -454,6 +565,7 @@ class SessionManager:
     async def close(self) -> None:
         """Fecha conexões."""
         try:
+            self.writer.flush()
             await self.redis.close()
             logger.info("SessionManager connections closed")
         except Exception as e:
@@ -54,7 +54,8 @@ def process_message_task(
     6. Update session state
 
     Idempotency: Uses message_id as idempotency key to prevent duplicate processing
-    Debounce: Consolidates rapid messages from same user within 2 seconds
+    Ordering: Routed to the sender's lane queue (src.utils.lanes), consumed by a
+    single-process worker, so one user's messages run one at a time and in order
 
     Args:
         message_id: WhatsApp message ID (used for idempotency)
@@ -80,38 +81,6 @@ def process_message_task(
         logger.info(f"Message {message_id} already processed, skipping")
         return idempotency_manager.get_result(message_idempotency_key)
 
-    # Check debounce for rapid messages
-    debounce_manager = DebounceManager()
-    debounce_key = debounce_manager.generate_debounce_key(
-        user_id=from_number,
-        event_type="message",
-    )
-
-    # Accumulate rapid messages for consolidation
-    if not debounce_manager.should_process(debounce_key, window_seconds=2):
-        logger.info(f"Message from {from_number} debounced, accumulating")
-        accumulator_key = f"accumulator:messages:{from_number}"
-        count = debounce_manager.accumulate_event(
-            accumulator_key,
-            {
-                "message_id": message_id,
-                "content": content,
-                "timestamp": timestamp,
-                "type": message_type,
-            },
-            ttl=5,
-        )
-        logger.info(f"Accumulated {count} messages for {from_number}")
-
-        # If we have multiple messages, process them together
-        if count >= 3:
-            accumulated = debounce_manager.get_accumulated_events(
-                accumulator_key, clear=True
-            )
-            # Consolidate messages
-            content = " ".join([msg["content"] for msg in accumulated])
-            logger.info(f"Consolidated {len(accumulated)} messages from {from_number}")
-
     try:
         # Import here to avoid circular dependencies
         from src.services.conversation_engine import get_conversation_engine
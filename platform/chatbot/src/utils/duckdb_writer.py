@@ -0,0 +1,476 @@
+"""
+Batched DuckDB writer that only holds the database file while writing.
+
+Session and message rows are buffered in memory and flushed as bulk
+``INSERT ... SELECT`` statements when the buffer reaches a size threshold or
+after a time interval, from a background thread. DuckDB lets a single
+process open a file read-write, and several processes (the prefork Celery
+children, the lane workers, the API) share the same file, so every flush
+and every read opens a connection and closes it afterwards. Reads open the
+file read-only, which only takes a shared lock. Opening waits while another
+process holds the file lock.
+
+A batch that fails for another reason is written again row by row, so only
+the offending rows are dropped.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import duckdb
+
+from config.settings import get_settings
+
+try:
+    import pyarrow as pa
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SESSION_COLUMNS = (
+    "session_id",
+    "phone_number",
+    "state",
+    "turn_id",
+    "user_profile",
+    "memory_summary",
+    "qualification_score",
+    "completeness",
+    "created_at",
+    "updated_at",
+)
+MESSAGE_COLUMNS = ("session_id", "role", "content", "timestamp")
+
+# Columns refreshed when a session is written again. DuckDB rewrites a row
+# whose indexed columns change, which fails once message_history references
+# it; the narrow variant skips the indexed updated_at for those sessions.
+_SESSION_UPDATE_COLUMNS = (
+    "state",
+    "turn_id",
+    "user_profile",
+    "memory_summary",
+    "qualification_score",
+    "completeness",
+    "updated_at",
+)
+
+# Rows per statement when inserting through VALUES (without pyarrow)
+VALUES_CHUNK_ROWS = 500
+
+# Backoff between attempts to open a file locked by another process
+_LOCK_RETRY_INITIAL = 0.01
+_LOCK_RETRY_MAX = 0.25
+
+
+def _is_lock_error(error: Exception) -> bool:
+    return isinstance(error, duckdb.IOException) and "lock" in str(error).lower()
+
+
+def _session_upsert_sql(source: str, update_columns: Sequence[str]) -> str:
+    columns = ", ".join(SESSION_COLUMNS)
+    updates = ", ".join(f"{col} = excluded.{col}" for col in update_columns)
+    return (
+        f"INSERT INTO archived_sessions ({columns}) "
+        f"SELECT {columns} FROM {source} "
+        f"ON CONFLICT (session_id) DO UPDATE SET {updates}"
+    )
+
+
+def _message_insert_sql(source: str) -> str:
+    columns = ", ".join(MESSAGE_COLUMNS)
+    return (
+        f"INSERT INTO message_history (id, {columns}) "
+        f"SELECT nextval('message_history_id_seq'), {columns} FROM {source}"
+    )
+
+
+def _values_source(columns: Sequence[str], rows: int) -> str:
+    placeholders = "(" + ", ".join("?" for _ in columns) + ")"
+    return f"(VALUES {', '.join([placeholders] * rows)}) AS batch({', '.join(columns)})"
+
+
+class DuckDBWriter:
+    """
+    Buffers the writes of one DuckDB file in this process.
+
+    Repeated writes of the same session inside one batch are coalesced
+    (last write wins), so a session updated on every turn costs one row per
+    flush.
+    """
+
+    def __init__(
+        self,
+        duckdb_path: str,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        read_pool_size: Optional[int] = None,
+        lock_timeout: Optional[float] = None,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            duckdb_path: DuckDB file (":memory:" for tests)
+            batch_size: Buffered rows that trigger a flush
+            flush_interval: Seconds between background flushes
+            read_pool_size: Maximum concurrent read connections
+            lock_timeout: Seconds to wait for a file locked by another process
+        """
+        self.duckdb_path = duckdb_path
+        self.batch_size = batch_size or settings.duckdb_flush_batch_size
+        self.flush_interval = flush_interval or settings.duckdb_flush_interval_seconds
+        self.read_pool_size = read_pool_size or settings.duckdb_read_pool_size
+        self.lock_timeout = (
+            settings.duckdb_lock_timeout_seconds if lock_timeout is None else lock_timeout
+        )
+
+        # ":memory:" is private to its connection, so it is the only one kept open
+        self._memory_conn = duckdb.connect(duckdb_path) if duckdb_path == ":memory:" else None
+        self._write_lock = threading.Lock()
+        self._buffer_lock = threading.Lock()
+        self._sessions: Dict[str, Tuple[Any, ...]] = {}
+        self._messages: List[Tuple[Any, ...]] = []
+
+        self._readers = threading.BoundedSemaphore(self.read_pool_size)
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "flushes": 0,
+            "session_rows": 0,
+            "message_rows": 0,
+            "coalesced_sessions": 0,
+            "failed_batches": 0,
+            "deferred_batches": 0,
+            "dropped_rows": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _connect(self, read_only: bool = False) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Open the file for one flush or read and close it afterwards.
+
+        Args:
+            read_only: Open with a shared lock (other readers, no writer)
+
+        Raises:
+            duckdb.IOException: The file stayed locked for lock_timeout seconds
+        """
+        deadline = time.monotonic() + self.lock_timeout
+        delay = _LOCK_RETRY_INITIAL
+        while self._memory_conn is None:
+            try:
+                conn = duckdb.connect(self.duckdb_path, read_only=read_only)
+                break
+            except duckdb.IOException as e:
+                if not _is_lock_error(e) or time.monotonic() >= deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, _LOCK_RETRY_MAX)
+        else:
+            conn = self._memory_conn.cursor()
+
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """
+        Keep this process's readers out while writing.
+
+        DuckDB refuses a read-only and a read-write connection to the same
+        file in one process, so a write takes every reader slot.
+        """
+        with self._write_lock:
+            for _ in range(self.read_pool_size):
+                self._readers.acquire()
+            try:
+                yield
+            finally:
+                for _ in range(self.read_pool_size):
+                    self._readers.release()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def execute(self, sql: str, params: Optional[Sequence[Any]] = None) -> None:
+        """Run a statement (DDL, maintenance) right away."""
+        with self._exclusive(), self._connect() as conn:
+            conn.execute(sql, params)
+
+    def enqueue_session(self, row: Tuple[Any, ...]) -> None:
+        """Buffer a session row (SESSION_COLUMNS order)."""
+        with self._buffer_lock:
+            if row[0] in self._sessions:
+                self.stats["coalesced_sessions"] += 1
+            self._sessions[row[0]] = row
+        self._after_enqueue()
+
+    def enqueue_messages(self, rows: List[Tuple[Any, ...]]) -> None:
+        """Buffer message rows (MESSAGE_COLUMNS order)."""
+        if not rows:
+            return
+        with self._buffer_lock:
+            self._messages.extend(rows)
+        self._after_enqueue()
+
+    def pending(self) -> int:
+        """Rows waiting for the next flush."""
+        with self._buffer_lock:
+            return len(self._sessions) + len(self._messages)
+
+    def _after_enqueue(self) -> None:
+        self._ensure_flusher()
+        if self.pending() >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Write every buffered row now.
+
+        Returns:
+            Number of rows written
+        """
+        # The write lock covers the swap too: concurrent flushes must write
+        # their batches in the order they were taken (newest session wins)
+        with self._exclusive():
+            with self._buffer_lock:
+                sessions = list(self._sessions.values())
+                messages = self._messages
+                self._sessions = {}
+                self._messages = []
+
+            if not sessions and not messages:
+                return 0
+
+            try:
+                with self._connect() as conn:
+                    try:
+                        conn.execute("BEGIN TRANSACTION")
+                        # Sessions first: messages reference them
+                        if sessions:
+                            self._upsert_sessions(conn, sessions)
+                        if messages:
+                            self._bulk_insert(conn, _message_insert_sql, MESSAGE_COLUMNS, messages)
+                        conn.execute("COMMIT")
+                    except Exception as e:
+                        conn.execute("ROLLBACK")
+                        self.stats["failed_batches"] += 1
+                        logger.warning(
+                            f"DuckDB flush failed ({len(sessions)} sessions, "
+                            f"{len(messages)} messages), writing row by row: {e}"
+                        )
+                        return self._write_rows(conn, sessions, messages)
+            except duckdb.IOException as e:
+                if not _is_lock_error(e):
+                    raise
+                # Another process kept the file: retry the batch next flush
+                self._requeue(sessions, messages)
+                self.stats["deferred_batches"] += 1
+                logger.warning(
+                    f"DuckDB file busy, {len(sessions)} sessions and "
+                    f"{len(messages)} messages kept for the next flush: {e}"
+                )
+                return 0
+
+        self.stats["flushes"] += 1
+        self.stats["session_rows"] += len(sessions)
+        self.stats["message_rows"] += len(messages)
+        logger.debug(f"DuckDB flush: {len(sessions)} sessions, {len(messages)} messages")
+        return len(sessions) + len(messages)
+
+    def _write_rows(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        sessions: List[Tuple[Any, ...]],
+        messages: List[Tuple[Any, ...]],
+    ) -> int:
+        """Write a failed batch one row per transaction, dropping only the rows that fail."""
+        upsert_session = partial(self._upsert_sessions, conn)
+        insert_message = partial(self._bulk_insert, conn, _message_insert_sql, MESSAGE_COLUMNS)
+        written = {"session_rows": 0, "message_rows": 0}
+
+        for rows, write, counter in (
+            (sessions, upsert_session, "session_rows"),
+            (messages, insert_message, "message_rows"),
+        ):
+            for row in rows:
+                try:
+                    conn.execute("BEGIN TRANSACTION")
+                    write([row])
+                    conn.execute("COMMIT")
+                    written[counter] += 1
+                except Exception as e:
+                    conn.execute("ROLLBACK")
+                    self.stats["dropped_rows"] += 1
+                    logger.error(f"DuckDB row of session {row[0]} dropped: {e}")
+
+        self.stats["flushes"] += 1
+        for counter, count in written.items():
+            self.stats[counter] += count
+        return sum(written.values())
+
+    def _requeue(self, sessions: List[Tuple[Any, ...]], messages: List[Tuple[Any, ...]]) -> None:
+        """Put an unwritten batch back in front of rows buffered since."""
+        with self._buffer_lock:
+            pending = {row[0]: row for row in sessions}
+            pending.update(self._sessions)
+            self._sessions = pending
+            self._messages = messages + self._messages
+
+    def _upsert_sessions(
+        self, conn: duckdb.DuckDBPyConnection, rows: List[Tuple[Any, ...]]
+    ) -> None:
+        try:
+            self._bulk_insert(
+                conn,
+                partial(_session_upsert_sql, update_columns=_SESSION_UPDATE_COLUMNS),
+                SESSION_COLUMNS,
+                rows,
+            )
+        except duckdb.ConstraintException:
+            # Some sessions already have archived messages: keep updated_at
+            conn.execute("ROLLBACK")
+            conn.execute("BEGIN TRANSACTION")
+            self._bulk_insert(
+                conn,
+                partial(_session_upsert_sql, update_columns=_SESSION_UPDATE_COLUMNS[:-1]),
+                SESSION_COLUMNS,
+                rows,
+            )
+
+    def _bulk_insert(
+        self,
+        conn: duckdb.DuckDBPyConnection,
+        build_sql: Callable[[str], str],
+        columns: Sequence[str],
+        rows: List[Tuple[Any, ...]],
+    ) -> None:
+        """One INSERT ... SELECT from an Arrow table, or chunked VALUES lists."""
+        if PYARROW_AVAILABLE:
+            table = pa.Table.from_arrays(
+                [pa.array([row[i] for row in rows]) for i in range(len(columns))],
+                names=list(columns),
+            )
+            conn.register("batch", table)
+            try:
+                conn.execute(build_sql("batch"))
+            finally:
+                conn.unregister("batch")
+            return
+
+        for start in range(0, len(rows), VALUES_CHUNK_ROWS):
+            chunk = rows[start : start + VALUES_CHUNK_ROWS]
+            params = [value for row in chunk for value in row]
+            conn.execute(build_sql(_values_source(columns, len(chunk))), params)
+
+    # ------------------------------------------------------------------
+    # Background flusher
+    # ------------------------------------------------------------------
+
+    def _ensure_flusher(self) -> None:
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._buffer_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="duckdb-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"DuckDB background flush error: {e}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def reader(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """
+        Open a read-only connection, closed when the block ends.
+
+        At most read_pool_size reads run at once. Reads see data up to the
+        last flush (at most flush_interval seconds behind the buffered
+        writes).
+        """
+        with self._readers, self._connect(read_only=True) as conn:
+            yield conn
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Stop the flusher and write pending rows."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+        if self._memory_conn is not None:
+            with self._write_lock:
+                self._memory_conn.close()
+
+        with _writers_lock:
+            if _writers.get(self.duckdb_path) is self:
+                del _writers[self.duckdb_path]
+        logger.info(f"DuckDB writer closed ({self.duckdb_path})")
+
+
+# One writer per database file in this process
+_writers: Dict[str, DuckDBWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_duckdb_writer(duckdb_path: str) -> DuckDBWriter:
+    """
+    Get or create the writer of a DuckDB file.
+
+    ":memory:" databases are private to their connection, so each call
+    gets a new writer.
+    """
+    if duckdb_path == ":memory:":
+        return DuckDBWriter(duckdb_path)
+
+    with _writers_lock:
+        writer = _writers.get(duckdb_path)
+        if writer is None:
+            writer = DuckDBWriter(duckdb_path)
+            _writers[duckdb_path] = writer
+        return writer
+
+
+def close_duckdb_writers() -> None:
+    """Flush and close every writer (process shutdown)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close()
+
+
+# Pending rows would be lost with the daemon flusher thread
+atexit.register(close_duckdb_writers)
@@ -10,6 +10,7 @@ import redis
 from celery import Task
 
 from config.settings import get_settings
+from src.utils.redis_pool import get_sync_redis
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -23,14 +24,9 @@ class IdempotencyManager:
         Initialize idempotency manager.
 
         Args:
-            redis_client: Redis client instance (optional)
+            redis_client: Redis client instance (default: shared pooled client)
         """
-        if redis_client is None:
-            redis_client = redis.from_url(
-                settings.redis_url,
-                decode_responses=True,
-            )
-        self.redis = redis_client
+        self.redis = redis_client if redis_client is not None else get_sync_redis()
 
     def generate_idempotency_key(
         self,
@@ -128,14 +124,9 @@ class DebounceManager:
         Initialize debounce manager.
 
         Args:
-            redis_client: Redis client instance (optional)
+            redis_client: Redis client instance (default: shared pooled client)
         """
-        if redis_client is None:
-            redis_client = redis.from_url(
-                settings.redis_url,
-                decode_responses=True,
-            )
-        self.redis = redis_client
+        self.redis = redis_client if redis_client is not None else get_sync_redis()
 
     def generate_debounce_key(
         self,
@@ -254,14 +245,9 @@ class DeduplicationManager:
         Initialize deduplication manager.
 
         Args:
-            redis_client: Redis client instance (optional)
+            redis_client: Redis client instance (default: shared pooled client)
         """
-        if redis_client is None:
-            redis_client = redis.from_url(
-                settings.redis_url,
-                decode_responses=True,
-            )
-        self.redis = redis_client
+        self.redis = redis_client if redis_client is not None else get_sync_redis()
 
     def generate_job_hash(self, task_name: str, args: tuple, kwargs: dict) -> str:
         """
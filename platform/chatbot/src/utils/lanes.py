@@ -0,0 +1,114 @@
+"""Per-user message lanes: consistent hash of the phone number to a Celery queue."""
+
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import get_settings
+
+settings = get_settings()
+
+LANE_QUEUE_PREFIX = "lane"
+
+
+def jump_consistent_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping & Veach).
+
+    Maps a 64-bit key to one of ``buckets`` buckets. When the number of
+    buckets grows from n to n+1, only ~1/(n+1) of the keys move.
+
+    Args:
+        key: 64-bit integer key
+        buckets: Number of buckets (>= 1)
+
+    Returns:
+        Bucket index in [0, buckets)
+    """
+    if buckets < 1:
+        raise ValueError("buckets must be >= 1")
+
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return b
+
+
+def lane_for(from_number: str, lanes: Optional[int] = None) -> int:
+    """
+    Lane of a user.
+
+    Uses BLAKE2 instead of hash(), which is salted per process
+    (PYTHONHASHSEED): the webhook and every worker must agree on the lane.
+
+    Args:
+        from_number: Sender's phone number
+        lanes: Number of lanes (default: settings.message_lanes)
+
+    Returns:
+        Lane index
+    """
+    lanes = lanes or settings.message_lanes
+    digest = hashlib.blake2b(from_number.encode("utf-8"), digest_size=8).digest()
+    return jump_consistent_hash(int.from_bytes(digest, "big"), lanes)
+
+
+def lane_queue(lane: int) -> str:
+    """Celery queue name of a lane."""
+    return f"{LANE_QUEUE_PREFIX}.{lane}"
+
+
+def lane_queue_for(from_number: str, lanes: Optional[int] = None) -> str:
+    """Celery queue that processes this user's messages."""
+    return lane_queue(lane_for(from_number, lanes))
+
+
+def lane_queues(lanes: Optional[int] = None) -> List[str]:
+    """All lane queue names."""
+    return [lane_queue(lane) for lane in range(lanes or settings.message_lanes)]
+
+
+def lanes_for_worker(
+    worker_index: int, worker_count: int, lanes: Optional[int] = None
+) -> List[str]:
+    """
+    Lane queues owned by one lane worker.
+
+    Each lane must be consumed by exactly one single-process worker, so the
+    lanes are split round-robin between ``worker_count`` workers.
+
+    Args:
+        worker_index: Index of this worker in [0, worker_count)
+        worker_count: Number of lane workers
+        lanes: Number of lanes (default: settings.message_lanes)
+
+    Returns:
+        Queue names for this worker
+    """
+    if not 0 <= worker_index < worker_count:
+        raise ValueError(f"worker_index must be in [0, {worker_count})")
+
+    return [
+        queue
+        for lane, queue in enumerate(lane_queues(lanes))
+        if lane % worker_count == worker_index
+    ]
+
+
+def route_message_task(
+    name: str,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+    options: Dict[str, Any],
+    task: Any = None,
+    **kw: Any,
+) -> Optional[Dict[str, str]]:
+    """
+    Celery router: process_message goes to the sender's lane.
+
+    Every other task keeps the default routing.
+    """
+    if name == "process_message" and kwargs and kwargs.get("from_number"):
+        return {"queue": lane_queue_for(kwargs["from_number"])}
+    return None
@@ -0,0 +1,165 @@
+"""WhatsApp message deduplication (local LRU front tier + Redis SET NX EX)."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from config.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class RecentMessageCache:
+    """
+    Bounded LRU of message IDs this worker has already seen.
+
+    WhatsApp redelivers aggressively (the same message can arrive several
+    times within seconds). IDs found here are duplicates for sure, so the
+    webhook skips the Redis round trip for them. Exact membership is used
+    instead of a bloom filter: a false positive would silently drop a
+    genuine customer message.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 600):
+        """
+        Initialize the local cache.
+
+        Args:
+            max_size: Maximum number of message IDs kept
+            ttl_seconds: How long an ID is remembered locally
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+
+    def __contains__(self, message_id: str) -> bool:
+        expiry = self._entries.get(message_id)
+        if expiry is None:
+            return False
+        if expiry < time.monotonic():
+            del self._entries[message_id]
+            return False
+        return True
+
+    def add(self, message_id: str) -> None:
+        """Remember a message ID (refreshing its position and TTL)."""
+        self._entries[message_id] = time.monotonic() + self.ttl_seconds
+        self._entries.move_to_end(message_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MessageDeduplicator:
+    """
+    Deduplicate every message of a webhook payload in one pass.
+
+    1. Repeated IDs inside the same payload
+    2. Local front tier (RecentMessageCache), no network
+    3. One pipelined batch of ``SET msg_processed:<id> 1 NX EX <ttl>``;
+       SET NX is atomic, so two workers can never both accept a message
+    """
+
+    KEY_PREFIX = "msg_processed"
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = None,
+        local_cache: Optional[RecentMessageCache] = None,
+    ):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            ttl_seconds: Redis key TTL (default: settings.message_dedup_ttl_seconds)
+            local_cache: Local front tier (default: sized from settings)
+        """
+        self.ttl_seconds = ttl_seconds or settings.message_dedup_ttl_seconds
+        self.local_cache = local_cache or RecentMessageCache(
+            max_size=settings.message_dedup_local_size,
+            ttl_seconds=settings.message_dedup_local_ttl_seconds,
+        )
+        self.stats = {
+            "checked": 0,
+            "payload_duplicates": 0,
+            "local_duplicates": 0,
+            "redis_duplicates": 0,
+            "redis_round_trips": 0,
+        }
+
+    def key(self, message_id: str) -> str:
+        """Redis key for a message ID."""
+        return f"{self.KEY_PREFIX}:{message_id}"
+
+    async def find_duplicates(
+        self,
+        message_ids: List[str],
+        redis: Optional[Any],
+    ) -> List[bool]:
+        """
+        Check and claim a batch of message IDs.
+
+        Args:
+            message_ids: Message IDs in payload order
+            redis: Async Redis client (None = local tier only)
+
+        Returns:
+            One flag per message ID, True for duplicates
+        """
+        self.stats["checked"] += len(message_ids)
+        duplicates = [False] * len(message_ids)
+
+        # 1-2. Same payload / recently seen by this worker
+        pending: Dict[str, int] = {}
+        for i, message_id in enumerate(message_ids):
+            if message_id in pending:
+                duplicates[i] = True
+                self.stats["payload_duplicates"] += 1
+            elif message_id in self.local_cache:
+                duplicates[i] = True
+                self.stats["local_duplicates"] += 1
+            else:
+                pending[message_id] = i
+
+        # 3. Claim the remaining IDs atomically, one round trip
+        if pending and redis is not None:
+            try:
+                pipe = redis.pipeline(transaction=False)
+                for message_id in pending:
+                    pipe.set(self.key(message_id), "1", nx=True, ex=self.ttl_seconds)
+                claimed = await pipe.execute()
+                self.stats["redis_round_trips"] += 1
+
+                for (message_id, i), was_set in zip(pending.items(), claimed):
+                    if not was_set:
+                        duplicates[i] = True
+                        self.stats["redis_duplicates"] += 1
+                        logger.info(f"Duplicate message detected: {message_id}")
+            except Exception as e:
+                # Fail open: losing a customer message is worse than a retry
+                logger.warning(f"Redis deduplication failed, accepting messages: {e}")
+        elif pending:
+            logger.warning("Redis not available, deduplicating locally only")
+
+        for message_id in pending:
+            self.local_cache.add(message_id)
+
+        return duplicates
+
+
+# Global deduplicator instance (local tier is per worker process)
+_deduplicator: Optional[MessageDeduplicator] = None
+
+
+def get_message_deduplicator() -> MessageDeduplicator:
+    """Get or create the message deduplicator."""
+    global _deduplicator
+
+    if _deduplicator is None:
+        _deduplicator = MessageDeduplicator()
+
+    return _deduplicator
@@ -0,0 +1,284 @@
+"""Process-wide pooled Redis clients (sync and async) with connection metrics."""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from config.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class RedisPoolMetrics:
+    """Connection and command latency counters for one client."""
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters."""
+        with self._lock:
+            self.connections_created = 0
+            self.connections_closed = 0
+            self.commands = 0
+            self.errors = 0
+            self.total_latency_ms = 0.0
+            self.max_latency_ms = 0.0
+
+    def connection_created(self) -> None:
+        """Count one opened connection."""
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self) -> None:
+        """Count one closed connection."""
+        with self._lock:
+            self.connections_closed += 1
+
+    def record_command(self, latency_ms: float, failed: bool = False) -> None:
+        """Record one command round trip."""
+        with self._lock:
+            self.commands += 1
+            self.total_latency_ms += latency_ms
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+            if failed:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters as a dict."""
+        with self._lock:
+            return {
+                "connections_created": self.connections_created,
+                "connections_open": self.connections_created - self.connections_closed,
+                "commands": self.commands,
+                "errors": self.errors,
+                "avg_latency_ms": (self.total_latency_ms / self.commands if self.commands else 0.0),
+                "max_latency_ms": self.max_latency_ms,
+            }
+
+
+sync_metrics = RedisPoolMetrics()
+async_metrics = RedisPoolMetrics()
+
+
+class _CountingConnection(redis.Connection):
+    """Sync connection that reports opened/closed sockets."""
+
+    def on_connect(self) -> None:
+        """Count the socket once the handshake is done."""
+        super().on_connect()
+        sync_metrics.connection_created()
+
+    def disconnect(self, *args: Any) -> None:
+        """Count the socket if one was open."""
+        was_connected = self._sock is not None
+        super().disconnect(*args)
+        if was_connected:
+            sync_metrics.connection_closed()
+
+
+class _CountingAsyncConnection(aioredis.Connection):
+    """Async connection that reports opened/closed sockets."""
+
+    async def on_connect(self) -> None:
+        """Count the socket once the handshake is done."""
+        await super().on_connect()
+        async_metrics.connection_created()
+
+    async def disconnect(self, nowait: bool = False) -> None:
+        """Count the socket if one was open."""
+        was_connected = self.is_connected
+        await super().disconnect(nowait=nowait)
+        if was_connected:
+            async_metrics.connection_closed()
+
+
+class InstrumentedRedis(redis.Redis):
+    """Sync client that times every command."""
+
+    def execute_command(self, *args: Any, **options: Any) -> Any:
+        """Run the command and record its latency."""
+        start = time.perf_counter()
+        failed = False
+        try:
+            return super().execute_command(*args, **options)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            sync_metrics.record_command((time.perf_counter() - start) * 1000, failed)
+
+
+class InstrumentedAsyncRedis(aioredis.Redis):
+    """Async client that times every command."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        """Run the command and record its latency."""
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            async_metrics.record_command((time.perf_counter() - start) * 1000, failed)
+
+
+def _pool_kwargs(decode_responses: bool = True) -> Dict[str, Any]:
+    """Connection options shared by the pools."""
+    return {
+        "encoding": "utf-8",
+        "decode_responses": decode_responses,
+        "max_connections": settings.redis_max_connections,
+        "socket_timeout": settings.redis_socket_timeout,
+        "socket_connect_timeout": settings.redis_socket_connect_timeout,
+        "health_check_interval": settings.redis_health_check_interval,
+    }
+
+
+# Global pooled clients
+_sync_client: Optional[InstrumentedRedis] = None
+# Async clients per event loop, then keyed by decode_responses (text vs
+# binary values). Clients requested outside a running loop are unbound.
+_async_clients: "weakref.WeakKeyDictionary[Any, Dict[bool, InstrumentedAsyncRedis]]" = (
+    weakref.WeakKeyDictionary()
+)
+_unbound_clients: Dict[bool, InstrumentedAsyncRedis] = {}
+_lock = threading.Lock()
+
+
+def get_sync_redis() -> InstrumentedRedis:
+    """
+    Get the process-wide sync Redis client (Celery tasks, utilities).
+
+    Backed by a BlockingConnectionPool: when every connection is in use,
+    callers wait up to settings.redis_pool_timeout seconds instead of
+    failing. redis-py resets the pool after a fork, so prefork Celery
+    workers get their own connections.
+    """
+    global _sync_client
+
+    if _sync_client is None:
+        with _lock:
+            if _sync_client is None:
+                kwargs = _pool_kwargs()
+                if settings.redis_url.startswith("redis://"):
+                    kwargs["connection_class"] = _CountingConnection
+                pool = redis.BlockingConnectionPool.from_url(
+                    settings.redis_url,
+                    timeout=settings.redis_pool_timeout,
+                    **kwargs,
+                )
+                _sync_client = InstrumentedRedis(connection_pool=pool)
+                logger.info(
+                    f"Sync Redis pool created (max_connections={settings.redis_max_connections})"
+                )
+
+    return _sync_client
+
+
+def get_async_redis(decode_responses: bool = True) -> InstrumentedAsyncRedis:
+    """
+    Get the async Redis client of the running event loop (webhook, backend
+    client cache; binary variant for the session manager).
+
+    Async connections belong to the event loop that opened them, so each
+    loop gets its own pool. Pools of loops that have since been closed are
+    dropped here; code that runs a short-lived loop should call
+    close_loop_redis() before the loop ends so its sockets are closed
+    rather than left to the garbage collector.
+
+    Celery tasks are synchronous and must use get_sync_redis() instead of
+    wrapping this client in asyncio.run().
+
+    Args:
+        decode_responses: False for a client that returns raw bytes
+    """
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    with _lock:
+        _drop_closed_loops()
+
+        if loop is None:
+            clients = _unbound_clients
+        else:
+            clients = _async_clients.setdefault(loop, {})
+
+        client = clients.get(decode_responses)
+        if client is None:
+            kwargs = _pool_kwargs(decode_responses)
+            if settings.redis_url.startswith("redis://"):
+                kwargs["connection_class"] = _CountingAsyncConnection
+            pool = aioredis.ConnectionPool.from_url(settings.redis_url, **kwargs)
+            client = InstrumentedAsyncRedis(connection_pool=pool)
+            clients[decode_responses] = client
+            logger.info(
+                f"Async Redis pool created (max_connections={settings.redis_max_connections}, "
+                f"decode_responses={decode_responses})"
+            )
+
+    return client
+
+
+def _drop_closed_loops() -> None:
+    """Forget the pools of event loops that are closed (caller holds _lock)."""
+    for loop in [loop for loop in list(_async_clients.keys()) if loop.is_closed()]:
+        pools = [client.connection_pool for client in _async_clients.pop(loop, {}).values()]
+        if any(pool._available_connections or pool._in_use_connections for pool in pools):
+            logger.warning(
+                "Async Redis pool of a closed event loop dropped without "
+                "close_loop_redis(); its sockets are released by the garbage collector"
+            )
+
+
+async def close_loop_redis() -> None:
+    """Close the async pools of the running event loop."""
+    loop = asyncio.get_running_loop()
+
+    with _lock:
+        clients = list(_async_clients.pop(loop, {}).values())
+
+    for client in clients:
+        await client.aclose(close_connection_pool=True)
+
+
+def get_redis_pool_stats() -> Dict[str, Any]:
+    """Connection and latency metrics for both clients."""
+    return {
+        "max_connections": settings.redis_max_connections,
+        "sync": sync_metrics.snapshot(),
+        "async": async_metrics.snapshot(),
+    }
+
+
+async def close_redis_pools() -> None:
+    """Close every pool (application shutdown)."""
+    global _sync_client
+
+    loop = asyncio.get_running_loop()
+
+    with _lock:
+        sync_client, _sync_client = _sync_client, None
+        async_clients = list(_async_clients.pop(loop, {}).values())
+        async_clients.extend(_unbound_clients.values())
+        _unbound_clients.clear()
+        _drop_closed_loops()
+
+    if sync_client is not None:
+        sync_client.connection_pool.disconnect()
+    for async_client in async_clients:
+        await async_client.aclose(close_connection_pool=True)
+    logger.info("Redis pools closed")
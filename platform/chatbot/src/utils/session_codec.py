@@ -0,0 +1,132 @@
+"""
+Compact Redis layout for conversation sessions.
+
+A session is stored as:
+
+- ``sess:{phone}``: hash with one packed field per top-level SessionData
+  field (memory without its messages goes into the ``memory`` field), so a
+  turn only rewrites the fields that changed
+- ``sess:{phone}:mem``: list of packed messages, appended with RPUSH and
+  capped with LTRIM
+
+Values are packed with msgpack when available, JSON otherwise. Each value
+carries a one-byte format tag, so both encodings can be read regardless of
+which one wrote them.
+"""
+
+import json
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+MSGPACK_TAG = b"m"
+JSON_TAG = b"j"
+
+MEMORY_FIELD = "memory"
+MESSAGES_FIELD = "messages"
+
+
+def session_key(phone_number: str) -> str:
+    """Hash with the session fields."""
+    return f"sess:{phone_number}"
+
+
+def memory_key(phone_number: str) -> str:
+    """Capped list with the conversation messages."""
+    return f"sess:{phone_number}:mem"
+
+
+def legacy_session_key(phone_number: str) -> str:
+    """Single JSON blob used before the hash layout."""
+    return f"session:{phone_number}"
+
+
+def pack(value: Any) -> bytes:
+    """Encode a JSON-compatible value."""
+    if MSGPACK_AVAILABLE:
+        packed: bytes = msgpack.packb(value, use_bin_type=True)
+        return MSGPACK_TAG + packed
+    return JSON_TAG + json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def unpack(data: Union[bytes, str]) -> Any:
+    """Decode a value written by pack()."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    tag, payload = data[:1], data[1:]
+    if tag == MSGPACK_TAG:
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is required to read this session")
+        return msgpack.unpackb(payload, raw=False)
+    if tag == JSON_TAG:
+        return json.loads(payload)
+    raise ValueError(f"Unknown session value format: {tag!r}")
+
+
+def encode_session(data: Dict[str, Any]) -> Tuple[Dict[str, bytes], List[bytes]]:
+    """
+    Split a dumped session (model_dump(mode="json")) into hash fields and
+    packed messages.
+
+    Returns:
+        (fields, messages)
+    """
+    data = dict(data)
+    memory = dict(data.pop(MEMORY_FIELD, None) or {})
+    messages = memory.pop(MESSAGES_FIELD, None) or []
+
+    fields = {name: pack(value) for name, value in data.items()}
+    fields[MEMORY_FIELD] = pack(memory)
+    return fields, [pack(message) for message in messages]
+
+
+def decode_session(
+    fields: Mapping[Union[bytes, str], Union[bytes, str]],
+    messages: Sequence[Union[bytes, str]],
+) -> Dict[str, Any]:
+    """Rebuild the dict accepted by SessionData.model_validate."""
+    data = {
+        (name.decode("utf-8") if isinstance(name, bytes) else name): unpack(value)
+        for name, value in fields.items()
+    }
+    memory = dict(data.get(MEMORY_FIELD) or {})
+    memory[MESSAGES_FIELD] = [unpack(message) for message in messages]
+    data[MEMORY_FIELD] = memory
+    return data
+
+
+def changed_fields(
+    fields: Dict[str, bytes],
+    previous: Optional[Dict[str, bytes]],
+) -> Dict[str, bytes]:
+    """Fields whose packed value differs from the last stored version."""
+    if previous is None:
+        return dict(fields)
+    return {name: value for name, value in fields.items() if previous.get(name) != value}
+
+
+def messages_to_append(
+    messages: Sequence[bytes],
+    last_stored: Optional[bytes],
+) -> Optional[List[bytes]]:
+    """
+    Messages added since the last stored one.
+
+    Searches from the end, so the cost is proportional to the new messages,
+    not to the conversation length.
+
+    Returns:
+        Messages to RPUSH, or None when the stored list no longer matches
+        (memory was reset or compacted) and must be rewritten
+    """
+    if last_stored is None:
+        return list(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index] == last_stored:
+            return list(messages[index + 1 :])
+    return None
@@ -1,5 +1,16 @@
-"""Script to start Celery worker."""
+"""Script to start Celery worker.
 
+Two kinds of workers:
+
+- General (default): default, high_priority and low_priority queues.
+- Lane worker (WORKER_LANES="<index>/<count>", e.g. "0/4"): consumes the
+  per-user process_message lanes owned by this worker, one task at a time,
+  so each user's messages are processed in order. Run <count> lane workers
+  with indexes 0..count-1; throughput scales with the number of lane
+  workers (up to settings.message_lanes).
+"""
+
+import os
 import sys
 from pathlib import Path
 
@@ -8,11 +19,13 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from config.celery_config import celery_app
+from src.utils.lanes import lanes_for_worker
 
-if __name__ == "__main__":
-    # Start Celery worker with configuration
-    celery_app.worker_main(
-        argv=[
+
+def build_worker_argv(worker_lanes: str = "") -> list:
+    """Celery worker arguments for a general or lane worker."""
+    if not worker_lanes:
+        return [
             "worker",
             "--loglevel=info",
             "--concurrency=4",
@@ -20,4 +33,21 @@ if __name__ == "__main__":
             "--queues=default,high_priority,low_priority",
             "--hostname=worker@%h",
         ]
-    )
+
+    worker_index, worker_count = (int(part) for part in worker_lanes.split("/"))
+    queues = lanes_for_worker(worker_index, worker_count)
+    return [
+        "worker",
+        "--loglevel=info",
+        # One process and no prefetch: a lane's tasks run strictly in order
+        "--concurrency=1",
+        "--prefetch-multiplier=1",
+        "--max-tasks-per-child=1000",
+        f"--queues={','.join(queues)}",
+        f"--hostname=lanes{worker_index}@%h",
+    ]
+
+
+if __name__ == "__main__":
+    # Start Celery worker with configuration
+    celery_app.worker_main(argv=build_worker_argv(os.getenv("WORKER_LANES", "")))
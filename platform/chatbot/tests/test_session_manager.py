@@ -246,3 +246,31 @@ async def test_consent_management(session_manager):
     assert session.consent_given
     assert session.consent_timestamp is not None
     assert isinstance(session.consent_timestamp, datetime)
+
+
+@pytest.mark.asyncio
+async def test_session_not_loaded_here_is_written_in_full(session_manager, redis_client):
+    """A session object this manager did not load overwrites every field."""
+    phone = "+5511999999999"
+    other_process = SessionManager(redis_client=redis_client, duckdb_path=":memory:")
+    
+    session = await session_manager.get_or_create_session(phone)
+    session.add_message("user", "Olá!")
+    await session_manager.update_session(session)
+    snapshot = session.model_dump(mode="json")
+    
+    # Another process moves the session on
+    theirs = await other_process.get_session(phone)
+    theirs.state = SessionState.COLLECTING_PROFILE
+    await other_process.update_session(theirs)
+    
+    # This process writes a copy of its older version
+    copy = SessionData.model_validate(snapshot)
+    copy.turn_id = theirs.turn_id
+    copy.user_profile.orcamento_max = 90000.0
+    await session_manager.update_session(copy)
+    
+    stored = await other_process.get_session(phone)
+    assert stored.state == SessionState.GREETING
+    assert stored.user_profile.orcamento_max == 90000.0
+    assert stored.turn_id == copy.turn_id
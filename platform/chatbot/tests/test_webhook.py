@@ -3,7 +3,7 @@
 import hashlib
 import hmac
 import json
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi.testclient import TestClient
@@ -109,7 +109,7 @@ class TestWebhookReceive:
             ],
         }
 
-    @patch("src.api.webhook.is_duplicate_message")
+    @patch("src.api.webhook.find_duplicate_messages")
     @patch("src.api.webhook.queue_message_processing")
     def test_receive_webhook_success(
         self,
@@ -120,7 +120,7 @@ class TestWebhookReceive:
     ):
         """Test successful webhook message reception."""
         # Mock deduplication check
-        mock_duplicate.return_value = False
+        mock_duplicate.return_value = [False]
         mock_queue.return_value = None
 
         # Create payload and signature
@@ -184,6 +184,25 @@ class TestWebhookReceive:
         assert response.status_code == 400
 
 
+def make_redis_mock(claimed):
+    """Async Redis mock whose pipeline returns the given SET NX results."""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=claimed)
+    redis = MagicMock()
+    redis.pipeline.return_value = pipe
+    return redis, pipe
+
+
+@pytest.fixture(autouse=True)
+def fresh_deduplicator():
+    """Each test starts with an empty local front tier."""
+    import src.utils.message_dedup as message_dedup
+
+    message_dedup._deduplicator = None
+    yield
+    message_dedup._deduplicator = None
+
+
 class TestMessageDeduplication:
     """Test message deduplication."""
 
@@ -193,15 +212,17 @@ class TestMessageDeduplication:
         """Test duplicate message detection."""
         from src.api.webhook import is_duplicate_message
 
-        # Mock Redis client
-        mock_redis_instance = AsyncMock()
-        mock_redis_instance.exists.return_value = True
+        # SET NX returns None when the key already exists
+        mock_redis_instance, pipe = make_redis_mock([None])
         mock_redis.return_value = mock_redis_instance
 
         result = await is_duplicate_message("test_message_id")
 
         assert result is True
-        mock_redis_instance.exists.assert_called_once()
+        pipe.set.assert_called_once_with(
+            "msg_processed:test_message_id", "1", nx=True, ex=86400
+        )
+        pipe.execute.assert_awaited_once()
 
     @pytest.mark.asyncio
     @patch("src.api.webhook.get_redis_client")
@@ -209,14 +230,111 @@ class TestMessageDeduplication:
         """Test new message is not duplicate."""
         from src.api.webhook import is_duplicate_message
 
-        # Mock Redis client
-        mock_redis_instance = AsyncMock()
-        mock_redis_instance.exists.return_value = False
-        mock_redis_instance.setex.return_value = True
+        mock_redis_instance, pipe = make_redis_mock([True])
         mock_redis.return_value = mock_redis_instance
 
         result = await is_duplicate_message("test_message_id")
 
         assert result is False
-        mock_redis_instance.exists.assert_called_once()
-        mock_redis_instance.setex.assert_called_once()
+        pipe.set.assert_called_once()
+        pipe.execute.assert_awaited_once()
+        mock_redis_instance.exists.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("src.api.webhook.get_redis_client")
+    async def test_batch_uses_single_round_trip(self, mock_redis):
+        """The whole payload is claimed with one pipelined batch."""
+        from src.api.webhook import find_duplicate_messages
+
+        mock_redis_instance, pipe = make_redis_mock([True, None, True])
+        mock_redis.return_value = mock_redis_instance
+
+        result = await find_duplicate_messages(["a", "b", "a", "c"])
+
+        # "a" repeated in the payload; "b" already claimed by another worker
+        assert result == [False, True, True, False]
+        assert pipe.set.call_count == 3
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("src.api.webhook.get_redis_client")
+    async def test_local_tier_absorbs_redelivery(self, mock_redis):
+        """Redelivered messages are rejected without touching Redis."""
+        from src.api.webhook import find_duplicate_messages
+
+        mock_redis_instance, pipe = make_redis_mock([True, True])
+        mock_redis.return_value = mock_redis_instance
+
+        assert await find_duplicate_messages(["a", "b"]) == [False, False]
+        assert await find_duplicate_messages(["a", "b"]) == [True, True]
+        assert await find_duplicate_messages(["b"]) == [True]
+
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("src.api.webhook.get_redis_client")
+    async def test_redis_unavailable_dedupes_locally(self, mock_redis):
+        """Without Redis, messages are accepted once per worker."""
+        from src.api.webhook import find_duplicate_messages
+
+        mock_redis.return_value = None
+
+        assert await find_duplicate_messages(["a"]) == [False]
+        assert await find_duplicate_messages(["a"]) == [True]
+
+    @pytest.mark.asyncio
+    @patch("src.api.webhook.get_redis_client")
+    async def test_redis_error_fails_open(self, mock_redis):
+        """A Redis error must not drop customer messages."""
+        from src.api.webhook import find_duplicate_messages
+
+        mock_redis_instance, pipe = make_redis_mock([])
+        pipe.execute.side_effect = ConnectionError("redis down")
+        mock_redis.return_value = mock_redis_instance
+
+        assert await find_duplicate_messages(["a", "b"]) == [False, False]
+
+    @patch("src.api.webhook.get_redis_client")
+    @patch("src.api.webhook.queue_message_processing")
+    def test_webhook_skips_duplicates_in_payload(self, mock_queue, mock_redis, client):
+        """Messages repeated in one payload are queued once."""
+        mock_redis_instance, pipe = make_redis_mock([True, True])
+        mock_redis.return_value = mock_redis_instance
+        mock_queue.return_value = None
+
+        def message(message_id):
+            return {
+                "from": "5511999999999",
+                "id": message_id,
+                "timestamp": "1234567890",
+                "text": {"body": "Oi"},
+                "type": "text",
+            }
+
+        payload = {
+            "object": "whatsapp_business_account",
+            "entry": [
+                {
+                    "id": "123",
+                    "changes": [
+                        {"field": "messages", "value": {"messages": [message("m1"), message("m2")]}},
+                        {"field": "messages", "value": {"messages": [message("m1")]}},
+                    ],
+                }
+            ],
+        }
+        payload_str = json.dumps(payload)
+
+        response = client.post(
+            "/webhook/whatsapp",
+            content=payload_str,
+            headers={
+                "Content-Type": "application/json",
+                "X-Hub-Signature-256": create_signature(payload_str, settings.whatsapp_webhook_secret),
+            },
+        )
+
+        assert response.status_code == 200
+        queued = [call.args[0].message_id for call in mock_queue.call_args_list]
+        assert queued == ["m1", "m2"]
+        pipe.execute.assert_awaited_once()
@@ -0,0 +1,338 @@
+"""Unit tests for the batched DuckDB writer."""
+
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import duckdb
+import pytest
+
+from src.utils.duckdb_writer import DuckDBWriter, get_duckdb_writer
+
+# Same tables SessionManager creates
+SCHEMA = [
+    """
+    CREATE TABLE archived_sessions (
+        session_id VARCHAR PRIMARY KEY,
+        phone_number VARCHAR NOT NULL,
+        state VARCHAR NOT NULL,
+        turn_id INTEGER NOT NULL,
+        user_profile JSON,
+        memory_summary TEXT,
+        qualification_score DOUBLE,
+        completeness DOUBLE,
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE message_history (
+        id INTEGER PRIMARY KEY,
+        session_id VARCHAR NOT NULL,
+        role VARCHAR NOT NULL,
+        content TEXT NOT NULL,
+        timestamp TIMESTAMP NOT NULL,
+        FOREIGN KEY (session_id) REFERENCES archived_sessions(session_id)
+    )
+    """,
+    "CREATE INDEX idx_sessions_phone ON archived_sessions(phone_number)",
+    "CREATE INDEX idx_sessions_updated ON archived_sessions(updated_at)",
+    "CREATE INDEX idx_messages_session ON message_history(session_id)",
+    "CREATE SEQUENCE message_history_id_seq",
+]
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def session_row(session_id, turn_id=1, state="greeting", phone="5511999999999", updated_at=NOW):
+    return (session_id, phone, state, turn_id, "{}", "", 0.0, 0.0, NOW, updated_at)
+
+
+def message_rows(session_id, count):
+    return [(session_id, "user", f"message {i}", NOW + timedelta(seconds=i)) for i in range(count)]
+
+
+def make_writer(path, **kwargs):
+    kwargs.setdefault("batch_size", 1000)
+    kwargs.setdefault("flush_interval", 60)
+    writer = DuckDBWriter(str(path), **kwargs)
+    for statement in SCHEMA:
+        writer.execute(statement)
+    return writer
+
+
+def fetch(writer, sql):
+    with writer.reader() as conn:
+        return conn.execute(sql).fetchall()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "sessions.duckdb"
+
+
+@pytest.fixture
+def writer(db_path):
+    writer = make_writer(db_path)
+    yield writer
+    writer.close()
+
+
+class TestFlush:
+    """Tests for buffered writes."""
+
+    def test_nothing_written_before_flush(self, writer):
+        """Rows stay in memory until the flush."""
+        writer.enqueue_session(session_row("s1"))
+
+        assert fetch(writer, "SELECT count(*) FROM archived_sessions") == [(0,)]
+        assert writer.pending() == 1
+
+    def test_sessions_and_messages_in_one_batch(self, writer):
+        """Sessions are written before the messages that reference them."""
+        writer.enqueue_messages(message_rows("s1", 3))
+        writer.enqueue_session(session_row("s1"))
+
+        assert writer.flush() == 4
+
+        assert fetch(writer, "SELECT count(*) FROM archived_sessions") == [(1,)]
+        assert fetch(writer, "SELECT id, content FROM message_history ORDER BY id") == [
+            (1, "message 0"),
+            (2, "message 1"),
+            (3, "message 2"),
+        ]
+        assert writer.pending() == 0
+        assert writer.stats["flushes"] == 1
+
+    def test_session_turns_are_coalesced(self, writer):
+        """Only the last turn of a session in a batch is written."""
+        for turn in range(1, 11):
+            writer.enqueue_session(session_row("s1", turn_id=turn))
+
+        assert writer.flush() == 1
+        assert fetch(writer, "SELECT turn_id FROM archived_sessions") == [(10,)]
+        assert writer.stats["coalesced_sessions"] == 9
+
+    def test_upsert_after_messages_were_archived(self, writer):
+        """A session with archived messages can still be updated."""
+        writer.enqueue_session(session_row("s1"))
+        writer.enqueue_messages(message_rows("s1", 2))
+        writer.flush()
+
+        writer.enqueue_session(
+            session_row(
+                "s1", turn_id=7, state="recommendation", updated_at=NOW + timedelta(hours=1)
+            )
+        )
+        assert writer.flush() == 1
+
+        assert fetch(writer, "SELECT turn_id, state FROM archived_sessions") == [
+            (7, "recommendation")
+        ]
+
+    def test_failed_batch_is_dropped(self, writer):
+        """A batch that violates a constraint does not block later batches."""
+        writer.enqueue_messages(message_rows("unknown", 1))
+        assert writer.flush() == 0
+        assert writer.stats["failed_batches"] == 1
+
+        writer.enqueue_session(session_row("s1"))
+        assert writer.flush() == 1
+
+    def test_only_the_bad_row_is_dropped(self, writer):
+        """Rows of other sessions in a failed batch are still written."""
+        writer.enqueue_session(session_row("s1"))
+        writer.enqueue_session(session_row("s2"))
+        writer.enqueue_messages(message_rows("s1", 2))
+        writer.enqueue_messages(message_rows("unknown", 1))
+        writer.enqueue_messages(message_rows("s2", 1))
+
+        assert writer.flush() == 5
+
+        assert writer.stats["failed_batches"] == 1
+        assert writer.stats["dropped_rows"] == 1
+        assert fetch(writer, "SELECT count(*) FROM archived_sessions") == [(2,)]
+        assert fetch(
+            writer, "SELECT session_id, count(*) FROM message_history GROUP BY 1 ORDER BY 1"
+        ) == [("s1", 2), ("s2", 1)]
+
+    def test_large_batch_is_chunked(self, writer):
+        """Batches larger than one VALUES statement are fully written."""
+        writer.enqueue_session(session_row("s1"))
+        writer.enqueue_messages(message_rows("s1", 1203))
+
+        assert writer.flush() == 1204
+        assert fetch(writer, "SELECT count(*) FROM message_history") == [(1203,)]
+
+
+class TestBackgroundFlush:
+    """Tests for size and time thresholds."""
+
+    @staticmethod
+    def wait_for(condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_size_threshold(self, db_path):
+        """Reaching batch_size wakes the flusher."""
+        writer = make_writer(db_path, batch_size=5, flush_interval=60)
+        try:
+            for i in range(5):
+                writer.enqueue_session(session_row(f"s{i}"))
+
+            assert self.wait_for(lambda: writer.stats["session_rows"] == 5)
+        finally:
+            writer.close()
+
+    def test_time_threshold(self, db_path):
+        """Small batches are flushed after flush_interval."""
+        writer = make_writer(db_path, batch_size=1000, flush_interval=0.05)
+        try:
+            writer.enqueue_session(session_row("s1"))
+
+            assert self.wait_for(lambda: writer.stats["session_rows"] == 1)
+            assert fetch(writer, "SELECT count(*) FROM archived_sessions") == [(1,)]
+        finally:
+            writer.close()
+
+    def test_close_flushes_pending_rows(self, tmp_path):
+        """Pending rows are written on close."""
+        path = str(tmp_path / "sessions.duckdb")
+        writer = get_duckdb_writer(path)
+        for statement in SCHEMA:
+            writer.execute(statement)
+        writer.enqueue_session(session_row("s1"))
+
+        assert get_duckdb_writer(path) is writer
+        writer.close()
+
+        reopened = get_duckdb_writer(path)
+        assert reopened is not writer
+        try:
+            assert fetch(reopened, "SELECT session_id FROM archived_sessions") == [("s1",)]
+        finally:
+            reopened.close()
+
+
+class TestSharedFile:
+    """Tests for several processes writing the same file."""
+
+    @staticmethod
+    def hold_file(path):
+        """Open the file read-write in another process until stdin closes."""
+        holder = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "import duckdb, sys; conn = duckdb.connect(sys.argv[1]); "
+                "print('ready', flush=True); sys.stdin.read()",
+                str(path),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        assert holder.stdout.readline().strip() == "ready"
+        return holder
+
+    @staticmethod
+    def release(holder):
+        holder.stdin.close()
+        holder.wait(timeout=10)
+
+    def test_file_is_free_between_flushes(self, writer, db_path):
+        """Another process can open the file once a flush is done."""
+        writer.enqueue_session(session_row("s1"))
+        writer.flush()
+
+        with writer.reader() as conn:
+            conn.execute("SELECT 1").fetchall()
+
+        self.release(self.hold_file(db_path))
+
+    def test_busy_file_keeps_the_batch(self, db_path):
+        """A batch that can't get the file lock is retried on the next flush."""
+        writer = make_writer(db_path, lock_timeout=0.1)
+        try:
+            holder = self.hold_file(db_path)
+            try:
+                writer.enqueue_session(session_row("s1", turn_id=1))
+                assert writer.flush() == 0
+                writer.enqueue_session(session_row("s1", turn_id=2))
+                writer.enqueue_messages(message_rows("s1", 1))
+            finally:
+                self.release(holder)
+
+            assert writer.stats["deferred_batches"] == 1
+            assert writer.pending() == 2
+            assert writer.flush() == 2
+            assert fetch(writer, "SELECT turn_id FROM archived_sessions") == [(2,)]
+        finally:
+            writer.close()
+
+    def test_readers_share_the_file(self, writer, db_path):
+        """Reads are read-only: another process can read at the same time."""
+        with writer.reader() as conn:
+            conn.execute("SELECT count(*) FROM archived_sessions").fetchall()
+            reader = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    "import duckdb, sys; duckdb.connect(sys.argv[1], read_only=True)",
+                    str(db_path),
+                ],
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+
+        assert reader.returncode == 0, reader.stderr
+
+    def test_flush_waits_for_readers_of_this_process(self, writer):
+        """A flush started while a read is open runs once the read ends."""
+        writer.enqueue_session(session_row("s1"))
+        flushed = []
+
+        with writer.reader():
+            flusher = threading.Thread(target=lambda: flushed.append(writer.flush()))
+            flusher.start()
+            time.sleep(0.1)
+            assert flushed == []
+        flusher.join(timeout=5)
+
+        assert flushed == [1]
+
+    def test_busy_file_fails_reads(self, writer, db_path):
+        """Reads give up after lock_timeout."""
+        writer.lock_timeout = 0.1
+        holder = self.hold_file(db_path)
+        try:
+            with pytest.raises(duckdb.IOException):
+                with writer.reader():
+                    pass
+        finally:
+            self.release(holder)
+
+
+class TestMemoryDatabase:
+    """ ":memory:" keeps its only connection open."""
+
+    def test_round_trip(self):
+        """Writes and reads share the private database."""
+        writer = DuckDBWriter(":memory:", batch_size=1000, flush_interval=60)
+        try:
+            for statement in SCHEMA:
+                writer.execute(statement)
+            writer.enqueue_session(session_row("s1"))
+            writer.flush()
+
+            assert fetch(writer, "SELECT session_id FROM archived_sessions") == [("s1",)]
+        finally:
+            writer.close()
@@ -0,0 +1,90 @@
+"""Unit tests for per-user message lanes."""
+
+from collections import Counter
+
+import pytest
+
+from src.utils.lanes import (
+    jump_consistent_hash,
+    lane_for,
+    lane_queue_for,
+    lane_queues,
+    lanes_for_worker,
+    route_message_task,
+)
+
+PHONES = [f"55119{n:08d}" for n in range(20000)]
+
+
+class TestLaneAssignment:
+    """Tests for the phone number -> lane mapping."""
+
+    def test_same_user_same_lane(self):
+        """A user always lands on the same lane."""
+        assert lane_for("5511999999999", 16) == lane_for("5511999999999", 16)
+        assert lane_queue_for("5511999999999", 16) == f"lane.{lane_for('5511999999999', 16)}"
+
+    def test_known_value_is_process_independent(self):
+        """The mapping must not depend on PYTHONHASHSEED."""
+        assert jump_consistent_hash(0, 16) == 0
+        assert [jump_consistent_hash(key, 8) for key in (1, 2, 3, 256)] == [6, 6, 3, 3]
+        assert [
+            lane_for(phone, 16) for phone in ("5511999999999", "5521988887777", "5531977776666")
+        ] == [5, 8, 2]
+        assert lane_for("5511999999999", 1) == 0
+
+    def test_lanes_are_balanced(self):
+        """Users spread evenly across lanes."""
+        counts = Counter(lane_for(phone, 16) for phone in PHONES)
+
+        assert set(counts) == set(range(16))
+        expected = len(PHONES) / 16
+        assert all(abs(count - expected) < expected * 0.15 for count in counts.values())
+
+    def test_adding_a_lane_moves_few_users(self):
+        """Going from 16 to 17 lanes only moves ~1/17 of the users."""
+        moved = sum(lane_for(phone, 16) != lane_for(phone, 17) for phone in PHONES)
+        moved_to_new_lane = sum(lane_for(phone, 17) == 16 for phone in PHONES)
+
+        assert moved == moved_to_new_lane
+        assert moved < len(PHONES) * 0.08
+
+    def test_invalid_bucket_count(self):
+        """At least one lane is required."""
+        with pytest.raises(ValueError):
+            jump_consistent_hash(1, 0)
+
+
+class TestLaneWorkers:
+    """Tests for splitting lanes between workers."""
+
+    @pytest.mark.parametrize("worker_count", [1, 3, 4, 16])
+    def test_every_lane_has_exactly_one_owner(self, worker_count):
+        """Lanes are partitioned, never shared between workers."""
+        owned = [
+            queue
+            for worker_index in range(worker_count)
+            for queue in lanes_for_worker(worker_index, worker_count, lanes=16)
+        ]
+
+        assert sorted(owned) == sorted(lane_queues(16))
+
+    def test_invalid_worker_index(self):
+        """Worker index must be below the worker count."""
+        with pytest.raises(ValueError):
+            lanes_for_worker(2, 2, lanes=16)
+
+
+class TestRouter:
+    """Tests for the Celery router."""
+
+    def test_process_message_goes_to_user_lane(self):
+        """process_message is routed by from_number."""
+        route = route_message_task("process_message", (), {"from_number": "5511999999999"}, {})
+
+        assert route == {"queue": lane_queue_for("5511999999999")}
+
+    def test_other_tasks_keep_default_routing(self):
+        """Other tasks are not routed to lanes."""
+        assert route_message_task("save_session_to_duckdb", (), {"session_id": "s"}, {}) is None
+        assert route_message_task("process_message", (), {}, {}) is None
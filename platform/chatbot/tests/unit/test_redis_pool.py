@@ -0,0 +1,158 @@
+"""Unit tests for the shared Redis connection pool."""
+
+import asyncio
+
+import pytest
+import redis
+
+import src.utils.redis_pool as redis_pool
+from config.settings import get_settings
+from src.utils.idempotency import (
+    DebounceManager,
+    DeduplicationManager,
+    IdempotencyManager,
+)
+from src.utils.redis_pool import (
+    InstrumentedRedis,
+    RedisPoolMetrics,
+    close_loop_redis,
+    get_async_redis,
+    get_redis_pool_stats,
+    get_sync_redis,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    """Each test starts without pooled clients."""
+    redis_pool._sync_client = None
+    redis_pool._async_clients.clear()
+    redis_pool._unbound_clients.clear()
+    yield
+    redis_pool._sync_client = None
+    redis_pool._async_clients.clear()
+    redis_pool._unbound_clients.clear()
+
+
+class TestSharedClients:
+    """Tests for the process-wide clients."""
+
+    def test_sync_client_is_shared(self):
+        """Repeated calls reuse one pooled client."""
+        client = get_sync_redis()
+
+        assert get_sync_redis() is client
+        assert isinstance(client.connection_pool, redis.BlockingConnectionPool)
+        assert client.connection_pool.max_connections == get_settings().redis_max_connections
+
+    def test_managers_share_the_pool(self):
+        """Utilities no longer open their own connections."""
+        client = get_sync_redis()
+
+        assert IdempotencyManager().redis is client
+        assert DebounceManager().redis is client
+        assert DeduplicationManager().redis is client
+
+    def test_explicit_client_still_accepted(self):
+        """An injected client takes precedence over the pool."""
+        custom = object()
+
+        assert IdempotencyManager(redis_client=custom).redis is custom
+
+    def test_async_client_is_shared_within_a_loop(self):
+        """Same loop, same client; a new loop gets its own pool."""
+
+        async def get_twice():
+            return get_async_redis(), get_async_redis()
+
+        first, second = asyncio.run(get_twice())
+        other_loop, _ = asyncio.run(get_twice())
+
+        assert first is second
+        assert other_loop is not first
+
+    def test_loops_keep_their_own_pools(self):
+        """A second loop does not discard the pool of a loop still running."""
+        loop = asyncio.new_event_loop()
+
+        async def get_client():
+            return get_async_redis()
+
+        try:
+            first = loop.run_until_complete(get_client())
+            other = asyncio.run(get_client())
+
+            assert other is not first
+            assert loop.run_until_complete(get_client()) is first
+        finally:
+            loop.close()
+
+    def test_closed_loops_are_forgotten(self):
+        """Pools of finished loops are not kept alive."""
+
+        async def get_client():
+            return get_async_redis()
+
+        asyncio.run(get_client())
+        get_async_redis()
+
+        assert len(redis_pool._async_clients) == 0
+
+    def test_close_loop_redis(self):
+        """A short-lived loop can close its own pools before it ends."""
+
+        async def run_task():
+            client = get_async_redis()
+            await close_loop_redis()
+            return client
+
+        client = asyncio.run(run_task())
+
+        assert len(redis_pool._async_clients) == 0
+        assert client.connection_pool._available_connections == []
+
+    def test_binary_client_has_its_own_pool(self):
+        """Binary values (session codec) need decode_responses=False."""
+        text = get_async_redis()
+        binary = get_async_redis(decode_responses=False)
+
+        assert binary is not text
+        assert get_async_redis(decode_responses=False) is binary
+        assert binary.connection_pool.connection_kwargs["decode_responses"] is False
+
+
+class TestMetrics:
+    """Tests for connection and latency metrics."""
+
+    def test_snapshot(self):
+        """Counters are aggregated into the snapshot."""
+        metrics = RedisPoolMetrics()
+        metrics.connection_created()
+        metrics.connection_created()
+        metrics.connection_closed()
+        metrics.record_command(2.0)
+        metrics.record_command(4.0, failed=True)
+
+        snapshot = metrics.snapshot()
+
+        assert snapshot["connections_created"] == 2
+        assert snapshot["connections_open"] == 1
+        assert snapshot["commands"] == 2
+        assert snapshot["errors"] == 1
+        assert snapshot["avg_latency_ms"] == pytest.approx(3.0)
+        assert snapshot["max_latency_ms"] == pytest.approx(4.0)
+
+    def test_failed_command_is_recorded(self):
+        """Commands are timed even when the server is unreachable."""
+        redis_pool.sync_metrics.reset()
+        client = InstrumentedRedis(
+            connection_pool=redis.ConnectionPool(port=1, socket_connect_timeout=0.5)
+        )
+
+        with pytest.raises(redis.ConnectionError):
+            client.get("key")
+
+        stats = get_redis_pool_stats()["sync"]
+        assert stats["commands"] == 1
+        assert stats["errors"] == 1
+        assert stats["connections_created"] == 0
@@ -0,0 +1,115 @@
+"""Unit tests for the compact Redis session layout."""
+
+import pytest
+
+import src.utils.session_codec as session_codec
+from src.utils.session_codec import (
+    changed_fields,
+    decode_session,
+    encode_session,
+    memory_key,
+    messages_to_append,
+    pack,
+    session_key,
+    unpack,
+)
+
+SESSION = {
+    "session_id": "5511999999999:1700000000",
+    "phone_number": "5511999999999",
+    "state": "discovery",
+    "turn_id": 3,
+    "user_profile": {"budget_max": 80000.0, "usage": ["família"]},
+    "memory": {
+        "summary": "",
+        "messages": [
+            {"role": "user", "content": "Oi", "timestamp": "2024-01-01T12:00:00"},
+            {"role": "assistant", "content": "Olá!", "timestamp": "2024-01-01T12:00:01"},
+        ],
+    },
+}
+
+
+@pytest.fixture(params=["json", "msgpack"])
+def codec(request, monkeypatch):
+    """Run each test with both encodings."""
+    if request.param == "msgpack":
+        pytest.importorskip("msgpack")
+    else:
+        monkeypatch.setattr(session_codec, "MSGPACK_AVAILABLE", False)
+    return request.param
+
+
+class TestPacking:
+    """Tests for single values."""
+
+    def test_round_trip(self, codec):
+        """Values come back unchanged, non-ASCII included."""
+        value = {"content": "Quero um SUV econômico", "score": 0.75, "tags": [1, None, True]}
+
+        assert unpack(pack(value)) == value
+
+    def test_str_input_is_accepted(self, codec):
+        """Text clients return str; JSON values still decode."""
+        if codec == "msgpack":
+            pytest.skip("binary values need a binary client")
+
+        assert unpack(pack([1, 2]).decode("utf-8")) == [1, 2]
+
+    def test_unknown_format(self):
+        """Values without a known tag are rejected."""
+        with pytest.raises(ValueError):
+            unpack(b'{"state": "greeting"}')
+
+
+class TestSessionLayout:
+    """Tests for the hash + list split."""
+
+    def test_keys(self):
+        """The message list lives next to the hash."""
+        assert session_key("5511") == "sess:5511"
+        assert memory_key("5511") == "sess:5511:mem"
+
+    def test_round_trip(self, codec):
+        """Messages leave the hash and come back in order."""
+        fields, messages = encode_session(SESSION)
+
+        assert len(messages) == 2
+        assert unpack(fields["memory"]) == {"summary": ""}
+
+        assert decode_session(fields, messages) == SESSION
+
+    def test_bytes_field_names(self, codec):
+        """HGETALL on a binary client returns bytes names."""
+        fields, messages = encode_session(SESSION)
+        raw = {name.encode("utf-8"): value for name, value in fields.items()}
+
+        assert decode_session(raw, messages) == SESSION
+
+    def test_only_changed_fields(self, codec):
+        """A turn rewrites the fields it touched."""
+        previous, _ = encode_session(SESSION)
+        fields, _ = encode_session({**SESSION, "turn_id": 4, "state": "recommendation"})
+
+        assert set(changed_fields(fields, previous)) == {"turn_id", "state"}
+        assert changed_fields(fields, None) == fields
+
+
+class TestMessagesToAppend:
+    """Tests for the RPUSH delta."""
+
+    def test_new_messages(self):
+        """Messages after the last stored one are appended."""
+        assert messages_to_append([b"a", b"b", b"c"], b"a") == [b"b", b"c"]
+
+    def test_nothing_new(self):
+        """No RPUSH when the last message is already stored."""
+        assert messages_to_append([b"a", b"b"], b"b") == []
+
+    def test_empty_list(self):
+        """Everything is appended to an empty list."""
+        assert messages_to_append([b"a", b"b"], None) == [b"a", b"b"]
+
+    def test_reset_memory(self):
+        """A list that no longer matches must be rewritten."""
+        assert messages_to_append([b"x", b"y"], b"a") is None